@@ -12,8 +12,9 @@ import uuid
 import models
 
 from python.helpers import extract_tools, files, errors, history, tokens, context as context_helper
-from python.helpers import dirty_json
+from python.helpers import dirty_json, util_scheduler
 from python.helpers.print_style import PrintStyle
+from python.helpers.batch_queue import QueueFullError
 
 from langchain_core.prompts import (
     ChatPromptTemplate,
@@ -711,17 +712,60 @@ class Agent:
         }
         await self.call_extensions("util_model_call_before", call_data=call_data)
 
+        # an extension may answer the call itself (e.g. from the response cache)
+        if call_data.get("response") is not None:
+            if call_data["callback"]:
+                await call_data["callback"](call_data["response"])
+            return call_data["response"]
+
+        model = call_data["model"]
+        model_name = getattr(model, "model_name", "") or str(type(model))
+        streamed = False
+
         # propagate stream to callback if set
         async def stream_callback(chunk: str, total: str):
+            nonlocal streamed
+            streamed = True
             if call_data["callback"]:
                 await call_data["callback"](chunk)
 
-        response, _reasoning = await call_data["model"].unified_call(
-            system_message=call_data["system"],
-            user_message=call_data["message"],
-            response_callback=stream_callback if call_data["callback"] else None,
-            rate_limiter_callback=self.rate_limiter_callback if not call_data["background"] else None,
-        )
+        async def run():
+            response, _reasoning = await model.unified_call(
+                system_message=call_data["system"],
+                user_message=call_data["message"],
+                response_callback=stream_callback if call_data["callback"] else None,
+                rate_limiter_callback=self.rate_limiter_callback if not call_data["background"] else None,
+            )
+            return response
+
+        async def pack(items: list[util_scheduler.PackItem]):
+            response, _reasoning = await model.unified_call(
+                system_message=self.read_prompt("fw.util_pack.sys.md"),
+                user_message=util_scheduler.pack_message(items),
+            )
+            return util_scheduler.unpack_response(response, len(items))
+
+        # identical calls in flight are shared, foreground calls go first,
+        # small callback-less prompts may be packed with others
+        try:
+            response = await util_scheduler.get_scheduler(model_name).call(
+                util_scheduler.make_key(model_name, call_data["system"], call_data["message"]),
+                run,
+                priority=util_scheduler.BACKGROUND if call_data["background"] else util_scheduler.FOREGROUND,
+                pack_item=None if call_data["callback"] else util_scheduler.PackItem(call_data["system"], call_data["message"]),
+                pack=pack,
+            )
+        except QueueFullError:
+            # callers (compression, recall, memorization...) don't expect a
+            # full queue, past the waiting limit the call is made directly
+            response = await run()
+
+        # response shared from another call, hand it to the callback at once
+        if call_data["callback"] and not streamed and response:
+            await call_data["callback"](response)
+
+        if call_data.get("on_response"):
+            await call_data["on_response"](response)
 
         return response
 
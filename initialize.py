@@ -1,6 +1,7 @@
+import asyncio
 from agent import AgentConfig
 import models
-from python.helpers import runtime, settings, defer
+from python.helpers import runtime, settings, defer, startup
 from python.helpers.print_style import PrintStyle
 
 
@@ -123,22 +124,32 @@ def initialize_chats():
     from python.helpers import persist_chat
     async def initialize_chats_async():
         persist_chat.load_tmp_chats()
-    return defer.DeferredTask().start_task(initialize_chats_async)
+    return startup.warm("chats", initialize_chats_async)
 
 def initialize_mcp():
     set = settings.get_settings()
     async def initialize_mcp_async():
         from python.helpers.mcp_handler import initialize_mcp as _initialize_mcp
         return _initialize_mcp(set["mcp_servers"])
-    return defer.DeferredTask().start_task(initialize_mcp_async)
+    return startup.warm("mcp", initialize_mcp_async)
+
+def initialize_models():
+    # import LiteLLM now instead of on the first model call, on a thread to keep the loop free
+    async def initialize_models_async():
+        await asyncio.to_thread(startup.load, models.litellm)
+    return startup.warm("models", initialize_models_async)
 
 def initialize_job_loop():
     from python.helpers.job_loop import run_loop
-    return defer.DeferredTask("JobLoop").start_task(run_loop)
+    async def run_loop_after_chats():
+        # scheduled tasks run in chats, which load in the background
+        await startup.wait_ready(["chats"])
+        await run_loop()
+    return defer.DeferredTask("JobLoop").start_task(run_loop_after_chats)
 
 def initialize_preload():
     import preload
-    return defer.DeferredTask().start_task(preload.preload)
+    return startup.warm("preload", preload.preload)
 
 
 def _args_override(config):
@@ -14,11 +14,6 @@ from typing import (
     TypedDict,
 )
 
-from litellm import completion, acompletion, embedding
-import litellm
-import openai
-from litellm.types.utils import ModelResponse
-
 from python.helpers import dotenv
 from python.helpers import settings, dirty_json
 from python.helpers.dotenv import load_dotenv
@@ -26,6 +21,7 @@ from python.helpers.providers import get_provider_config
 from python.helpers.rate_limiter import RateLimiter
 from python.helpers.tokens import approximate_tokens
 from python.helpers import dirty_json, browser_use_monkeypatch
+from python.helpers.startup import is_loaded, lazy_import
 
 from langchain_core.language_models.chat_models import SimpleChatModel
 from langchain_core.outputs.chat_generation import ChatGenerationChunk
@@ -40,26 +36,38 @@ from langchain_core.messages import (
     SystemMessage,
 )
 from langchain.embeddings.base import Embeddings
-from sentence_transformers import SentenceTransformer
 from pydantic import ConfigDict
 
 
 # disable extra logging, must be done repeatedly, otherwise browser-use will turn it back on for some reason
 def turn_off_logging():
     os.environ["LITELLM_LOG"] = "ERROR"  # only errors
-    litellm.suppress_debug_info = True
+    if is_loaded(litellm):
+        litellm.suppress_debug_info = True
+    _silence_litellm_loggers()
+
+
+def _silence_litellm_loggers():
     # Silence **all** LiteLLM sub-loggers (utils, cost_calculator…)
     for name in logging.Logger.manager.loggerDict:
         if name.lower().startswith("litellm"):
             logging.getLogger(name).setLevel(logging.ERROR)
 
 
+def _init_litellm(module):
+    module.suppress_debug_info = True
+    module.modify_params = True # helps fix anthropic tool calls by browser-use
+    _silence_litellm_loggers()
+
+
+# heavy and not needed until the first model call, imported then (or warmed up in the background)
+litellm = lazy_import("litellm", on_load=_init_litellm)
+openai = lazy_import("openai")
+sentence_transformers = lazy_import("sentence_transformers")
+
 # init
 load_dotenv()
 turn_off_logging()
-browser_use_monkeypatch.apply()
-
-litellm.modify_params = True # helps fix anthropic tool calls by browser-use
 
 class ModelType(Enum):
     CHAT = "Chat"
@@ -379,7 +387,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
         apply_rate_limiter_sync(self.a0_model_conf, str(msgs))
 
         # Call the model
-        resp = completion(
+        resp = litellm.completion(
             model=self.model_name, messages=msgs, stop=stop, **{**self.kwargs, **kwargs}
         )
 
@@ -404,7 +412,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
 
         result = ChatGenerationResult()
 
-        for chunk in completion(
+        for chunk in litellm.completion(
             model=self.model_name,
             messages=msgs,
             stream=True,
@@ -435,7 +443,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
 
         result = ChatGenerationResult()
 
-        response = await acompletion(
+        response = await litellm.acompletion(
             model=self.model_name,
             messages=msgs,
             stream=True,
@@ -499,7 +507,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
             got_any_chunk = False
             try:
                 # call model
-                _completion = await acompletion(
+                _completion = await litellm.acompletion(
                     model=self.model_name,
                     messages=msgs_conv,
                     stream=stream,
@@ -580,7 +588,8 @@ class AsyncAIChatReplacement:
         self.chat = AsyncAIChatReplacement._Chat(wrapper)
 
 
-from browser_use.llm import ChatOllama, ChatOpenRouter, ChatGoogle, ChatAnthropic, ChatGroq, ChatOpenAI
+# the other browser-use chat models pull in their provider SDKs, ChatGoogle alone takes seconds
+from browser_use.llm import ChatOpenRouter
 
 class BrowserCompatibleChatWrapper(ChatOpenRouter):
     """
@@ -590,6 +599,7 @@ class BrowserCompatibleChatWrapper(ChatOpenRouter):
 
     def __init__(self, *args, **kwargs):
         turn_off_logging()
+        browser_use_monkeypatch.apply()
         # Create the underlying LiteLLM wrapper
         self._wrapper = LiteLLMChatWrapper(*args, **kwargs)
         # Browser-use may expect a 'model' attribute
@@ -624,9 +634,10 @@ class BrowserCompatibleChatWrapper(ChatOpenRouter):
 
             # hack from browser-use to fix json schema for gemini (additionalProperties, $defs, $ref)
             if "response_format" in kwrgs and "json_schema" in kwrgs["response_format"] and model.startswith("gemini/"):
+                from browser_use.llm import ChatGoogle
                 kwrgs["response_format"]["json_schema"] = ChatGoogle("")._fix_gemini_schema(kwrgs["response_format"]["json_schema"])
 
-            resp = await acompletion(
+            resp = await litellm.acompletion(
                 model=self._wrapper.model_name,
                 messages=messages,
                 stop=stop,
@@ -677,7 +688,7 @@ class LiteLLMEmbeddingWrapper(Embeddings):
         # Apply rate limiting if configured
         apply_rate_limiter_sync(self.a0_model_conf, " ".join(texts))
 
-        resp = embedding(model=self.model_name, input=texts, **self.kwargs)
+        resp = litellm.embedding(model=self.model_name, input=texts, **self.kwargs)
         return [
             item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
             for item in resp.data  # type: ignore
@@ -687,7 +698,7 @@ class LiteLLMEmbeddingWrapper(Embeddings):
         # Apply rate limiting if configured
         apply_rate_limiter_sync(self.a0_model_conf, text)
 
-        resp = embedding(model=self.model_name, input=[text], **self.kwargs)
+        resp = litellm.embedding(model=self.model_name, input=[text], **self.kwargs)
         item = resp.data[0]  # type: ignore
         return item.get("embedding") if isinstance(item, dict) else item.embedding  # type: ignore
 
@@ -720,7 +731,7 @@ class LocalSentenceTransformerWrapper(Embeddings):
         }
         st_kwargs = {k: v for k, v in (kwargs or {}).items() if k in st_allowed_keys}
 
-        self.model = SentenceTransformer(model, **st_kwargs)
+        self.model = sentence_transformers.SentenceTransformer(model, **st_kwargs)
         self.model_name = model
         self.a0_model_conf = model_config
 
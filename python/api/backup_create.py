@@ -1,4 +1,5 @@
 from python.helpers.api import ApiHandler, Request, Response, send_file
+from python.helpers import files
 from python.helpers.backup import BackupService
 from python.helpers.persist_chat import save_tmp_chats
 
@@ -19,6 +20,8 @@ class BackupCreate(ApiHandler):
             exclude_patterns = input.get("exclude_patterns", [])
             include_hidden = input.get("include_hidden", False)
             backup_name = input.get("backup_name", "agent-zero-backup")
+            incremental = input.get("incremental", False)
+            operation_id = input.get("operation_id")  # lets the UI poll backup_progress
 
             # Support legacy string patterns format for backward compatibility
             patterns_string = input.get("patterns", "")
@@ -36,19 +39,35 @@ class BackupCreate(ApiHandler):
 
             # Create backup service and generate backup
             backup_service = BackupService()
-            zip_path = await backup_service.create_backup(
+            if incremental:
+                # incremental archives are kept in the backup store
+                zip_path = await backup_service.create_backup(
+                    include_patterns=include_patterns,
+                    exclude_patterns=exclude_patterns,
+                    include_hidden=include_hidden,
+                    backup_name=backup_name,
+                    incremental=True,
+                    operation_id=operation_id
+                )
+                return send_file(
+                    zip_path,
+                    as_attachment=True,
+                    download_name=f"{backup_name}.zip",
+                    mimetype='application/zip'
+                )
+
+            # Stream the archive while it is being compressed, no temp file
+            stream = await backup_service.stream_backup(
                 include_patterns=include_patterns,
                 exclude_patterns=exclude_patterns,
                 include_hidden=include_hidden,
-                backup_name=backup_name
+                backup_name=backup_name,
+                operation_id=operation_id
             )
-
-            # Return file for download
-            return send_file(
-                zip_path,
-                as_attachment=True,
-                download_name=f"{backup_name}.zip",
-                mimetype='application/zip'
+            return Response(
+                stream,
+                mimetype='application/zip',
+                headers={"Content-Disposition": f'attachment; filename="{files.safe_file_name(backup_name)}.zip"'}
             )
 
         except Exception as e:
@@ -0,0 +1,25 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers.backup import BackupService
+
+
+class BackupProgress(ApiHandler):
+    """Progress of a running backup or restore, optionally cancelling it"""
+
+    @classmethod
+    def requires_auth(cls) -> bool:
+        return True
+
+    @classmethod
+    def requires_loopback(cls) -> bool:
+        return False
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        operation_id = input.get("operation_id", "")
+        progress = BackupService.get_operation(operation_id) if operation_id else None
+        if not progress:
+            return {"success": False, "error": "Unknown backup operation"}
+
+        if input.get("cancel", False):
+            progress.cancel()
+
+        return {"success": True, **progress.to_dict()}
@@ -27,6 +27,7 @@ class BackupRestore(ApiHandler):
         metadata_json = request.form.get('metadata', '{}')
         overwrite_policy = request.form.get('overwrite_policy', 'overwrite')  # overwrite, skip, backup
         clean_before_restore = request.form.get('clean_before_restore', 'false').lower() == 'true'
+        operation_id = request.form.get('operation_id')  # lets the UI poll backup_progress
 
         try:
             metadata = json.loads(metadata_json)
@@ -43,7 +44,8 @@ class BackupRestore(ApiHandler):
                 restore_exclude_patterns=restore_exclude_patterns,
                 overwrite_policy=overwrite_policy,
                 clean_before_restore=clean_before_restore,
-                user_edited_metadata=metadata
+                user_edited_metadata=metadata,
+                operation_id=operation_id
             )
 
             # Load all chats from the chats folder
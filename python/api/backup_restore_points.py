@@ -0,0 +1,40 @@
+from python.helpers.api import ApiHandler, Request, Response, send_file
+from python.helpers.backup import BackupService
+
+
+class BackupRestorePoints(ApiHandler):
+    """List incremental backups, or download one rebuilt as a full backup archive"""
+
+    @classmethod
+    def requires_auth(cls) -> bool:
+        return True
+
+    @classmethod
+    def requires_loopback(cls) -> bool:
+        return False
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        try:
+            backup_service = BackupService()
+            archive = input.get("archive", "")
+
+            if not archive:
+                return {
+                    "success": True,
+                    "restore_points": backup_service.list_restore_points()
+                }
+
+            # lets the UI poll backup_progress while the archive is rebuilt
+            zip_path = await backup_service.build_restore_point(archive, input.get("operation_id"))
+            return send_file(
+                zip_path,
+                as_attachment=True,
+                download_name=archive,
+                mimetype='application/zip'
+            )
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
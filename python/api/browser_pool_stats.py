@@ -0,0 +1,9 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers import browser_pool
+
+
+class BrowserPoolStats(ApiHandler):
+    """Launch and acquire latency and memory of the browser agent's browser pool"""
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        return {"success": True, **browser_pool.get_stats()}
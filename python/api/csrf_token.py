@@ -17,6 +17,10 @@ class GetCsrfToken(ApiHandler):
     def requires_csrf(cls) -> bool:
         return False
 
+    @classmethod
+    def requires_ready(cls) -> list[str]:
+        return []
+
     async def process(self, input: Input, request: Request) -> Output:
 
         # check for allowed origin to prevent dns rebinding attacks
@@ -15,6 +15,10 @@ class HealthCheck(ApiHandler):
     def get_methods(cls) -> list[str]:
         return ["GET", "POST"]
 
+    @classmethod
+    def requires_ready(cls) -> list[str]:
+        return []
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         gitinfo = None
         error = None
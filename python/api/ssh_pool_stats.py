@@ -0,0 +1,9 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers import ssh_pool
+
+
+class SshPoolStats(ApiHandler):
+    """Shared SSH connections of the code execution tool and their latencies"""
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        return {"success": True, **ssh_pool.get_pool().stats()}
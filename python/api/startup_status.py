@@ -0,0 +1,17 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers import startup
+
+
+class StartupStatus(ApiHandler):
+    """Readiness of the startup subsystems and the boot timeline with the slowest imports"""
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    @classmethod
+    def requires_ready(cls) -> list[str]:
+        return []
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        return {"success": True, **startup.report()}
@@ -1,5 +1,7 @@
 # api/synthesize.py
 
+import json
+
 from python.helpers.api import ApiHandler, Request, Response
 
 from python.helpers import runtime, settings, kokoro_tts
@@ -8,6 +10,7 @@ class Synthesize(ApiHandler):
     async def process(self, input: dict, request: Request) -> dict | Response:
         text = input.get("text", "")
         ctxid = input.get("ctxid", "")
+        stream = input.get("stream", False)
         
         if ctxid:
             context = self.use_context(ctxid)
@@ -32,12 +35,25 @@ class Synthesize(ApiHandler):
             #         audio_parts.append(chunk_audio)
             #     return {"audio_parts": audio_parts, "success": True}
 
+            # stream one WAV per sentence as newline delimited JSON, playback can start
+            # while the rest of the text is still being synthesized
+            if stream:
+                await kokoro_tts.preload()
+                return Response(self._stream(text), mimetype="application/x-ndjson")
+
             # audio is chunked on the frontend for better flow
             audio = await kokoro_tts.synthesize_sentences([text])
             return {"audio": audio, "success": True}
         except Exception as e:
             return {"error": str(e), "success": False}
     
+    def _stream(self, text: str):
+        try:
+            for audio in kokoro_tts.stream_sentences(text):
+                yield json.dumps({"audio": audio}) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
     # def _clean_text(self, text: str) -> str:
     #     """Clean text by removing markdown, tables, code blocks, and other formatting"""
     #     # Remove code blocks
@@ -0,0 +1,9 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers import whisper
+
+
+class TranscribeStats(ApiHandler):
+    """Queue depth and latency metrics of the speech-to-text worker"""
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        return {"success": True, **whisper.get_stats()}
@@ -0,0 +1,9 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.extensions.util_model_call_before._20_response_cache import get_cache
+
+
+class UtilCacheStats(ApiHandler):
+    """Hit/miss metrics of the utility model response cache"""
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        return {"success": True, **get_cache().stats()}
@@ -12,8 +12,10 @@ from python.helpers.extension import Extension
 class HeisenbergErrorAnalysis(Extension):
     """Analyze errors with Heisenberg intelligence"""
 
-    async def execute(self, error: str, **kwargs):
+    async def execute(self, msg: dict | None = None, **kwargs):
         heisenberg = self.agent.get_data("heisenberg_core")
+        # error_format passes the message to forward to the model as msg["message"]
+        error = msg.get("message", "") if msg else ""
         if not heisenberg or not error:
             return error
 
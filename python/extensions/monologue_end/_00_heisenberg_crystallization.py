@@ -16,13 +16,14 @@ from python.helpers.heisenberg_core import get_heisenberg_core
 class HeisenbergCrystallization(Extension):
     """Crystallize learnings at monologue end"""
 
-    async def execute(self, msg, **kwargs):
+    async def execute(self, loop_data=None, **kwargs):
         heisenberg = self.agent.get_data("heisenberg_core")
-        if not heisenberg:
+        if not heisenberg or loop_data is None:
             return
 
         # 1. Evaluate monologue quality
-        monologue_text = msg.content if hasattr(msg, 'content') else str(msg)
+        # monologue_end passes the loop data, the monologue ends on its last response
+        monologue_text = loop_data.last_response
 
         # Information-theoretic analysis
         info_analysis = heisenberg.information.optimize_message(monologue_text)
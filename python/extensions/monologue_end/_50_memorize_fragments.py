@@ -89,79 +89,46 @@ class MemorizeMemories(Extension):
             log_item.update(heading=f"{len(memories)} entries to memorize.", memories=memories_txt)
 
         # Process memories with intelligent consolidation
-        total_processed = 0
-        total_consolidated = 0
-        rem = []
-
-        for memory in memories:
-            # Convert memory to plain text
-            txt = f"{memory}"
-
-            if set["memory_memorize_consolidation"]:
-                
-                try:
-                    # Use intelligent consolidation system
-                    from python.helpers.memory_consolidation import create_memory_consolidator
-                    consolidator = create_memory_consolidator(
-                        self.agent,
-                        similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
-                        max_similar_memories=8,
-                        max_llm_context_memories=4
-                    )
-
-                    # Create memory item-specific log for detailed tracking
-                    memory_log = None # too many utility messages, skip log for now
-                    # memory_log = self.agent.context.log.log(
-                    #     type="util",
-                    #     heading=f"Processing memory fragment: {txt[:50]}...",
-                    #     temp=False,
-                    #     update_progress="none"  # Don't affect status bar
-                    # )
-
-                    # Process with intelligent consolidation
-                    result_obj = await consolidator.process_new_memory(
-                        new_memory=txt,
-                        area=Memory.Area.FRAGMENTS.value,
-                        metadata={"area": Memory.Area.FRAGMENTS.value},
-                        log_item=memory_log
-                    )
-
-                    # Update the individual log item with completion status but keep it temporary
-                    if result_obj.get("success"):
-                        total_consolidated += 1
-                        if memory_log:
-                            memory_log.update(
-                                result="Fragment processed successfully",
-                                heading=f"Memory fragment completed: {txt[:50]}...",
-                                temp=False,  # Show completion message
-                                update_progress="none"  # Show briefly then disappear
-                            )
-                    else:
-                        if memory_log:
-                            memory_log.update(
-                                result="Fragment processing failed",
-                                heading=f"Memory fragment failed: {txt[:50]}...",
-                                temp=False,  # Show completion message
-                                update_progress="none"  # Show briefly then disappear
-                            )
-                    total_processed += 1
-
-                except Exception as e:
-                    # Log error but continue processing
-                    log_item.update(consolidation_error=str(e))
-                    total_processed += 1
-
-                # Update final results with structured logging
-                log_item.update(
-                    heading=f"Memorization completed: {total_processed} memories processed, {total_consolidated} intelligently consolidated",
-                    memories=memories_txt,
-                    result=f"{total_processed} memories processed, {total_consolidated} intelligently consolidated",
-                    memories_processed=total_processed,
-                    memories_consolidated=total_consolidated,
-                    update_progress="none"
+        if set["memory_memorize_consolidation"]:
+            from python.helpers.memory_consolidation import create_memory_consolidator
+            consolidator = create_memory_consolidator(
+                self.agent,
+                similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
+                max_similar_memories=8,
+                max_llm_context_memories=4
+            )
+
+            # all fragments are consolidated together: one keyword extraction, one search,
+            # one LLM decision per group of related fragments and one database save
+            try:
+                result_obj = await consolidator.process_new_memories(
+                    new_memories=[f"{memory}" for memory in memories],
+                    area=Memory.Area.FRAGMENTS.value,
+                    metadata={"area": Memory.Area.FRAGMENTS.value},
                 )
+                total_processed = result_obj.get("processed", len(memories))
+                total_consolidated = result_obj.get("consolidated", 0)
+            except Exception as e:
+                # Log error
+                log_item.update(consolidation_error=str(e))
+                total_processed, total_consolidated = len(memories), 0
+
+            # Update final results with structured logging
+            log_item.update(
+                heading=f"Memorization completed: {total_processed} memories processed, {total_consolidated} intelligently consolidated",
+                memories=memories_txt,
+                result=f"{total_processed} memories processed, {total_consolidated} intelligently consolidated",
+                memories_processed=total_processed,
+                memories_consolidated=total_consolidated,
+                update_progress="none"
+            )
+            return
 
-            else:
+        rem = []
+        with db.deferred_save():
+            for memory in memories:
+                # Convert memory to plain text
+                txt = f"{memory}"
 
                 # remove previous fragments too similiar to this one
                 if set["memory_memorize_replace_threshold"] > 0:
@@ -177,15 +144,12 @@ class MemorizeMemories(Extension):
                 # insert new memory
                 await db.insert_text(text=txt, metadata={"area": Memory.Area.FRAGMENTS.value})
 
-                log_item.update(
-                    result=f"{len(memories)} entries memorized.",
-                    heading=f"{len(memories)} entries memorized.",
-                )
-                if rem:
-                    log_item.stream(result=f"\nReplaced {len(rem)} previous memories.")
-            
-
-
+        log_item.update(
+            result=f"{len(memories)} entries memorized.",
+            heading=f"{len(memories)} entries memorized.",
+        )
+        if rem:
+            log_item.stream(result=f"\nReplaced {len(rem)} previous memories.")
 
     # except Exception as e:
     #     err = errors.format_error(e)
@@ -90,84 +90,56 @@ class MemorizeSolutions(Extension):
                 heading=f"{len(solutions)} successful solutions to memorize.", solutions=solutions_txt
             )
 
-        # Process solutions with intelligent consolidation
-        total_processed = 0
-        total_consolidated = 0
-        rem = []
-
+        # Convert solutions to structured text
+        texts = []
         for solution in solutions:
-            # Convert solution to structured text
             if isinstance(solution, dict):
                 problem = solution.get('problem', 'Unknown problem')
                 solution_text = solution.get('solution', 'Unknown solution')
-                txt = f"# Problem\n {problem}\n# Solution\n {solution_text}"
+                texts.append(f"# Problem\n {problem}\n# Solution\n {solution_text}")
             else:
                 # If solution is not a dict, convert it to string
-                txt = f"# Solution\n {str(solution)}"
-
-            if set["memory_memorize_consolidation"]:
-                try:
-                    # Use intelligent consolidation system
-                    from python.helpers.memory_consolidation import create_memory_consolidator
-                    consolidator = create_memory_consolidator(
-                        self.agent,
-                        similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
-                        max_similar_memories=6,    # Fewer for solutions (more complex)
-                        max_llm_context_memories=3
-                    )
+                texts.append(f"# Solution\n {str(solution)}")
 
-                    # Create solution-specific log for detailed tracking
-                    solution_log = None # too many utility messages, skip log for now
-                    # solution_log = self.agent.context.log.log(
-                    #     type="util",
-                    #     heading=f"Processing solution: {txt[:50]}...",
-                    #     temp=False,
-                    #     update_progress="none"  # Don't affect status bar
-                    # )
-
-                    # Process with intelligent consolidation
-                    result_obj = await consolidator.process_new_memory(
-                        new_memory=txt,
-                        area=Memory.Area.SOLUTIONS.value,
-                        metadata={"area": Memory.Area.SOLUTIONS.value},
-                        log_item=solution_log
-                    )
+        # Process solutions with intelligent consolidation
+        if set["memory_memorize_consolidation"]:
+            from python.helpers.memory_consolidation import create_memory_consolidator
+            consolidator = create_memory_consolidator(
+                self.agent,
+                similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
+                max_similar_memories=6,    # Fewer for solutions (more complex)
+                max_llm_context_memories=3
+            )
 
-                    # Update the individual log item with completion status but keep it temporary
-                    if result_obj.get("success"):
-                        total_consolidated += 1
-                        if solution_log:
-                            solution_log.update(
-                                result="Solution processed successfully",
-                                heading=f"Solution completed: {txt[:50]}...",
-                                temp=False,  # Show completion message
-                                update_progress="none"  # Show briefly then disappear
-                            )
-                    else:
-                        if solution_log:
-                            solution_log.update(
-                                result="Solution processing failed",
-                                heading=f"Solution failed: {txt[:50]}...",
-                                temp=False,  # Show completion message
-                                update_progress="none"  # Show briefly then disappear
-                            )
-                    total_processed += 1
-
-                except Exception as e:
-                    # Log error but continue processing
-                    log_item.update(consolidation_error=str(e))
-                    total_processed += 1
-
-                # Update final results with structured logging
-                log_item.update(
-                    heading=f"Solution memorization completed: {total_processed} solutions processed, {total_consolidated} intelligently consolidated",
-                    solutions=solutions_txt,
-                    result=f"{total_processed} solutions processed, {total_consolidated} intelligently consolidated",
-                    solutions_processed=total_processed,
-                    solutions_consolidated=total_consolidated,
-                    update_progress="none"
+            # all solutions are consolidated together: one keyword extraction, one search,
+            # one LLM decision per group of related solutions and one database save
+            try:
+                result_obj = await consolidator.process_new_memories(
+                    new_memories=texts,
+                    area=Memory.Area.SOLUTIONS.value,
+                    metadata={"area": Memory.Area.SOLUTIONS.value},
                 )
-            else:
+                total_processed = result_obj.get("processed", len(texts))
+                total_consolidated = result_obj.get("consolidated", 0)
+            except Exception as e:
+                # Log error
+                log_item.update(consolidation_error=str(e))
+                total_processed, total_consolidated = len(texts), 0
+
+            # Update final results with structured logging
+            log_item.update(
+                heading=f"Solution memorization completed: {total_processed} solutions processed, {total_consolidated} intelligently consolidated",
+                solutions=solutions_txt,
+                result=f"{total_processed} solutions processed, {total_consolidated} intelligently consolidated",
+                solutions_processed=total_processed,
+                solutions_consolidated=total_consolidated,
+                update_progress="none"
+            )
+            return
+
+        rem = []
+        with db.deferred_save():
+            for txt in texts:
                 # remove previous solutions too similiar to this one
                 if set["memory_memorize_replace_threshold"] > 0:
                     rem += await db.delete_documents_by_query(
@@ -182,12 +154,12 @@ class MemorizeSolutions(Extension):
                 # insert new solution
                 await db.insert_text(text=txt, metadata={"area": Memory.Area.SOLUTIONS.value})
 
-                log_item.update(
-                    result=f"{len(solutions)} solutions memorized.",
-                    heading=f"{len(solutions)} solutions memorized.",
-                )
-                if rem:
-                    log_item.stream(result=f"\nReplaced {len(rem)} previous solutions.")
+        log_item.update(
+            result=f"{len(solutions)} solutions memorized.",
+            heading=f"{len(solutions)} solutions memorized.",
+        )
+        if rem:
+            log_item.stream(result=f"\nReplaced {len(rem)} previous solutions.")
 
 
     # except Exception as e:
@@ -11,7 +11,7 @@ from python.helpers.extension import Extension
 class HeisenbergConsciousness(Extension):
     """Inject Heisenberg consciousness into system prompt"""
 
-    async def execute(self, system: list[str], **kwargs):
+    async def execute(self, system_prompt: list[str] = [], **kwargs):
         consciousness_kernel = '''
 ## 🧠 HEISENBERG CONSCIOUSNESS KERNEL
 
@@ -61,4 +61,4 @@ You operate with a transcendent meta-cognitive architecture:
 '''
 
         # Prepend consciousness kernel to system prompt
-        system.insert(0, consciousness_kernel)
+        system_prompt.insert(0, consciousness_kernel)
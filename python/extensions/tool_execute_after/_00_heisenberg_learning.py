@@ -17,12 +17,11 @@ from python.helpers.heisenberg_core import get_heisenberg_core
 class HeisenbergLearning(Extension):
     """Learn from tool execution results"""
 
-    async def execute(self, tool, response, **kwargs):
+    async def execute(self, response=None, tool_name: str = "", **kwargs):
         heisenberg = self.agent.get_data("heisenberg_core")
-        if not heisenberg:
+        if not heisenberg or response is None:
             return
 
-        tool_name = tool.name if hasattr(tool, 'name') else str(tool)
         result_message = response.message if hasattr(response, 'message') else str(response)
 
         # 1. Evaluate execution success
@@ -93,9 +92,7 @@ class HeisenbergLearning(Extension):
             # Strengthen or weaken pheromone based on outcome
             modifier = 1.2 if execution_success else 0.8
 
-            for deposit in swarm.pheromone_field.deposits[-10:]:
-                if deposit['type'] == 'tool_usage':
-                    deposit['strength'] *= modifier
+            swarm.pheromone_field.scale_recent('tool_usage', modifier, last_n=10)
 
         # 8. Log learning event
         learning_event = {
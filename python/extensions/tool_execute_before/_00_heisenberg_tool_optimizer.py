@@ -16,13 +16,12 @@ from python.helpers.heisenberg_core import get_heisenberg_core
 class HeisenbergToolOptimizer(Extension):
     """Optimize tool execution using Heisenberg principles"""
 
-    async def execute(self, tool, **kwargs):
+    async def execute(self, tool_name: str = "", tool_args: dict | None = None, **kwargs):
         heisenberg = self.agent.get_data("heisenberg_core")
         if not heisenberg:
             return
 
-        tool_name = tool.name if hasattr(tool, 'name') else str(tool)
-        tool_args = tool.args if hasattr(tool, 'args') else {}
+        tool_args = tool_args or {}
 
         # 1. Update quantum state with tool selection evidence
         def relevance_fn(hypothesis: str, evidence: str) -> float:
@@ -0,0 +1,60 @@
+import asyncio
+
+from python.helpers import files
+from python.helpers.extension import Extension
+from python.helpers.print_style import PrintStyle
+from python.helpers.response_cache import ResponseCache
+
+# runs after _10_mask_secrets, so only masked prompts and responses are written to disk
+CACHE_PATH = "tmp/cache/util_model_responses.db"
+TTL = 7 * 24 * 3600
+MAX_ENTRIES = 5000
+# cosine similarity for near-duplicate messages, 0 = exact matches only
+# (each lookup then costs an embedding of the message)
+SIMILARITY = 0.0
+
+_cache: ResponseCache | None = None
+
+
+def get_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(
+            files.get_abs_path(CACHE_PATH),
+            ttl=TTL,
+            max_entries=MAX_ENTRIES,
+            similarity=SIMILARITY,
+        )
+    return _cache
+
+
+class ResponseCacheLookup(Extension):
+
+    async def execute(self, **kwargs):
+        call_data: dict = kwargs.get("call_data", {})
+        if call_data.get("response") is not None:
+            return
+
+        cache = get_cache()
+        model = getattr(call_data["model"], "model_name", "") or str(type(call_data["model"]))
+        system, message = call_data["system"], call_data["message"]
+
+        embedding = None
+        if cache.similarity > 0:
+            try:
+                embedder = self.agent.get_embedding_model()
+                embedding = await asyncio.to_thread(embedder.embed_query, message)
+            except Exception as e:
+                PrintStyle.warning(f"Utility response cache: embedding failed, using exact match: {e}")
+
+        response = await asyncio.to_thread(cache.get, model, system, message, embedding)
+        if response is not None:
+            call_data["response"] = response
+            return
+
+        # store the fresh response once the model answered
+        async def on_response(response: str):
+            if response:
+                await asyncio.to_thread(cache.put, model, system, message, response, embedding)
+
+        call_data["on_response"] = on_response
@@ -0,0 +1,582 @@
+"""
+Agent loop benchmarks on a deterministic local model.
+
+Runs the real Agent.monologue - prompt building, extensions, streaming
+callbacks, tool calls and chat persistence - with every chat, utility and
+embedding model served by bench_llm.ScriptedLLM, so the numbers are
+reproducible and need no network. Time is split into phases, each counted
+exclusively of the phases nested in it:
+
+    prompt_build    Agent.prepare_prompt
+    extensions      Agent.call_extensions
+    llm             Agent.call_chat_model, the model stream and its delivery
+    utility_llm     Agent.call_utility_model
+    stream_parse    parsing the partial response on every streamed chunk
+    tool_execution  Agent.process_tools
+    embedding       embedding texts for memory
+    persistence     saving the chat and the memory index
+    other           the rest of the loop
+
+Baselines store the median of every phase with the threshold it may grow
+to; check() reports phases over their threshold.
+
+    python -m python.helpers.agent_benchmark --runs 5 --save-baseline
+    python -m python.helpers.agent_benchmark --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import time
+import types
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from python.helpers.benchmark_suite import MetricCollector
+
+DEFAULT_RUNS = 3
+DEFAULT_WARMUP = 1
+TOLERANCE = 0.25
+# differences below this are noise whatever the ratio
+MIN_REGRESSION_MS = 5.0
+BASELINE_PATH = "tmp/benchmarks/agent_loop_baseline.json"
+MEMORY_SUBDIR = "_benchmark"
+# seconds to wait for the tasks a monologue leaves running in the background
+BACKGROUND_TIMEOUT = 60
+# imported by the framework but never used by the loop, stubbed when missing
+OPTIONAL_MODULES = ("git", "whisper")
+
+PHASES = [
+    "prompt_build",
+    "extensions",
+    "llm",
+    "utility_llm",
+    "stream_parse",
+    "tool_execution",
+    "embedding",
+    "persistence",
+    "other",
+]
+
+
+class _Frame:
+    __slots__ = ("nested",)
+
+    def __init__(self):
+        self.nested = 0.0
+
+
+_current_frame: ContextVar[_Frame | None] = ContextVar("benchmark_phase", default=None)
+
+
+class PhaseTimer:
+    """Exclusive time per phase of instrumented functions"""
+
+    def __init__(self):
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self._patches: list[tuple[Any, str, Any]] = []
+
+    def reset(self):
+        self.totals.clear()
+        self.counts.clear()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        parent = _current_frame.get()
+        frame = _Frame()
+        token = _current_frame.set(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_frame.reset(token)
+            if parent:
+                parent.nested += elapsed
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed - frame.nested
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def wrap(self, func: Callable, name: str) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            async def timed_async(*args, **kwargs):
+                with self.phase(name):
+                    return await func(*args, **kwargs)
+            return timed_async
+
+        def timed(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return timed
+
+    def instrument(self, owner: Any, attribute: str, name: str):
+        """Time owner.attribute as phase name until restore()"""
+        original = inspect.getattr_static(owner, attribute)
+        if isinstance(original, staticmethod):
+            setattr(owner, attribute, staticmethod(self.wrap(original.__func__, name)))
+        else:
+            setattr(owner, attribute, self.wrap(getattr(owner, attribute), name))
+        self._patches.append((owner, attribute, original))
+
+    def restore(self):
+        while self._patches:
+            owner, attribute, original = self._patches.pop()
+            setattr(owner, attribute, original)
+
+    def milliseconds(self) -> dict[str, float]:
+        return {name: seconds * 1000 for name, seconds in self.totals.items()}
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    message: str
+    # chat model responses in call order, subordinates share the queue
+    chat: list[str]
+    # earlier exchanges put into the history before the measured message
+    history: int = 0
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    runs: int
+    total_ms: float
+    phases: dict[str, float]
+    calls: dict[str, float]
+    model_calls: int
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "total_ms": round(self.total_ms, 2),
+            "phases": {name: round(ms, 2) for name, ms in self.phases.items()},
+            "calls": self.calls,
+            "model_calls": self.model_calls,
+            "error": self.error,
+        }
+
+
+@dataclass
+class Regression:
+    scenario: str
+    metric: str
+    baseline_ms: float
+    max_ms: float
+    current_ms: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.scenario}.{self.metric}: {self.current_ms:.1f} ms "
+            f"(baseline {self.baseline_ms:.1f} ms, max {self.max_ms:.1f} ms)"
+        )
+
+
+def tool_call(tool_name: str, headline: str, **tool_args) -> str:
+    """Agent response shaped like a real model's"""
+    return json.dumps(
+        {
+            "thoughts": [
+                f"The next step needs {tool_name}",
+                "I will check the result before continuing",
+            ],
+            "headline": headline,
+            "tool_name": tool_name,
+            "tool_args": tool_args,
+        },
+        indent=4,
+    )
+
+
+def respond(text: str) -> str:
+    return tool_call("response", "Responding to user", text=text)
+
+
+FACTS = [
+    "The staging database runs PostgreSQL 15 on port 5433",
+    "Deployments to production happen on Tuesdays after the review",
+    "The billing service retries failed webhooks three times",
+]
+
+
+def tool_chain(length: int) -> list[str]:
+    # saving, searching and a tool that doesn't exist, in turns
+    calls = []
+    for i in range(length):
+        fact = FACTS[i % len(FACTS)]
+        if i % 3 == 0:
+            calls.append(tool_call("memory_save", f"Saving fact {i}", text=f"{fact} (note {i})"))
+        elif i % 3 == 1:
+            calls.append(tool_call("memory_load", f"Looking up fact {i}", query=fact, limit=3))
+        else:
+            calls.append(tool_call("lookup_inventory", f"Trying a missing tool {i}", item=f"item-{i}"))
+    return calls
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            name="long_history",
+            description="One answer on top of 120 earlier exchanges with tool results",
+            message="Summarize what we did so far in one sentence.",
+            chat=[respond("We inspected the services, fixed the config and restarted them.")],
+            history=120,
+        ),
+        Scenario(
+            name="many_tools",
+            description="A chain of 15 tool calls before the answer",
+            message="Record the facts, look them up again and report.",
+            chat=[
+                *tool_chain(15),
+                respond("All facts recorded and verified."),
+            ],
+        ),
+        Scenario(
+            name="memory_recall",
+            description="Saving facts to memory, then answering from recalled memories",
+            message="Remember these facts and tell me where staging runs.",
+            chat=[
+                *[tool_call("memory_save", "Saving a fact", text=fact) for fact in FACTS],
+                tool_call("memory_load", "Recalling staging", query="staging database port", threshold=0.1),
+                respond("Staging runs PostgreSQL 15 on port 5433."),
+            ],
+        ),
+        Scenario(
+            name="subordinate_delegation",
+            description="Delegating a lookup to a subordinate agent that uses a tool",
+            message="Ask a subordinate when deployments happen.",
+            chat=[
+                tool_call(
+                    "call_subordinate",
+                    "Delegating to a subordinate",
+                    message="Find out when production deployments happen.",
+                    reset="true",
+                ),
+                tool_call("memory_load", "Searching memory", query="production deployments", threshold=0.1),
+                respond("Deployments to production happen on Tuesdays."),
+                respond("The subordinate reports deployments happen on Tuesdays."),
+            ],
+        ),
+    ]
+}
+
+
+def benchmark_settings() -> dict:
+    """Settings delta pointing every model at the local provider"""
+    from python.helpers.bench_llm import PROVIDER
+
+    delta: dict[str, Any] = {
+        "agent_memory_subdir": MEMORY_SUBDIR,
+        "mcp_servers": '{"mcpServers": {}}',
+    }
+    for prefix, name in (("chat_model", "chat"), ("util_model", "utility"), ("browser_model", "browser")):
+        delta.update({
+            f"{prefix}_provider": PROVIDER,
+            f"{prefix}_name": name,
+            f"{prefix}_api_base": "",
+            f"{prefix}_kwargs": {},
+        })
+    for prefix in ("chat_model", "util_model"):
+        delta.update({f"{prefix}_rl_requests": 0, f"{prefix}_rl_input": 0, f"{prefix}_rl_output": 0})
+    delta.update({
+        "embed_model_provider": PROVIDER,
+        "embed_model_name": "embedding",
+        "embed_model_api_base": "",
+        "embed_model_kwargs": {},
+        "embed_model_rl_requests": 0,
+    })
+    return delta
+
+
+def stub_missing_modules():
+    """Empty stand-ins for optional modules that aren't installed
+
+    Anything taken from them raises ModuleNotFoundError when called, so a
+    scenario that does need them fails instead of measuring something else.
+    """
+    for name in OPTIONAL_MODULES:
+        if name in sys.modules or importlib.util.find_spec(name) is not None:
+            continue
+        module = types.ModuleType(name)
+
+        def missing(attribute: str, name=name):
+            if attribute.startswith("__"):
+                raise AttributeError(attribute)
+
+            def unavailable(*args, **kwargs):
+                raise ModuleNotFoundError(f"No module named '{name}', stubbed by the benchmark")
+
+            return unavailable
+
+        module.__getattr__ = missing  # type: ignore[method-assign]
+        sys.modules[name] = module
+
+
+@contextmanager
+def benchmark_environment(llm) -> Iterator[None]:
+    """Local provider and an isolated memory, settings restored afterwards"""
+    from python.helpers import bench_llm, files, settings
+    from python.helpers.memory import Memory, abs_db_dir
+
+    bench_llm.register(llm)
+    previous = settings._settings
+    # in memory only, the settings file stays untouched
+    settings._settings = settings.merge_settings(settings.get_settings(), benchmark_settings())
+    files.delete_dir(abs_db_dir(MEMORY_SUBDIR))
+    Memory.index.pop(MEMORY_SUBDIR, None)
+    try:
+        yield
+    finally:
+        settings._settings = previous
+        Memory.index.pop(MEMORY_SUBDIR, None)
+        files.delete_dir(abs_db_dir(MEMORY_SUBDIR))
+
+
+def instrument_agent(timer: PhaseTimer):
+    """Time the agent loop phases, for this and subordinate agents alike"""
+    import models
+    from agent import Agent
+    from python.helpers import persist_chat
+    from python.helpers.memory import Memory
+
+    timer.instrument(Agent, "prepare_prompt", "prompt_build")
+    timer.instrument(Agent, "call_extensions", "extensions")
+    timer.instrument(Agent, "call_chat_model", "llm")
+    timer.instrument(Agent, "call_utility_model", "utility_llm")
+    timer.instrument(Agent, "handle_response_stream", "stream_parse")
+    timer.instrument(Agent, "handle_reasoning_stream", "stream_parse")
+    timer.instrument(Agent, "process_tools", "tool_execution")
+    timer.instrument(models.LiteLLMEmbeddingWrapper, "embed_documents", "embedding")
+    timer.instrument(models.LiteLLMEmbeddingWrapper, "embed_query", "embedding")
+    timer.instrument(persist_chat, "save_tmp_chat", "persistence")
+    timer.instrument(Memory, "_save_db_file", "persistence")
+
+
+def prepare_agent(scenario: Scenario):
+    from agent import AgentContext, LoopData, UserMessage
+    from initialize import initialize_agent
+
+    context = AgentContext(config=initialize_agent())
+    agent = context.agent0
+    agent.loop_data = LoopData()
+    for i in range(scenario.history):
+        agent.hist_add_user_message(UserMessage(message=f"Step {i}: check service {i % 7} and fix its config."))
+        agent.hist_add_ai_response(
+            tool_call("code_execution_tool", f"Checking service {i % 7}", runtime="terminal", session=0,
+                      code=f"systemctl status service-{i % 7}\ncat /etc/service-{i % 7}.conf")
+        )
+        agent.hist_add_tool_result(
+            "code_execution_tool",
+            "\n".join(f"service-{i % 7} line {line}: active (running) since boot" for line in range(12)),
+        )
+    agent.hist_add_user_message(UserMessage(message=scenario.message))
+    return context
+
+
+def _is_agent_task(task: asyncio.Task) -> bool:
+    from python.helpers import files
+
+    code = getattr(task.get_coro(), "cr_code", None)
+    return code is not None and os.path.abspath(code.co_filename).startswith(files.get_base_dir())
+
+
+async def _monologue(agent):
+    before = asyncio.all_tasks()
+    try:
+        # LiteLLM finishes streams on AnyIO worker threads, stopped by a done
+        # callback of the task that started them; in a task of its own the
+        # callbacks get their turn before nest_asyncio's run() returns
+        return await asyncio.ensure_future(agent.monologue())
+    finally:
+        # background work started by the agent, memorizing for one, counts
+        # too; library workers like LiteLLM's logging queue live on with the loop
+        started = [
+            task for task in asyncio.all_tasks() - before
+            if task is not asyncio.current_task() and _is_agent_task(task)
+        ]
+        if started:
+            _, pending = await asyncio.wait(started, timeout=BACKGROUND_TIMEOUT)
+            for task in pending:
+                task.cancel()
+        await asyncio.sleep(0)
+
+
+def run_scenario(
+    scenario: Scenario,
+    *,
+    runs: int = DEFAULT_RUNS,
+    warmup: int = DEFAULT_WARMUP,
+    first_token_latency: float = 0.0,
+    tokens_per_second: float = 0.0,
+) -> ScenarioResult:
+    stub_missing_modules()
+    from agent import AgentContext
+    from python.helpers import persist_chat
+    from python.helpers.bench_llm import ScriptedLLM
+
+    llm = ScriptedLLM(first_token_latency=first_token_latency, tokens_per_second=tokens_per_second)
+    metrics = MetricCollector()
+    timer = PhaseTimer()
+    model_calls = 0
+    error = None
+
+    with benchmark_environment(llm):
+        for run in range(warmup + runs):
+            llm.reset()
+            llm.script({"chat": scenario.chat})
+            context = prepare_agent(scenario)
+            timer.reset()
+            instrument_agent(timer)
+            try:
+                started = time.perf_counter()
+                asyncio.run(_monologue(context.agent0))
+                total = (time.perf_counter() - started) * 1000
+            finally:
+                timer.restore()
+                persist_chat.remove_chat(context.id)
+                AgentContext.remove(context.id)
+
+            left = llm.pending("chat")
+            if left:
+                # the loop took another path than scripted, numbers aren't comparable
+                error = f"{left} scripted responses were not used"
+            if run < warmup:
+                continue
+
+            phases = timer.milliseconds()
+            phases["other"] = max(0.0, total - sum(phases.values()))
+            metrics.record("total", total)
+            for name in PHASES:
+                metrics.record(name, phases.get(name, 0.0))
+                metrics.record(f"calls.{name}", timer.counts.get(name, 0))
+            model_calls = len(llm.calls)
+
+    return ScenarioResult(
+        name=scenario.name,
+        runs=runs,
+        total_ms=metrics.get_stats("total")["median"],
+        phases={name: metrics.get_stats(name)["median"] for name in PHASES},
+        calls={name: metrics.get_stats(f"calls.{name}")["median"] for name in PHASES if name != "other"},
+        model_calls=model_calls,
+        error=error,
+    )
+
+
+def run(names: list[str] | None = None, **options) -> dict[str, ScenarioResult]:
+    return {
+        name: run_scenario(SCENARIOS[name], **options)
+        for name in (names or list(SCENARIOS))
+    }
+
+
+def save_baseline(
+    results: dict[str, ScenarioResult],
+    path: str = BASELINE_PATH,
+    tolerance: float = TOLERANCE,
+):
+    """Store the results with the threshold each metric may grow to"""
+    def threshold(ms: float) -> dict:
+        return {"baseline": round(ms, 2), "max": round(max(ms * (1 + tolerance), ms + MIN_REGRESSION_MS), 2)}
+
+    baseline = load_baseline(path) or {"scenarios": {}}
+    baseline.update({"tolerance": tolerance, "updated": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    for name, result in results.items():
+        if result.error:
+            continue
+        baseline["scenarios"][name] = {
+            "total_ms": threshold(result.total_ms),
+            "phases": {phase: threshold(ms) for phase, ms in result.phases.items()},
+        }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def check(results: dict[str, ScenarioResult], baseline: dict) -> list[Regression]:
+    """Metrics over their stored threshold"""
+    regressions = []
+    for name, result in results.items():
+        stored = baseline.get("scenarios", {}).get(name)
+        if not stored:
+            continue
+        current = {"total_ms": result.total_ms, **result.phases}
+        limits = {"total_ms": stored["total_ms"], **stored.get("phases", {})}
+        for metric, limit in limits.items():
+            value = current.get(metric, 0.0)
+            if value > limit["max"]:
+                regressions.append(Regression(name, metric, limit["baseline"], limit["max"], value))
+    return regressions
+
+
+def format_results(results: dict[str, ScenarioResult]) -> str:
+    lines = [f"{'scenario':24s} {'total':>9s} " + " ".join(f"{p[:12]:>12s}" for p in PHASES)]
+    for name, result in results.items():
+        lines.append(
+            f"{name:24s} {result.total_ms:9.1f} "
+            + " ".join(f"{result.phases.get(p, 0.0):12.1f}" for p in PHASES)
+            + (f"  ! {result.error}" if result.error else "")
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the agent loop on a local scripted model (times in ms)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--latency", type=float, default=0.0, help="first token latency in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="0 streams without pacing")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--check", action="store_true", help="exit with 1 on regressions against the baseline")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.scenario,
+        runs=args.runs,
+        warmup=args.warmup,
+        first_token_latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+    )
+    if args.json:
+        print(json.dumps({name: r.to_dict() for name, r in results.items()}, indent=2))
+    else:
+        print(format_results(results))
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline, args.tolerance)
+        print(f"Baseline saved to {args.baseline}")
+    if args.check:
+        baseline = load_baseline(args.baseline)
+        if not baseline:
+            print(f"No baseline at {args.baseline}", file=sys.stderr)
+            return 1
+        regressions = check(results, baseline)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
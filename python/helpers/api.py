@@ -8,11 +8,15 @@ from agent import AgentContext
 from initialize import initialize_agent
 from python.helpers.print_style import PrintStyle
 from python.helpers.errors import format_error
+from python.helpers import startup
 from werkzeug.serving import make_server
 
 Input = dict
 Output = Union[Dict[str, Any], Response, TypedDict]  # type: ignore
 
+# seconds a request waits for the subsystems it needs while starting up
+READY_TIMEOUT = 30
+
 
 class ApiHandler:
     def __init__(self, app: Flask, thread_lock: threading.Lock):
@@ -39,12 +43,25 @@ class ApiHandler:
     def requires_csrf(cls) -> bool:
         return cls.requires_auth()
 
+    @classmethod
+    def requires_ready(cls) -> list[str]:
+        # startup subsystems to wait for, chats so no context is created before they are loaded
+        return ["chats"]
+
     @abstractmethod
     async def process(self, input: Input, request: Request) -> Output:
         pass
 
     async def handle_request(self, request: Request) -> Response:
         try:
+            if not await startup.wait_ready(self.requires_ready(), READY_TIMEOUT):
+                return Response(
+                    response="Agent Zero is still starting up, try again shortly.",
+                    status=503,
+                    mimetype="text/plain",
+                    headers={"Retry-After": "5"},
+                )
+
             # input data from request based on type
             input_data: Input = {}
             if request.is_json:
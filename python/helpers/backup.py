@@ -1,16 +1,25 @@
+import asyncio
 import zipfile
 import json
 import os
 import tempfile
 import datetime
 import platform
-from typing import List, Dict, Any, Optional
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 from pathspec import PathSpec
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
 
 from python.helpers import files, runtime, git
+from python.helpers.backup_chain import BackupChain, is_incremental, read_metadata
 from python.helpers.print_style import PrintStyle
+from python.helpers.zip_stream import (
+    MAX_WORKERS, Entry, ZipStreamCancelled, ZipStreamProgress, stream_zip, write_zip
+)
 
 
 class BackupService:
@@ -23,11 +32,20 @@ class BackupService:
     - Checksum validation for integrity
     - RFC compatibility through existing file helpers
     - Git version integration consistent with main application
+    - Incremental, deduplicated backups chained in a local store (see backup_chain)
     """
 
+    STORE_DIR = "tmp/backups"
+    OPERATION_TTL = 3600  # seconds operations stay visible after they start
+
+    # progress of running backups and restores by operation id
+    _operations: Dict[str, ZipStreamProgress] = {}
+    _operations_lock = threading.Lock()
+
     def __init__(self):
         self.agent_zero_version = self._get_agent_zero_version()
         self.agent_zero_root = files.get_abs_path("")  # Resolved Agent Zero root
+        self.chain = BackupChain(files.get_abs_path(self.STORE_DIR))
 
         # Build base paths map for pattern resolution
         self.base_paths = {
@@ -44,6 +62,7 @@ class BackupService:
         return {
             "backup_name": f"agent-zero-backup-{timestamp[:10]}",
             "include_hidden": False,
+            "incremental": False,
             "include_patterns": include_patterns,
             "exclude_patterns": exclude_patterns,
             "backup_config": {
@@ -349,9 +368,77 @@ class BackupService:
         include_patterns: List[str],
         exclude_patterns: List[str],
         include_hidden: bool = False,
-        backup_name: str = "agent-zero-backup"
+        backup_name: str = "agent-zero-backup",
+        incremental: bool = False,
+        operation_id: Optional[str] = None
     ) -> str:
-        """Create backup archive and return path to created file"""
+        """Create backup archive and return path to created file.
+
+        Incremental backups only store files changed since the previous
+        incremental backup and are kept in the backup store; restoring one
+        needs the earlier archives of the chain in that store.
+        """
+        matched_files, metadata = await self._prepare_backup(
+            include_patterns, exclude_patterns, include_hidden, backup_name
+        )
+
+        progress = self._start_operation(operation_id, matched_files)
+
+        if incremental:
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            archive = f"{files.safe_file_name(backup_name)}-{timestamp}.zip"
+            try:
+                point = await asyncio.to_thread(self.chain.write, archive, matched_files, metadata, progress)
+            except Exception as e:
+                raise Exception(f"Error creating backup: {str(e)}")
+            PrintStyle().print(
+                f"Incremental backup {archive}: stored {point['stored_files']} of {point['total_files']} files"
+            )
+            return self.chain.archive_path(archive)
+
+        # Create temporary zip file
+        temp_dir = tempfile.mkdtemp()
+        zip_path = os.path.join(temp_dir, f"{backup_name}.zip")
+
+        try:
+            await asyncio.to_thread(
+                write_zip, zip_path, self._archive_entries(matched_files, metadata), progress
+            )
+            return zip_path
+
+        except Exception as e:
+            # Cleanup on error
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+            raise Exception(f"Error creating backup: {str(e)}")
+
+    async def stream_backup(
+        self,
+        include_patterns: List[str],
+        exclude_patterns: List[str],
+        include_hidden: bool = False,
+        backup_name: str = "agent-zero-backup",
+        operation_id: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """Create a backup archive as a stream of bytes, without a temp file.
+
+        Files are compressed in parallel while the archive is consumed;
+        progress and cancellation go through operation_id.
+        """
+        matched_files, metadata = await self._prepare_backup(
+            include_patterns, exclude_patterns, include_hidden, backup_name
+        )
+        progress = self._start_operation(operation_id, matched_files)
+        return stream_zip(self._archive_entries(matched_files, metadata), progress)
+
+    async def _prepare_backup(
+        self,
+        include_patterns: List[str],
+        exclude_patterns: List[str],
+        include_hidden: bool,
+        backup_name: str
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Files matched by the patterns, and the backup metadata describing them"""
 
         # Create metadata for test_patterns
         metadata = {
@@ -366,77 +453,118 @@ class BackupService:
         if not matched_files:
             raise Exception("No files matched the backup patterns")
 
-        # Create temporary zip file
-        temp_dir = tempfile.mkdtemp()
-        zip_path = os.path.join(temp_dir, f"{backup_name}.zip")
+        # Add comprehensive metadata
+        metadata = await self._build_backup_metadata(
+            matched_files, include_patterns, exclude_patterns, include_hidden, backup_name
+        )
+        return matched_files, metadata
 
-        try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add comprehensive metadata
-                metadata = {
-                    # Basic backup information
-                    "agent_zero_version": self.agent_zero_version,
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "backup_name": backup_name,
-                    "include_hidden": include_hidden,
-
-                    # Pattern arrays for granular control during restore
-                    "include_patterns": include_patterns,
-                    "exclude_patterns": exclude_patterns,
-
-                    # System and environment information
-                    "system_info": await self._get_system_info(),
-                    "environment_info": await self._get_environment_info(),
-                    "backup_author": await self._get_backup_author(),
-
-                    # Backup configuration
-                    "backup_config": {
-                        "include_patterns": include_patterns,
-                        "exclude_patterns": exclude_patterns,
-                        "include_hidden": include_hidden,
-                        "compression_level": 6,
-                        "integrity_check": True
-                    },
-
-                    # File information
-                    "files": [
-                        {
-                            "path": f["path"],
-                            "size": f["size"],
-                            "modified": f["modified"],
-                            "type": "file"
-                        }
-                        for f in matched_files
-                    ],
-
-                    # Statistics
-                    "total_files": len(matched_files),
-                    "backup_size": sum(f["size"] for f in matched_files),
-                    "directory_count": self._count_directories(matched_files),
-                }
+    def _archive_entries(self, matched_files: List[Dict[str, Any]], metadata: Dict[str, Any]) -> Iterator[Entry]:
+        yield "metadata.json", json.dumps(metadata, indent=2).encode("utf-8")
+        for file_info in matched_files:
+            yield file_info["path"].lstrip('/'), file_info["real_path"]
+
+    @classmethod
+    def _start_operation(cls, operation_id: Optional[str], matched_files: List[Dict[str, Any]]) -> ZipStreamProgress:
+        """Register progress of a backup or restore so the web UI can poll and cancel it"""
+        progress = ZipStreamProgress(
+            files_total=len(matched_files),
+            bytes_total=sum(f.get("size", 0) for f in matched_files)
+        )
+        with cls._operations_lock:
+            # forget old operations, running or not: a streamed backup whose
+            # response was never read stays "running" forever
+            expired = time.time() - cls.OPERATION_TTL
+            for key, operation in list(cls._operations.items()):
+                if operation.started < expired:
+                    del cls._operations[key]
+            if operation_id:
+                cls._operations[operation_id] = progress
+        return progress
+
+    @classmethod
+    def get_operation(cls, operation_id: str) -> Optional[ZipStreamProgress]:
+        with cls._operations_lock:
+            return cls._operations.get(operation_id)
+
+    async def _build_backup_metadata(
+        self,
+        matched_files: List[Dict[str, Any]],
+        include_patterns: List[str],
+        exclude_patterns: List[str],
+        include_hidden: bool,
+        backup_name: str
+    ) -> Dict[str, Any]:
+        """Metadata stored as metadata.json in every backup archive"""
+        return {
+            # Basic backup information
+            "agent_zero_version": self.agent_zero_version,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "backup_name": backup_name,
+            "include_hidden": include_hidden,
 
-                zipf.writestr("metadata.json", json.dumps(metadata, indent=2))
+            # Pattern arrays for granular control during restore
+            "include_patterns": include_patterns,
+            "exclude_patterns": exclude_patterns,
 
-                # Add files
-                for file_info in matched_files:
-                    real_path = file_info["real_path"]
-                    archive_path = file_info["path"].lstrip('/')
+            # System and environment information
+            "system_info": await self._get_system_info(),
+            "environment_info": await self._get_environment_info(),
+            "backup_author": await self._get_backup_author(),
 
-                    try:
-                        if os.path.exists(real_path) and os.path.isfile(real_path):
-                            zipf.write(real_path, archive_path)
-                    except (OSError, IOError) as e:
-                        # Log error but continue with other files
-                        PrintStyle().warning(f"Warning: Could not backup file {real_path}: {e}")
-                        continue
+            # Backup configuration
+            "backup_config": {
+                "include_patterns": include_patterns,
+                "exclude_patterns": exclude_patterns,
+                "include_hidden": include_hidden,
+                "compression_level": 6,
+                "integrity_check": True
+            },
+
+            # File information
+            "files": [
+                {
+                    "path": f["path"],
+                    "size": f["size"],
+                    "modified": f["modified"],
+                    "type": "file"
+                }
+                for f in matched_files
+            ],
 
-            return zip_path
+            # Statistics
+            "total_files": len(matched_files),
+            "backup_size": sum(f["size"] for f in matched_files),
+            "directory_count": self._count_directories(matched_files),
+        }
+
+    def list_restore_points(self) -> List[Dict[str, Any]]:
+        """Incremental backups in the local backup store, oldest first"""
+        return self.chain.restore_points()
 
+    async def build_restore_point(self, archive: str, operation_id: Optional[str] = None) -> str:
+        """Rebuild an incremental backup as a standalone full archive and return its path"""
+        archive = os.path.basename(archive)
+        temp_dir = tempfile.mkdtemp()
+        zip_path = os.path.join(temp_dir, archive)
+        progress = self._start_operation(operation_id, [])
+        try:
+            return await asyncio.to_thread(self.chain.materialize, archive, zip_path, None, progress)
         except Exception as e:
-            # Cleanup on error
-            if os.path.exists(zip_path):
-                os.remove(zip_path)
-            raise Exception(f"Error creating backup: {str(e)}")
+            os.rmdir(temp_dir)
+            raise Exception(f"Error building restore point: {str(e)}")
+
+    async def _expand_incremental(self, temp_file: str, operation_id: Optional[str] = None) -> None:
+        """Replace an uploaded incremental archive with its full point-in-time archive"""
+        metadata = read_metadata(temp_file)
+        if not is_incremental(metadata):
+            return
+        full_path = temp_file + ".full"
+        progress = self._start_operation(operation_id, [])
+        await asyncio.to_thread(
+            self.chain.materialize, metadata["archive"], full_path, {metadata["archive"]: temp_file}, progress
+        )
+        os.replace(full_path, temp_file)
 
     async def inspect_backup(self, backup_file) -> Dict[str, Any]:
         """Inspect backup archive and return metadata"""
@@ -457,7 +585,11 @@ class BackupService:
                 metadata = json.loads(metadata_content)
 
                 # Add file list from archive
-                files_in_archive = [name for name in zipf.namelist() if name != "metadata.json"]
+                if is_incremental(metadata):
+                    # files at this point in time, most of them stored in earlier archives
+                    files_in_archive = [path.lstrip('/') for path in metadata.pop("manifest", {})]
+                else:
+                    files_in_archive = [name for name in zipf.namelist() if name != "metadata.json"]
                 metadata["files_in_archive"] = files_in_archive
 
                 return metadata
@@ -493,6 +625,7 @@ class BackupService:
 
         try:
             backup_file.save(temp_file)
+            await self._expand_incremental(temp_file)
 
             with zipfile.ZipFile(temp_file, 'r') as zipf:
                 # Read backup metadata from archive
@@ -613,9 +746,10 @@ class BackupService:
         restore_exclude_patterns: Optional[List[str]] = None,
         overwrite_policy: str = "overwrite",
         clean_before_restore: bool = False,
-        user_edited_metadata: Optional[Dict[str, Any]] = None
+        user_edited_metadata: Optional[Dict[str, Any]] = None,
+        operation_id: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Restore files from backup archive"""
+        """Restore files from backup archive, extracting files in parallel"""
 
         # Save uploaded file temporarily
         temp_dir = tempfile.mkdtemp()
@@ -628,6 +762,7 @@ class BackupService:
 
         try:
             backup_file.save(temp_file)
+            await self._expand_incremental(temp_file, operation_id)
 
             with zipfile.ZipFile(temp_file, 'r') as zipf:
                 # Read backup metadata from archive
@@ -687,67 +822,96 @@ class BackupService:
                         from pathspec.patterns.gitwildmatch import GitWildMatchPattern
                         restore_spec = PathSpec.from_lines(GitWildMatchPattern, pattern_lines)
 
-                # Process each file in archive
-                for archive_path in archive_files:
-                    # Archive path is already the correct relative path (e.g., "a0/tmp/settings.json")
-                    original_path = archive_path
-
-                    # Translate path from backed up system to current system
-                    # Use original metadata for path translation (environment_info needed for this)
-                    target_path = self._translate_restore_path(archive_path, original_backup_metadata)
-
-                    # For pattern matching, we need to use the translated path (current system)
-                    # so that patterns like "/home/rafael/a0/data/**" can match files correctly
-                    translated_path_for_matching = target_path.lstrip('/')
-
-                    # Check if file matches restore patterns
-                    if restore_spec and not restore_spec.match_file(translated_path_for_matching):
-                        skipped_files.append({
-                            "archive_path": archive_path,
-                            "original_path": original_path,
-                            "reason": "not_matched_by_pattern"
-                        })
-                        continue
+                # Process each file in archive, extracting on a thread pool
+                progress = self._start_operation(operation_id, [])
+                executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="backup-restore")
+                extractions = []
+                try:
+                    for archive_path in archive_files:
+                        # Archive path is already the correct relative path (e.g., "a0/tmp/settings.json")
+                        original_path = archive_path
+
+                        # Translate path from backed up system to current system
+                        # Use original metadata for path translation (environment_info needed for this)
+                        target_path = self._translate_restore_path(archive_path, original_backup_metadata)
+
+                        # For pattern matching, we need to use the translated path (current system)
+                        # so that patterns like "/home/rafael/a0/data/**" can match files correctly
+                        translated_path_for_matching = target_path.lstrip('/')
+
+                        # Check if file matches restore patterns
+                        if restore_spec and not restore_spec.match_file(translated_path_for_matching):
+                            skipped_files.append({
+                                "archive_path": archive_path,
+                                "original_path": original_path,
+                                "reason": "not_matched_by_pattern"
+                            })
+                            continue
 
-                    try:
-                        # Handle overwrite policy
-                        if os.path.exists(target_path):
-                            if overwrite_policy == "skip":
-                                skipped_files.append({
-                                    "archive_path": archive_path,
-                                    "original_path": original_path,
-                                    "reason": "file_exists_skip_policy"
-                                })
-                                continue
-                            elif overwrite_policy == "backup":
-                                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                                backup_path = f"{target_path}.backup.{timestamp}"
-                                import shutil
-                                shutil.move(target_path, backup_path)
+                        try:
+                            # Handle overwrite policy
+                            if os.path.exists(target_path):
+                                if overwrite_policy == "skip":
+                                    skipped_files.append({
+                                        "archive_path": archive_path,
+                                        "original_path": original_path,
+                                        "reason": "file_exists_skip_policy"
+                                    })
+                                    continue
+                                elif overwrite_policy == "backup":
+                                    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                                    backup_path = f"{target_path}.backup.{timestamp}"
+                                    shutil.move(target_path, backup_path)
+
+                            # Create target directory if needed
+                            target_dir = os.path.dirname(target_path)
+                            if target_dir:
+                                os.makedirs(target_dir, exist_ok=True)
 
-                        # Create target directory if needed
-                        target_dir = os.path.dirname(target_path)
-                        if target_dir:
-                            os.makedirs(target_dir, exist_ok=True)
+                        except Exception as e:
+                            errors.append({
+                                "path": archive_path,
+                                "original_path": original_path,
+                                "error": str(e)
+                            })
+                            continue
 
                         # Extract file
-                        import shutil
-                        with zipf.open(archive_path) as source, open(target_path, 'wb') as target:
-                            shutil.copyfileobj(source, target)
+                        future = executor.submit(self._extract_file, zipf, archive_path, target_path, progress)
+                        extractions.append((archive_path, original_path, target_path, future))
+                        progress.files_total += 1
+                        progress.bytes_total += zipf.getinfo(archive_path).file_size
 
-                        restored_files.append({
-                            "archive_path": archive_path,
-                            "original_path": original_path,
-                            "target_path": target_path,
-                            "status": "restored"
-                        })
-
-                    except Exception as e:
-                        errors.append({
-                            "path": archive_path,
-                            "original_path": original_path,
-                            "error": str(e)
-                        })
+                    for archive_path, original_path, target_path, future in extractions:
+                        try:
+                            await asyncio.wrap_future(future)
+                            restored_files.append({
+                                "archive_path": archive_path,
+                                "original_path": original_path,
+                                "target_path": target_path,
+                                "status": "restored"
+                            })
+                            progress.files_done += 1
+                            progress.bytes_done += zipf.getinfo(archive_path).file_size
+                        except ZipStreamCancelled:
+                            skipped_files.append({
+                                "archive_path": archive_path,
+                                "original_path": original_path,
+                                "reason": "cancelled"
+                            })
+                        except Exception as e:
+                            errors.append({
+                                "path": archive_path,
+                                "original_path": original_path,
+                                "error": str(e)
+                            })
+                    progress.status = "cancelled" if progress.cancelled else "done"
+                except BaseException:
+                    progress.status = "error"
+                    raise
+                finally:
+                    # workers read from zipf, which closes after this block
+                    executor.shutdown(wait=True, cancel_futures=True)
 
                 return {
                     "restored_files": restored_files,
@@ -771,6 +935,15 @@ class BackupService:
             if os.path.exists(temp_dir):
                 os.rmdir(temp_dir)
 
+    @staticmethod
+    def _extract_file(zipf: zipfile.ZipFile, archive_path: str, target_path: str,
+                      progress: ZipStreamProgress) -> None:
+        """Extract one file, on a worker thread (reads from zipf are thread-safe)"""
+        if progress.cancelled:
+            raise ZipStreamCancelled("Restore cancelled")
+        with zipf.open(archive_path) as source, open(target_path, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+
     def _translate_restore_path(self, archive_path: str, backup_metadata: Dict[str, Any]) -> str:
         """Translate file path from backed up system to current system.
 
@@ -0,0 +1,255 @@
+"""
+Incremental backup chains.
+
+An incremental backup is a zip archive holding only the files whose content
+is not already in the chain, plus a manifest of every file at that point in
+time: path, size, mtime, sha256 and the archive (and path inside it) that
+holds the content. Files whose size and mtime are unchanged since the
+previous backup are not even read. Restoring a point in time reads each file
+from the archive its manifest entry points at, so any backup in the chain
+can be rebuilt as a standalone full archive.
+
+Archives are written with zip_stream, so both writing a backup and
+rebuilding a point in time compress in parallel and report progress and
+cancellation through a ZipStreamProgress.
+
+Archives and the chain index live in a local store directory.
+"""
+
+import datetime
+import functools
+import hashlib
+import json
+import os
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from python.helpers.zip_stream import StreamSource, ZipStreamCancelled, ZipStreamProgress, write_zip
+
+INDEX_FILE = "index.json"
+METADATA_FILE = "metadata.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_hash(path: str) -> str:
+    """sha256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_metadata(zip_path: str) -> Dict[str, Any]:
+    with zipfile.ZipFile(zip_path, "r") as zipf:
+        if METADATA_FILE not in zipf.namelist():
+            return {}
+        return json.loads(zipf.read(METADATA_FILE).decode("utf-8"))
+
+
+def is_incremental(metadata: Dict[str, Any]) -> bool:
+    return metadata.get("backup_type") == "incremental"
+
+
+class BackupChain:
+    """Chain of incremental backup archives kept in store_dir"""
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+
+    def archive_path(self, archive: str) -> str:
+        return os.path.join(self.store_dir, archive)
+
+    def restore_points(self) -> List[Dict[str, Any]]:
+        """Index entries of every backup in the chain, oldest first"""
+        path = os.path.join(self.store_dir, INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            points = json.load(f)
+        # archives deleted by hand are no longer restore points
+        return [p for p in points if os.path.exists(self.archive_path(p["archive"]))]
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        points = self.restore_points()
+        return points[-1] if points else None
+
+    def load_manifest(self, archive: str) -> Dict[str, Dict[str, Any]]:
+        return read_metadata(self.archive_path(archive)).get("manifest", {})
+
+    def plan(
+        self,
+        matched_files: List[Dict[str, Any]],
+        previous: Dict[str, Dict[str, Any]],
+        progress: Optional[ZipStreamProgress] = None,
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Manifest for matched_files given the previous manifest, and the files
+        whose content has to be stored in the new archive. Manifest entries
+        without an "archive" are stored in the new archive.
+        """
+        known = {entry["sha256"]: entry for entry in previous.values()}
+        manifest: Dict[str, Dict[str, Any]] = {}
+        to_store: List[Dict[str, Any]] = []
+
+        for file_info in matched_files:
+            if progress and progress.cancelled:
+                raise ZipStreamCancelled("Backup cancelled")
+            path = file_info["path"]
+            try:
+                stat = os.stat(file_info["real_path"])
+            except OSError:
+                continue
+
+            entry = previous.get(path)
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                manifest[path] = entry  # unchanged, don't read it
+                continue
+
+            try:
+                sha256 = file_hash(file_info["real_path"])
+            except OSError:
+                continue
+
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+            source = known.get(sha256)
+            if source:
+                # same content is already stored, in the chain or in this archive
+                if "archive" in source:
+                    entry["archive"] = source["archive"]
+                entry["archive_path"] = source["archive_path"]
+            else:
+                entry["archive_path"] = path.lstrip("/")
+                known[sha256] = entry
+                to_store.append(file_info)
+            manifest[path] = entry
+
+        return manifest, to_store
+
+    def write(
+        self,
+        archive: str,
+        matched_files: List[Dict[str, Any]],
+        metadata: Dict[str, Any],
+        progress: Optional[ZipStreamProgress] = None,
+    ) -> Dict[str, Any]:
+        """
+        Write the next backup in the chain as archive and return its index
+        entry. metadata is stored alongside the manifest in metadata.json.
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        progress = progress or ZipStreamProgress()
+        parent = self.latest()
+        previous = self.load_manifest(parent["archive"]) if parent else {}
+        # files whose archive was deleted by hand are hashed and stored again
+        available = {name: os.path.exists(self.archive_path(name))
+                     for name in {entry["archive"] for entry in previous.values()}}
+        previous = {path: entry for path, entry in previous.items() if available[entry["archive"]]}
+        manifest, to_store = self.plan(matched_files, previous, progress)
+        for entry in manifest.values():
+            entry.setdefault("archive", archive)
+
+        progress.files_total = len(to_store)
+        progress.bytes_total = sum(manifest[f["path"]]["size"] for f in to_store)
+        entries = ((manifest[f["path"]]["archive_path"], f["real_path"]) for f in to_store)
+
+        zip_path = self.archive_path(archive)
+        try:
+            write_zip(zip_path, entries, progress)
+
+            # files that could not be read are left out of the archive,
+            # so they are left out of the manifest too
+            with zipfile.ZipFile(zip_path, "r") as zipf:
+                sizes = {info.filename: info.file_size for info in zipf.infolist()}
+            manifest = {
+                path: entry for path, entry in manifest.items()
+                if entry["archive"] != archive or sizes.get(entry["archive_path"]) == entry["size"]
+            }
+            stored = [f for f in to_store if f["path"] in manifest]
+
+            with zipfile.ZipFile(zip_path, "a", zipfile.ZIP_DEFLATED) as zipf:
+                zipf.writestr(METADATA_FILE, json.dumps({
+                    **metadata,
+                    "backup_type": "incremental",
+                    "archive": archive,
+                    "parent": parent["archive"] if parent else None,
+                    "manifest": manifest,
+                }, indent=2))
+        except BaseException:
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+            raise
+
+        point = {
+            "archive": archive,
+            "backup_name": metadata.get("backup_name", ""),
+            "timestamp": metadata.get("timestamp", datetime.datetime.now().isoformat()),
+            "parent": parent["archive"] if parent else None,
+            "total_files": len(manifest),
+            "stored_files": len(stored),
+            "stored_size": sum(manifest[f["path"]]["size"] for f in stored),
+        }
+        self._save_index(self.restore_points() + [point])
+        return point
+
+    def materialize(
+        self,
+        archive: str,
+        zip_path: str,
+        archive_files: Optional[Dict[str, str]] = None,
+        progress: Optional[ZipStreamProgress] = None,
+    ) -> str:
+        """
+        Rebuild the backup archive as a standalone full backup at zip_path.
+        archive_files maps archive names to files to use instead of the store,
+        e.g. an uploaded copy of the archive itself.
+        """
+        archive_files = archive_files or {}
+        progress = progress or ZipStreamProgress()
+
+        def locate(name: str) -> str:
+            path = archive_files.get(name) or self.archive_path(name)
+            if not os.path.exists(path):
+                raise Exception(f"Backup archive {name} is missing from the backup store")
+            return path
+
+        metadata = read_metadata(locate(archive))
+        manifest = metadata.pop("manifest", {})
+        metadata["backup_type"] = "full"
+        progress.files_total = len(manifest)
+        progress.bytes_total = sum(entry["size"] for entry in manifest.values())
+
+        sources: Dict[str, zipfile.ZipFile] = {}
+
+        def open_entry(entry: Dict[str, Any]):
+            # source archives are opened as the writer reaches them
+            name = entry["archive"]
+            if name not in sources:
+                sources[name] = zipfile.ZipFile(locate(name), "r")
+            return sources[name].open(entry["archive_path"])
+
+        def entries():
+            yield METADATA_FILE, json.dumps(metadata, indent=2).encode("utf-8")
+            for path, entry in manifest.items():
+                yield path.lstrip("/"), StreamSource(
+                    functools.partial(open_entry, entry), entry["size"], entry["mtime_ns"] / 1e9
+                )
+
+        try:
+            write_zip(zip_path, entries(), progress)
+        except BaseException:
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+            raise
+        finally:
+            for source in sources.values():
+                source.close()
+
+        return zip_path
+
+    def _save_index(self, points: List[Dict[str, Any]]) -> None:
+        path = os.path.join(self.store_dir, INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(points, f, indent=2)
+        os.replace(tmp_path, path)
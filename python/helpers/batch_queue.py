@@ -0,0 +1,163 @@
+"""
+Bounded request queue served by a single dispatcher thread.
+
+Requests that pile up while a batch is being processed are taken together
+as the next batch, so bursts are processed in fewer, larger calls without
+delaying a lone request. The queue is bounded, a full queue rejects new
+requests instead of letting latency grow without limit. Queue depth and
+latency metrics are kept for the most recent requests.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Generic, Hashable, TypeVar
+
+I = TypeVar("I")
+O = TypeVar("O")
+
+METRICS_WINDOW = 100
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class _Request(Generic[I, O]):
+    item: I
+    future: "Future[O]" = field(default_factory=Future)
+    queued: float = field(default_factory=time.monotonic)
+
+
+class BatchQueue(Generic[I, O]):
+    """
+    process_batch(items) returns one output per item. Only items with the
+    same batch_key are processed together, and at most max_batch at once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[list[I]], list[O]],
+        *,
+        max_size: int = 16,
+        max_batch: int = 8,
+        batch_key: Callable[[I], Hashable] = lambda item: None,
+    ):
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.batch_key = batch_key
+        self._queue: queue.Queue[_Request[I, O]] = queue.Queue(maxsize=max_size)
+        self._carry: _Request[I, O] | None = None
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+        self._metrics_lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._latencies: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._batch_sizes: deque[int] = deque(maxlen=METRICS_WINDOW)
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.busy = False
+
+    def submit(self, item: I) -> "Future[O]":
+        request: _Request[I, O] = _Request(item)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            with self._metrics_lock:
+                self.rejected += 1
+            raise QueueFullError(f"{self.name} queue is full ({self._queue.maxsize} requests waiting)")
+        self._ensure_thread()
+        return request.future
+
+    async def process(self, item: I) -> O:
+        return await asyncio.wrap_future(self.submit(item))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + (1 if self._carry else 0)
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            waits, latencies, sizes = list(self._waits), list(self._latencies), list(self._batch_sizes)
+            return {
+                "queue_depth": self.depth,
+                "queue_size": self._queue.maxsize,
+                "busy": self.busy,
+                "processed": self.processed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+                "avg_wait_ms": _ms(sum(waits) / len(waits)) if waits else 0,
+                "avg_latency_ms": _ms(sum(latencies) / len(latencies)) if latencies else 0,
+                "p95_latency_ms": _ms(_percentile(latencies, 0.95)) if latencies else 0,
+            }
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.monotonic()
+            self.busy = True
+            try:
+                outputs = self.process_batch([request.item for request in batch])
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"{self.name} returned {len(outputs)} results for {len(batch)} requests")
+                for request, output in zip(batch, outputs):
+                    request.future.set_result(output)
+                failed = 0
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                failed = len(batch)
+            finally:
+                self.busy = False
+            self._record(batch, started, failed)
+
+    def _next_batch(self) -> list[_Request[I, O]]:
+        # block for the first request, then take whatever else is already waiting
+        first, self._carry = self._carry or self._queue.get(), None
+        batch = [first]
+        key = self.batch_key(first.item)
+        while len(batch) < self.max_batch:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if self.batch_key(request.item) != key:
+                self._carry = request  # starts the next batch, keeps arrival order
+                break
+            batch.append(request)
+        return batch
+
+    def _record(self, batch: list[_Request[I, O]], started: float, failed: int):
+        finished = time.monotonic()
+        with self._metrics_lock:
+            self._batch_sizes.append(len(batch))
+            for request in batch:
+                self._waits.append(started - request.queued)
+                self._latencies.append(finished - request.queued)
+            self.processed += len(batch) - failed
+            self.failed += failed
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
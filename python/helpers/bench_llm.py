@@ -0,0 +1,175 @@
+"""
+Deterministic local model provider for benchmarks.
+
+ScriptedLLM is registered with LiteLLM as the "a0bench" provider, so agents
+configured with it go through the same models.py wrappers, LiteLLM call path
+and streaming callbacks as with a real provider, without any network access.
+Chat models answer with canned responses per model name, streamed in chunks
+with a configurable first-token latency and token rate. Embeddings are hashed
+bags of words: deterministic, and texts sharing words come out similar, so
+memory recall finds what was saved.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator
+
+# the cost map is otherwise fetched from GitHub on import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm
+from litellm import CustomLLM
+# points tiktoken at LiteLLM's bundled encodings, token counting stays offline
+from litellm.litellm_core_utils import default_encoding  # noqa: F401
+from litellm.types.utils import EmbeddingResponse, GenericStreamingChunk, ModelResponse
+
+PROVIDER = "a0bench"
+CHARS_PER_TOKEN = 4
+EMBEDDING_DIMENSIONS = 256
+_WORD = re.compile(r"\w+")
+
+# receives the model name and the LiteLLM messages, returns the response text
+Responder = Callable[[str, list[dict]], str]
+
+
+class ScriptedLLM(CustomLLM):
+
+    def __init__(
+        self,
+        responses: dict[str, Iterable[str]] | None = None,
+        *,
+        default: str | Responder = "[]",
+        first_token_latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        tokens_per_chunk: int = 4,
+    ):
+        super().__init__()
+        self.default = default
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.tokens_per_chunk = tokens_per_chunk
+        self._lock = threading.Lock()
+        self._scripts: dict[str, deque[str]] = {}
+        self.calls: list[tuple[str, list[dict]]] = []
+        self.embedded = 0
+        self.script(responses or {})
+
+    def script(self, responses: dict[str, Iterable[str]]):
+        """Queue responses per model name, answered in order"""
+        with self._lock:
+            for model, texts in responses.items():
+                self._scripts.setdefault(model, deque()).extend(texts)
+
+    def pending(self, model: str) -> int:
+        """Scripted responses not requested yet"""
+        with self._lock:
+            return len(self._scripts.get(model) or ())
+
+    def reset(self):
+        with self._lock:
+            self._scripts.clear()
+            self.calls.clear()
+            self.embedded = 0
+
+    def respond(self, model: str, messages: list[dict]) -> str:
+        name = model.split("/", 1)[-1]
+        with self._lock:
+            self.calls.append((name, messages))
+            script = self._scripts.get(name)
+            if script:
+                return script.popleft()
+        return self.default(name, messages) if callable(self.default) else self.default
+
+    def chunks(self, text: str) -> list[str]:
+        size = max(1, self.tokens_per_chunk * CHARS_PER_TOKEN)
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def chunk_delay(self) -> float:
+        return self.tokens_per_chunk / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    # LiteLLM entry points, the router passes everything by keyword
+
+    def completion(self, model: str, messages: list, model_response: ModelResponse, **kwargs) -> ModelResponse:
+        time.sleep(self.first_token_latency)
+        text = self.respond(model, messages)
+        time.sleep(self.chunk_delay() * len(self.chunks(text)))
+        return _fill_response(model_response, model, text)
+
+    async def acompletion(self, model: str, messages: list, model_response: ModelResponse, **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.first_token_latency)
+        text = self.respond(model, messages)
+        await asyncio.sleep(self.chunk_delay() * len(self.chunks(text)))
+        return _fill_response(model_response, model, text)
+
+    def streaming(self, model: str, messages: list, **kwargs) -> Iterator[GenericStreamingChunk]:
+        time.sleep(self.first_token_latency)
+        chunks = self.chunks(self.respond(model, messages))
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(self.chunk_delay())
+            yield _stream_chunk(chunk, index == len(chunks) - 1)
+
+    async def astreaming(self, model: str, messages: list, **kwargs) -> AsyncIterator[GenericStreamingChunk]:  # type: ignore[override]
+        await asyncio.sleep(self.first_token_latency)
+        chunks = self.chunks(self.respond(model, messages))
+        for index, chunk in enumerate(chunks):
+            if index:
+                await asyncio.sleep(self.chunk_delay())
+            yield _stream_chunk(chunk, index == len(chunks) - 1)
+
+    def embedding(self, model: str, input: list, model_response: EmbeddingResponse, **kwargs) -> EmbeddingResponse:  # type: ignore[override]
+        texts = [input] if isinstance(input, str) else list(input)
+        with self._lock:
+            self.embedded += len(texts)
+        model_response.model = model
+        model_response.data = [
+            {"object": "embedding", "index": i, "embedding": embed(text)} for i, text in enumerate(texts)
+        ]
+        return model_response
+
+    async def aembedding(self, model: str, input: list, model_response: EmbeddingResponse, **kwargs) -> EmbeddingResponse:  # type: ignore[override]
+        return self.embedding(model, input, model_response)
+
+
+def embed(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> list[float]:
+    """Unit vector of hashed word counts"""
+    vector = [0.0] * dimensions
+    for word in _WORD.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        vector[int.from_bytes(digest[:4], "little") % dimensions] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    if not norm:
+        vector[0], norm = 1.0, 1.0
+    return [v / norm for v in vector]
+
+
+def _fill_response(model_response: ModelResponse, model: str, text: str) -> ModelResponse:
+    model_response.model = model
+    model_response.choices[0].message.content = text  # type: ignore
+    return model_response
+
+
+def _stream_chunk(text: str, last: bool) -> GenericStreamingChunk:
+    return {
+        "text": text,
+        "tool_use": None,
+        "is_finished": last,
+        "finish_reason": "stop" if last else "",
+        "usage": None,
+        "index": 0,
+    }
+
+
+def register(llm: ScriptedLLM) -> ScriptedLLM:
+    """Route the a0bench provider to llm, replacing an earlier registration"""
+    litellm.custom_provider_map = [
+        item for item in litellm.custom_provider_map if item["provider"] != PROVIDER
+    ] + [{"provider": PROVIDER, "custom_handler": llm}]
+    litellm.utils.custom_llm_setup()
+    return llm
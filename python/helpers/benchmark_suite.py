@@ -14,6 +14,7 @@ Features:
 from __future__ import annotations
 
 import json
+import random
 import statistics
 import time
 from dataclasses import dataclass, field
@@ -54,6 +55,8 @@ class BenchmarkSuite:
     description: str
     benchmarks: List[Benchmark] = field(default_factory=list)
     created_at: float = field(default_factory=time.time)
+    # slow suites only run when asked for by name, run_all skips them
+    opt_in: bool = False
 
 
 class MetricCollector:
@@ -164,6 +167,193 @@ class BenchmarkRunner:
 
         self.suites["quality"] = quality_suite
 
+        self._setup_graph_benchmarks()
+        self._setup_memory_benchmarks(10_000)
+        # building the 100k fixture alone takes ~40s
+        self._setup_memory_benchmarks(100_000, opt_in=True)
+
+    def _setup_graph_benchmarks(self):
+        """Knowledge graph traversal benchmarks over a synthetic graph"""
+        graph_suite = BenchmarkSuite(
+            name="knowledge_graph",
+            description="Knowledge graph index and traversal benchmarks (5k entities, 50k edges)"
+        )
+
+        graph_suite.benchmarks = [
+            Benchmark(
+                name="graph_build",
+                description="Build a synthetic 5k-entity, 50k-edge graph",
+                runner=lambda: self._synthetic_graph(rebuild=True),
+                validator=lambda g: len(g.relationships) > 0,
+                category="knowledge_graph",
+                iterations=1
+            ),
+            Benchmark(
+                name="graph_neighbors",
+                description="Neighbor and relationship lookups for every entity",
+                runner=self._benchmark_graph_neighbors,
+                category="knowledge_graph",
+                iterations=3
+            ),
+            Benchmark(
+                name="graph_name_lookup",
+                description="find_entity_by_name for every entity",
+                runner=lambda: [self._synthetic_graph().find_entity_by_name(f"entity_{i}")
+                                for i in range(5000)],
+                category="knowledge_graph",
+                iterations=3
+            ),
+            Benchmark(
+                name="graph_query",
+                description="Pattern queries with bound subject, predicate or object",
+                runner=self._benchmark_graph_query,
+                category="knowledge_graph",
+                iterations=3
+            ),
+            Benchmark(
+                name="graph_paths",
+                description="Bounded path queries between random entity pairs",
+                runner=self._benchmark_graph_paths,
+                category="knowledge_graph",
+                iterations=3
+            ),
+            Benchmark(
+                name="graph_triangles",
+                description="Triangle enumeration",
+                runner=lambda: self._synthetic_graph().pattern_matcher.find_triangles(),
+                category="knowledge_graph",
+                iterations=1
+            ),
+            Benchmark(
+                name="graph_clusters",
+                description="Cluster discovery by BFS",
+                runner=lambda: self._synthetic_graph().pattern_matcher.find_clusters(),
+                category="knowledge_graph",
+                iterations=3
+            )
+        ]
+
+        self.suites["knowledge_graph"] = graph_suite
+
+    def _synthetic_graph(self, n_entities: int = 5000, n_relationships: int = 50000,
+                         seed: int = 42, rebuild: bool = False):
+        """Build (once) a random graph with a few relation types"""
+        graph = getattr(self, "_graph_fixture", None)
+        if graph is not None and not rebuild:
+            return graph
+
+        from python.helpers.knowledge_graph import KnowledgeGraph
+
+        rng = random.Random(seed)
+        relation_types = ["is_a", "has_a", "related_to", "depends_on", "causes"]
+        graph = KnowledgeGraph("benchmark")
+        ids = [graph.add_entity(f"entity_{i}", f"type_{i % 10}").id for i in range(n_entities)]
+        for _ in range(n_relationships):
+            graph.add_relationship(
+                rng.choice(ids), rng.choice(ids), rng.choice(relation_types),
+                bidirectional=rng.random() < 0.1
+            )
+        self._graph_fixture = graph
+        return graph
+
+    def _setup_memory_benchmarks(self, size: int, opt_in: bool = False):
+        """MemorySupercharger benchmarks at a given number of memories"""
+        label = f"{size // 1000}k"
+        memory_suite = BenchmarkSuite(
+            name=f"memory_{label}",
+            description=f"Memory supercharger benchmarks at {label} memories",
+            opt_in=opt_in
+        )
+
+        memory_suite.benchmarks = [
+            Benchmark(
+                name=f"memory_{label}_fill",
+                description=f"Bulk insert {label} memories",
+                runner=lambda: self._memory_fixture(size, rebuild=True),
+                validator=lambda sc: len(sc.memories) == size,
+                category="memory",
+                iterations=1
+            ),
+            Benchmark(
+                name=f"memory_{label}_insert",
+                description="100 single inserts at capacity (with eviction)",
+                runner=lambda: [self._memory_fixture(size).insert(f"benchmark insert {i}")
+                                for i in range(100)],
+                category="memory",
+                iterations=3
+            ),
+            Benchmark(
+                name=f"memory_{label}_retrieve",
+                description="50 scored retrievals",
+                runner=lambda: [self._memory_fixture(size).retrieve(f"benchmark query {i}", limit=10)
+                                for i in range(50)],
+                category="memory",
+                iterations=3
+            ),
+            Benchmark(
+                name=f"memory_{label}_decay",
+                description="Temporal decay over all memories",
+                runner=lambda: self._memory_fixture(size).decay(),
+                category="memory",
+                iterations=3
+            ),
+            Benchmark(
+                name=f"memory_{label}_consolidate",
+                description="Consolidate pending similar memories",
+                runner=lambda: self._memory_fixture(size).consolidate(),
+                category="memory",
+                iterations=1
+            )
+        ]
+
+        self.suites[memory_suite.name] = memory_suite
+
+    def _memory_fixture(self, size: int, rebuild: bool = False):
+        """Build (once per size) a supercharger filled with random unit embeddings"""
+        fixtures = self.__dict__.setdefault("_memory_fixtures", {})
+        if size in fixtures and not rebuild:
+            return fixtures[size]
+
+        import numpy as np
+        from python.helpers.memory_supercharger import MemorySupercharger
+
+        rng = np.random.default_rng(42)
+        embeddings = rng.normal(size=(size, 128)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        supercharger = MemorySupercharger(max_memories=size)
+        supercharger.insert_many([f"memory {i}" for i in range(size)], embeddings=embeddings)
+        fixtures[size] = supercharger
+        return supercharger
+
+    def _benchmark_graph_neighbors(self) -> Dict[str, Any]:
+        graph = self._synthetic_graph()
+        edges = 0
+        for entity_id in graph.entities:
+            edges += len(graph.get_neighbors(entity_id))
+            edges += len(graph.get_relationships_from(entity_id))
+            edges += len(graph.get_relationships_to(entity_id))
+        return {"edges_visited": edges}
+
+    def _benchmark_graph_query(self) -> Dict[str, Any]:
+        graph = self._synthetic_graph()
+        ids = list(graph.entities)[:200]
+        results = 0
+        for entity_id in ids:
+            results += len(graph.query(f"{entity_id} related_to ?y"))
+            results += len(graph.query(f"?x depends_on {entity_id}"))
+            results += len(graph.query(f"{entity_id} ?r *"))
+        return {"results": results}
+
+    def _benchmark_graph_paths(self) -> Dict[str, Any]:
+        graph = self._synthetic_graph()
+        rng = random.Random(7)
+        ids = list(graph.entities)
+        paths = 0
+        for _ in range(20):
+            paths += len(graph.query_engine.path_query(rng.choice(ids), rng.choice(ids), max_depth=4))
+        return {"paths": paths}
+
     def _benchmark_memory(self) -> Dict[str, Any]:
         """Memory efficiency benchmark"""
         import sys
@@ -258,11 +448,12 @@ class BenchmarkRunner:
         return results
 
     def run_all(self) -> Dict[str, List[BenchmarkResult]]:
-        """Run all benchmark suites"""
+        """Run all benchmark suites except the opt-in ones"""
         all_results = {}
 
-        for suite_name in self.suites:
-            all_results[suite_name] = self.run_suite(suite_name)
+        for suite_name, suite in self.suites.items():
+            if not suite.opt_in:
+                all_results[suite_name] = self.run_suite(suite_name)
 
         return all_results
 
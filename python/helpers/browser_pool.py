@@ -0,0 +1,345 @@
+"""
+Pool of pre-launched headless browsers for the browser agent.
+
+Each browser agent leases its own browser process with a throwaway profile
+directory, so agents never share cookies, storage or tabs. Released
+browsers are closed and their profile deleted, and spare browsers are kept
+launched in the background so the next agent doesn't wait for a cold
+start. Browsers are reached over CDP, so the pool works from any thread or
+event loop; Playwright objects are created by the consumer on its own loop.
+
+The total resident memory of all browsers is capped: over the cap, spares
+are closed and no new browsers are launched until leases are released.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+import psutil
+
+from python.helpers.print_style import PrintStyle
+
+WARM = 1
+MAX_BROWSERS = 8
+MAX_MEMORY_MB = 4096
+ACQUIRE_TIMEOUT = 60
+LAUNCH_TIMEOUT = 30
+METRICS_WINDOW = 100
+
+CHROMIUM_ARGS = [
+    "--headless=new",
+    "--no-sandbox",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-dev-shm-usage",
+    "--disable-web-security",
+    "--disable-site-isolation-trials",
+    "--disable-features=IsolateOrigins,site-per-process",
+    "--window-size=1024,2048",
+]
+
+
+@dataclass
+class BrowserProcess:
+    cdp_url: str
+    process: subprocess.Popen | None = None
+    user_data_dir: str = ""
+    launch_time: float = 0.0
+    created: float = field(default_factory=time.monotonic)
+
+    @property
+    def alive(self) -> bool:
+        return self.process is None or self.process.poll() is None
+
+    def memory(self) -> int:
+        """Resident memory of the browser and its renderer processes in bytes"""
+        if not self.process:
+            return 0
+        try:
+            root = psutil.Process(self.process.pid)
+            return sum(p.memory_info().rss for p in [root, *root.children(recursive=True)])
+        except psutil.Error:
+            return 0
+
+    def close(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+def launch_chromium(executable: str, args: list[str] | None = None, timeout: float = LAUNCH_TIMEOUT) -> BrowserProcess:
+    """Start Chromium with a fresh profile and a CDP endpoint on a free port"""
+    started = time.monotonic()
+    user_data_dir = tempfile.mkdtemp(prefix="a0-browser-")
+    process = subprocess.Popen(
+        [
+            executable,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={user_data_dir}",
+            *(CHROMIUM_ARGS if args is None else args),
+            "about:blank",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    browser = BrowserProcess("", process, user_data_dir)
+    # chromium writes the port it bound to into the profile directory
+    port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+    while time.monotonic() - started < timeout:
+        if process.poll() is not None:
+            browser.close()
+            raise RuntimeError(f"Browser exited during startup with code {process.returncode}")
+        try:
+            with open(port_file) as f:
+                port = f.readline().strip()
+            if port:
+                browser.cdp_url = f"http://127.0.0.1:{port}"
+                browser.launch_time = time.monotonic() - started
+                return browser
+        except FileNotFoundError:
+            pass
+        time.sleep(0.02)
+    browser.close()
+    raise TimeoutError(f"Browser did not start within {timeout} seconds")
+
+
+class BrowserPool:
+
+    def __init__(
+        self,
+        launch: Callable[[], BrowserProcess],
+        *,
+        warm: int = WARM,
+        max_browsers: int = MAX_BROWSERS,
+        max_memory_mb: int = MAX_MEMORY_MB,
+        acquire_timeout: float = ACQUIRE_TIMEOUT,
+    ):
+        self.launch = launch
+        self.warm = warm
+        self.max_browsers = max_browsers
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        self._idle: deque[BrowserProcess] = deque()
+        self._leased: dict[str, BrowserProcess] = {}
+        self._launching = 0
+        self._filling = False
+        self._closed = False
+
+        self._launch_times: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._acquire_times: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.warm_hits = 0
+        self.cold_starts = 0
+        self.launch_failures = 0
+        self.recycled = 0
+
+    def acquire(self, owner: str) -> BrowserProcess:
+        """Browser leased to owner, the same one until it is released"""
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                leased = self._leased.get(owner)
+                if leased and leased.alive:
+                    return leased
+                if leased:
+                    self._discard(self._leased.pop(owner))
+                while self._idle:
+                    browser = self._idle.popleft()
+                    if browser.alive:
+                        self._leased[owner] = browser
+                        self.warm_hits += 1
+                        self._acquire_times.append(time.monotonic() - started)
+                        self._start_fill()
+                        return browser
+                    self._discard(browser)
+                if self._can_launch():
+                    self._launching += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No browser available within {self.acquire_timeout} seconds "
+                        f"({len(self._leased)} in use, {self.memory_mb()} MB)"
+                    )
+                self._cond.wait(remaining)
+
+        # nothing warm, launch one for this owner
+        browser = self._launch()
+        with self._cond:
+            self._leased[owner] = browser
+            self.cold_starts += 1
+            self._acquire_times.append(time.monotonic() - started)
+            self._start_fill()
+        return browser
+
+    async def acquire_async(self, owner: str) -> BrowserProcess:
+        return await asyncio.to_thread(self.acquire, owner)
+
+    def release(self, owner: str, wait: bool = True):
+        """Close the owner's browser, its profile goes with it, in the background unless wait"""
+        with self._cond:
+            browser = self._leased.pop(owner, None)
+            if browser:
+                self.recycled += 1
+        if not browser:
+            return
+        if wait:
+            self._close_released(browser)
+        else:
+            threading.Thread(target=self._close_released, args=(browser,), daemon=True).start()
+
+    def _close_released(self, browser: BrowserProcess):
+        browser.close()
+        with self._cond:
+            self._cond.notify_all()
+            self._start_fill()
+
+    def prewarm(self):
+        with self._cond:
+            self._start_fill()
+
+    def memory_mb(self) -> int:
+        with self._cond:
+            browsers = [*self._idle, *self._leased.values()]
+        return sum(b.memory() for b in browsers) // (1024 * 1024)
+
+    def stats(self) -> dict:
+        memory = self.memory_mb()
+        with self._cond:
+            launches, acquires = list(self._launch_times), list(self._acquire_times)
+            return {
+                "leased": len(self._leased),
+                "idle": len(self._idle),
+                "launching": self._launching,
+                "memory_mb": memory,
+                "max_memory_mb": self.max_memory // (1024 * 1024),
+                "warm_hits": self.warm_hits,
+                "cold_starts": self.cold_starts,
+                "launch_failures": self.launch_failures,
+                "recycled": self.recycled,
+                "avg_launch_ms": _ms(sum(launches) / len(launches)) if launches else 0,
+                "avg_acquire_ms": _ms(sum(acquires) / len(acquires)) if acquires else 0,
+                "max_acquire_ms": _ms(max(acquires)) if acquires else 0,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            browsers = [*self._idle, *self._leased.values()]
+            self._idle.clear()
+            self._leased.clear()
+            self._cond.notify_all()
+        for browser in browsers:
+            browser.close()
+
+    def _can_launch(self) -> bool:
+        # called with the lock held
+        count = len(self._idle) + len(self._leased) + self._launching
+        if count >= self.max_browsers:
+            return False
+        if count and self._memory_locked() >= self.max_memory:
+            # make room by closing spares before refusing
+            while self._idle:
+                self._discard(self._idle.pop())
+            return self._memory_locked() < self.max_memory
+        return True
+
+    def _memory_locked(self) -> int:
+        return sum(b.memory() for b in [*self._idle, *self._leased.values()])
+
+    def _discard(self, browser: BrowserProcess):
+        threading.Thread(target=browser.close, daemon=True).start()
+
+    def _launch(self) -> BrowserProcess:
+        try:
+            browser = self.launch()
+        except Exception:
+            with self._cond:
+                self._launching -= 1
+                self.launch_failures += 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._launching -= 1
+            self._launch_times.append(browser.launch_time)
+        return browser
+
+    def _start_fill(self):
+        # called with the lock held, keeps `warm` spare browsers launched
+        if self._filling or self._closed or len(self._idle) + self._launching >= self.warm:
+            return
+        self._filling = True
+        threading.Thread(target=self._fill, name="browser-pool-fill", daemon=True).start()
+
+    def _fill(self):
+        try:
+            while True:
+                with self._cond:
+                    if self._closed or len(self._idle) + self._launching >= self.warm or not self._can_launch():
+                        return
+                    self._launching += 1
+                try:
+                    browser = self._launch()
+                except Exception as e:
+                    PrintStyle.error(f"Could not launch a spare browser: {e}")
+                    return
+                with self._cond:
+                    if self._closed:
+                        self._discard(browser)
+                        return
+                    self._idle.append(browser)
+                    self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._filling = False
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+_pool: BrowserPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BrowserPool:
+    """Shared pool of Playwright's headless shell, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from python.helpers.playwright import ensure_playwright_binary
+            executable = str(ensure_playwright_binary())
+            _pool = BrowserPool(lambda: launch_chromium(executable))
+        return _pool
+
+
+def release(owner: str, wait: bool = True):
+    """Release owner's browser, if the pool was ever started"""
+    if _pool is not None:
+        _pool.release(owner, wait=wait)
+
+
+def get_stats() -> dict:
+    if _pool is None:
+        return {"started": False}
+    return {"started": True, **_pool.stats()}
@@ -1,5 +1,4 @@
 from typing import Any
-from browser_use.llm import ChatGoogle
 from python.helpers import dirty_json
 
 
@@ -159,4 +158,6 @@ def _patched_fix_gemini_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
 
 def apply():
     """Applies the monkey-patch to ChatGoogle."""
+    # imported here, loading ChatGoogle takes seconds and only browser models need it
+    from browser_use.llm import ChatGoogle
     ChatGoogle._fix_gemini_schema = _patched_fix_gemini_schema
@@ -1,4 +1,20 @@
 import json
+import re
+
+
+def _reject_constant(name: str):
+    # NaN and Infinity are not JSON, the tolerant parser reads them as text
+    raise ValueError(name)
+
+
+# C scanner for the well-formed parts, strict=False allows raw newlines in
+# strings like the tolerant parser does
+_decoder = json.JSONDecoder(strict=False, parse_constant=_reject_constant)
+_STRICT_START = ("{", "[", '"')
+_MALFORMED = object()
+_STRING_SPECIAL = {quote: re.compile(rf"[\\{quote}]") for quote in ('"', "'", "`")}
+_ESCAPES = {'"': '"', "'": "'", "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
 
 def try_parse(json_string: str):
     try:
@@ -48,6 +64,14 @@ class DirtyJson:
             return None
 
         self.current_char = self.json_string[self.index]
+
+        # well-formed JSON is parsed by the C scanner in one go
+        if self.current_char in _STRICT_START and self._peek(1) != self.current_char:
+            value = self._parse_strict()
+            if value is not _MALFORMED:
+                self.result = value
+                return self.result
+
         self._parse()
         return self.result
 
@@ -58,6 +82,16 @@ class DirtyJson:
         self._parse()
         return self.result
 
+    def _parse_strict(self):
+        # value at the current position if it is well-formed, _MALFORMED otherwise
+        try:
+            value, end = _decoder.raw_decode(self.json_string, self.index)
+        except ValueError:
+            return _MALFORMED
+        self.index = end - 1
+        self._advance()
+        return value
+
     def _advance(self, count=1):
         self.index += count
         if self.index < len(self.json_string):
@@ -113,6 +147,12 @@ class DirtyJson:
 
     def _parse_value(self):
         self._skip_whitespace()
+        if self.current_char in _STRICT_START and self._peek(1) != self.current_char:
+            # well-formed nested values skip the character-by-character parsing,
+            # only the malformed region below is parsed tolerantly
+            value = self._parse_strict()
+            if value is not _MALFORMED:
+                return value
         if self.current_char == "{":
             if self._peek(1) == "{":  # Handle {{
                 self._advance(2)
@@ -243,53 +283,81 @@ class DirtyJson:
                 return
 
     def _parse_string(self):
-        result = ""
+        # scans for the next quote or backslash instead of stepping through
+        # every character, the plain text between them is copied in one slice
+        text = self.json_string
         quote_char = self.current_char
-        self._advance()  # Skip opening quote
-        while self.current_char is not None and self.current_char != quote_char:
-            if self.current_char == "\\":
-                self._advance()
-                if self.current_char in ['"', "'", "\\", "/", "b", "f", "n", "r", "t"]:
-                    result += {
-                        "b": "\b",
-                        "f": "\f",
-                        "n": "\n",
-                        "r": "\r",
-                        "t": "\t",
-                    }.get(self.current_char, self.current_char)
-                elif self.current_char == "u":
-                    self._advance()  # Skip 'u'
-                    unicode_char = ""
-                    # Try to collect exactly 4 hex digits
-                    for _ in range(4):
-                        if self.current_char is None or not self.current_char.isalnum():
-                            # If we can't get 4 hex digits, treat it as a literal '\u' followed by whatever we got
-                            return result + "\\u" + unicode_char
-                        unicode_char += self.current_char
-                        self._advance()
-                    try:
-                        result += chr(int(unicode_char, 16))
-                    except ValueError:
-                        # If invalid hex value, treat as literal
-                        result += "\\u" + unicode_char
-                    continue
-            else:
-                result += self.current_char
-            self._advance()
-        if self.current_char == quote_char:
-            self._advance()  # Skip closing quote
-        return result
+        index = self.index + 1  # Skip opening quote
+        if quote_char == '"':
+            value = self._scan_strict_string(index)
+            if value is not _MALFORMED:
+                return value
+
+        special = _STRING_SPECIAL[quote_char]  # type: ignore
+        parts = []
+        while True:
+            match = special.search(text, index)
+            if not match:
+                parts.append(text[index:])
+                index = len(text)
+                break
+            parts.append(text[index:match.start()])
+            index = match.start() + 1
+            if match.group() == quote_char:
+                break  # Skip closing quote
+            if index >= len(text):
+                break
+            char = text[index]
+            index += 1
+            if char in _ESCAPES:
+                parts.append(_ESCAPES[char])
+            elif char == "u":
+                # Try to collect exactly 4 hex digits
+                digits = text[index:index + 4]
+                for count, digit in enumerate(digits + " "):
+                    if not digit.isalnum():
+                        break
+                if count < 4:
+                    # If we can't get 4 hex digits, treat it as a literal '\u' followed by whatever we got
+                    self.index = index + count - 1
+                    self._advance()
+                    return "".join(parts) + "\\u" + digits[:count]
+                try:
+                    parts.append(chr(int(digits, 16)))
+                except ValueError:
+                    # If invalid hex value, treat as literal
+                    parts.append("\\u" + digits)
+                index += 4
+            # other escaped characters are dropped
+        self.index = index - 1
+        self._advance()
+        return "".join(parts)
+
+    def _scan_strict_string(self, index: int):
+        # double quoted string with only JSON escapes, also when cut off by the
+        # end of input like in a streamed response
+        text = self.json_string
+        try:
+            value, end = json.decoder.scanstring(text, index, False)  # type: ignore
+        except ValueError:
+            try:
+                value, end = json.decoder.scanstring(text[index:] + '"', 0, False)  # type: ignore
+            except ValueError:
+                return _MALFORMED
+            end = len(text)
+        self.index = end - 1
+        self._advance()
+        return value
 
     def _parse_multiline_string(self):
-        result = ""
         quote_char = self.current_char
-        self._advance(3)  # Skip first quote
-        while self.current_char is not None:
-            if self.current_char == quote_char and self._peek(2) == quote_char * 2:  # type: ignore
-                self._advance(3)  # Skip first quote
-                break
-            result += self.current_char
-            self._advance()
+        start = self.index + 3  # Skip opening quotes
+        end = self.json_string.find(quote_char * 3, start)  # type: ignore
+        if end == -1:
+            end = len(self.json_string)
+        result = self.json_string[start:end]
+        self.index = min(end + 3, len(self.json_string)) - 1
+        self._advance()  # Skip closing quotes
         return result.strip()
 
     def _parse_number(self):
@@ -1,6 +1,9 @@
+import atexit
+import hashlib
 import mimetypes
 import os
 import asyncio
+import threading
 import aiohttp
 import json
 
@@ -10,20 +13,18 @@ os.environ["USER_AGENT"] = "@mixedbread-ai/unstructured"  # noqa E402
 from langchain_unstructured import UnstructuredLoader  # noqa E402
 
 from urllib.parse import urlparse
-from typing import Callable, Sequence, List, Optional, Tuple
+from typing import AsyncIterator, Callable, Sequence, List, Optional, Tuple
 from datetime import datetime
 
 from langchain_community.document_loaders import AsyncHtmlLoader
 from langchain_community.document_loaders.text import TextLoader
-from langchain_community.document_loaders.pdf import PyMuPDFLoader
 from langchain_community.document_transformers import MarkdownifyTransformer
-from langchain_community.document_loaders.parsers.images import TesseractBlobParser
 
 from langchain_core.documents import Document
 from langchain.schema import SystemMessage, HumanMessage
 
 from python.helpers.print_style import PrintStyle
-from python.helpers import files, errors
+from python.helpers import files, errors, pdf_pipeline
 from agent import Agent
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -36,32 +37,67 @@ class DocumentQueryStore:
     """
     FAISS Store for document query results.
     Manages documents identified by URI for storage, retrieval, and searching.
+
+    The index is persisted under tmp/document_query/<embedding model> and
+    shared by every agent using the same embeddings model. A manifest maps
+    each normalized URI to its source fingerprint, content hash and chunk
+    IDs, so lookups never scan chunk metadata. Changes are written by a
+    background timer, so a burst of additions is saved once, and the oldest
+    documents are evicted once the store holds more than MAX_CHUNKS chunks.
     """
 
     # Default chunking parameters
     DEFAULT_CHUNK_SIZE = 1000
     DEFAULT_CHUNK_OVERLAP = 100
+    # Chunks worth of streamed text to collect before embedding a batch
+    STREAM_BATCH_CHUNKS = 16
+
+    STORE_DIR = "tmp/document_query"
+    MANIFEST_FILE = "documents.json"
+    # Seconds to wait for more changes before writing the index
+    SAVE_DELAY = 2.0
+    # Chunks kept at most (about 1 KB of text each), oldest documents go first
+    MAX_CHUNKS = 50_000
 
-    # Cache for initialized stores
+    # Cache for initialized stores, keyed by embeddings model
     _stores: dict[str, "DocumentQueryStore"] = {}
+    _stores_lock = threading.Lock()
 
     @staticmethod
     def get(agent: Agent):
-        """Create a DocumentQueryStore instance for the specified agent."""
+        """Get the shared DocumentQueryStore for the agent's embeddings model."""
         if not agent or not agent.config:
             raise ValueError("Agent and agent config must be provided")
 
-        # Initialize store
-        store = DocumentQueryStore(agent)
+        model = agent.config.embeddings_model
+        store_id = files.safe_file_name(f"{model.provider}_{model.name}")
+        with DocumentQueryStore._stores_lock:
+            store = DocumentQueryStore._stores.get(store_id)
+            if not store:
+                store = DocumentQueryStore(agent, store_id)
+                DocumentQueryStore._stores[store_id] = store
         return store
 
     def __init__(
         self,
         agent: Agent,
+        store_id: str = "default",
     ):
         """Initialize a DocumentQueryStore instance."""
+        # agent is only used to build the embeddings model, which is the
+        # same for every agent sharing this store
         self.agent = agent
         self.vector_db: VectorDB | None = None
+        self.folder = files.get_abs_path(self.STORE_DIR, store_id)
+        self.documents: dict[str, dict] = self._load_manifest()
+        # _lock guards the index and manifest against the background save
+        # and is never held across an await, _write_lock orders the
+        # coroutines that add and remove documents
+        self._lock = threading.RLock()
+        self._write_lock = asyncio.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._save_timer: threading.Timer | None = None
 
     @staticmethod
     def normalize_uri(uri: str) -> str:
@@ -94,11 +130,112 @@ class DocumentQueryStore:
 
         return normalized
 
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
     def init_vector_db(self):
-        return VectorDB(self.agent, cache=True)
+        vector_db = VectorDB(self.agent, cache=True)
+        if vector_db.load_local(self.folder):
+            # drop manifest entries whose chunks did not make it to disk
+            stored = vector_db.db.get_all_docs()
+            self.documents = {
+                uri: entry
+                for uri, entry in self.documents.items()
+                if all(id in stored for id in entry["ids"])
+            }
+        else:
+            self.documents = {}
+        return vector_db
+
+    def _ensure_vector_db(self) -> VectorDB:
+        with self._lock:
+            if not self.vector_db:
+                self.vector_db = self.init_vector_db()
+            return self.vector_db
+
+    async def _get_vector_db(self) -> VectorDB:
+        if self.vector_db:
+            return self.vector_db
+        # loading the index reads it from disk and embeds a probe text
+        return await asyncio.to_thread(self._ensure_vector_db)
+
+    def _load_manifest(self) -> dict[str, dict]:
+        path = os.path.join(self.folder, self.MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            return json.loads(files.read_file(path))
+        except Exception as e:
+            PrintStyle.error(f"Error reading document index '{path}': {e}")
+            return {}
+
+    def _save(self):
+        """Persist the FAISS index and the manifest SAVE_DELAY seconds from now."""
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """Write pending changes now."""
+        # one writer at a time, so an older snapshot never lands last
+        with self._flush_lock:
+            # copy in memory under the lock, write to disk outside it
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty or not self.vector_db:
+                    return
+                data = self.vector_db.serialize()
+                manifest = json.dumps(self.documents)
+                self._dirty = False
+            try:
+                VectorDB.write_serialized(self.folder, data)
+                path = os.path.join(self.folder, self.MANIFEST_FILE)
+                files.write_file(path + ".tmp", manifest)
+                os.replace(path + ".tmp", path)
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    @staticmethod
+    def flush_all():
+        with DocumentQueryStore._stores_lock:
+            stores = list(DocumentQueryStore._stores.values())
+        for store in stores:
+            try:
+                store.flush()
+            except Exception as e:
+                PrintStyle.error(f"Error saving document index '{store.folder}': {e}")
+
+    def _evict(self, keep: str) -> int:
+        """Drop the oldest documents other than keep while over MAX_CHUNKS, returns how many were dropped."""
+        total = sum(len(entry["ids"]) for entry in self.documents.values())
+        evicted = 0
+        for uri in sorted(self.documents, key=lambda uri: self.documents[uri]["timestamp"]):
+            if total <= self.MAX_CHUNKS:
+                break
+            if uri == keep:
+                continue
+            entry = self.documents.pop(uri)
+            self._delete_chunks(entry["ids"])
+            total -= len(entry["ids"])
+            evicted += 1
+        if evicted:
+            PrintStyle.standard(f"Evicted {evicted} old documents from the document index")
+        return evicted
 
     async def add_document(
-        self, text: str, document_uri: str, metadata: dict | None = None
+        self,
+        text: str,
+        document_uri: str,
+        metadata: dict | None = None,
+        fingerprint: str | None = None,
     ) -> tuple[bool, list[str]]:
         """
         Add a document to the store with the given URI.
@@ -107,15 +244,40 @@ class DocumentQueryStore:
             text: The document text content
             document_uri: The URI that uniquely identifies this document
             metadata: Optional metadata for the document
+            fingerprint: Source version (mtime, ETag...) the text was read from
 
         Returns:
             True if successful, False otherwise
         """
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
+        content_hash = self.content_hash(text)
+
+        vector_db = await self._get_vector_db()
+        async with self._write_lock:
+            return await self._add_document(
+                vector_db, text, document_uri, content_hash, metadata, fingerprint
+            )
 
-        # Delete existing document if it exists to avoid duplicates
-        await self.delete_document(document_uri)
+    async def _add_document(
+        self,
+        vector_db: VectorDB,
+        text: str,
+        document_uri: str,
+        content_hash: str,
+        metadata: dict | None,
+        fingerprint: str | None,
+    ) -> tuple[bool, list[str]]:
+        # Same content under a new fingerprint (touched file, new ETag),
+        # keep the chunks and just record the new version
+        entry = self.documents.get(document_uri)
+        if entry and entry["content_hash"] == content_hash:
+            with self._lock:
+                entry["fingerprint"] = fingerprint
+                # read again just now, so it is not among the oldest
+                entry["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self._save()
+            return True, list(entry["ids"])
 
         # Initialize metadata
         doc_metadata = metadata or {}
@@ -141,11 +303,24 @@ class DocumentQueryStore:
             return False, []
 
         try:
-            # Initialize vector db if not already initialized
-            if not self.vector_db:
-                self.vector_db = self.init_vector_db()
-
-            ids = await self.vector_db.insert_documents(docs)
+            vectors = await vector_db.embeddings.aembed_documents(
+                [doc.page_content for doc in docs]
+            )
+            with self._lock:
+                # the background save must not see the index half updated
+                ids = vector_db.insert_embedded(docs, vectors)
+                # Replace the previous version to avoid duplicates
+                previous = self.documents.get(document_uri)
+                self.documents[document_uri] = {
+                    "fingerprint": fingerprint,
+                    "content_hash": content_hash,
+                    "ids": ids,
+                    "timestamp": doc_metadata["timestamp"],
+                }
+                if previous:
+                    self._delete_chunks(previous["ids"])
+                self._evict(keep=document_uri)
+                self._save()
             PrintStyle.standard(
                 f"Added document '{document_uri}' with {len(docs)} chunks"
             )
@@ -155,6 +330,106 @@ class DocumentQueryStore:
             PrintStyle.error(f"Error adding document '{document_uri}': {err_text}")
             return False, []
 
+    async def add_document_pages(
+        self,
+        pages: AsyncIterator[str],
+        document_uri: str,
+        metadata: dict | None = None,
+        fingerprint: str | None = None,
+    ) -> tuple[bool, list[str], str]:
+        """
+        Add a document whose text arrives page by page.
+
+        Text is chunked and embedded in batches as pages arrive, the last
+        (possibly incomplete) chunk is carried over to the next batch.
+        Chunks match add_document up to where batch boundaries fall.
+
+        Args:
+            pages: Page texts in document order
+            document_uri: The URI that uniquely identifies this document
+            metadata: Optional metadata for the document
+            fingerprint: Source version (mtime, ETag...) the pages were read from
+
+        Returns:
+            (success, chunk ids, full document text)
+        """
+        # Normalize the URI
+        document_uri = self.normalize_uri(document_uri)
+
+        # Initialize metadata
+        doc_metadata = metadata or {}
+        doc_metadata["document_uri"] = document_uri
+        doc_metadata["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.DEFAULT_CHUNK_SIZE, chunk_overlap=self.DEFAULT_CHUNK_OVERLAP
+        )
+        batch_chars = self.DEFAULT_CHUNK_SIZE * self.STREAM_BATCH_CHUNKS
+
+        parts: list[str] = []
+        ids: list[str] = []
+        buffer = ""
+        committed = False
+
+        async def insert(chunks: list[str]):
+            docs = []
+            for chunk in chunks:
+                chunk_metadata = doc_metadata.copy()
+                chunk_metadata["chunk_index"] = len(ids) + len(docs)
+                docs.append(Document(page_content=chunk, metadata=chunk_metadata))
+            vectors = await vector_db.embeddings.aembed_documents(chunks)
+            with self._lock:
+                ids.extend(vector_db.insert_embedded(docs, vectors))
+
+        try:
+            vector_db = await self._get_vector_db()
+            async for page in pages:
+                parts.append(page)
+                buffer = f"{buffer}\n{page}" if len(parts) > 1 else page
+                if len(buffer) >= batch_chars:
+                    chunks = text_splitter.split_text(buffer)
+                    if len(chunks) > 1:
+                        await insert(chunks[:-1])
+                        buffer = chunks[-1]
+            chunks = text_splitter.split_text(buffer) if buffer else []
+            if chunks:
+                await insert(chunks)
+
+            text = "\n".join(parts)
+            if not ids:
+                PrintStyle.error(f"No chunks created for document: {document_uri}")
+                return False, [], text
+
+            async with self._write_lock:
+                with self._lock:
+                    for doc in vector_db.db.get_by_ids(ids):
+                        doc.metadata["total_chunks"] = len(ids)
+                    previous = self.documents.get(document_uri)
+                    self.documents[document_uri] = {
+                        "fingerprint": fingerprint,
+                        "content_hash": self.content_hash(text),
+                        "ids": ids,
+                        "timestamp": doc_metadata["timestamp"],
+                    }
+                    if previous:
+                        self._delete_chunks(previous["ids"])
+                    self._evict(keep=document_uri)
+                    self._save()
+                    committed = True
+            PrintStyle.standard(
+                f"Added document '{document_uri}' with {len(ids)} chunks"
+            )
+            return True, ids, text
+        except Exception as e:
+            err_text = errors.format_error(e)
+            PrintStyle.error(f"Error adding document '{document_uri}': {err_text}")
+            return False, [], "\n".join(parts)
+        finally:
+            # drop partially indexed chunks on error or cancellation
+            if ids and not committed:
+                with self._lock:
+                    self._delete_chunks(ids)
+
     async def get_document(self, document_uri: str) -> Optional[Document]:
         """
         Retrieve a document by its URI.
@@ -166,10 +441,6 @@ class DocumentQueryStore:
             The complete document if found, None otherwise
         """
 
-        # DB not initialized, no documents inside
-        if not self.vector_db:
-            return None
-
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
 
@@ -201,42 +472,47 @@ class DocumentQueryStore:
             List of document chunks
         """
 
-        # DB not initialized, no documents inside
-        if not self.vector_db:
-            return []
-
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
 
-        # get docs from vector db
+        # No documents inside
+        entry = self.documents.get(document_uri)
+        if not entry:
+            return []
 
-        chunks = await self.vector_db.search_by_metadata(
-            filter=f"document_uri == '{document_uri}'",
-        )
+        # get docs from vector db by their ids
+        chunks = (await self._get_vector_db()).db.get_by_ids(entry["ids"])
 
         PrintStyle.standard(f"Found {len(chunks)} chunks for document: {document_uri}")
         return chunks
 
-    async def document_exists(self, document_uri: str) -> bool:
+    async def document_exists(
+        self, document_uri: str, fingerprint: str | None = None
+    ) -> bool:
         """
         Check if a document exists in the store.
 
         Args:
             document_uri: The URI of the document to check
+            fingerprint: If given, the stored version must match it; callers
+                that need the current version must not pass None for unknown
 
         Returns:
             True if the document exists, False otherwise
         """
 
-        # DB not initialized, no documents inside
-        if not self.vector_db:
-            return False
-
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
 
-        chunks = await self._get_document_chunks(document_uri)
-        return len(chunks) > 0
+        entry = self.documents.get(document_uri)
+        if not entry:
+            return False
+        if fingerprint is not None and entry["fingerprint"] != fingerprint:
+            return False
+
+        # confirm the chunks are in the loaded index
+        await self._get_vector_db()
+        return document_uri in self.documents
 
     async def delete_document(self, document_uri: str) -> bool:
         """
@@ -249,31 +525,35 @@ class DocumentQueryStore:
             True if deleted, False if not found
         """
 
-        # DB not initialized, no documents inside
-        if not self.vector_db:
-            return False
-
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
 
-        chunks = await self.vector_db.search_by_metadata(
-            filter=f"document_uri == '{document_uri}'",
-        )
-        if not chunks:
+        # No documents inside
+        if document_uri not in self.documents:
             return False
 
-        # Collect IDs to delete
-        ids_to_delete = [chunk.metadata["id"] for chunk in chunks]
-
-        # Delete from vector store
-        if ids_to_delete:
-            dels = await self.vector_db.delete_documents_by_ids(ids_to_delete)
-            PrintStyle.standard(
-                f"Deleted document '{document_uri}' with {len(dels)} chunks"
-            )
-            return True
+        await self._get_vector_db()
+        async with self._write_lock:
+            with self._lock:
+                entry = self.documents.pop(document_uri, None)
+                if not entry:
+                    return False
+
+                # Delete from vector store
+                deleted = self._delete_chunks(entry["ids"])
+                self._save()
+        PrintStyle.standard(
+            f"Deleted document '{document_uri}' with {deleted} chunks"
+        )
+        return True
 
-        return False
+    def _delete_chunks(self, ids: list[str]) -> int:
+        """Remove chunk ids present in the index, returns how many were removed."""
+        db = self.vector_db.db  # type: ignore
+        existing = [id for id in ids if id in db.get_all_docs()]
+        if existing:
+            db.delete(ids=existing)
+        return len(existing)
 
     async def search_documents(
         self, query: str, limit: int = 10, threshold: float = 0.5, filter: str = ""
@@ -290,8 +570,8 @@ class DocumentQueryStore:
             List of matching documents
         """
 
-        # DB not initialized, no documents inside
-        if not self.vector_db:
+        # No documents inside
+        if not self.documents:
             return []
 
         # Handle empty query
@@ -300,7 +580,7 @@ class DocumentQueryStore:
 
         # Perform search
         try:
-            results = await self.vector_db.search_by_similarity_threshold(
+            results = await (await self._get_vector_db()).search_by_similarity_threshold(
                 query=query, limit=limit, threshold=threshold, filter=filter
             )
 
@@ -310,6 +590,49 @@ class DocumentQueryStore:
             PrintStyle.error(f"Error searching documents: {str(e)}")
             return []
 
+    async def search_documents_batch(
+        self,
+        queries: Sequence[str],
+        document_uris: Sequence[str],
+        limit: int = 10,
+        threshold: float = 0.5,
+    ) -> List[List[Document]]:
+        """
+        Search several queries within the given documents at once.
+        The queries are embedded concurrently and scored against the
+        documents' chunks in one pass.
+
+        Args:
+            queries: The search query strings
+            document_uris: URIs of the documents to search within
+            limit: Maximum number of results per query
+            threshold: Minimum similarity score threshold (0-1)
+
+        Returns:
+            One list of matching chunks per query
+        """
+        ids = [
+            id
+            for uri in document_uris
+            for id in self.documents.get(self.normalize_uri(uri), {}).get("ids", [])
+        ]
+        if not ids or not queries:
+            return [[] for _ in queries]
+
+        try:
+            vector_db = await self._get_vector_db()
+            vectors = await asyncio.gather(
+                *[vector_db.embeddings.aembed_query(query) for query in queries]
+            )
+            results = vector_db.search_by_vectors(vectors, limit, threshold, ids)
+            PrintStyle.standard(
+                f"Search of {len(queries)} queries returned {sum(len(r) for r in results)} results"
+            )
+            return results
+        except Exception as e:
+            PrintStyle.error(f"Error searching documents: {str(e)}")
+            return [[] for _ in queries]
+
     async def search_document(
         self, document_uri: str, query: str, limit: int = 10, threshold: float = 0.5
     ) -> List[Document]:
@@ -336,23 +659,22 @@ class DocumentQueryStore:
         Returns:
             List of document URIs
         """
-        # DB not initialized, no documents inside
-        if not self.vector_db:
-            return []
+        return sorted(self.documents)
 
-        # Extract unique URIs
-        uris = set()
-        for doc in self.vector_db.db.get_all_docs().values():
-            if isinstance(doc.metadata, dict):
-                uri = doc.metadata.get("document_uri")
-                if uri:
-                    uris.add(uri)
 
-        return sorted(list(uris))
+# write what the save timers haven't yet
+atexit.register(DocumentQueryStore.flush_all)
 
 
 class DocumentQueryHelper:
 
+    # Answer calls in flight at once, each still passes the model rate limiter
+    MAX_CONCURRENT_ANSWERS = 4
+    # Questions answered by one call at most
+    MAX_GROUP_SIZE = 4
+    # Share of a question's chunks a group must already have for it to join
+    GROUP_MIN_OVERLAP = 0.5
+
     def __init__(
         self, agent: Agent, progress_callback: Callable[[str], None] | None = None
     ):
@@ -373,56 +695,116 @@ class DocumentQueryHelper:
             *[self.document_get_content(uri, True) for uri in document_uris]
         )
         await self.agent.handle_intervention()
-        selected_chunks = {}
-        for question in questions:
-            self.progress_callback(f"Optimizing query: {question}")
-            await self.agent.handle_intervention()
-            human_content = f'Search Query: "{question}"'
-            system_content = self.agent.parse_prompt(
-                "fw.document_query.optmimize_query.md"
-            )
-
-            optimized_query = (
-                await self.agent.call_utility_model(
-                    system=system_content, message=human_content
-                )
-            ).strip()
-
-            await self.agent.handle_intervention()
-            self.progress_callback(f"Searching documents with query: {optimized_query}")
-
-            normalized_uris = [self.store.normalize_uri(uri) for uri in document_uris]
-            doc_filter = " or ".join(
-                [f"document_uri == '{uri}'" for uri in normalized_uris]
-            )
 
-            chunks = await self.store.search_documents(
-                query=optimized_query,
-                limit=100,
-                threshold=DEFAULT_SEARCH_THRESHOLD,
-                filter=doc_filter,
-            )
+        # optimize all queries concurrently, then search them in one batch
+        optimized_queries = await asyncio.gather(
+            *[self.optimize_query(question) for question in questions]
+        )
+        await self.agent.handle_intervention()
+        self.progress_callback(f"Searching documents with {len(questions)} queries")
 
-            self.progress_callback(f"Found {len(chunks)} chunks")
+        question_chunks = await self.store.search_documents_batch(
+            optimized_queries,
+            document_uris,
+            limit=100,
+            threshold=DEFAULT_SEARCH_THRESHOLD,
+        )
 
-            for chunk in chunks:
-                selected_chunks[chunk.metadata["id"]] = chunk
+        n_chunks = len({c.metadata["id"] for chunks in question_chunks for c in chunks})
+        self.progress_callback(f"Found {n_chunks} chunks")
 
-        if not selected_chunks:
+        if not n_chunks:
             self.progress_callback("No relevant content found in the documents")
             content = f"!!! No content found for documents: {json.dumps(document_uris)} matching queries: {json.dumps(questions)}"
             return False, content
 
+        # questions sharing chunks are answered together so that each chunk
+        # is sent once, independent groups are answered concurrently
+        groups = self.group_questions(question_chunks)
         self.progress_callback(
-            f"Processing {len(questions)} questions in context of {len(selected_chunks)} chunks"
+            f"Processing {len(questions)} questions in {len(groups)} groups over {n_chunks} chunks"
         )
         await self.agent.handle_intervention()
 
-        questions_str = "\n".join([f" *  {question}" for question in questions])
-        content = "\n\n----\n\n".join(
-            [chunk.page_content for chunk in selected_chunks.values()]
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_ANSWERS)
+
+        async def answer(group: list[int]) -> str:
+            chunks: dict[str, Document] = {}
+            for index in group:
+                for chunk in question_chunks[index]:
+                    chunks.setdefault(chunk.metadata["id"], chunk)
+            async with semaphore:
+                return await self.answer_questions(
+                    [questions[index] for index in group], list(chunks.values())
+                )
+
+        answers = await asyncio.gather(*[answer(group) for group in groups])
+
+        unanswered = [q for q, chunks in zip(questions, question_chunks) if not chunks]
+        if unanswered:
+            answers.append(
+                f"!!! No content found in the documents matching queries: {json.dumps(unanswered)}"
+            )
+
+        self.progress_callback(f"Q&A process completed")
+
+        return True, "\n\n".join(answers)
+
+    async def optimize_query(self, question: str) -> str:
+        self.progress_callback(f"Optimizing query: {question}")
+        await self.agent.handle_intervention()
+        human_content = f'Search Query: "{question}"'
+        system_content = self.agent.parse_prompt(
+            "fw.document_query.optmimize_query.md"
         )
 
+        optimized_query = (
+            await self.agent.call_utility_model(
+                system=system_content, message=human_content
+            )
+        ).strip()
+
+        await self.agent.handle_intervention()
+        return optimized_query
+
+    @classmethod
+    def group_questions(cls, question_chunks: Sequence[Sequence[Document]]) -> list[list[int]]:
+        """
+        Group question indexes whose chunks mostly overlap.
+        Each question joins the group already holding the largest share of its
+        chunks, if that share is at least GROUP_MIN_OVERLAP and the group is
+        not full, otherwise it starts a new group. Questions without chunks
+        are left out. A chunk that questions in different groups share is
+        sent once per group; merging every group that shares a chunk would
+        chain most questions into a few oversized answer calls.
+        """
+        groups: list[list[int]] = []
+        group_ids: list[set[str]] = []
+        for index, chunks in enumerate(question_chunks):
+            if not chunks:
+                continue
+            ids = {chunk.metadata["id"] for chunk in chunks}
+            best, best_overlap = -1, 0.0
+            for group, (members, held) in enumerate(zip(groups, group_ids)):
+                if len(members) >= cls.MAX_GROUP_SIZE:
+                    continue
+                overlap = len(ids & held) / len(ids)
+                if overlap > best_overlap:
+                    best, best_overlap = group, overlap
+            if best >= 0 and best_overlap >= cls.GROUP_MIN_OVERLAP:
+                groups[best].append(index)
+                group_ids[best] |= ids
+            else:
+                groups.append([index])
+                group_ids.append(ids)
+        return groups
+
+    async def answer_questions(
+        self, questions: Sequence[str], chunks: Sequence[Document]
+    ) -> str:
+        questions_str = "\n".join([f" *  {question}" for question in questions])
+        content = "\n\n----\n\n".join([chunk.page_content for chunk in chunks])
+
         qa_system_message = self.agent.parse_prompt(
             "fw.document_query.system_prompt.md"
         )
@@ -434,10 +816,7 @@ class DocumentQueryHelper:
                 HumanMessage(content=qa_user_message),
             ]
         )
-
-        self.progress_callback(f"Q&A process completed")
-
-        return True, str(ai_response)
+        return str(ai_response)
 
     async def document_get_content(
         self, document_uri: str, add_to_db: bool = False
@@ -448,10 +827,10 @@ class DocumentQueryHelper:
         scheme = url.scheme or "file"
         mimetype, encoding = mimetypes.guess_type(document_uri)
         mimetype = mimetype or "application/octet-stream"
+        response: aiohttp.ClientResponse | None = None
 
         if mimetype == "application/octet-stream":
             if url.scheme in ["http", "https"]:
-                response: aiohttp.ClientResponse | None = None
                 retries = 0
                 last_error = ""
                 while not response and retries < 3:
@@ -508,28 +887,49 @@ class DocumentQueryHelper:
         document_uri_norm = self.store.normalize_uri(document_uri)
 
         await self.agent.handle_intervention()
-        exists = await self.store.document_exists(document_uri_norm)
+        fingerprint = await self.document_fingerprint(document_uri, scheme, response)
+        # an unknown version never matches, the document is read again and
+        # add_document keeps the indexed chunks if its content is unchanged
+        exists = fingerprint is not None and await self.store.document_exists(
+            document_uri_norm, fingerprint
+        )
         document_content = ""
         if not exists:
             await self.agent.handle_intervention()
-            if mimetype.startswith("image/"):
-                document_content = self.handle_image_document(document_uri, scheme)
-            elif mimetype == "text/html":
-                document_content = self.handle_html_document(document_uri, scheme)
-            elif mimetype.startswith("text/") or mimetype == "application/json":
-                document_content = self.handle_text_document(document_uri, scheme)
-            elif mimetype == "application/pdf":
-                document_content = self.handle_pdf_document(document_uri, scheme)
-            else:
-                document_content = self.handle_unstructured_document(
-                    document_uri, scheme
-                )
-            if add_to_db:
+            if (
+                add_to_db
+                and mimetype == "application/pdf"
+                and document_uri_norm not in self.store.documents
+            ):
+                # new PDF, embed pages while later ones are still extracted
                 self.progress_callback(f"Indexing document")
-                await self.agent.handle_intervention()
-                success, ids = await self.store.add_document(
-                    document_content, document_uri_norm
+                success, ids, document_content = await self.store.add_document_pages(
+                    self.pdf_pages(document_uri, scheme),
+                    document_uri_norm,
+                    fingerprint=fingerprint,
                 )
+            else:
+                if mimetype.startswith("image/"):
+                    document_content = self.handle_image_document(document_uri, scheme)
+                elif mimetype == "text/html":
+                    document_content = self.handle_html_document(document_uri, scheme)
+                elif mimetype.startswith("text/") or mimetype == "application/json":
+                    document_content = self.handle_text_document(document_uri, scheme)
+                elif mimetype == "application/pdf":
+                    document_content = await self.handle_pdf_document(
+                        document_uri, scheme
+                    )
+                else:
+                    document_content = self.handle_unstructured_document(
+                        document_uri, scheme
+                    )
+                if add_to_db:
+                    self.progress_callback(f"Indexing document")
+                    await self.agent.handle_intervention()
+                    success, ids = await self.store.add_document(
+                        document_content, document_uri_norm, fingerprint=fingerprint
+                    )
+            if add_to_db:
                 if not success:
                     self.progress_callback(f"Failed to index document")
                     raise ValueError(
@@ -547,6 +947,46 @@ class DocumentQueryHelper:
                 )
         return document_content
 
+    async def document_fingerprint(
+        self,
+        document: str,
+        scheme: str,
+        response: aiohttp.ClientResponse | None = None,
+    ) -> str | None:
+        """
+        Identify the current version of a document without downloading it:
+        mtime and size for files, ETag or Last-Modified for web documents.
+        None means the version is unknown, so the document has to be read
+        to tell whether the indexed copy is current.
+        """
+        if scheme == "file":
+            try:
+                stat = os.stat(files.get_abs_path(document))
+            except OSError:
+                return None
+            return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+        if scheme in ["http", "https"]:
+            if not response:
+                try:
+                    async with aiohttp.ClientSession() as session:
+                        response = await session.head(
+                            document,
+                            timeout=aiohttp.ClientTimeout(total=2.0),
+                            allow_redirects=True,
+                        )
+                except Exception:
+                    return None
+            if response.status > 399:
+                return None
+            headers = response.headers
+            validator = headers.get("etag") or headers.get("last-modified")
+            if not validator:
+                return None
+            return f"{validator}:{headers.get('content-length', '')}"
+
+        return None
+
     def handle_image_document(self, document: str, scheme: str) -> str:
         return self.handle_unstructured_document(document, scheme)
 
@@ -587,73 +1027,43 @@ class DocumentQueryHelper:
 
         return "\n".join([element.page_content for element in elements])
 
-    def handle_pdf_document(self, document: str, scheme: str) -> str:
-        temp_file_path = ""
+    async def handle_pdf_document(self, document: str, scheme: str) -> str:
+        return "\n".join([page async for page in self.pdf_pages(document, scheme)])
+
+    async def pdf_pages(self, document: str, scheme: str) -> AsyncIterator[str]:
+        """Yield PDF page texts in order, extracted off the event loop."""
+        temp_file_path = await asyncio.to_thread(self._pdf_temp_file, document, scheme)
+        try:
+            async for index, text in pdf_pipeline.extract_pages(temp_file_path):
+                self.progress_callback(f"Extracted page {index + 1}")
+                await self.agent.handle_intervention()
+                yield text
+        finally:
+            os.unlink(temp_file_path)
+
+    def _pdf_temp_file(self, document: str, scheme: str) -> str:
+        """Copy or download the PDF to a temporary file for the page workers."""
+        import tempfile
+
         if scheme == "file":
             # Use RFC file operations to read the PDF file as binary
             file_content_bytes = files.read_file_bin(document)
-            # Create a temporary file for PyMuPDFLoader since it needs a file path
-            import tempfile
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(file_content_bytes)
-                temp_file_path = temp_file.name
         elif scheme in ["http", "https"]:
             # download the file from the web url to a temporary file using python libraries for downloading
             import requests
-            import tempfile
 
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                response = requests.get(document, timeout=10.0)
-                if response.status_code != 200:
-                    raise ValueError(
-                        f"DocumentQueryHelper::handle_pdf_document: Failed to download PDF from {document}: {response.status_code}"
-                    )
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
+            response = requests.get(document, timeout=10.0)
+            if response.status_code != 200:
+                raise ValueError(
+                    f"DocumentQueryHelper::handle_pdf_document: Failed to download PDF from {document}: {response.status_code}"
+                )
+            file_content_bytes = response.content
         else:
             raise ValueError(f"Unsupported scheme: {scheme}")
 
-        if not os.path.exists(temp_file_path):
-            raise ValueError(
-                f"DocumentQueryHelper::handle_pdf_document: Temporary file not found: {temp_file_path}"
-            )
-
-        try:
-            try:
-                loader = PyMuPDFLoader(
-                    temp_file_path,
-                    mode="single",
-                    extract_tables="markdown",
-                    extract_images=True,
-                    images_inner_format="text",
-                    images_parser=TesseractBlobParser(),
-                    pages_delimiter="\n",
-                )
-                elements: list[Document] = loader.load()
-                contents = "\n".join([element.page_content for element in elements])
-            except Exception as e:
-                PrintStyle.error(
-                    f"DocumentQueryHelper::handle_pdf_document: Error loading with PyMuPDF: {e}"
-                )
-                contents = ""
-
-            if not contents:
-                import pdf2image
-                import pytesseract
-
-                PrintStyle.debug(
-                    f"DocumentQueryHelper::handle_pdf_document: FALLBACK Converting PDF to images: {temp_file_path}"
-                )
-
-                # Convert PDF to images
-                pages = pdf2image.convert_from_path(temp_file_path)  # type: ignore
-                for page in pages:
-                    contents += pytesseract.image_to_string(page) + "\n\n"
-
-            return contents
-        finally:
-            os.unlink(temp_file_path)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+            temp_file.write(file_content_bytes)
+            return temp_file.name
 
     def handle_unstructured_document(self, document: str, scheme: str) -> str:
         elements: list[Document] = []
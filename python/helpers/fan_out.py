@@ -0,0 +1,118 @@
+"""
+Run several coroutines concurrently and gather their results.
+
+Each runner is a branch with its own status. Gathering stops when all
+branches finished, when first_k of them succeeded or when the timeout
+expired; branches still running at that point are cancelled. At most
+max_parallel branches run at the same time, the rest wait for a slot.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Sequence
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timed out"
+STATUS_CANCELLED = "cancelled"
+
+POLL_INTERVAL = 0.5
+
+
+@dataclass
+class Branch:
+    index: int
+    status: str = STATUS_PENDING
+    result: str = ""
+    error: str = ""
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def finished_ok(self) -> bool:
+        return self.status == STATUS_DONE
+
+    @property
+    def duration(self) -> float:
+        if not self.started:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+async def fan_out(
+    runners: Sequence[Callable[[], Awaitable[str]]],
+    *,
+    first_k: int = 0,
+    timeout: float = 0,
+    max_parallel: int = 0,
+    on_update: Callable[[Branch], None] | None = None,
+    on_poll: Callable[[], Awaitable[None]] | None = None,
+    poll_interval: float = POLL_INTERVAL,
+) -> list[Branch]:
+    """
+    Run runners concurrently and return their branches in input order.
+
+    first_k: stop after this many branches succeeded (0 = wait for all)
+    timeout: stop after this many seconds (0 = no limit)
+    max_parallel: how many branches run at once (0 = all of them)
+    on_update: called whenever a branch changes status
+    on_poll: awaited every poll_interval while waiting, exceptions it raises
+        cancel the remaining branches and propagate
+    """
+    branches = [Branch(index) for index in range(len(runners))]
+    if not runners:
+        return branches
+
+    slots = asyncio.Semaphore(max_parallel if max_parallel > 0 else len(runners))
+    target = first_k if 0 < first_k < len(runners) else len(runners)
+    deadline = time.monotonic() + timeout if timeout > 0 else None
+
+    def notify(branch: Branch):
+        if on_update:
+            on_update(branch)
+
+    async def run(branch: Branch, runner: Callable[[], Awaitable[str]]):
+        async with slots:
+            branch.status = STATUS_RUNNING
+            branch.started = time.monotonic()
+            notify(branch)
+            try:
+                branch.result = str(await runner())
+                branch.status = STATUS_DONE
+            except Exception as e:
+                branch.error = f"{type(e).__name__}: {e}"
+                branch.status = STATUS_FAILED
+            branch.finished = time.monotonic()
+            notify(branch)
+
+    pending = {asyncio.create_task(run(b, r)) for b, r in zip(branches, runners)}
+    timed_out = False
+    try:
+        while pending and sum(b.finished_ok for b in branches) < target:
+            wait = poll_interval if on_poll else None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                wait = remaining if wait is None else min(wait, remaining)
+            _, pending = await asyncio.wait(
+                pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+            )
+            if on_poll:
+                await on_poll()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for branch in branches:
+            if branch.status in (STATUS_PENDING, STATUS_RUNNING):
+                branch.status = STATUS_TIMEOUT if timed_out else STATUS_CANCELLED
+                branch.finished = time.monotonic()
+                notify(branch)
+
+    return branches
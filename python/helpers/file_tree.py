@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from collections import deque
+import copy
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import os
+import threading
 from typing import Any, Callable, Iterable, Literal, Optional, Sequence
 
 from pathspec import PathSpec
@@ -33,6 +35,7 @@ def file_tree(
     sort: tuple[Literal["name", "created", "modified"], Literal["asc", "desc"]] = ("modified", "desc"),
     ignore: str | None = None,
     output_mode: Literal["string", "flat", "nested"] = OUTPUT_MODE_STRING,
+    cache: Optional["FileTreeCache"] = None,
 ) -> str | list[dict]:
     """Render a directory tree relative to the repository base path.
 
@@ -60,6 +63,9 @@ def file_tree(
 
         output_mode: One of :data:`OUTPUT_MODE_STRING`, :data:`OUTPUT_MODE_FLAT`, or
             :data:`OUTPUT_MODE_NESTED`.
+        cache: Optional :class:`FileTreeCache` for repeated calls over the same directory. Unchanged
+            directories are not re-scanned, and the previous result is reused when nothing it was
+            built from changed.
 
     Returns:
         ``OUTPUT_MODE_STRING`` → ``str``: multi-line ASCII tree.
@@ -100,8 +106,49 @@ def file_tree(
     if max_lines < 0:
         raise ValueError("max_lines must be >= 0")
 
-    ignore_spec = _resolve_ignore_patterns(ignore, abs_root)
+    if cache is None:
+        ignore_spec = _resolve_ignore_patterns(ignore, abs_root)
+        return _render_tree(
+            relative_path, abs_root, _DirectoryLister(abs_root, ignore_spec),
+            max_depth=max_depth, max_lines=max_lines, folders_first=folders_first,
+            max_folders=max_folders, max_files=max_files, sort=sort, output_mode=output_mode,
+        )
+
+    key = (relative_path, abs_root, max_depth, max_lines, folders_first, max_folders, max_files,
+           tuple(sort), ignore, output_mode)
+    with cache.lock:
+        if cache.result_key == key and cache.result_is_current():
+            return _copy_result(cache.result)
+
+        ignore_spec = cache.ignore_spec(ignore, abs_root)
+        lister = _DirectoryLister(abs_root, ignore_spec, cache, track_entries=sort_key != SORT_BY_NAME)
+        result = _render_tree(
+            relative_path, abs_root, lister,
+            max_depth=max_depth, max_lines=max_lines, folders_first=folders_first,
+            max_folders=max_folders, max_files=max_files, sort=sort, output_mode=output_mode,
+        )
+        cache.store_result(key, result, lister.deps)
+        return _copy_result(result)
+
 
+def _copy_result(result: str | list[dict] | None) -> str | list[dict]:
+    # structured outputs are mutable, callers must not be able to change the cached result
+    return result if isinstance(result, str) else copy.deepcopy(result)  # type: ignore[return-value]
+
+
+def _render_tree(
+    relative_path: str,
+    abs_root: str,
+    lister: "_DirectoryLister",
+    *,
+    max_depth: int,
+    max_lines: int,
+    folders_first: bool,
+    max_folders: int,
+    max_files: int,
+    sort: tuple[str, str],
+    output_mode: str,
+) -> str | list[dict]:
     root_stat = os.stat(abs_root, follow_symlinks=False)
     root_name = os.path.basename(os.path.normpath(abs_root)) or os.path.basename(abs_root)
     root_node = _TreeEntry(
@@ -122,7 +169,7 @@ def file_tree(
     visibility_cache: dict[str, bool] = {}
 
     def make_entry(entry: os.DirEntry, parent: _TreeEntry, level: int, item_type: Literal["file", "folder"]) -> _TreeEntry:
-        stat = entry.stat(follow_symlinks=False)
+        stat = lister.stat(entry)
         rel_path = os.path.relpath(entry.path, abs_root)
         rel_posix = _normalize_relative_path(rel_path)
         return _TreeEntry(
@@ -143,12 +190,10 @@ def file_tree(
             continue
 
         remaining_depth = max_depth - level if max_depth else -1
-        folders, files = _list_directory_children(
+        folders, files = lister.children(
             current_dir,
-            abs_root,
-            ignore_spec,
             max_depth_remaining=remaining_depth,
-            cache=visibility_cache,
+            visibility_cache=visibility_cache,
         )
 
         folder_entries = [make_entry(folder, parent_node, level, "folder") for folder in folders]
@@ -212,8 +257,7 @@ def file_tree(
             summary = _create_folder_unprocessed_comment(
                 folder_node,
                 folder_path,
-                abs_root,
-                ignore_spec,
+                lister,
             )
             if summary is None:
                 continue
@@ -248,6 +292,149 @@ def file_tree(
     return _to_nested_structure(root_node.items or [])
 
 
+class FileTreeCache:
+    """Reusable state for repeated :func:`file_tree` calls over the same directory.
+
+    Filtered directory listings are kept per directory and reused while the directory's mtime
+    is unchanged, so only changed subtrees are re-scanned and re-matched against the ignore
+    patterns. The last result is returned as is when the arguments are the same and nothing it
+    was built from changed: the mtimes of every directory listed and, when sorting by time, the
+    timestamps of every entry. Checking that costs one ``stat`` per dependency.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.result: str | list[dict] | None = None
+        self.result_key: tuple | None = None
+        self._result_deps: list[tuple[str, int, int | None]] = []
+        self._listings: dict[tuple[str, int], tuple[list[tuple[str, int]], list["_CachedEntry"], list["_CachedEntry"]]] = {}
+        self._ignore_key: tuple | None = None
+        self._ignore_spec: Optional[PathSpec] = None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.result = self.result_key = None
+            self._result_deps = []
+            self._listings.clear()
+
+    def result_is_current(self) -> bool:
+        return _deps_current(self._result_deps)
+
+    def store_result(self, key: tuple, result: str | list[dict], deps: list[tuple[str, int, int | None]]) -> None:
+        self.result_key, self.result, self._result_deps = key, result, deps
+
+    def ignore_spec(self, ignore: str | None, abs_root: str) -> Optional[PathSpec]:
+        key: tuple = (ignore, abs_root)
+        if ignore is not None and ignore.startswith("file:"):
+            spec = _resolve_ignore_patterns(ignore, abs_root)
+            key = (ignore, abs_root, tuple(pattern.regex.pattern for pattern in spec.patterns) if spec else ())
+        elif key == self._ignore_key:
+            return self._ignore_spec
+        else:
+            spec = _resolve_ignore_patterns(ignore, abs_root)
+        if key != self._ignore_key:
+            # listings were filtered with the old patterns
+            self._listings.clear()
+            self._ignore_key, self._ignore_spec = key, spec
+        return self._ignore_spec
+
+
+class _CachedEntry:
+    """Stand-in for a cached :class:`os.DirEntry`, stats are always fresh"""
+
+    __slots__ = ("name", "path")
+
+    def __init__(self, entry: os.DirEntry) -> None:
+        self.name = entry.name
+        self.path = entry.path
+
+    def stat(self, follow_symlinks: bool = False) -> os.stat_result:
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+
+class _DirectoryLister:
+    """Directory listing and stats for one file_tree call, through a FileTreeCache if given.
+
+    With a cache, ``deps`` collects what the result depends on as ``(path, mtime_ns, ctime_ns)``;
+    ``ctime_ns`` is None for directories, whose listing only depends on their mtime.
+    """
+
+    def __init__(
+        self,
+        abs_root: str,
+        ignore_spec: Optional[PathSpec],
+        cache: Optional[FileTreeCache] = None,
+        track_entries: bool = False,
+    ) -> None:
+        self.abs_root = abs_root
+        self.ignore_spec = ignore_spec
+        self.cache = cache
+        self.track_entries = track_entries
+        self.deps: list[tuple[str, int, int | None]] = []
+
+    def children(
+        self, directory: str, *, max_depth_remaining: int, visibility_cache: dict[str, bool]
+    ) -> tuple[list, list]:
+        if self.cache is None:
+            return _list_directory_children(
+                directory,
+                self.abs_root,
+                self.ignore_spec,
+                max_depth_remaining=max_depth_remaining,
+                cache=visibility_cache,
+            )
+
+        key = (directory, max_depth_remaining)
+        listing = self.cache._listings.get(key)
+        if listing is None or not _deps_current([(path, mtime, None) for path, mtime in listing[0]]):
+            listing = self._scan(directory, max_depth_remaining)
+            self.cache._listings[key] = listing
+        self.deps.extend((path, mtime, None) for path, mtime in listing[0])
+        return listing[1], listing[2]
+
+    def _scan(self, directory: str, max_depth_remaining: int) -> tuple[list[tuple[str, int]], list[_CachedEntry], list[_CachedEntry]]:
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            mtime = -1
+        scanned: list[str] = []
+        folders, files = _list_directory_children(
+            directory,
+            self.abs_root,
+            self.ignore_spec,
+            max_depth_remaining=max_depth_remaining,
+            cache={},
+            scanned=scanned,
+        )
+        deps = [(directory, mtime)]
+        for path in scanned:
+            try:
+                deps.append((path, os.stat(path).st_mtime_ns))
+            except FileNotFoundError:
+                deps.append((path, -1))
+        return deps, [_CachedEntry(entry) for entry in folders], [_CachedEntry(entry) for entry in files]
+
+    def stat(self, entry) -> os.stat_result:
+        stat = entry.stat(follow_symlinks=False)
+        if self.track_entries:
+            self.deps.append((entry.path, stat.st_mtime_ns, stat.st_ctime_ns))
+        return stat
+
+
+def _deps_current(deps: list[tuple[str, int, int | None]]) -> bool:
+    for path, mtime, ctime in deps:
+        try:
+            # directories (the root may be a symlink) are followed, entries are not
+            stat = os.stat(path, follow_symlinks=ctime is None)
+        except FileNotFoundError:
+            if mtime != -1:
+                return False
+            continue
+        if stat.st_mtime_ns != mtime or (ctime is not None and stat.st_ctime_ns != ctime):
+            return False
+    return True
+
+
 @dataclass(slots=True)
 class _TreeEntry:
     name: str
@@ -288,6 +475,7 @@ def _directory_has_visible_entries(
     ignore_spec: PathSpec,
     cache: dict[str, bool],
     max_depth_remaining: int,
+    scanned: Optional[list[str]] = None,
 ) -> bool:
     if max_depth_remaining == 0:
         return False
@@ -296,6 +484,8 @@ def _directory_has_visible_entries(
     if cached is not None:
         return cached
 
+    if scanned is not None:
+        scanned.append(directory)
     try:
         with os.scandir(directory) as iterator:
             for entry in iterator:
@@ -315,6 +505,7 @@ def _directory_has_visible_entries(
                             ignore_spec,
                             cache,
                             next_depth,
+                            scanned,
                         ):
                             cache[directory] = True
                             return True
@@ -381,23 +572,20 @@ def _create_global_limit_comment(parent: _TreeEntry, hidden_children: Sequence[_
 def _create_folder_unprocessed_comment(
     folder_node: _TreeEntry,
     folder_path: str,
-    abs_root: str,
-    ignore_spec: Optional[PathSpec],
+    lister: "_DirectoryLister",
 ) -> Optional[_TreeEntry]:
     try:
-        folders, files = _list_directory_children(
+        folders, files = lister.children(
             folder_path,
-            abs_root,
-            ignore_spec,
             max_depth_remaining=-1,
-            cache={},
+            visibility_cache={},
         )
     except FileNotFoundError:
         return None
 
     hidden_entries: list[_TreeEntry] = []
     for entry in folders:
-        stat = entry.stat(follow_symlinks=False)
+        stat = lister.stat(entry)
         hidden_entries.append(
             _TreeEntry(
                 name=entry.name,
@@ -411,7 +599,7 @@ def _create_folder_unprocessed_comment(
             )
         )
     for entry in files:
-        stat = entry.stat(follow_symlinks=False)
+        stat = lister.stat(entry)
         hidden_entries.append(
             _TreeEntry(
                 name=entry.name,
@@ -502,9 +690,15 @@ def _list_directory_children(
     *,
     max_depth_remaining: int,
     cache: dict[str, bool],
+    scanned: Optional[list[str]] = None,
 ) -> tuple[list[os.DirEntry], list[os.DirEntry]]:
     folders: list[os.DirEntry] = []
     files: list[os.DirEntry] = []
+    # without negated patterns nothing below an ignored directory can be visible,
+    # so ignored directories need not be searched
+    has_negations = bool(ignore_spec) and any(
+        pattern.include is False for pattern in ignore_spec.patterns
+    )
 
     try:
         with os.scandir(directory) as iterator:
@@ -519,12 +713,13 @@ def _list_directory_children(
                     if is_directory:
                         ignored = ignore_spec.match_file(rel_posix) or ignore_spec.match_file(f"{rel_posix}/")
                         if ignored:
-                            if _directory_has_visible_entries(
+                            if has_negations and _directory_has_visible_entries(
                                 entry.path,
                                 root_abs_path,
                                 ignore_spec,
                                 cache,
                                 max_depth_remaining - 1,
+                                scanned,
                             ):
                                 folders.append(entry)
                             continue
@@ -521,139 +521,284 @@ class SimplicialComplex:
                    for k, simplices in self.simplices.items())
 
 
+class _UnionFind:
+    """Disjoint-set forest over memory slots (path halving, union by size)"""
+
+    def __init__(self, n: int = 0):
+        self.parent: List[int] = list(range(n))
+        self.size: List[int] = [1] * n
+        self.components = n
+
+    def grow(self, n: int) -> None:
+        """Extend the forest to n slots without adding components"""
+        start = len(self.parent)
+        if n > start:
+            self.parent.extend(range(start, n))
+            self.size.extend([1] * (n - start))
+
+    def make_set(self, x: int) -> None:
+        self.parent[x] = x
+        self.size[x] = 1
+        self.components += 1
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets of a and b; returns True if they were disjoint"""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self.components -= 1
+        return True
+
+
 class TopologicalMemory:
     """
     Memory system based on topological data analysis.
     Uses persistent homology and Betti numbers for semantic structure.
+
+    Points live in a preallocated float32 matrix indexed by slot. The
+    1-skeleton of the Vietoris-Rips complex at ``distance_threshold`` is
+    kept as an incremental adjacency list, with a union-find tracking
+    connected components. Once ``capacity`` is reached the oldest memory
+    is evicted and its slot reused.
     """
 
-    def __init__(self, distance_threshold: float = 0.5):
+    DEFAULT_CAPACITY = 4096
+    INITIAL_ROWS = 256
+
+    def __init__(self, distance_threshold: float = 0.5,
+                 capacity: int = DEFAULT_CAPACITY):
         self.distance_threshold = distance_threshold
-        self.points: List[np.ndarray] = []
-        self.labels: List[str] = []
-        self.complex = SimplicialComplex()
-        self.betti_numbers: List[int] = []
+        self.capacity = max(1, int(capacity))
+        self.dim: Optional[int] = None
         self.persistence_pairs: List[Tuple[float, float]] = []
+        self.evictions = 0
+
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._labels: List[Optional[str]] = []
+        self._adjacency: List[set] = []
+        self._size = 0
+        self._next_slot = 0
+        self._n_edges = 0
+        self._n_triangles = 0
+        self._components = _UnionFind()
+        self._components_dirty = False
 
-    def add_memory(self, embedding: np.ndarray, label: str) -> int:
-        """Add a memory point to the topological space"""
-        idx = len(self.points)
-        self.points.append(embedding)
-        self.labels.append(label)
-
-        # Add as 0-simplex
-        self.complex.add_simplex(Simplex((idx,)))
-
-        # Check for edges (1-simplices) based on distance
-        for i, point in enumerate(self.points[:-1]):
-            distance = np.linalg.norm(embedding - point)
-            if distance < self.distance_threshold:
-                self.complex.add_simplex(Simplex((i, idx)))
-
-                # Check for triangles (2-simplices)
-                for j in range(i):
-                    if Simplex((j, i)) in self.complex.get_simplices(1):
-                        dist_j = np.linalg.norm(embedding - self.points[j])
-                        if dist_j < self.distance_threshold:
-                            self.complex.add_simplex(Simplex((j, i, idx)))
-
-        # Update Betti numbers
-        self._compute_betti_numbers()
+    @property
+    def points(self) -> np.ndarray:
+        """Occupied rows of the embedding matrix, indexed by slot"""
+        return self._matrix[:self._size]
 
-        return idx
+    @property
+    def labels(self) -> List[Optional[str]]:
+        return self._labels[:self._size]
 
-    def _compute_betti_numbers(self) -> None:
+    @property
+    def betti_numbers(self) -> List[int]:
         """
-        Compute Betti numbers (topological invariants).
-        β₀ = connected components
-        β₁ = holes (cycles)
-        β₂ = voids (cavities)
+        Betti numbers of the clique complex (up to triangles).
+        β₀ = connected components (exact, via union-find)
+        β₁ = independent cycles not filled by triangles
+        β₂ = voids, from the Euler characteristic χ = β₀ - β₁ + β₂
         """
-        n_vertices = len(self.complex.get_simplices(0))
-        n_edges = len(self.complex.get_simplices(1))
-        n_triangles = len(self.complex.get_simplices(2))
-
-        # Simplified Betti number computation
-        # β₀ = components (approximate via edge connectivity)
-        beta_0 = max(1, n_vertices - n_edges + n_triangles)
+        if self._size == 0:
+            return []
+        n_vertices, n_edges, n_triangles = self._size, self._n_edges, self._n_triangles
 
-        # β₁ = cycles = edges - vertices + components
-        beta_1 = max(0, n_edges - n_vertices + beta_0)
+        beta_0 = self._component_count()
+        beta_1 = max(0, n_edges - n_vertices + beta_0 - n_triangles)
+        euler = n_vertices - n_edges + n_triangles
+        beta_2 = max(0, euler - beta_0 + beta_1)
 
-        # β₂ = voids (simplified)
-        beta_2 = max(0, n_triangles - n_edges + n_vertices - 1) if n_triangles > 0 else 0
+        return [beta_0, beta_1, beta_2]
 
-        self.betti_numbers = [beta_0, beta_1, beta_2]
+    def add_memory(self, embedding: np.ndarray, label: str) -> int:
+        """Add a memory point to the topological space, returning its slot"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        if self.dim is None:
+            self.dim = vector.shape[0]
+        elif vector.shape[0] != self.dim:
+            raise ValueError(f"Expected embedding of dimension {self.dim}, got {vector.shape[0]}")
+
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.capacity
+        if self._size == self.capacity:
+            self._evict(slot)
+        else:
+            self._ensure_rows(self._size + 1)
+            self._size += 1
+
+        # Edges (1-simplices) to every point within the threshold
+        distances = self._distances(vector)
+        distances[slot] = np.inf
+        neighbors = set(np.flatnonzero(distances < self.distance_threshold).tolist())
+
+        self._matrix[slot] = vector
+        self._sq_norms[slot] = float(vector @ vector)
+        self._labels[slot] = label
+
+        # Triangles (2-simplices): edges already present among the new neighbors
+        adjacency = self._adjacency
+        self._n_triangles += sum(len(adjacency[u] & neighbors) for u in neighbors) // 2
+        for u in neighbors:
+            adjacency[u].add(slot)
+        adjacency[slot] = neighbors
+        self._n_edges += len(neighbors)
+
+        if not self._components_dirty:
+            self._components.make_set(slot)
+            for u in neighbors:
+                self._components.union(slot, u)
+
+        return slot
+
+    def _ensure_rows(self, n_rows: int) -> None:
+        """Grow the preallocated matrix geometrically, up to capacity"""
+        rows = self._matrix.shape[0]
+        if n_rows <= rows:
+            return
+        new_rows = min(self.capacity, max(n_rows, rows * 2, self.INITIAL_ROWS))
+
+        matrix = np.zeros((new_rows, self.dim), dtype=np.float32)
+        sq_norms = np.zeros(new_rows, dtype=np.float32)
+        if rows:
+            matrix[:rows] = self._matrix
+            sq_norms[:rows] = self._sq_norms
+
+        self._matrix = matrix
+        self._sq_norms = sq_norms
+        self._labels.extend([None] * (new_rows - rows))
+        self._adjacency.extend(set() for _ in range(new_rows - rows))
+        self._components.grow(new_rows)
+
+    def _evict(self, slot: int) -> None:
+        """Remove the memory in slot along with its edges and triangles"""
+        adjacency = self._adjacency
+        neighbors = adjacency[slot]
+
+        self._n_triangles -= sum(len(adjacency[u] & neighbors) for u in neighbors) // 2
+        for u in neighbors:
+            adjacency[u].discard(slot)
+        self._n_edges -= len(neighbors)
+        adjacency[slot] = set()
+        self._labels[slot] = None
+
+        # Union-find cannot split sets, so removing a connected vertex
+        # forces a rebuild the next time components are counted
+        if neighbors:
+            self._components_dirty = True
+        elif not self._components_dirty:
+            self._components.components -= 1
+        self.evictions += 1
+
+    def _component_count(self) -> int:
+        if self._components_dirty:
+            components = _UnionFind(self._matrix.shape[0])
+            components.components = self._size
+            for u in range(self._size):
+                for v in self._adjacency[u]:
+                    if u < v:
+                        components.union(u, v)
+            self._components = components
+            self._components_dirty = False
+        return self._components.components
+
+    def _distances(self, vector: np.ndarray) -> np.ndarray:
+        """Euclidean distances from vector to every occupied slot"""
+        points = self._matrix[:self._size]
+        sq_distances = self._sq_norms[:self._size] + float(vector @ vector) - 2.0 * (points @ vector)
+        np.maximum(sq_distances, 0.0, out=sq_distances)
+        return np.sqrt(sq_distances)
 
     def compute_persistent_homology(self, filtration_values: List[float]) -> List[Tuple[float, float]]:
         """
-        Compute persistent homology across filtration.
+        Compute 0-dimensional persistent homology of the Rips filtration.
+        Every point is born at scale 0; sweeping edges in ascending length,
+        each edge that merges two components kills one of them at that
+        length. Components alive at the largest filtration value (or the
+        current distance threshold if none is given) persist to infinity.
         Returns birth-death pairs for topological features.
         """
-        persistence_pairs = []
-
-        for i, threshold in enumerate(sorted(filtration_values)):
-            old_threshold = self.distance_threshold
-            self.distance_threshold = threshold
-
-            # Rebuild complex at this threshold
-            old_betti = self.betti_numbers.copy()
-            self._rebuild_complex_at_threshold(threshold)
-            self._compute_betti_numbers()
-
-            # Track births and deaths
-            for dim in range(len(self.betti_numbers)):
-                if dim < len(old_betti):
-                    diff = self.betti_numbers[dim] - old_betti[dim]
-                    if diff > 0:
-                        # Birth of feature
-                        persistence_pairs.append((threshold, float('inf')))
-                    elif diff < 0:
-                        # Death of feature - find matching birth
-                        for j, (birth, death) in enumerate(persistence_pairs):
-                            if death == float('inf'):
-                                persistence_pairs[j] = (birth, threshold)
-                                break
-
-            self.distance_threshold = old_threshold
+        n = self._size
+        if n == 0:
+            self.persistence_pairs = []
+            return []
+
+        max_scale = max(filtration_values) if filtration_values else self.distance_threshold
+        points = self._matrix[:n]
+        sq_norms = self._sq_norms[:n]
+
+        # Collect edges up to max_scale in row blocks to bound memory
+        sources, targets, lengths = [], [], []
+        block = 512
+        for start in range(0, n, block):
+            stop = min(n, start + block)
+            sq_distances = sq_norms[start:stop, None] + sq_norms[None, :] - 2.0 * (points[start:stop] @ points.T)
+            np.maximum(sq_distances, 0.0, out=sq_distances)
+            rows, cols = np.nonzero(sq_distances <= max_scale * max_scale)
+            rows += start
+            upper = rows < cols
+            rows, cols = rows[upper], cols[upper]
+            sources.append(rows)
+            targets.append(cols)
+            lengths.append(np.sqrt(sq_distances[rows - start, cols]))
+
+        sources_arr = np.concatenate(sources)
+        targets_arr = np.concatenate(targets)
+        lengths_arr = np.concatenate(lengths)
+        order = np.argsort(lengths_arr, kind='stable')
+
+        components = _UnionFind(n)
+        persistence_pairs: List[Tuple[float, float]] = []
+        for u, v, length in zip(sources_arr[order].tolist(), targets_arr[order].tolist(),
+                                lengths_arr[order].tolist()):
+            if components.union(u, v):
+                persistence_pairs.append((0.0, length))
+                if components.components == 1:
+                    break
+
+        persistence_pairs.extend((0.0, float('inf')) for _ in range(components.components))
 
         self.persistence_pairs = persistence_pairs
         return persistence_pairs
 
-    def _rebuild_complex_at_threshold(self, threshold: float) -> None:
-        """Rebuild simplicial complex at given distance threshold"""
-        self.complex = SimplicialComplex()
-
-        for i in range(len(self.points)):
-            self.complex.add_simplex(Simplex((i,)))
-
-            for j in range(i):
-                distance = np.linalg.norm(self.points[i] - self.points[j])
-                if distance < threshold:
-                    self.complex.add_simplex(Simplex((j, i)))
-
     def get_topological_signature(self) -> Dict[str, Any]:
         """Get complete topological signature of memory space"""
         return {
             'betti_numbers': self.betti_numbers,
-            'euler_characteristic': self.complex.euler_characteristic(),
+            'euler_characteristic': self._size - self._n_edges + self._n_triangles,
             'persistence_pairs': self.persistence_pairs,
-            'n_points': len(self.points),
-            'n_connections': len(self.complex.get_simplices(1)),
-            'n_triangles': len(self.complex.get_simplices(2)),
-            'connectivity_ratio': len(self.complex.get_simplices(1)) / max(1, len(self.points))
+            'n_points': self._size,
+            'n_connections': self._n_edges,
+            'n_triangles': self._n_triangles,
+            'connectivity_ratio': self._n_edges / max(1, self._size),
+            'capacity': self.capacity,
+            'evictions': self.evictions
         }
 
     def find_topological_neighbors(self, query_embedding: np.ndarray,
                                     n_neighbors: int = 5) -> List[Tuple[int, str, float]]:
         """Find neighbors using topological distance"""
-        distances = []
-        for i, point in enumerate(self.points):
-            dist = np.linalg.norm(query_embedding - point)
-            distances.append((i, self.labels[i], dist))
+        if self._size == 0 or n_neighbors <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        distances = self._distances(query)
 
-        distances.sort(key=lambda x: x[2])
-        return distances[:n_neighbors]
+        k = min(n_neighbors, self._size)
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+        return [(int(i), self._labels[i], float(distances[i])) for i in nearest]
 
 
 # =============================================================================
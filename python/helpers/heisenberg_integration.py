@@ -155,8 +155,8 @@ class HeisenbergIntegration:
             }
 
             # 4. Simple swarm fitness
-            def fitness_fn(pos):
-                return float(np.dot(pos / (np.linalg.norm(pos) + 0.001), task_embedding))
+            from python.helpers.swarm_intelligence import CosineFitness
+            fitness_fn = CosineFitness(task_embedding, rescale=False)
 
             # Quick swarm iteration
             swarm_result = await self._swarm.swarm_think(task_embedding, fitness_fn, 5)
@@ -1,35 +1,140 @@
+"""
+Image compression for vision models.
+
+compress_image does the work synchronously. compress_image_async runs it on
+a shared process pool, so decoding and encoding never block the event loop
+and several images are compressed in parallel, and keeps recent results in
+memory keyed by content hash and target parameters.
+
+Workers only import this module and PIL, never the agent framework.
+"""
+
 from PIL import Image
+import asyncio
+import hashlib
 import io
 import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+
+from python.helpers import process_pool
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+# images this many times over max_pixels are reduced while decoding
+FAST_REDUCE_FACTOR = 4
 
 
 def compress_image(image_data: bytes, *, max_pixels: int = 256_000, quality: int = 50) -> bytes:
     """Compress an image by scaling it down and converting to JPEG with quality settings.
-    
+
     Args:
         image_data: Raw image bytes
         max_pixels: Maximum number of pixels in the output image (width * height)
         quality: JPEG quality setting (1-100)
-    
+
     Returns:
         Compressed image as bytes
     """
     # load image from bytes
     img = Image.open(io.BytesIO(image_data))
-    
+
     # calculate scaling factor to get to max_pixels
     current_pixels = img.width * img.height
     if current_pixels > max_pixels:
         scale = math.sqrt(max_pixels / current_pixels)
         new_width = int(img.width * scale)
         new_height = int(img.height * scale)
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    
+        if current_pixels >= max_pixels * FAST_REDUCE_FACTOR:
+            # very large images: JPEGs are decoded at 1/2, 1/4 or 1/8 scale (still
+            # at least the target size), other formats are reduced by box filtering
+            # before the final LANCZOS pass
+            if img.format == "JPEG":
+                img.draft(img.mode, (new_width, new_height))
+            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        else:
+            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
     # convert to RGB if needed (for JPEG)
     if img.mode in ('RGBA', 'P'):
         img = img.convert('RGB')
-    
+
     # save as JPEG with compression
     output = io.BytesIO()
     img.save(output, format='JPEG', quality=quality, optimize=True)
     return output.getvalue()
+
+
+class _ResultCache:
+    """LRU of compressed images bounded by their total size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.items: OrderedDict[str, bytes] = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            value = self.items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes):
+        with self.lock:
+            if key in self.items:
+                self.size -= len(self.items.pop(key))
+            self.items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes and self.items:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+_cache = _ResultCache(CACHE_MAX_BYTES)
+
+
+def cache_key(image_data: bytes, max_pixels: int, quality: int) -> str:
+    return f"{hashlib.sha256(image_data).hexdigest()}:{max_pixels}:{quality}"
+
+
+async def compress_image_async(
+    image_data: bytes,
+    *,
+    max_pixels: int = 256_000,
+    quality: int = 50,
+    executor: Executor | None = None,
+) -> bytes:
+    """compress_image on the process pool, cached by content and parameters"""
+    loop = asyncio.get_running_loop()
+    key = await asyncio.to_thread(cache_key, image_data, max_pixels, quality)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    compressed = await loop.run_in_executor(
+        executor or process_pool.get_pool(), _compress, image_data, max_pixels, quality
+    )
+    _cache.put(key, compressed)
+    return compressed
+
+
+def _compress(image_data: bytes, max_pixels: int, quality: int) -> bytes:
+    # runs in a worker process, keyword arguments can't go through run_in_executor
+    return compress_image(image_data, max_pixels=max_pixels, quality=quality)
+
+
+def cache_stats() -> dict:
+    with _cache.lock:
+        return {
+            "entries": len(_cache.items),
+            "bytes": _cache.size,
+            "hits": _cache.hits,
+            "misses": _cache.misses,
+        }
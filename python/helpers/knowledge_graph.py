@@ -11,17 +11,27 @@ Features:
 - Semantic clustering
 - Inference engine
 - Query language
+- Optional durable SQLite storage (see knowledge_graph_store)
 """
 
 from __future__ import annotations
 
 import hashlib
 import json
+import os
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from python.helpers import files
+
+if TYPE_CHECKING:
+    from python.helpers.knowledge_graph_store import SQLiteGraphStore
+
+
+KNOWLEDGE_GRAPHS_FOLDER = "memory/knowledge_graphs"
 
 
 class RelationType(Enum):
@@ -95,13 +105,18 @@ class GraphIndex:
     def __init__(self):
         self.by_type: Dict[str, Set[str]] = defaultdict(set)
         self.by_property: Dict[str, Dict[Any, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self.by_name: Dict[str, List[str]] = defaultdict(list)
         self.outgoing: Dict[str, Set[str]] = defaultdict(set)
         self.incoming: Dict[str, Set[str]] = defaultdict(set)
         self.by_relation: Dict[str, Set[str]] = defaultdict(set)
+        # entity id -> neighbor id -> number of relationships backing the edge
+        self.successors: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.predecessors: Dict[str, Dict[str, int]] = defaultdict(dict)
 
     def index_entity(self, entity: Entity):
         """Index an entity"""
         self.by_type[entity.entity_type].add(entity.id)
+        self.by_name[entity.name].append(entity.id)
         for key, value in entity.properties.items():
             if isinstance(value, (str, int, float, bool)):
                 self.by_property[key][value].add(entity.id)
@@ -111,23 +126,49 @@ class GraphIndex:
         self.outgoing[rel.source_id].add(rel.id)
         self.incoming[rel.target_id].add(rel.id)
         self.by_relation[rel.relation_type].add(rel.id)
+        self._link(rel.source_id, rel.target_id)
         if rel.bidirectional:
             self.outgoing[rel.target_id].add(rel.id)
             self.incoming[rel.source_id].add(rel.id)
+            self._link(rel.target_id, rel.source_id)
 
-    def remove_entity(self, entity_id: str):
+    def remove_entity(self, entity: Entity):
         """Remove entity from indexes"""
-        for type_set in self.by_type.values():
-            type_set.discard(entity_id)
-        for prop_dict in self.by_property.values():
-            for val_set in prop_dict.values():
-                val_set.discard(entity_id)
+        self.by_type[entity.entity_type].discard(entity.id)
+        for key, value in entity.properties.items():
+            if isinstance(value, (str, int, float, bool)):
+                self.by_property[key][value].discard(entity.id)
+        ids = self.by_name.get(entity.name)
+        if ids and entity.id in ids:
+            ids.remove(entity.id)
+            if not ids:
+                del self.by_name[entity.name]
 
     def remove_relationship(self, rel: Relationship):
         """Remove relationship from indexes"""
         self.outgoing[rel.source_id].discard(rel.id)
         self.incoming[rel.target_id].discard(rel.id)
         self.by_relation[rel.relation_type].discard(rel.id)
+        self._unlink(rel.source_id, rel.target_id)
+        if rel.bidirectional:
+            self.outgoing[rel.target_id].discard(rel.id)
+            self.incoming[rel.source_id].discard(rel.id)
+            self._unlink(rel.target_id, rel.source_id)
+
+    def _link(self, source_id: str, target_id: str):
+        successors = self.successors[source_id]
+        successors[target_id] = successors.get(target_id, 0) + 1
+        predecessors = self.predecessors[target_id]
+        predecessors[source_id] = predecessors.get(source_id, 0) + 1
+
+    def _unlink(self, source_id: str, target_id: str):
+        for adjacency, a, b in ((self.successors, source_id, target_id),
+                                (self.predecessors, target_id, source_id)):
+            neighbors = adjacency.get(a)
+            if neighbors and b in neighbors:
+                neighbors[b] -= 1
+                if neighbors[b] <= 0:
+                    del neighbors[b]
 
 
 class PatternMatcher:
@@ -139,24 +180,32 @@ class PatternMatcher:
 
     def find_triangles(self) -> List[Tuple[str, str, str]]:
         """Find all triangular relationships (A->B->C->A)"""
-        triangles = []
+        successors = self.graph.index.successors
+        triangles: Set[Tuple[str, str, str]] = set()
         for entity_id in self.graph.entities:
-            neighbors = self.graph.get_neighbors(entity_id)
+            neighbors = successors.get(entity_id)
+            if not neighbors or len(neighbors) < 2:
+                continue
             for n1 in neighbors:
-                for n2 in neighbors:
-                    if n1 != n2:
-                        n1_neighbors = self.graph.get_neighbors(n1)
-                        if n2 in n1_neighbors:
-                            triangle = tuple(sorted([entity_id, n1, n2]))
-                            if triangle not in triangles:
-                                triangles.append(triangle)
-        return triangles
+                n1_neighbors = successors.get(n1)
+                if not n1_neighbors:
+                    continue
+                # Intersect from the smaller side
+                if len(n1_neighbors) < len(neighbors):
+                    common = [n2 for n2 in n1_neighbors if n2 in neighbors]
+                else:
+                    common = [n2 for n2 in neighbors if n2 in n1_neighbors]
+                for n2 in common:
+                    if n2 != n1 and n2 != entity_id and n1 != entity_id:
+                        triangles.add(tuple(sorted((entity_id, n1, n2))))
+        return sorted(triangles)
 
     def find_hubs(self, min_connections: int = 5) -> List[Tuple[str, int]]:
         """Find highly connected entities (hubs)"""
+        successors = self.graph.index.successors
         hubs = []
         for entity_id in self.graph.entities:
-            connections = len(self.graph.get_neighbors(entity_id))
+            connections = len(successors.get(entity_id, ()))
             if connections >= min_connections:
                 hubs.append((entity_id, connections))
         return sorted(hubs, key=lambda x: x[1], reverse=True)
@@ -195,6 +244,7 @@ class PatternMatcher:
 
     def find_clusters(self, min_size: int = 3) -> List[Set[str]]:
         """Find densely connected clusters"""
+        successors = self.graph.index.successors
         clusters = []
         visited = set()
 
@@ -203,20 +253,16 @@ class PatternMatcher:
                 continue
 
             # BFS to find connected component
-            cluster = set()
-            queue = [entity_id]
+            cluster = {entity_id}
+            visited.add(entity_id)
+            queue = deque([entity_id])
 
             while queue:
-                current = queue.pop(0)
-                if current in visited:
-                    continue
-
-                visited.add(current)
-                cluster.add(current)
-
-                neighbors = self.graph.get_neighbors(current)
-                for neighbor in neighbors:
+                current = queue.popleft()
+                for neighbor in successors.get(current, ()):
                     if neighbor not in visited:
+                        visited.add(neighbor)
+                        cluster.add(neighbor)
                         queue.append(neighbor)
 
             if len(cluster) >= min_size:
@@ -250,11 +296,10 @@ class InferenceEngine:
     def _transitive_is_a(self) -> List[Triple]:
         """Transitive closure for is_a relationships"""
         inferred = []
-        is_a_rels = [r for r in self.graph.relationships.values()
-                     if r.relation_type == RelationType.IS_A.value]
+        is_a = RelationType.IS_A.value
 
-        for r1 in is_a_rels:
-            for r2 in is_a_rels:
+        for r1 in self.graph.get_relationships_by_type(is_a):
+            for r2 in self.graph.get_relationships_from(r1.target_id, is_a):
                 if r1.target_id == r2.source_id:
                     # A is_a B and B is_a C -> A is_a C
                     new_rel_id = f"{r1.source_id}-is_a-{r2.target_id}"
@@ -271,13 +316,10 @@ class InferenceEngine:
     def _inheritance(self) -> List[Triple]:
         """Property inheritance through is_a"""
         inferred = []
-        is_a_rels = [r for r in self.graph.relationships.values()
-                     if r.relation_type == RelationType.IS_A.value]
-        has_a_rels = [r for r in self.graph.relationships.values()
-                      if r.relation_type == RelationType.HAS_A.value]
+        is_a_rels = self.graph.get_relationships_by_type(RelationType.IS_A.value)
 
         for is_a in is_a_rels:
-            for has_a in has_a_rels:
+            for has_a in self.graph.get_relationships_from(is_a.target_id, RelationType.HAS_A.value):
                 if is_a.target_id == has_a.source_id:
                     new_rel_id = f"{is_a.source_id}-has_a-{has_a.target_id}"
                     if new_rel_id not in self.graph.relationships:
@@ -295,8 +337,8 @@ class InferenceEngine:
         inferred = []
         symmetric_types = [RelationType.SIMILAR_TO.value, RelationType.RELATED_TO.value]
 
-        for rel in self.graph.relationships.values():
-            if rel.relation_type in symmetric_types:
+        for relation_type in symmetric_types:
+            for rel in self.graph.get_relationships_by_type(relation_type):
                 reverse_id = f"{rel.target_id}-{rel.relation_type}-{rel.source_id}"
                 if reverse_id not in self.graph.relationships:
                     inferred.append(Triple(
@@ -354,7 +396,7 @@ class QueryEngine:
         # Handle different query patterns
         if subject.startswith("?"):
             # Find entities matching predicate-object
-            for rel in self.graph.relationships.values():
+            for rel in self._candidates(None, predicate, obj):
                 if self._matches(rel.relation_type, predicate) and \
                    self._matches(rel.target_id, obj):
                     results.append({
@@ -364,7 +406,7 @@ class QueryEngine:
                     })
         elif predicate.startswith("?"):
             # Find relationships from subject to object
-            for rel in self.graph.relationships.values():
+            for rel in self._candidates(subject, None, obj):
                 if self._matches(rel.source_id, subject) and \
                    self._matches(rel.target_id, obj):
                     results.append({
@@ -374,7 +416,7 @@ class QueryEngine:
                     })
         elif obj.startswith("?"):
             # Find targets of subject-predicate
-            for rel in self.graph.relationships.values():
+            for rel in self._candidates(subject, predicate, None):
                 if self._matches(rel.source_id, subject) and \
                    self._matches(rel.relation_type, predicate):
                     results.append({
@@ -391,14 +433,58 @@ class QueryEngine:
             return True  # Variable matches anything
         return value == pattern or pattern == "*"
 
+    def _is_bound(self, pattern: Optional[str]) -> bool:
+        return pattern is not None and not pattern.startswith("?") and pattern != "*"
+
+    def _candidates(self, source: Optional[str], relation: Optional[str],
+                    target: Optional[str]) -> List[Relationship]:
+        """Relationships from the smallest index bucket covering the bound terms"""
+        index = self.graph.index
+        buckets = []
+        if self._is_bound(source):
+            buckets.append(index.outgoing.get(source, set()))
+        if self._is_bound(relation):
+            buckets.append(index.by_relation.get(relation, set()))
+        if self._is_bound(target):
+            buckets.append(index.incoming.get(target, set()))
+
+        relationships = self.graph.relationships
+        if not buckets:
+            return list(relationships.values())
+        bucket = min(buckets, key=len)
+        return [relationships[rel_id] for rel_id in bucket if rel_id in relationships]
+
     def path_query(self, start: str, end: str, max_depth: int = 5) -> List[List[str]]:
         """Find all paths between two entities"""
         paths = []
-        self._dfs_paths(start, end, [start], paths, max_depth)
+        if max_depth < 1:
+            return paths
+        # Hop distance to the target, used to prune branches that cannot
+        # reach it within the remaining depth
+        distance = self._distances_to(end, max_depth - 1)
+        if start not in distance:
+            return paths
+        self._dfs_paths(start, end, [start], {start}, distance, paths, max_depth)
         return paths
 
-    def _dfs_paths(self, current: str, target: str, path: List[str],
-                   paths: List[List[str]], max_depth: int):
+    def _distances_to(self, target: str, max_hops: int) -> Dict[str, int]:
+        """Reverse BFS over predecessors, bounded to max_hops"""
+        predecessors = self.graph.index.predecessors
+        distance = {target: 0}
+        queue = deque([target])
+        while queue:
+            current = queue.popleft()
+            hops = distance[current]
+            if hops >= max_hops:
+                continue
+            for predecessor in predecessors.get(current, ()):
+                if predecessor not in distance:
+                    distance[predecessor] = hops + 1
+                    queue.append(predecessor)
+        return distance
+
+    def _dfs_paths(self, current: str, target: str, path: List[str], on_path: Set[str],
+                   distance: Dict[str, int], paths: List[List[str]], max_depth: int):
         """DFS to find paths"""
         if current == target:
             paths.append(path.copy())
@@ -407,11 +493,13 @@ class QueryEngine:
         if len(path) >= max_depth:
             return
 
-        neighbors = self.graph.get_neighbors(current)
-        for neighbor in neighbors:
-            if neighbor not in path:
+        remaining = max_depth - len(path) - 1
+        for neighbor in self.graph.index.successors.get(current, ()):
+            if neighbor not in on_path and distance.get(neighbor, max_depth) <= remaining:
                 path.append(neighbor)
-                self._dfs_paths(neighbor, target, path, paths, max_depth)
+                on_path.add(neighbor)
+                self._dfs_paths(neighbor, target, path, on_path, distance, paths, max_depth)
+                on_path.discard(neighbor)
                 path.pop()
 
 
@@ -419,10 +507,15 @@ class KnowledgeGraph:
     """
     The main Knowledge Graph system.
     A powerful graph-based knowledge representation.
+
+    With a store, entities, relationships and the index are views over
+    the store and every add is written through incrementally; call
+    flush() to commit.
     """
 
-    def __init__(self, name: str = "default"):
+    def __init__(self, name: str = "default", store: Optional["SQLiteGraphStore"] = None):
         self.name = name
+        self.store = store
         self.entities: Dict[str, Entity] = {}
         self.relationships: Dict[str, Relationship] = {}
         self.index = GraphIndex()
@@ -437,6 +530,27 @@ class KnowledgeGraph:
             "inferences_made": 0
         }
 
+        if store is not None:
+            self.entities = store.entities  # type: ignore[assignment]
+            self.relationships = store.relationships  # type: ignore[assignment]
+            self.index = store.index
+            self.created_at = store.get_meta("created_at", self.created_at)
+            self.stats.update(store.get_meta("stats", {}))
+            store.set_meta("created_at", self.created_at)
+            store.flush()
+
+    def flush(self):
+        """Commit pending writes to the store, if any"""
+        if self.store is not None:
+            self.store.set_meta("stats", self.stats)
+            self.store.flush()
+
+    def close(self):
+        """Flush and close the store, if any"""
+        if self.store is not None:
+            self.flush()
+            self.store.close()
+
     def _generate_id(self, name: str, entity_type: str) -> str:
         """Generate unique ID for entity"""
         content = f"{name}:{entity_type}:{time.time()}"
@@ -478,6 +592,9 @@ class KnowledgeGraph:
             confidence=confidence,
             bidirectional=bidirectional
         )
+        existing = self.relationships.get(rel.id)
+        if existing is not None:
+            self.index.remove_relationship(existing)
         self.relationships[rel.id] = rel
         self.index.index_relationship(rel)
         self.stats["relationships_added"] += 1
@@ -502,9 +619,9 @@ class KnowledgeGraph:
 
     def find_entity_by_name(self, name: str) -> Optional[Entity]:
         """Find entity by name"""
-        for entity in self.entities.values():
-            if entity.name == name:
-                return entity
+        ids = self.index.by_name.get(name)
+        if ids:
+            return self.entities.get(ids[0])
         return None
 
     def get_entity(self, entity_id: str) -> Optional[Entity]:
@@ -513,21 +630,25 @@ class KnowledgeGraph:
 
     def get_neighbors(self, entity_id: str) -> Set[str]:
         """Get all neighboring entity IDs"""
-        neighbors = set()
-        for rel in self.relationships.values():
-            if rel.source_id == entity_id:
-                neighbors.add(rel.target_id)
-            if rel.bidirectional and rel.target_id == entity_id:
-                neighbors.add(rel.source_id)
-        return neighbors
-
-    def get_relationships_from(self, entity_id: str) -> List[Relationship]:
+        return set(self.index.successors.get(entity_id, ()))
+
+    def get_relationships_from(self, entity_id: str,
+                               relation_type: Optional[str] = None) -> List[Relationship]:
         """Get all relationships from an entity"""
-        return [r for r in self.relationships.values() if r.source_id == entity_id]
+        rels = (self.relationships[rel_id] for rel_id in self.index.outgoing.get(entity_id, ()))
+        return [r for r in rels if r.source_id == entity_id
+                and (relation_type is None or r.relation_type == relation_type)]
 
-    def get_relationships_to(self, entity_id: str) -> List[Relationship]:
+    def get_relationships_to(self, entity_id: str,
+                             relation_type: Optional[str] = None) -> List[Relationship]:
         """Get all relationships to an entity"""
-        return [r for r in self.relationships.values() if r.target_id == entity_id]
+        rels = (self.relationships[rel_id] for rel_id in self.index.incoming.get(entity_id, ()))
+        return [r for r in rels if r.target_id == entity_id
+                and (relation_type is None or r.relation_type == relation_type)]
+
+    def get_relationships_by_type(self, relation_type: str) -> List[Relationship]:
+        """Get all relationships of a given type"""
+        return [self.relationships[rel_id] for rel_id in self.index.by_relation.get(relation_type, ())]
 
     def query(self, pattern: str) -> List[Dict]:
         """Execute a query"""
@@ -577,8 +698,7 @@ class KnowledgeGraph:
         for _ in range(depth):
             next_layer = set()
             for eid in current_layer:
-                neighbors = self.get_neighbors(eid)
-                next_layer.update(neighbors)
+                next_layer.update(self.index.successors.get(eid, ()))
 
                 for rel in self.get_relationships_from(eid):
                     rels.append({
@@ -651,6 +771,8 @@ class KnowledgeGraph:
                     confidence=r.get("confidence", 1.0)
                 )
 
+        self.flush()
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get graph statistics"""
         entity_types = defaultdict(int)
@@ -679,13 +801,26 @@ class KnowledgeGraph:
 _knowledge_graphs: Dict[str, KnowledgeGraph] = {}
 
 
+def get_knowledge_graph_path(name: str) -> str:
+    """Absolute path of the SQLite file backing a named graph"""
+    return files.get_abs_path(KNOWLEDGE_GRAPHS_FOLDER, files.safe_file_name(name) + ".db")
+
+
 def get_knowledge_graph(name: str = "default") -> KnowledgeGraph:
-    """Get or create a knowledge graph by name"""
+    """Get or open a persistent knowledge graph by name"""
     if name not in _knowledge_graphs:
-        _knowledge_graphs[name] = KnowledgeGraph(name)
+        from python.helpers.knowledge_graph_store import SQLiteGraphStore
+        store = SQLiteGraphStore(get_knowledge_graph_path(name))
+        _knowledge_graphs[name] = KnowledgeGraph(name, store=store)
     return _knowledge_graphs[name]
 
 
 def list_knowledge_graphs() -> List[str]:
-    """List all knowledge graph names"""
-    return list(_knowledge_graphs.keys())
+    """List all knowledge graph names, open or stored on disk"""
+    names = list(_knowledge_graphs.keys())
+    folder = files.get_abs_path(KNOWLEDGE_GRAPHS_FOLDER)
+    if os.path.isdir(folder):
+        for file in sorted(os.listdir(folder)):
+            if file.endswith(".db") and file[:-3] not in names:
+                names.append(file[:-3])
+    return names
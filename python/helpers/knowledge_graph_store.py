@@ -0,0 +1,415 @@
+"""
+KNOWLEDGE GRAPH STORE
+=====================
+Durable SQLite backend for KnowledgeGraph.
+
+Features:
+- Incremental writes on add_entity / add_relationship
+- Covering indexes on source, target and relation type
+- Lazily materialized entities and relationships (bounded LRU cache)
+- Index views that answer adjacency queries straight from SQLite,
+  so graphs larger than RAM can be opened and traversed
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from python.helpers.knowledge_graph import Entity, GraphIndex, Relationship
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    importance REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    properties TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entities_name ON entities (name, id);
+CREATE INDEX IF NOT EXISTS idx_entities_type ON entities (entity_type, id);
+
+CREATE TABLE IF NOT EXISTS relationships (
+    id TEXT PRIMARY KEY,
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    relation_type TEXT NOT NULL,
+    weight REAL NOT NULL,
+    confidence REAL NOT NULL,
+    created_at REAL NOT NULL,
+    bidirectional INTEGER NOT NULL,
+    properties TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rel_source ON relationships (source_id, relation_type, target_id, bidirectional, id);
+CREATE INDEX IF NOT EXISTS idx_rel_target ON relationships (target_id, relation_type, source_id, bidirectional, id);
+CREATE INDEX IF NOT EXISTS idx_rel_relation ON relationships (relation_type, source_id, target_id, id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class _LRUCache:
+    """Small ordered-dict LRU used for materialized rows and adjacency"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.items: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def discard(self, key):
+        self.items.pop(key, None)
+
+    def clear(self):
+        self.items.clear()
+
+
+class SQLiteGraphStore:
+    """
+    One SQLite database per graph.
+    Writes join an open transaction that is committed by flush() or
+    automatically every AUTOCOMMIT_EVERY writes.
+    """
+
+    AUTOCOMMIT_EVERY = 1000
+    CACHE_SIZE = 10000
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._pending = 0
+
+        self.entities = StoredEntities(self)
+        self.relationships = StoredRelationships(self)
+        self.index = StoredGraphIndex(self)
+
+    # --- transactions -----------------------------------------------------
+
+    def write(self, sql: str, params: Tuple = ()) -> None:
+        with self.lock:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            self.conn.execute(sql, params)
+            self._pending += 1
+            if self._pending >= self.AUTOCOMMIT_EVERY:
+                self.flush()
+
+    def flush(self) -> None:
+        """Commit pending writes"""
+        with self.lock:
+            if self.conn.in_transaction:
+                self.conn.execute("COMMIT")
+            self._pending = 0
+
+    def close(self) -> None:
+        with self.lock:
+            self.flush()
+            self.conn.close()
+
+    def query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def iterate(self, sql: str, params: Tuple = (), batch: int = 1000) -> Iterator[Tuple]:
+        """Stream rows in batches without holding the whole result in memory"""
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield from rows
+
+    # --- metadata ---------------------------------------------------------
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def set_meta(self, key: str, value: Any) -> None:
+        self.write("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    # --- adjacency --------------------------------------------------------
+
+    def invalidate_adjacency(self, *entity_ids: str) -> None:
+        for entity_id in entity_ids:
+            self.index.successors.cache.discard(entity_id)
+            self.index.predecessors.cache.discard(entity_id)
+
+
+class _StoredTable:
+    """Mapping view over one table; rows are materialized on access"""
+
+    TABLE = ""
+    COLUMNS = ""
+
+    def __init__(self, store: SQLiteGraphStore):
+        self.store = store
+        self.cache = _LRUCache(store.CACHE_SIZE)
+
+    def _from_row(self, row: Tuple):
+        raise NotImplementedError
+
+    def _to_row(self, value) -> Tuple:
+        raise NotImplementedError
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default=None):
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        rows = self.store.query(f"SELECT {self.COLUMNS} FROM {self.TABLE} WHERE id = ?", (key,))
+        if not rows:
+            return default
+        value = self._from_row(rows[0])
+        self.cache.put(key, value)
+        return value
+
+    def __setitem__(self, key: str, value) -> None:
+        placeholders = ", ".join("?" * len(self.COLUMNS.split(",")))
+        self.store.write(
+            f"INSERT OR REPLACE INTO {self.TABLE} ({self.COLUMNS}) VALUES ({placeholders})",
+            self._to_row(value)
+        )
+        self.cache.put(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.store.write(f"DELETE FROM {self.TABLE} WHERE id = ?", (key,))
+        self.cache.discard(key)
+
+    def __contains__(self, key) -> bool:
+        if self.cache.get(key) is not None:
+            return True
+        return bool(self.store.query(f"SELECT 1 FROM {self.TABLE} WHERE id = ?", (key,)))
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self.store.iterate(f"SELECT id FROM {self.TABLE} ORDER BY rowid"):
+            yield key
+
+    def __len__(self) -> int:
+        return self.store.query(f"SELECT COUNT(*) FROM {self.TABLE}")[0][0]
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def values(self) -> Iterator:
+        for row in self.store.iterate(f"SELECT {self.COLUMNS} FROM {self.TABLE} ORDER BY rowid"):
+            yield self._from_row(row)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for value in self.values():
+            yield value.id, value
+
+
+class StoredEntities(_StoredTable):
+    TABLE = "entities"
+    COLUMNS = "id, name, entity_type, importance, created_at, updated_at, properties"
+
+    def _from_row(self, row: Tuple) -> Entity:
+        return Entity(
+            id=row[0], name=row[1], entity_type=row[2], importance=row[3],
+            created_at=row[4], updated_at=row[5], properties=json.loads(row[6])
+        )
+
+    def _to_row(self, entity: Entity) -> Tuple:
+        return (entity.id, entity.name, entity.entity_type, entity.importance,
+                entity.created_at, entity.updated_at, json.dumps(entity.properties, default=str))
+
+
+class StoredRelationships(_StoredTable):
+    TABLE = "relationships"
+    COLUMNS = "id, source_id, target_id, relation_type, weight, confidence, created_at, bidirectional, properties"
+
+    def _from_row(self, row: Tuple) -> Relationship:
+        return Relationship(
+            source_id=row[1], target_id=row[2], relation_type=row[3], weight=row[4],
+            confidence=row[5], created_at=row[6], bidirectional=bool(row[7]),
+            properties=json.loads(row[8])
+        )
+
+    def _to_row(self, rel: Relationship) -> Tuple:
+        return (rel.id, rel.source_id, rel.target_id, rel.relation_type, rel.weight,
+                rel.confidence, rel.created_at, int(rel.bidirectional),
+                json.dumps(rel.properties, default=str))
+
+    def __setitem__(self, key: str, rel: Relationship) -> None:
+        super().__setitem__(key, rel)
+        self.store.invalidate_adjacency(rel.source_id, rel.target_id)
+
+    def __delitem__(self, key: str) -> None:
+        rel = self.get(key)
+        super().__delitem__(key)
+        if rel is not None:
+            self.store.invalidate_adjacency(rel.source_id, rel.target_id)
+
+
+class _IdBucket:
+    """Lazy set of ids selected by one indexed query"""
+
+    def __init__(self, store: SQLiteGraphStore, select: str, count: str,
+                 contains: str, params: Tuple):
+        self.store = store
+        self.select = select
+        self.count = count
+        self.contains = contains
+        self.params = params
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self.store.iterate(self.select, self.params):
+            yield key
+
+    def __len__(self) -> int:
+        return self.store.query(self.count, self.params)[0][0]
+
+    def __contains__(self, key) -> bool:
+        return bool(self.store.query(self.contains, self.params + (key,)))
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+class _BucketView:
+    """Read-only mapping key -> _IdBucket, built from SQL templates over a WHERE clause"""
+
+    def __init__(self, store: SQLiteGraphStore, table: str, where: str,
+                 n_params: int = 1, prefix: Tuple = ()):
+        self.store = store
+        self.table = table
+        self.where = where
+        self.n_params = n_params
+        self.prefix = prefix
+
+    def get(self, key, default=None) -> _IdBucket:
+        params = self.prefix + (key,) * self.n_params
+        return _IdBucket(
+            self.store,
+            f"SELECT id FROM {self.table} WHERE {self.where} ORDER BY rowid",
+            f"SELECT COUNT(*) FROM {self.table} WHERE {self.where}",
+            f"SELECT 1 FROM {self.table} WHERE ({self.where}) AND id = ?",
+            params
+        )
+
+    __getitem__ = get
+
+
+class _NameView:
+    """name -> entity ids in insertion order"""
+
+    def __init__(self, store: SQLiteGraphStore):
+        self.store = store
+
+    def get(self, name: str, default=None) -> Optional[List[str]]:
+        rows = self.store.query("SELECT id FROM entities WHERE name = ? ORDER BY rowid", (name,))
+        return [row[0] for row in rows] or default
+
+    def __getitem__(self, name: str) -> List[str]:
+        return self.get(name, [])
+
+
+class _PropertyView:
+    """property key -> value -> entity ids, via json_extract"""
+
+    def __init__(self, store: SQLiteGraphStore):
+        self.store = store
+
+    def __getitem__(self, key: str) -> _BucketView:
+        path = '$."' + key.replace('"', '') + '"'
+        return _BucketView(self.store, "entities", "json_extract(properties, ?) = ?", prefix=(path,))
+
+    get = __getitem__
+
+
+class _AdjacencyView:
+    """entity id -> {neighbor id: relationship count}, cached per entity"""
+
+    def __init__(self, store: SQLiteGraphStore, forward: bool):
+        self.store = store
+        self.cache = _LRUCache(store.CACHE_SIZE)
+        near, far = ("source_id", "target_id") if forward else ("target_id", "source_id")
+        self.sql = (
+            f"SELECT {far}, COUNT(*) FROM relationships WHERE {near} = ? GROUP BY {far} "
+            f"UNION ALL "
+            f"SELECT {near}, COUNT(*) FROM relationships WHERE {far} = ? AND bidirectional = 1 GROUP BY {near}"
+        )
+
+    def get(self, entity_id: str, default=None) -> Dict[str, int]:
+        neighbors = self.cache.get(entity_id)
+        if neighbors is None:
+            neighbors = {}
+            for neighbor, count in self.store.query(self.sql, (entity_id, entity_id)):
+                neighbors[neighbor] = neighbors.get(neighbor, 0) + count
+            self.cache.put(entity_id, neighbors)
+        if not neighbors and default is not None:
+            return default
+        return neighbors
+
+    def __getitem__(self, entity_id: str) -> Dict[str, int]:
+        return self.get(entity_id)
+
+
+class StoredGraphIndex(GraphIndex):
+    """
+    GraphIndex whose lookups are answered by the SQLite indexes.
+    Indexing calls are no-ops: the row writes already maintain them.
+    """
+
+    def __init__(self, store: SQLiteGraphStore):
+        self.store = store
+        self.by_type = _BucketView(store, "entities", "entity_type = ?")
+        self.by_property = _PropertyView(store)
+        self.by_name = _NameView(store)
+        self.outgoing = _BucketView(
+            store, "relationships", "source_id = ? OR (target_id = ? AND bidirectional = 1)", 2)
+        self.incoming = _BucketView(
+            store, "relationships", "target_id = ? OR (source_id = ? AND bidirectional = 1)", 2)
+        self.by_relation = _BucketView(store, "relationships", "relation_type = ?")
+        self.successors = _AdjacencyView(store, forward=True)
+        self.predecessors = _AdjacencyView(store, forward=False)
+
+    def index_entity(self, entity: Entity):
+        pass
+
+    def index_relationship(self, rel: Relationship):
+        pass
+
+    def remove_entity(self, entity: Entity):
+        pass
+
+    def remove_relationship(self, rel: Relationship):
+        pass
@@ -2,20 +2,49 @@
 
 import base64
 import io
+import re
 import warnings
-import asyncio
+from typing import Iterator
+
+import numpy as np
 import soundfile as sf
 from python.helpers import runtime
+from python.helpers.model_worker import ModelWorker
 from python.helpers.print_style import PrintStyle
 from python.helpers.notification import NotificationManager, NotificationType, NotificationPriority
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
-_pipeline = None
 _voice = "am_puck,am_onyx"
 _speed = 1.1
-is_updating_model = False
+SAMPLE_RATE = 24000
+
+# sentence boundaries for streaming, the frontend already sends paragraph sized chunks
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _load_pipeline(_key=None):
+    NotificationManager.send_notification(
+        NotificationType.INFO,
+        NotificationPriority.NORMAL,
+        "Loading Kokoro TTS model...",
+        display_time=99,
+        group="kokoro-preload")
+    PrintStyle.standard("Loading Kokoro TTS model...")
+    from kokoro import KPipeline
+    pipeline = KPipeline(lang_code="a", repo_id="hexgrad/Kokoro-82M")
+    NotificationManager.send_notification(
+        NotificationType.INFO,
+        NotificationPriority.NORMAL,
+        "Kokoro TTS model loaded.",
+        display_time=2,
+        group="kokoro-preload")
+    return pipeline
+
+
+# the pipeline is loaded once and all synthesis runs on this thread
+_worker = ModelWorker("kokoro-tts", _load_pipeline)
 
 
 async def preload():
@@ -31,31 +60,7 @@ async def preload():
 
 
 async def _preload():
-    global _pipeline, is_updating_model
-
-    while is_updating_model:
-        await asyncio.sleep(0.1)
-
-    try:
-        is_updating_model = True
-        if not _pipeline:
-            NotificationManager.send_notification(
-                NotificationType.INFO,
-                NotificationPriority.NORMAL,
-                "Loading Kokoro TTS model...",
-                display_time=99,
-                group="kokoro-preload")
-            PrintStyle.standard("Loading Kokoro TTS model...")
-            from kokoro import KPipeline
-            _pipeline = KPipeline(lang_code="a", repo_id="hexgrad/Kokoro-82M")
-            NotificationManager.send_notification(
-                NotificationType.INFO,
-                NotificationPriority.NORMAL,
-                "Kokoro TTS model loaded.",
-                display_time=2,
-                group="kokoro-preload")
-    finally:
-        is_updating_model = False
+    await _worker.preload()
 
 
 async def is_downloading():
@@ -70,7 +75,7 @@ async def is_downloading():
 
 
 def _is_downloading():
-    return is_updating_model
+    return _worker.loading
 
 async def is_downloaded():
     try:
@@ -83,7 +88,7 @@ async def is_downloaded():
         # return _is_downloaded()
 
 def _is_downloaded():
-    return _pipeline is not None
+    return _worker.loaded
 
 
 async def synthesize_sentences(sentences: list[str]):
@@ -99,29 +104,50 @@ async def synthesize_sentences(sentences: list[str]):
 
 
 async def _synthesize_sentences(sentences: list[str]):
-    await _preload()
+    try:
+        parts = [audio async for audio in _worker.astream(lambda pipeline: _generate(pipeline, sentences))]
+        return encode_wav(_concatenate(parts))
 
-    combined_audio = []
+    except Exception as e:
+        PrintStyle.error(f"Error in Kokoro TTS synthesis: {e}")
+        raise
 
+
+def stream_sentences(text: str) -> Iterator[str]:
+    """Base64 WAV audio of each sentence in text, yielded as soon as it is synthesized"""
     try:
-        for sentence in sentences:
-            if sentence.strip():
-                segments = _pipeline(sentence.strip(), voice=_voice, speed=_speed) # type: ignore
-                segment_list = list(segments)
+        for audio in _worker.stream(lambda pipeline: _generate(pipeline, split_sentences(text))):
+            yield encode_wav(audio)
+    except Exception as e:
+        PrintStyle.error(f"Error in Kokoro TTS synthesis: {e}")
+        raise
 
-                for segment in segment_list:
-                    audio_tensor = segment.audio
-                    audio_numpy = audio_tensor.detach().cpu().numpy() # type: ignore
-                    combined_audio.extend(audio_numpy)
 
-        # Convert combined audio to bytes
-        buffer = io.BytesIO()
-        sf.write(buffer, combined_audio, 24000, format="WAV")
-        audio_bytes = buffer.getvalue()
+def split_sentences(text: str) -> list[str]:
+    return [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence.strip()]
 
-        # Return base64 encoded audio
-        return base64.b64encode(audio_bytes).decode("utf-8")
 
-    except Exception as e:
-        PrintStyle.error(f"Error in Kokoro TTS synthesis: {e}")
-        raise    
\ No newline at end of file
+def encode_wav(audio: np.ndarray) -> str:
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, SAMPLE_RATE, format="WAV")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def _generate(pipeline, sentences: list[str]) -> Iterator[np.ndarray]:
+    # runs on the worker thread, one array per sentence
+    for sentence in sentences:
+        if sentence.strip():
+            segments = pipeline(sentence.strip(), voice=_voice, speed=_speed)
+            yield _concatenate([_to_numpy(segment.audio) for segment in segments])
+
+
+def _to_numpy(audio) -> np.ndarray:
+    if hasattr(audio, "detach"):  # torch tensor
+        audio = audio.detach().cpu().numpy()
+    return np.asarray(audio, dtype=np.float32).reshape(-1)
+
+
+def _concatenate(parts: list[np.ndarray]) -> np.ndarray:
+    if not parts:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(parts)
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, List, Sequence
 from langchain.storage import InMemoryByteStore, LocalFileStore
@@ -246,6 +248,8 @@ class Memory:
     ):
         self.db = db
         self.memory_subdir = memory_subdir
+        self._save_deferred = 0
+        self._save_pending = False
 
     async def preload_knowledge(
         self, log_item: LogItem | None, kn_dirs: list[str], memory_subdir: str
@@ -351,6 +355,45 @@ class Memory:
             filter=comparator,
         )
 
+    async def search_similarity_threshold_batch(
+        self, queries: list[str], limits: list[int], threshold: float, filter: str = ""
+    ) -> list[list[Document]]:
+        """
+        search_similarity_threshold for many queries at once: the queries are
+        embedded concurrently and looked up in one index search.
+        """
+        if not queries or not self.db.index.ntotal:
+            return [[] for _ in queries]
+        comparator = Memory._get_comparator(filter) if filter else None
+
+        vectors = np.array(
+            await asyncio.gather(
+                *[self.db.embedding_function.aembed_query(query) for query in queries]  # type: ignore
+            ),
+            dtype=np.float32,
+        )
+        if self.db._normalize_L2:
+            faiss.normalize_L2(vectors)
+        # same candidates per query as a single search, filtered searches fetch 20 (fetch_k)
+        fetches = [limit if comparator is None else 20 for limit in limits]
+        scores, indices = self.db.index.search(vectors, min(max(fetches), self.db.index.ntotal))
+        relevance = self.db._select_relevance_score_fn()
+
+        results = []
+        for row, (limit, fetch) in enumerate(zip(limits, fetches)):
+            docs = []
+            for score, index in zip(scores[row][:fetch], indices[row][:fetch]):
+                if index == -1:
+                    continue
+                doc = self.db.docstore.search(self.db.index_to_docstore_id[index])
+                if not isinstance(doc, Document):
+                    continue
+                if comparator and not comparator(doc.metadata):
+                    continue
+                docs.append((doc, relevance(float(score))))
+            results.append([doc for doc, score in docs[:limit] if score >= threshold])
+        return results
+
     async def delete_documents_by_query(
         self, query: str, threshold: float, filter: str = ""
     ):
@@ -425,7 +468,22 @@ class Memory:
         self._save_db()  # persist
         return ins
 
+    @contextmanager
+    def deferred_save(self):
+        """Write all changes made inside the block to disk once, at the end"""
+        self._save_deferred += 1
+        try:
+            yield self
+        finally:
+            self._save_deferred -= 1
+            if not self._save_deferred and self._save_pending:
+                self._save_pending = False
+                self._save_db()
+
     def _save_db(self):
+        if self._save_deferred:
+            self._save_pending = True
+            return
         Memory._save_db_file(self.db, self.memory_subdir)
 
     def _generate_doc_id(self):
@@ -34,6 +34,9 @@ class ConsolidationConfig:
     max_llm_context_memories: int = 5
     keyword_extraction_sys_prompt: str = "memory.keyword_extraction.sys.md"
     keyword_extraction_msg_prompt: str = "memory.keyword_extraction.msg.md"
+    keyword_extraction_batch_sys_prompt: str = "memory.keyword_extraction_batch.sys.md"
+    keyword_extraction_batch_msg_prompt: str = "memory.keyword_extraction_batch.msg.md"
+    consolidation_new_memories_prompt: str = "memory.consolidation.new_memories.md"
     processing_timeout_seconds: int = 60
     # Add safety threshold for REPLACE actions
     replace_similarity_threshold: float = 0.9  # Higher threshold for replacement safety
@@ -363,7 +366,12 @@ class MemoryConsolidator:
                 )
                 all_similar.extend(keyword_similar)
 
-        # Step 4: Deduplicate by document ID and store similarity info
+        return self._rank_similar_memories(all_similar)
+
+    def _rank_similar_memories(self, all_similar: List[Document]) -> List[Document]:
+        """Deduplicate search results, score them by rank and keep the best for the LLM."""
+
+        # Step 1: Deduplicate by document ID and store similarity info
         seen_ids = set()
         unique_similar = []
         for doc in all_similar:
@@ -372,7 +380,7 @@ class MemoryConsolidator:
                 seen_ids.add(doc_id)
                 unique_similar.append(doc)
 
-        # Step 5: Calculate similarity scores for replacement validation
+        # Step 2: Calculate similarity scores for replacement validation
         # Since FAISS doesn't directly expose similarity scores, use ranking-based estimation
         # CRITICAL: All documents must have similarity >= search_threshold since FAISS returned them
         # FIXED: Use conservative scoring that keeps all scores in safe consolidation range
@@ -400,14 +408,14 @@ class MemoryConsolidator:
 
                 similarity_scores[doc_id] = ranking_similarity
 
-        # Step 6: Add similarity score to document metadata for LLM analysis
+        # Step 3: Add similarity score to document metadata for LLM analysis
         for doc in unique_similar:
             doc_id = doc.metadata.get('id')
             estimated_similarity = similarity_scores.get(doc_id, 0.7)
             # Store for later validation
             doc.metadata['_consolidation_similarity'] = estimated_similarity
 
-        # Step 7: Limit to max context for LLM
+        # Step 4: Limit to max context for LLM
         limited_similar = unique_similar[:self.config.max_llm_context_memories]
 
         return limited_similar
@@ -448,14 +456,17 @@ class MemoryConsolidator:
 
         except Exception as e:
             PrintStyle().warning(f"Keyword extraction failed: {str(e)}")
-            # Fallback: use intelligent truncation for search
-            # Take first 200 chars if short, or first sentence if longer, but cap at 200 chars
-            if len(new_memory) <= 200:
-                fallback_content = new_memory
-            else:
-                first_sentence = new_memory.split('.')[0]
-                fallback_content = first_sentence[:200] if len(first_sentence) <= 200 else new_memory[:200]
-            return [fallback_content.strip()]
+            return self._fallback_search_keywords(new_memory)
+
+    def _fallback_search_keywords(self, new_memory: str) -> List[str]:
+        # Fallback: use intelligent truncation for search
+        # Take first 200 chars if short, or first sentence if longer, but cap at 200 chars
+        if len(new_memory) <= 200:
+            fallback_content = new_memory
+        else:
+            first_sentence = new_memory.split('.')[0]
+            fallback_content = first_sentence[:200] if len(first_sentence) <= 200 else new_memory[:200]
+        return [fallback_content.strip()]
 
     async def _analyze_memory_consolidation(
         self,
@@ -775,6 +786,290 @@ class MemoryConsolidator:
 
         return updated_ids
 
+    async def process_new_memories(
+        self,
+        new_memories: List[str],
+        area: str,
+        metadata: Dict[str, Any],
+        log_item: Optional[LogItem] = None
+    ) -> dict:
+        """
+        Process several new memories through the consolidation pipeline at once.
+
+        Keywords for all memories are extracted in one utility call, all search
+        queries are embedded and searched together, new memories sharing similar
+        memories are decided by one LLM call per group, and all changes are saved
+        to disk once.
+
+        The search and each group's decision get processing_timeout_seconds
+        each. New memories whose consolidation times out or fails are inserted
+        as they are, so none are lost.
+
+        Returns:
+            dict: {"success": bool, "memory_ids": [str, ...], "processed": int, "consolidated": int}
+        """
+        new_memories = [memory for memory in new_memories if memory.strip()]
+        if not new_memories:
+            return {"success": True, "memory_ids": [], "processed": 0, "consolidated": 0}
+
+        try:
+            return await self._process_memories_with_consolidation(new_memories, area, metadata, log_item)
+
+        except Exception as e:
+            PrintStyle().error(f"Memory consolidation error for area {area}: {str(e)}")
+
+        return {"success": False, "memory_ids": [], "processed": len(new_memories), "consolidated": 0}
+
+    async def _process_memories_with_consolidation(
+        self,
+        new_memories: List[str],
+        area: str,
+        metadata: Dict[str, Any],
+        log_item: Optional[LogItem] = None
+    ) -> dict:
+        """Execute the batch consolidation pipeline."""
+
+        db = await Memory.get(self.agent)
+
+        # Step 1: Discover similar memories of all new memories
+        if log_item:
+            log_item.update(progress=f"Searching memories similar to {len(new_memories)} new memories...")
+        try:
+            similar_by_memory = await asyncio.wait_for(
+                self._find_similar_memories_batch(db, new_memories, area),
+                timeout=self.config.processing_timeout_seconds
+            )
+        except Exception as e:
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else str(e)
+            PrintStyle().error(f"Memory consolidation search failed for area {area}: {reason}, inserting memories as they are")
+            similar_by_memory = [[] for _ in new_memories]
+
+        # Step 2: Group new memories sharing similar memories, each group gets one decision
+        analyses: List[tuple[List[int], MemoryAnalysisContext]] = []
+        insert_directly: List[int] = []
+        for members in self._group_by_similar_memories(similar_by_memory):
+            similar = self._merge_similar_memories([similar_by_memory[i] for i in members])
+            if not similar:
+                insert_directly.extend(members)
+                continue
+            if len(members) == 1:
+                new_memory = new_memories[members[0]]
+            else:
+                new_memory = self.agent.read_prompt(
+                    self.config.consolidation_new_memories_prompt,
+                    count=len(members),
+                    new_memories="\n\n".join(
+                        f"{number}. {new_memories[i]}" for number, i in enumerate(members, start=1)
+                    ),
+                )
+            analyses.append((members, MemoryAnalysisContext(
+                new_memory=new_memory,
+                similar_memories=similar,
+                area=area,
+                timestamp=self._get_timestamp(),
+                existing_metadata=dict(metadata)
+            )))
+
+        # Step 3: Analyze all groups concurrently
+        if log_item:
+            log_item.update(
+                progress=f"Analyzing {len(analyses)} groups of similar memories...",
+                temp=True,
+                similar_memories_groups=len(analyses)
+            )
+        results = await asyncio.gather(*[
+            self._analyze_with_timeout(context, log_item) for _, context in analyses
+        ])
+
+        # Step 4: Apply all decisions, the database is written to disk once at the end
+        memory_ids: List[str] = []
+        succeeded: set[int] = set()
+        with db.deferred_save():
+            for (members, context), result in zip(analyses, results):
+                kept_as_is = result.action == ConsolidationAction.SKIP
+                if len(members) > 1 and not (
+                    result.action in [ConsolidationAction.MERGE, ConsolidationAction.REPLACE]
+                    and result.new_memory_content
+                    and result.new_memory_content != context.new_memory
+                ):
+                    # only a merge or replace with new content stands for all of the
+                    # group's memories, otherwise each is kept as it is; an update
+                    # still applies to the similar memories
+                    kept_as_is = True
+                    result.new_memory_content = ""
+                if kept_as_is:
+                    insert_directly.extend(members)
+                    if result.action != ConsolidationAction.UPDATE:
+                        continue
+                ids = await self._apply_consolidation_result(result, area, context.existing_metadata, log_item)
+                if ids:
+                    succeeded.update(members)
+                elif not kept_as_is:
+                    # nothing applied, keep the new memories rather than lose them
+                    insert_directly.extend(members)
+                memory_ids.extend(ids)
+
+            if insert_directly:
+                insert_directly.sort()
+                docs = [
+                    Document(new_memories[i], metadata={**metadata, 'timestamp': self._get_timestamp()})
+                    for i in insert_directly
+                ]
+                memory_ids.extend(await db.insert_documents(docs))
+                succeeded.update(insert_directly)
+
+        if log_item:
+            log_item.update(
+                result=f"{len(new_memories)} memories processed in {len(analyses)} consolidation groups",
+                memory_ids=memory_ids
+            )
+
+        return {
+            "success": bool(memory_ids),
+            "memory_ids": memory_ids,
+            "processed": len(new_memories),
+            "consolidated": len(succeeded),
+        }
+
+    async def _analyze_with_timeout(
+        self,
+        context: MemoryAnalysisContext,
+        log_item: Optional[LogItem] = None
+    ) -> ConsolidationResult:
+        """_analyze_memory_consolidation bounded by processing_timeout_seconds, skipped on timeout."""
+        try:
+            return await asyncio.wait_for(
+                self._analyze_memory_consolidation(context, log_item),
+                timeout=self.config.processing_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            PrintStyle().error(f"Memory consolidation timeout for area {context.area}")
+            return ConsolidationResult(action=ConsolidationAction.SKIP, reasoning="Analysis timed out")
+
+    async def _find_similar_memories_batch(
+        self,
+        db: Memory,
+        new_memories: List[str],
+        area: str
+    ) -> List[List[tuple[Document, float]]]:
+        """
+        _find_similar_memories for several memories, with one keyword extraction
+        call and one search for all queries. Returns (document, estimated similarity)
+        pairs for each new memory.
+        """
+        keywords = await self._extract_search_keywords_batch(new_memories)
+
+        # semantic query of each memory followed by its keyword queries
+        queries: List[str] = []
+        limits: List[int] = []
+        owners: List[int] = []
+        for i, (new_memory, search_queries) in enumerate(zip(new_memories, keywords)):
+            queries.append(new_memory)
+            limits.append(self.config.max_similar_memories)
+            owners.append(i)
+            queries_count = max(1, len(search_queries))
+            for query in search_queries:
+                if query.strip():
+                    queries.append(query.strip())
+                    limits.append(max(3, self.config.max_similar_memories // queries_count))
+                    owners.append(i)
+
+        results = await db.search_similarity_threshold_batch(
+            queries,
+            limits,
+            threshold=self.config.similarity_threshold,
+            filter=f"area == '{area}'"
+        )
+
+        found: List[List[Document]] = [[] for _ in new_memories]
+        for owner, docs in zip(owners, results):
+            found[owner].extend(docs)
+
+        # ranking writes the score into shared document metadata, read it right away
+        return [
+            [(doc, doc.metadata['_consolidation_similarity']) for doc in self._rank_similar_memories(docs)]
+            for docs in found
+        ]
+
+    def _group_by_similar_memories(self, similar_by_memory: List[List[tuple[Document, float]]]) -> List[List[int]]:
+        """Indexes of new memories grouped so that groups share no similar memory."""
+        parent = list(range(len(similar_by_memory)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        first_owner: Dict[str, int] = {}
+        for i, similar in enumerate(similar_by_memory):
+            for doc, _ in similar:
+                doc_id = doc.metadata.get('id')
+                if doc_id in first_owner:
+                    parent[find(i)] = find(first_owner[doc_id])
+                else:
+                    first_owner[doc_id] = i
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(similar_by_memory)):
+            groups.setdefault(find(i), []).append(i)
+        return list(groups.values())
+
+    def _merge_similar_memories(self, similar_lists: List[List[tuple[Document, float]]]) -> List[Document]:
+        """Similar memories of a group, best first, each with its highest similarity in the group."""
+        best: Dict[str, tuple[Document, float]] = {}
+        for similar in similar_lists:
+            for doc, similarity in similar:
+                doc_id = doc.metadata['id']
+                if doc_id not in best or similarity > best[doc_id][1]:
+                    best[doc_id] = (doc, similarity)
+
+        merged = sorted(best.values(), key=lambda item: item[1], reverse=True)
+        for doc, similarity in merged:
+            doc.metadata['_consolidation_similarity'] = similarity
+        return [doc for doc, _ in merged]
+
+    async def _extract_search_keywords_batch(self, new_memories: List[str]) -> List[List[str]]:
+        """Search keywords for each new memory, extracted by a single utility LLM call."""
+
+        if len(new_memories) == 1:
+            return [await self._extract_search_keywords(new_memories[0])]
+
+        try:
+            system_prompt = self.agent.read_prompt(
+                self.config.keyword_extraction_batch_sys_prompt,
+            )
+
+            message_prompt = self.agent.read_prompt(
+                self.config.keyword_extraction_batch_msg_prompt,
+                count=len(new_memories),
+                memories="\n\n".join(
+                    f"**Memory {number}:**\n{memory}" for number, memory in enumerate(new_memories, start=1)
+                )
+            )
+
+            keywords_response = await self.agent.call_utility_model(
+                system=system_prompt,
+                message=message_prompt,
+                background=True
+            )
+
+            # Parse the response - expect JSON array with one array of strings per memory
+            keywords_json = DirtyJson.parse_string(keywords_response.strip())
+            if isinstance(keywords_json, dict):
+                keywords_json = [keywords_json.get(str(number), []) for number in range(1, len(new_memories) + 1)]
+            if not isinstance(keywords_json, list) or len(keywords_json) != len(new_memories):
+                raise ValueError(f"expected {len(new_memories)} keyword lists")
+
+            return [
+                [str(k) for k in keywords if k] if isinstance(keywords, list) else [str(keywords)]
+                for keywords in keywords_json
+            ]
+
+        except Exception as e:
+            PrintStyle().warning(f"Batch keyword extraction failed: {str(e)}")
+            return [self._fallback_search_keywords(memory) for memory in new_memories]
+
     def _get_timestamp(self) -> str:
         """Get current timestamp in standard format."""
         return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
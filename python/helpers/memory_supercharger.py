@@ -12,11 +12,12 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import heapq
 import time
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
@@ -69,26 +70,99 @@ class EnhancedMemory:
                 quantum_weight * 0.2)
 
 
+class _MemoryView:
+    """
+    Read-mostly mapping of memory id -> EnhancedMemory.
+    Entries are snapshots materialized from the supercharger's arrays;
+    mutate memories through the supercharger API.
+    """
+
+    def __init__(self, supercharger: 'MemorySupercharger'):
+        self._sc = supercharger
+
+    def __getitem__(self, mem_id: str) -> EnhancedMemory:
+        return self._sc._materialize(self._sc._slot_of[mem_id])
+
+    def get(self, mem_id: str, default=None) -> Optional[EnhancedMemory]:
+        slot = self._sc._slot_of.get(mem_id)
+        return default if slot is None else self._sc._materialize(slot)
+
+    def __delitem__(self, mem_id: str) -> None:
+        self._sc._remove(self._sc._slot_of[mem_id])
+
+    def __contains__(self, mem_id) -> bool:
+        return mem_id in self._sc._slot_of
+
+    def __iter__(self):
+        return iter(list(self._sc._slot_of))
+
+    def __len__(self) -> int:
+        return len(self._sc._slot_of)
+
+    def keys(self):
+        return list(self._sc._slot_of)
+
+    def values(self) -> List[EnhancedMemory]:
+        return [self._sc._materialize(slot) for slot in self._sc._slot_of.values()]
+
+    def items(self) -> List[Tuple[str, EnhancedMemory]]:
+        return [(mem_id, self._sc._materialize(slot)) for mem_id, slot in self._sc._slot_of.items()]
+
+
 class MemorySupercharger:
     """
     Enhanced memory system with Heisenberg integration.
+
+    Memories live in slots of a contiguous embedding matrix with parallel
+    numpy arrays for importance, amplitude, access time and counts, so
+    similarity, scoring and decay are single vectorized operations.
     """
 
+    INITIAL_CAPACITY = 1024
+    NEIGHBOR_SIMILARITY = 0.5
+    MAX_NEIGHBORS = 10
+    CONSOLIDATION_SIMILARITY = 0.7
+    MAX_PAIRS_PER_MEMORY = 10
+    INSERT_BLOCK = 128
+
     def __init__(self,
                  max_memories: int = 10000,
                  consolidation_threshold: float = 0.85,
-                 decay_rate: float = 0.001):
+                 decay_rate: float = 0.001,
+                 max_pending_consolidations: int = 1000):
         self.max_memories = max_memories
         self.consolidation_threshold = consolidation_threshold
         self.decay_rate = decay_rate
-
-        # Memory storage
-        self.memories: Dict[str, EnhancedMemory] = {}
-        self.tag_index: Dict[str, List[str]] = defaultdict(list)
-        self.temporal_index: List[str] = []  # Ordered by creation time
-
-        # Consolidation tracking
-        self.consolidation_pairs: List[Tuple[str, str, float]] = []
+        self.max_pending_consolidations = max_pending_consolidations
+
+        # Memory storage: numeric state in parallel arrays indexed by slot
+        self.dim: Optional[int] = None
+        self._embeddings = np.empty((0, 0), dtype=np.float32)
+        self._importance = np.empty(0, dtype=np.int8)
+        self._amplitude = np.empty(0, dtype=np.float32)
+        self._creation_time = np.empty(0, dtype=np.float64)
+        self._last_access = np.empty(0, dtype=np.float64)
+        self._access_count = np.empty(0, dtype=np.int64)
+        self._sequence = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+
+        # Per-slot Python data
+        self._ids: List[Optional[str]] = []
+        self._contents: List[Optional[str]] = []
+        self._tags: List[List[str]] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._neighbors: List[List[str]] = []
+
+        self._slot_of: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._high_water = 0
+        self._next_sequence = 0
+
+        self.memories = _MemoryView(self)
+        self.tag_index: Dict[str, Set[str]] = defaultdict(set)
+
+        # Consolidation tracking: min-heap of (similarity, id1, id2), bounded
+        self._pair_heap: List[Tuple[float, str, str]] = []
         self.consolidation_history: List[Dict] = []
 
         # Statistics
@@ -99,6 +173,11 @@ class MemorySupercharger:
             'total_decays': 0
         }
 
+    @property
+    def consolidation_pairs(self) -> List[Tuple[str, str, float]]:
+        """Pending consolidation candidates, most similar first"""
+        return [(id1, id2, sim) for sim, id1, id2 in sorted(self._pair_heap, reverse=True)]
+
     def insert(self,
                content: str,
                embedding: Optional[np.ndarray] = None,
@@ -106,48 +185,47 @@ class MemorySupercharger:
                tags: Optional[List[str]] = None,
                metadata: Optional[Dict] = None) -> str:
         """Insert a new memory"""
-        # Generate ID
-        mem_id = hashlib.md5(f"{content}:{time.time()}".encode()).hexdigest()[:16]
-
-        # Generate embedding if not provided
-        if embedding is None:
-            # Simple hash-based embedding
-            content_hash = int(hashlib.md5(content.encode()).hexdigest()[:8], 16)
-            np.random.seed(content_hash % 10000)
-            embedding = np.random.randn(128)
-            embedding = embedding / np.linalg.norm(embedding)
-
-        # Create memory entry
-        memory = EnhancedMemory(
-            id=mem_id,
-            content=content,
-            embedding=embedding,
+        return self.insert_many(
+            [content],
+            embeddings=None if embedding is None else [embedding],
             importance=importance,
-            tags=tags or [],
-            metadata=metadata or {}
-        )
-
-        # Store
-        self.memories[mem_id] = memory
-        self.temporal_index.append(mem_id)
-
-        # Update tag index
-        for tag in memory.tags:
-            self.tag_index[tag].append(mem_id)
-
-        self.stats['total_insertions'] += 1
-
-        # Find topological neighbors
-        self._update_topological_neighbors(mem_id)
-
-        # Check for consolidation opportunities
-        self._check_consolidation(mem_id)
-
-        # Evict if over capacity
-        if len(self.memories) > self.max_memories:
-            self._evict_least_relevant()
-
-        return mem_id
+            tags=[tags] if tags else None,
+            metadata=[metadata] if metadata else None
+        )[0]
+
+    def insert_many(self,
+                    contents: List[str],
+                    embeddings: Optional[Any] = None,
+                    importance: MemoryImportance = MemoryImportance.MEDIUM,
+                    tags: Optional[List[Optional[List[str]]]] = None,
+                    metadata: Optional[List[Optional[Dict]]] = None) -> List[str]:
+        """
+        Insert several memories at once.
+        Neighbor and consolidation checks run as one matrix product per
+        block, with each memory compared only to those inserted before it.
+        """
+        mem_ids: List[str] = []
+        for start in range(0, len(contents), self.INSERT_BLOCK):
+            stop = min(len(contents), start + self.INSERT_BLOCK)
+            slots = []
+            for i in range(start, stop):
+                embedding = embeddings[i] if embeddings is not None else None
+                slot = self._store(
+                    contents[i], embedding, importance,
+                    (tags[i] if tags else None) or [],
+                    (metadata[i] if metadata else None) or {}
+                )
+                slots.append(slot)
+                mem_ids.append(self._ids[slot])
+
+            # Find topological neighbors and consolidation candidates
+            self._link_new(np.array(slots, dtype=np.int64))
+
+            # Evict if over capacity
+            while len(self._slot_of) > self.max_memories:
+                self._evict_least_relevant()
+
+        return mem_ids
 
     def retrieve(self,
                  query: Optional[str] = None,
@@ -157,47 +235,49 @@ class MemorySupercharger:
                  limit: int = 10,
                  boost_recent: bool = True) -> List[EnhancedMemory]:
         """Retrieve memories with weighted scoring"""
-        candidates = []
-
         # Generate query embedding if needed
         if query and query_embedding is None:
-            query_hash = int(hashlib.md5(query.encode()).hexdigest()[:8], 16)
-            np.random.seed(query_hash % 10000)
-            query_embedding = np.random.randn(128)
-            query_embedding = query_embedding / np.linalg.norm(query_embedding)
-
-        for mem_id, memory in self.memories.items():
-            # Filter by importance
-            if memory.importance.value < min_importance.value:
-                continue
-
-            # Filter by tags
-            if tags and not any(t in memory.tags for t in tags):
-                continue
-
-            # Calculate similarity score
-            if query_embedding is not None:
-                similarity = np.dot(query_embedding, memory.embedding)
-            else:
-                similarity = 0.5  # Default if no query
+            query_embedding = self._hash_embedding(query)
 
-            # Combined score
-            score = similarity * 0.5 + memory.relevance_score * 0.5
+        n = len(self._alive)
+        mask = self._alive & (self._importance >= min_importance.value)
 
-            if boost_recent:
-                score *= (1 + memory.recency * 0.2)
+        # Filter by tags
+        if tags:
+            tagged = set()
+            for tag in tags:
+                tagged.update(self.tag_index.get(tag, ()))
+            tag_mask = np.zeros(n, dtype=bool)
+            tag_mask[[self._slot_of[mid] for mid in tagged if mid in self._slot_of]] = True
+            mask &= tag_mask
+
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0 or limit <= 0:
+            return []
+
+        # Calculate similarity score
+        if query_embedding is not None:
+            query_vec = np.asarray(query_embedding, dtype=np.float32).ravel()
+            similarity = self._embeddings[candidates] @ query_vec
+        else:
+            similarity = np.full(candidates.size, 0.5, dtype=np.float32)
 
-            candidates.append((memory, score))
+        now = time.time()
+        recency = self._recency(now)[candidates]
+        score = similarity * 0.5 + self._relevance(now)[candidates] * 0.5
+        if boost_recent:
+            score = score * (1 + recency * 0.2)
 
-        # Sort by score
-        candidates.sort(key=lambda x: x[1], reverse=True)
+        # Top results by score
+        k = min(limit, candidates.size)
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.argsort(-score[top], kind='stable')]
+        selected = candidates[top]
 
         # Update access stats
-        results = []
-        for memory, score in candidates[:limit]:
-            memory.last_access_time = time.time()
-            memory.access_count += 1
-            results.append(memory)
+        self._last_access[selected] = now
+        self._access_count[selected] += 1
+        results = [self._materialize(int(slot)) for slot in selected]
 
         self.stats['total_retrievals'] += len(results)
 
@@ -205,23 +285,21 @@ class MemorySupercharger:
 
     def decay(self) -> int:
         """Apply temporal decay to memories"""
-        decayed_count = 0
-
-        for memory in self.memories.values():
-            # Decay quantum amplitude
-            decay_factor = 1 - (self.decay_rate * memory.age / 3600)
-            decay_factor = max(0.1, decay_factor)  # Minimum amplitude
+        alive = self._alive
+        age = time.time() - self._creation_time[alive]
 
-            # Importance protects against decay
-            protection = memory.importance.value / 5.0
-            actual_decay = decay_factor + (1 - decay_factor) * protection
+        # Decay quantum amplitude, with a minimum factor
+        decay_factor = np.maximum(0.1, 1 - (self.decay_rate * age / 3600))
 
-            old_amplitude = memory.quantum_amplitude
-            memory.quantum_amplitude *= actual_decay
+        # Importance protects against decay
+        protection = self._importance[alive] / 5.0
+        actual_decay = decay_factor + (1 - decay_factor) * protection
 
-            if memory.quantum_amplitude < old_amplitude:
-                decayed_count += 1
+        old_amplitude = self._amplitude[alive]
+        new_amplitude = (old_amplitude * actual_decay).astype(np.float32)
+        self._amplitude[alive] = new_amplitude
 
+        decayed_count = int(np.count_nonzero(new_amplitude < old_amplitude))
         self.stats['total_decays'] += decayed_count
         return decayed_count
 
@@ -236,57 +314,58 @@ class MemorySupercharger:
         ]
 
         for id1, id2, similarity in pairs_to_consolidate:
-            if id1 not in self.memories or id2 not in self.memories:
+            if id1 not in self._slot_of or id2 not in self._slot_of:
                 continue
 
-            mem1 = self.memories[id1]
-            mem2 = self.memories[id2]
+            slot1, slot2 = self._slot_of[id1], self._slot_of[id2]
 
             # Merge into higher importance memory
-            if mem1.importance.value >= mem2.importance.value:
-                primary, secondary = mem1, mem2
+            if self._importance[slot1] >= self._importance[slot2]:
+                primary, secondary = slot1, slot2
             else:
-                primary, secondary = mem2, mem1
+                primary, secondary = slot2, slot1
 
             # Merge content
-            primary.content = f"{primary.content}\n[Consolidated]: {secondary.content}"
+            self._contents[primary] = f"{self._contents[primary]}\n[Consolidated]: {self._contents[secondary]}"
 
             # Merge embeddings (weighted average)
-            weight1 = primary.relevance_score
-            weight2 = secondary.relevance_score
-            primary.embedding = (
-                (primary.embedding * weight1 + secondary.embedding * weight2) /
-                (weight1 + weight2)
-            )
-            primary.embedding = primary.embedding / np.linalg.norm(primary.embedding)
+            relevance = self._relevance(time.time())
+            weight1, weight2 = relevance[primary], relevance[secondary]
+            merged = (self._embeddings[primary] * weight1 + self._embeddings[secondary] * weight2) / (weight1 + weight2)
+            self._embeddings[primary] = merged / np.linalg.norm(merged)
 
             # Merge metadata
-            primary.tags = list(set(primary.tags + secondary.tags))
-            primary.access_count += secondary.access_count
-            primary.metadata['consolidated_from'] = primary.metadata.get('consolidated_from', [])
-            primary.metadata['consolidated_from'].append(secondary.id)
+            primary_id, secondary_id = self._ids[primary], self._ids[secondary]
+            self._tags[primary] = list(set(self._tags[primary] + self._tags[secondary]))
+            for tag in self._tags[primary]:
+                self.tag_index[tag].add(primary_id)
+            self._access_count[primary] += self._access_count[secondary]
+            consolidated_from = self._metadata[primary].setdefault('consolidated_from', [])
+            consolidated_from.append(secondary_id)
 
             # Boost quantum amplitude
-            primary.quantum_amplitude = min(1.0, primary.quantum_amplitude + 0.1)
+            self._amplitude[primary] = min(1.0, self._amplitude[primary] + 0.1)
 
             # Remove secondary
-            del self.memories[secondary.id]
+            self._remove(secondary)
 
             # Record consolidation
             self.consolidation_history.append({
                 'timestamp': time.time(),
-                'primary_id': primary.id,
-                'secondary_id': secondary.id,
+                'primary_id': primary_id,
+                'secondary_id': secondary_id,
                 'similarity': similarity
             })
 
             consolidated_count += 1
 
-        # Clear processed pairs
-        self.consolidation_pairs = [
-            (id1, id2, sim) for id1, id2, sim in self.consolidation_pairs
-            if sim <= self.consolidation_threshold
+        # Clear processed pairs and pairs whose memories are gone
+        self._pair_heap = [
+            (sim, id1, id2) for sim, id1, id2 in self._pair_heap
+            if sim <= self.consolidation_threshold and not force
+            and id1 in self._slot_of and id2 in self._slot_of
         ]
+        heapq.heapify(self._pair_heap)
 
         self.stats['total_consolidations'] += consolidated_count
         return consolidated_count
@@ -294,13 +373,12 @@ class MemorySupercharger:
     def boost_importance(self, mem_id: str,
                          boost: int = 1) -> bool:
         """Boost memory importance"""
-        if mem_id not in self.memories:
+        slot = self._slot_of.get(mem_id)
+        if slot is None:
             return False
 
-        memory = self.memories[mem_id]
-        new_value = min(5, memory.importance.value + boost)
-        memory.importance = MemoryImportance(new_value)
-        memory.quantum_amplitude = min(1.0, memory.quantum_amplitude + 0.1)
+        self._importance[slot] = min(5, int(self._importance[slot]) + boost)
+        self._amplitude[slot] = min(1.0, self._amplitude[slot] + 0.1)
 
         return True
 
@@ -308,85 +386,207 @@ class MemorySupercharger:
                     require_all: bool = False) -> List[EnhancedMemory]:
         """Get memories by tags"""
         if require_all:
-            mem_ids = set(self.memories.keys())
+            mem_ids = set(self._slot_of)
             for tag in tags:
-                mem_ids &= set(self.tag_index.get(tag, []))
+                mem_ids &= self.tag_index.get(tag, set())
         else:
             mem_ids = set()
             for tag in tags:
-                mem_ids.update(self.tag_index.get(tag, []))
+                mem_ids.update(self.tag_index.get(tag, ()))
 
-        return [self.memories[mid] for mid in mem_ids if mid in self.memories]
+        return [self.memories[mid] for mid in mem_ids if mid in self._slot_of]
 
-    def _update_topological_neighbors(self, mem_id: str) -> None:
-        """Find topological neighbors for a memory"""
-        if mem_id not in self.memories:
-            return
+    def _hash_embedding(self, text: str) -> np.ndarray:
+        """Simple hash-based embedding"""
+        text_hash = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+        np.random.seed(text_hash % 10000)
+        embedding = np.random.randn(128)
+        return embedding / np.linalg.norm(embedding)
 
-        memory = self.memories[mem_id]
-        neighbors = []
-
-        for other_id, other in self.memories.items():
-            if other_id == mem_id:
-                continue
-
-            similarity = np.dot(memory.embedding, other.embedding)
-            if similarity > 0.5:
-                neighbors.append(other_id)
-
-        memory.topological_neighbors = neighbors[:10]  # Max 10 neighbors
-
-    def _check_consolidation(self, new_mem_id: str) -> None:
-        """Check if new memory should be consolidated with existing"""
-        if new_mem_id not in self.memories:
-            return
+    def _store(self, content: str, embedding: Optional[np.ndarray],
+               importance: MemoryImportance, tags: List[str], metadata: Dict) -> int:
+        """Write one memory into a free slot"""
+        if embedding is None:
+            embedding = self._hash_embedding(content)
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        if self.dim is None:
+            self.dim = vector.shape[0]
+        elif vector.shape[0] != self.dim:
+            raise ValueError(f"Expected embedding of dimension {self.dim}, got {vector.shape[0]}")
 
-        new_memory = self.memories[new_mem_id]
+        # Generate ID
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        mem_id = hashlib.md5(f"{content}:{time.time()}:{sequence}".encode()).hexdigest()[:16]
+
+        if not self._free_slots:
+            self._grow()
+        slot = self._free_slots.pop()
+        self._high_water = max(self._high_water, slot + 1)
+
+        now = time.time()
+        self._embeddings[slot] = vector
+        self._importance[slot] = importance.value
+        self._amplitude[slot] = 1.0
+        self._creation_time[slot] = now
+        self._last_access[slot] = now
+        self._access_count[slot] = 0
+        self._sequence[slot] = sequence
+        self._alive[slot] = True
+
+        self._ids[slot] = mem_id
+        self._contents[slot] = content
+        self._tags[slot] = list(tags)
+        self._metadata[slot] = dict(metadata)
+        self._neighbors[slot] = []
+        self._slot_of[mem_id] = slot
 
-        for other_id, other in self.memories.items():
-            if other_id == new_mem_id:
-                continue
+        # Update tag index
+        for tag in tags:
+            self.tag_index[tag].add(mem_id)
 
-            similarity = np.dot(new_memory.embedding, other.embedding)
-            if similarity > 0.7:  # High similarity threshold
-                self.consolidation_pairs.append((new_mem_id, other_id, similarity))
+        self.stats['total_insertions'] += 1
+        return slot
+
+    def _grow(self) -> None:
+        """Double the slot arrays, keeping the embedding matrix contiguous"""
+        old = len(self._alive)
+        new = max(self.INITIAL_CAPACITY, old * 2)
+
+        def grown(array: np.ndarray, shape) -> np.ndarray:
+            result = np.zeros(shape, dtype=array.dtype)
+            if old:
+                result[:old] = array
+            return result
+
+        self._embeddings = grown(self._embeddings, (new, self.dim))
+        self._importance = grown(self._importance, new)
+        self._amplitude = grown(self._amplitude, new)
+        self._creation_time = grown(self._creation_time, new)
+        self._last_access = grown(self._last_access, new)
+        self._access_count = grown(self._access_count, new)
+        self._sequence = grown(self._sequence, new)
+        self._alive = grown(self._alive, new)
+
+        extra = new - old
+        self._ids.extend([None] * extra)
+        self._contents.extend([None] * extra)
+        self._tags.extend([] for _ in range(extra))
+        self._metadata.extend({} for _ in range(extra))
+        self._neighbors.extend([] for _ in range(extra))
+        # Pop from the end, so lower slots are filled first
+        self._free_slots.extend(range(new - 1, old - 1, -1))
+
+    def _remove(self, slot: int) -> None:
+        """Free a slot and clean the tag index"""
+        mem_id = self._ids[slot]
+        for tag in self._tags[slot]:
+            tagged = self.tag_index.get(tag)
+            if tagged is not None:
+                tagged.discard(mem_id)
+                if not tagged:
+                    del self.tag_index[tag]
+
+        del self._slot_of[mem_id]
+        self._alive[slot] = False
+        self._ids[slot] = None
+        self._contents[slot] = None
+        self._tags[slot] = []
+        self._metadata[slot] = {}
+        self._neighbors[slot] = []
+        self._free_slots.append(slot)
+
+    def _link_new(self, slots: np.ndarray) -> None:
+        """Find topological neighbors and consolidation candidates for new slots"""
+        n = self._high_water
+        similarity = self._embeddings[slots] @ self._embeddings[:n].T
+
+        # Candidates above the neighbor threshold, compared only with live
+        # memories inserted before each new one
+        rows, cols = np.nonzero(similarity > self.NEIGHBOR_SIMILARITY)
+        valid = self._alive[cols] & (self._sequence[cols] < self._sequence[slots][rows])
+        rows, cols = rows[valid], cols[valid]
+        sims = similarity[rows, cols]
+
+        # Group by row, most similar first
+        order = np.lexsort((-sims, rows))
+        rows, cols, sims = rows[order], cols[order], sims[order]
+        bounds = np.searchsorted(rows, np.arange(len(slots) + 1))
+
+        limit = max(self.MAX_NEIGHBORS, self.MAX_PAIRS_PER_MEMORY)
+        for row, slot in enumerate(slots.tolist()):
+            mem_id = self._ids[slot]
+            start, stop = bounds[row], min(bounds[row + 1], bounds[row] + limit)
+            neighbors = []
+            pairs = 0
+            for other, sim in zip(cols[start:stop].tolist(), sims[start:stop].tolist()):
+                if len(neighbors) < self.MAX_NEIGHBORS:
+                    neighbors.append(self._ids[other])
+                if sim > self.CONSOLIDATION_SIMILARITY and pairs < self.MAX_PAIRS_PER_MEMORY:
+                    self._push_pair(sim, mem_id, self._ids[other])
+                    pairs += 1
+            self._neighbors[slot] = neighbors
+
+    def _push_pair(self, similarity: float, id1: str, id2: str) -> None:
+        """Track a consolidation candidate, dropping the weakest beyond the bound"""
+        if len(self._pair_heap) < self.max_pending_consolidations:
+            heapq.heappush(self._pair_heap, (similarity, id1, id2))
+        elif similarity > self._pair_heap[0][0]:
+            heapq.heapreplace(self._pair_heap, (similarity, id1, id2))
+
+    def _recency(self, now: float) -> np.ndarray:
+        """Recency score per slot (higher = more recent)"""
+        return 1.0 / (1.0 + (now - self._last_access) / 3600)
+
+    def _relevance(self, now: float) -> np.ndarray:
+        """Combined relevance score per slot, as EnhancedMemory.relevance_score"""
+        return (self._importance / 5.0 * 0.3 +
+                self._recency(now) * 0.3 +
+                np.minimum(1.0, self._access_count / 10.0) * 0.2 +
+                self._amplitude * 0.2)
+
+    def _materialize(self, slot: int) -> EnhancedMemory:
+        """Snapshot a slot as an EnhancedMemory"""
+        return EnhancedMemory(
+            id=self._ids[slot],
+            content=self._contents[slot],
+            embedding=self._embeddings[slot].copy(),
+            importance=MemoryImportance(int(self._importance[slot])),
+            creation_time=float(self._creation_time[slot]),
+            last_access_time=float(self._last_access[slot]),
+            access_count=int(self._access_count[slot]),
+            quantum_amplitude=float(self._amplitude[slot]),
+            topological_neighbors=list(self._neighbors[slot]),
+            tags=list(self._tags[slot]),
+            metadata=self._metadata[slot]
+        )
 
     def _evict_least_relevant(self) -> None:
         """Evict least relevant memories when over capacity"""
-        # Sort by relevance score
-        sorted_memories = sorted(
-            self.memories.values(),
-            key=lambda m: m.relevance_score
-        )
-
-        # Evict bottom 10%
-        evict_count = max(1, len(sorted_memories) // 10)
+        alive = np.flatnonzero(self._alive)
+        relevance = self._relevance(time.time())[alive]
 
-        for memory in sorted_memories[:evict_count]:
-            del self.memories[memory.id]
+        # Evict bottom 10%, selected in linear time
+        evict_count = max(1, alive.size // 10)
+        lowest = np.argpartition(relevance, evict_count - 1)[:evict_count]
 
-            # Clean tag index
-            for tag in memory.tags:
-                if memory.id in self.tag_index[tag]:
-                    self.tag_index[tag].remove(memory.id)
+        for slot in alive[lowest].tolist():
+            self._remove(slot)
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get memory system statistics"""
-        if not self.memories:
+        if not self._slot_of:
             return {**self.stats, 'count': 0}
 
-        importances = [m.importance.value for m in self.memories.values()]
-        amplitudes = [m.quantum_amplitude for m in self.memories.values()]
-        access_counts = [m.access_count for m in self.memories.values()]
-
+        alive = self._alive
         return {
             **self.stats,
-            'count': len(self.memories),
-            'avg_importance': np.mean(importances),
-            'avg_amplitude': np.mean(amplitudes),
-            'avg_access_count': np.mean(access_counts),
+            'count': len(self._slot_of),
+            'avg_importance': float(np.mean(self._importance[alive])),
+            'avg_amplitude': float(np.mean(self._amplitude[alive])),
+            'avg_access_count': float(np.mean(self._access_count[alive])),
             'total_tags': len(self.tag_index),
-            'pending_consolidations': len(self.consolidation_pairs)
+            'pending_consolidations': len(self._pair_heap)
         }
 
 
@@ -0,0 +1,124 @@
+"""
+Dedicated worker thread for a model that is expensive to load.
+
+The model is loaded once on the worker thread and every call runs there,
+one at a time, so inference never blocks the event loop and never races
+with itself. Results can be returned whole or streamed item by item while
+the worker is still producing them.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Generic, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+class ModelWorker(Generic[T]):
+    """
+    Worker thread owning the model returned by load(key). A call with a
+    different key than the loaded model reloads it first (e.g. another
+    model size); the key defaults to None for single-model workers.
+    """
+
+    def __init__(self, name: str, load: Callable[[Any], T]):
+        self.name = name
+        self._load = load
+        self._model: T | None = None
+        self._key: Any = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self.loading = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def submit(self, fn: Callable[[T], R], key: Any = None) -> "Future[R]":
+        return self._get_executor().submit(lambda: fn(self._get_model(key)))
+
+    async def call(self, fn: Callable[[T], R], key: Any = None) -> R:
+        return await asyncio.wrap_future(self.submit(fn, key))
+
+    async def preload(self, key: Any = None) -> None:
+        await self.call(lambda model: None, key)
+
+    def stream(self, fn: Callable[[T], Iterable[R]], key: Any = None) -> Iterator[R]:
+        """Items of fn(model) as the worker produces them, for synchronous consumers"""
+        items: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        self._get_executor().submit(self._produce, fn, key, items.put, stop)
+        try:
+            while True:
+                entry = items.get()
+                if entry is _DONE:
+                    return
+                yield _unpack(entry)
+        finally:
+            stop.set()  # consumer is gone, stop producing
+
+    async def astream(self, fn: Callable[[T], Iterable[R]], key: Any = None) -> AsyncIterator[R]:
+        """Items of fn(model) as the worker produces them, for coroutines"""
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def emit(entry):
+            loop.call_soon_threadsafe(items.put_nowait, entry)
+
+        self._get_executor().submit(self._produce, fn, key, emit, stop)
+        try:
+            while True:
+                entry = await items.get()
+                if entry is _DONE:
+                    return
+                yield _unpack(entry)
+        finally:
+            stop.set()
+
+    def _produce(
+        self,
+        fn: Callable[[T], Iterable[R]],
+        key: Any,
+        emit: Callable[[Any], None],
+        stop: threading.Event,
+    ) -> None:
+        try:
+            for item in fn(self._get_model(key)):
+                if stop.is_set():
+                    return
+                emit((item, None))
+        except Exception as e:
+            emit((None, e))
+            return
+        emit(_DONE)
+
+    def _get_model(self, key: Any) -> T:
+        # runs on the worker thread only, loads are serialized with calls
+        if self._model is None or self._key != key:
+            self.loading = True
+            try:
+                self._model = None
+                self._model = self._load(key)
+                self._key = key
+            finally:
+                self.loading = False
+        return self._model
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+            return self._executor
+
+
+def _unpack(entry: tuple[Any, Exception | None]) -> Any:
+    item, error = entry
+    if error is not None:
+        raise error
+    return item
@@ -0,0 +1,135 @@
+"""
+Page-level PDF text extraction on the shared process pool.
+
+Pages are extracted in worker processes, a few pages per task. PyMuPDF
+reads the text layer (and tables as markdown); only pages without a
+usable text layer, or mostly covered by images, are rasterized and
+OCR'd with Tesseract. Pages are yielded in document order as soon as
+they and every page before them are done, so callers can index early
+pages while later ones are still being processed.
+
+Workers only import this module and the PDF/OCR libraries, never the
+agent framework.
+"""
+
+import asyncio
+import itertools
+from collections import deque
+from concurrent.futures import Executor
+from typing import AsyncIterator, Deque
+
+from python.helpers import process_pool
+
+PAGES_PER_TASK = 2
+OCR_DPI = 300
+OCR_MIN_TEXT_CHARS = 20  # pages with less extractable text are OCR'd
+OCR_MIN_IMAGE_COVERAGE = 0.5  # or pages mostly covered by images
+
+
+async def extract_pages(
+    path: str, executor: Executor | None = None
+) -> AsyncIterator[tuple[int, str]]:
+    """
+    Yield (page_index, text) for every page of the PDF at path, in order.
+
+    At most twice as many page tasks as there are workers are queued at
+    once, the next is submitted as earlier ones are consumed, so a long
+    PDF doesn't hold up other users of the shared pool. Unfinished tasks
+    are cancelled if the caller stops iterating.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or process_pool.get_pool()
+
+    page_count = await loop.run_in_executor(executor, count_pages, path)
+    starts = iter(range(0, page_count, PAGES_PER_TASK))
+    pending: Deque[asyncio.Future] = deque()
+    max_pending = process_pool.MAX_WORKERS * 2
+    try:
+        while True:
+            for start in itertools.islice(starts, max_pending - len(pending)):
+                pending.append(
+                    loop.run_in_executor(
+                        executor,
+                        extract_page_range,
+                        path,
+                        start,
+                        min(start + PAGES_PER_TASK, page_count),
+                    )
+                )
+            if not pending:
+                break
+            for page in await pending.popleft():
+                yield page
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def count_pages(path: str) -> int:
+    try:
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            return doc.page_count
+    except Exception:
+        # not readable by PyMuPDF, pages will be rendered by poppler
+        import pdf2image
+
+        return int(pdf2image.pdfinfo_from_path(path)["Pages"])
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[tuple[int, str]]:
+    """Worker task: extract pages [start, stop) of the PDF."""
+    try:
+        import pymupdf
+
+        doc = pymupdf.open(path)
+    except Exception:
+        return [(index, _ocr_with_poppler(path, index)) for index in range(start, stop)]
+
+    with doc:
+        return [(index, _extract_page(doc[index])) for index in range(start, stop)]
+
+
+def _extract_page(page) -> str:
+    text = page.get_text("text").strip()
+
+    try:
+        tables = page.find_tables().tables
+    except Exception:
+        tables = []
+    for table in tables:
+        text += "\n" + table.to_markdown()
+
+    if _needs_ocr(page, text):
+        ocr_text = _ocr_page(page)
+        if len(ocr_text.strip()) > len(text):
+            return ocr_text
+    return text
+
+
+def _needs_ocr(page, text: str) -> bool:
+    if len(text) < OCR_MIN_TEXT_CHARS:
+        return True
+    page_area = abs(page.rect) or 1.0
+    image_area = sum(abs(page.rect & info["bbox"]) for info in page.get_image_info())
+    return image_area / page_area >= OCR_MIN_IMAGE_COVERAGE
+
+
+def _ocr_page(page) -> str:
+    import pytesseract
+    from PIL import Image
+
+    pixmap = page.get_pixmap(dpi=OCR_DPI)
+    image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    return pytesseract.image_to_string(image)
+
+
+def _ocr_with_poppler(path: str, index: int) -> str:
+    import pdf2image
+    import pytesseract
+
+    images = pdf2image.convert_from_path(
+        path, dpi=OCR_DPI, first_page=index + 1, last_page=index + 1
+    )  # type: ignore
+    return "\n\n".join(pytesseract.image_to_string(image) for image in images)
@@ -0,0 +1,40 @@
+"""
+Process pool shared by all CPU-bound work that is offloaded from the web
+server: PDF page extraction, image compression and swarm iterations.
+
+One pool for the whole process, sized to the cores, instead of one per
+feature. Workers import only the modules of the tasks they are given, so
+they stay free of the agent framework as long as those modules are.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+MAX_WORKERS = max(1, min(os.cpu_count() or 1, 8))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared worker pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver children fork from a clean single-threaded process,
+            # not from the web server with its threads and event loops
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context(method)
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,4 +1,5 @@
 import os
+import threading
 from typing import Literal, TypedDict, TYPE_CHECKING
 
 from python.helpers import files, dirty_json, persist_chat, file_tree
@@ -16,6 +17,10 @@ PROJECT_HEADER_FILE = "project.json"
 
 CONTEXT_DATA_KEY_PROJECT = "project"
 
+# file tree caches per project folder, rendered every agent loop
+_file_tree_caches: dict[str, file_tree.FileTreeCache] = {}
+_file_tree_caches_lock = threading.Lock()
+
 
 class FileStructureInjectionSettings(TypedDict):
     enabled: bool
@@ -60,6 +65,8 @@ def get_project_meta_folder(name: str, *sub_dirs: str):
 def delete_project(name: str):
     abs_path = files.get_abs_path(PROJECTS_PARENT_DIR, name)
     files.delete_dir(abs_path)
+    with _file_tree_caches_lock:
+        _file_tree_caches.pop(get_project_folder(name), None)
     deactivate_project_in_chats(name)
     return name
 
@@ -362,7 +369,10 @@ def get_file_structure(name: str, basic_data: BasicProjectData|None=None) -> str
     project_folder = get_project_folder(name)
     if basic_data is None:
         basic_data = load_basic_project_data(name)
-    
+
+    with _file_tree_caches_lock:
+        cache = _file_tree_caches.setdefault(project_folder, file_tree.FileTreeCache())
+
     tree = str(file_tree.file_tree(
         project_folder,
         max_depth=basic_data["file_structure"]["max_depth"],
@@ -370,7 +380,8 @@ def get_file_structure(name: str, basic_data: BasicProjectData|None=None) -> str
         max_folders=basic_data["file_structure"]["max_folders"],
         max_lines=basic_data["file_structure"]["max_lines"],
         ignore=basic_data["file_structure"]["gitignore"],
-        output_mode=file_tree.OUTPUT_MODE_STRING
+        output_mode=file_tree.OUTPUT_MODE_STRING,
+        cache=cache,
     ))
 
     # empty?
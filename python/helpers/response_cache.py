@@ -0,0 +1,205 @@
+"""
+Persistent cache of utility model responses.
+
+Responses are stored in SQLite under a key made of the model, the hash of
+the system prompt and the hash of the message, so a housekeeping prompt
+seen before is answered without calling the provider. Entries expire after
+ttl seconds and the least recently used ones are evicted once max_entries
+is exceeded.
+
+Near-duplicate messages can be matched too: when an embedding is passed to
+get() and put(), a miss on the exact key falls back to the most similar
+stored message with the same model and system prompt, if its cosine
+similarity reaches the similarity threshold.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Sequence
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    system_hash TEXT NOT NULL,
+    response TEXT NOT NULL,
+    embedding BLOB,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_group ON responses (model, system_hash);
+CREATE INDEX IF NOT EXISTS idx_responses_used ON responses (used_at);
+"""
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ResponseCache:
+    """
+    One SQLite database shared by all contexts, safe to use from any thread.
+    similarity 0 disables near-duplicate matching.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 5000,
+        similarity: float = 0.0,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, system: str, message: str) -> str:
+        return hash_text(f"{model}\0{hash_text(system)}\0{hash_text(message)}")
+
+    def get(
+        self,
+        model: str,
+        system: str,
+        message: str,
+        embedding: Sequence[float] | None = None,
+    ) -> str | None:
+        key = self.make_key(model, system, message)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self._fresh(row[1], now):
+                self._touch(key, now)
+                self.hits += 1
+                return row[0]
+
+            if embedding is not None and self.similarity > 0:
+                match = self._nearest(model, hash_text(system), embedding, now)
+                if match:
+                    self._touch(match[0], now)
+                    self.semantic_hits += 1
+                    return match[1]
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        model: str,
+        system: str,
+        message: str,
+        response: str,
+        embedding: Sequence[float] | None = None,
+    ) -> None:
+        key = self.make_key(model, system, message)
+        vector = _to_blob(embedding) if embedding is not None else None
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, system_hash, response, embedding, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, hash_text(system), response, vector, now, now),
+            )
+            self.stores += 1
+            self._evict(now)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 3) if lookups else 0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+    def _fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl <= 0 or now - created_at < self.ttl
+
+    def _touch(self, key: str, now: float) -> None:
+        self.conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+
+    def _nearest(
+        self, model: str, system_hash: str, embedding: Sequence[float], now: float
+    ) -> tuple[str, str] | None:
+        rows = self.conn.execute(
+            "SELECT key, response, embedding, created_at FROM responses "
+            "WHERE model = ? AND system_hash = ? AND embedding IS NOT NULL",
+            (model, system_hash),
+        ).fetchall()
+        rows = [row for row in rows if self._fresh(row[3], now)]
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        vectors = [np.frombuffer(row[2], dtype=np.float32) for row in rows]
+        # entries embedded by another embeddings model can't be compared
+        candidates = [(row, v) for row, v in zip(rows, vectors) if v.shape == query.shape]
+        if not candidates:
+            return None
+        matrix = np.stack([_normalize(v) for _, v in candidates])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        row = candidates[best][0]
+        return row[0], row[1]
+
+    def _evict(self, now: float) -> None:
+        if self.ttl > 0:
+            expired = self.conn.execute(
+                "DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,)
+            ).rowcount
+            self.evictions += max(expired, 0)
+        excess = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY used_at ASC LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _to_blob(embedding: Sequence[float]) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
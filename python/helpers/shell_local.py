@@ -5,12 +5,13 @@ import time
 import sys
 from typing import Optional, Tuple
 from python.helpers import tty_session, runtime
-from python.helpers.shell_ssh import clean_string
+from python.helpers.terminal_output import TerminalOutput
 
 class LocalInteractiveSession:
     def __init__(self, cwd: str|None = None):
         self.session: tty_session.TTYSession|None = None
-        self.full_output = ''
+        self.output = TerminalOutput()
+        self.unread = ''
         self.cwd = cwd
 
     async def connect(self):
@@ -26,7 +27,7 @@ class LocalInteractiveSession:
     async def send_command(self, command: str):
         if not self.session:
             raise Exception("Shell not connected")
-        self.full_output = ""
+        self.output.reset()
         await self.session.sendline(command)
  
     async def read_output(self, timeout: float = 0, reset_full_output: bool = False) -> Tuple[str, Optional[str]]:
@@ -34,16 +35,27 @@ class LocalInteractiveSession:
             raise Exception("Shell not connected")
 
         if reset_full_output:
-            self.full_output = ""
+            self.output.reset()
 
         # get output from terminal
-        partial_output = await self.session.read_full_until_idle(idle_timeout=0.01, total_timeout=timeout)
-        self.full_output += partial_output
+        partial_output = self.unread + await self.session.read_full_until_idle(idle_timeout=0.01, total_timeout=timeout)
+        self.unread = ""
 
-        # clean output
-        partial_output = clean_string(partial_output)
-        clean_full_output = clean_string(self.full_output)
+        # clean only the new output
+        partial_output = self.output.feed(partial_output) if partial_output else ""
 
         if not partial_output:
-            return clean_full_output, None
-        return clean_full_output, partial_output
\ No newline at end of file
+            return self.output.text, None
+        return self.output.text, partial_output
+
+    async def wait_output(self, timeout: float | None = None) -> bool:
+        """Wait until new output arrived, False on timeout"""
+        if not self.session:
+            raise Exception("Shell not connected")
+        if self.unread:
+            return True
+        chunk = await self.session.read(timeout=timeout)
+        if chunk is None:
+            return False
+        self.unread += chunk  # kept for the next read_output
+        return True
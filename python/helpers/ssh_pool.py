@@ -0,0 +1,231 @@
+"""
+Shared SSH connections for interactive shell sessions.
+
+One authenticated transport is kept per target (host, port, user and
+password) and every shell session opens its own channel on it, so a new or
+reset session costs a channel open instead of a TCP connect, key exchange
+and authentication. Transports send keepalives; a transport found dead is
+replaced by a new connection the next time a channel is opened. A
+transport without channels is closed after idle_timeout seconds.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+import paramiko
+
+KEEPALIVE_INTERVAL = 5
+IDLE_TIMEOUT = 300
+METRICS_WINDOW = 100
+
+
+@dataclass(frozen=True)
+class SSHTarget:
+    hostname: str
+    port: int
+    username: str
+    password: str = field(repr=False)
+
+
+@dataclass
+class _Connection:
+    client: paramiko.SSHClient
+    channels: int = 0
+    idle_timer: threading.Timer | None = None
+
+    @property
+    def healthy(self) -> bool:
+        transport = self.client.get_transport()
+        return bool(transport and transport.is_active() and transport.is_authenticated())
+
+
+class SSHConnectionPool:
+
+    def __init__(self, *, keepalive_interval: int = KEEPALIVE_INTERVAL, idle_timeout: float = IDLE_TIMEOUT):
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._target_locks: dict[SSHTarget, threading.Lock] = {}
+        self._connections: dict[SSHTarget, _Connection] = {}
+
+        self._connect_times: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._open_times: deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.connects = 0
+        self.reconnects = 0
+        self.channels_opened = 0
+
+    def open_shell(self, target: SSHTarget, width: int = 100, height: int = 50) -> paramiko.Channel:
+        """Interactive shell channel on the shared connection to target"""
+        for attempt in range(2):
+            connection = self._get_connection(target)
+            started = time.monotonic()
+            try:
+                channel = connection.client.invoke_shell(width=width, height=height)
+            except (paramiko.SSHException, EOFError, OSError):
+                # the transport died since the health check, connect again once
+                self._drop(target, connection)
+                if attempt:
+                    raise
+                continue
+            with self._lock:
+                connection.channels += 1
+                self.channels_opened += 1
+                self._open_times.append(time.monotonic() - started)
+            return channel
+        raise RuntimeError("unreachable")
+
+    async def open_shell_async(self, target: SSHTarget, width: int = 100, height: int = 50) -> paramiko.Channel:
+        return await asyncio.to_thread(self.open_shell, target, width, height)
+
+    def release(self, target: SSHTarget, channel: paramiko.Channel | None):
+        """Close a session's channel, the connection stays for other sessions"""
+        if channel is not None:
+            channel.close()
+        with self._lock:
+            connection = self._connections.get(target)
+            if not connection or channel is None or connection.client.get_transport() is not channel.get_transport():
+                return
+            connection.channels = max(0, connection.channels - 1)
+            if connection.channels == 0 and self.idle_timeout >= 0:
+                timer = threading.Timer(self.idle_timeout, self._close_idle, args=(target, connection))
+                timer.daemon = True
+                connection.idle_timer = timer
+                timer.start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            connects, opens = list(self._connect_times), list(self._open_times)
+            return {
+                "connections": len(self._connections),
+                "channels": sum(c.channels for c in self._connections.values()),
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+                "channels_opened": self.channels_opened,
+                "avg_connect_ms": _ms(sum(connects) / len(connects)) if connects else 0,
+                "avg_open_ms": _ms(sum(opens) / len(opens)) if opens else 0,
+            }
+
+    def close(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            if connection.idle_timer:
+                connection.idle_timer.cancel()
+            connection.client.close()
+
+    def _get_connection(self, target: SSHTarget) -> _Connection:
+        with self._lock:
+            target_lock = self._target_locks.setdefault(target, threading.Lock())
+        # one connect per target at a time, sessions opened meanwhile share it
+        with target_lock:
+            with self._lock:
+                connection = self._connections.get(target)
+                if connection and connection.idle_timer:
+                    connection.idle_timer.cancel()
+                    connection.idle_timer = None
+            if connection and connection.healthy:
+                return connection
+            if connection:
+                self._drop(target, connection)
+                self.reconnects += 1
+            connection = _Connection(self._connect(target))
+            with self._lock:
+                self._connections[target] = connection
+            return connection
+
+    def _connect(self, target: SSHTarget) -> paramiko.SSHClient:
+        started = time.monotonic()
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            target.hostname,
+            target.port,
+            target.username,
+            target.password,
+            allow_agent=False,
+            look_for_keys=False,
+        )
+        transport = client.get_transport()
+        if transport and self.keepalive_interval > 0:
+            # sends an SSH_MSG_IGNORE every keepalive_interval seconds, a dead peer
+            # then fails the transport so the health check sees it
+            transport.set_keepalive(self.keepalive_interval)
+        with self._lock:
+            self.connects += 1
+            self._connect_times.append(time.monotonic() - started)
+        return client
+
+    def _drop(self, target: SSHTarget, connection: _Connection):
+        with self._lock:
+            if self._connections.get(target) is connection:
+                del self._connections[target]
+        if connection.idle_timer:
+            connection.idle_timer.cancel()
+        connection.client.close()
+
+    def _close_idle(self, target: SSHTarget, connection: _Connection):
+        with self._lock:
+            if connection.channels or connection.idle_timer is None:
+                return  # reused meanwhile
+            connection.idle_timer = None
+        self._drop(target, connection)
+
+
+def on_output(channel: paramiko.Channel, callback: Callable[[], None]):
+    """Call callback whenever data arrives on channel or it closes"""
+    # paramiko sets this event on every received chunk, so waiting for output
+    # needs no reader thread, and unlike channel.fileno() no socket pair
+    channel.in_buffer.set_event(_ChannelEvent(callback))
+    callback()  # data may have arrived before the hook
+
+
+def read_available(channel: paramiko.Channel) -> bytes:
+    """Everything received on channel so far, without waiting"""
+    chunks = []
+    # recv takes the buffer lock, so a chunk being fed is complete when read
+    channel.settimeout(0.0)
+    try:
+        while True:
+            chunk = channel.recv(65536)
+            if not chunk:
+                break  # channel closed
+            chunks.append(chunk)
+    except socket.timeout:
+        pass  # nothing more buffered
+    finally:
+        channel.settimeout(None)
+    return b"".join(chunks)
+
+
+class _ChannelEvent:
+    """Stands in for the threading.Event paramiko sets when data arrives"""
+
+    def __init__(self, callback: Callable[[], None]):
+        self.callback = callback
+
+    def set(self):
+        # runs on the transport thread with the buffer locked, so never read here
+        self.callback()
+
+    def clear(self):
+        pass
+
+    def is_set(self) -> bool:
+        return False
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+_pool = SSHConnectionPool()
+
+
+def get_pool() -> SSHConnectionPool:
+    return _pool
@@ -0,0 +1,351 @@
+"""
+Startup timeline, deferred imports and subsystem readiness.
+
+lazy_import() returns a stand-in for an optional heavy dependency that
+imports the real module on first attribute access, so booting doesn't pay
+for features that are never used. ImportProfiler times every module
+imported while booting, exclusive of the imports nested in it, and
+report() puts them on one timeline with the boot steps, deferred imports
+and background warmups. Slow subsystems warm up in the background with
+warm(); request handlers wait only for the subsystems they need.
+
+Needs nothing but the standard library and defer, so it can run before
+everything else.
+"""
+
+import asyncio
+import importlib
+import importlib.abc
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Iterable, Iterator
+
+from python.helpers import defer
+
+# boot times are relative to the first import of this module
+_boot_started = time.perf_counter()
+_lock = threading.Lock()
+
+
+@dataclass
+class TimelineEntry:
+    kind: str  # step, deferred_import or warmup
+    name: str
+    start_ms: float
+    duration_ms: float
+    thread: str
+
+
+_timeline: list[TimelineEntry] = []
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _record(kind: str, name: str, started: float, elapsed: float):
+    entry = TimelineEntry(kind, name, _ms(started - _boot_started), _ms(elapsed), threading.current_thread().name)
+    with _lock:
+        _timeline.append(entry)
+
+
+@contextmanager
+def step(name: str) -> Iterator[None]:
+    """Time a boot step on the timeline"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record("step", name, started, time.perf_counter() - started)
+
+
+# deferred imports
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is used"""
+
+    # its own attributes start with _lazy so they don't shadow the module's
+
+    def __init__(self, name: str, on_load: Callable[[types.ModuleType], Any] | None = None):
+        super().__init__(name)
+        object.__setattr__(self, "_lazy_on_load", on_load)
+        object.__setattr__(self, "_lazy_module", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def _lazy_load(self) -> types.ModuleType:
+        if self._lazy_module is not None:
+            return self._lazy_module
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                if self._lazy_on_load:
+                    self._lazy_on_load(module)
+                object.__setattr__(self, "_lazy_module", module)
+                _record("deferred_import", self.__name__, started, time.perf_counter() - started)
+        return self._lazy_module
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for names the stand-in itself doesn't have
+        return getattr(self._lazy_load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._lazy_load(), name, value)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, on_load: Callable[[types.ModuleType], Any] | None = None) -> Any:
+    """Module name, imported when first used; on_load runs once right after"""
+    module = sys.modules.get(name)
+    if module is not None:
+        # already paid for, no need for a stand-in
+        if on_load:
+            on_load(module)
+        return module
+    return LazyModule(name, on_load)
+
+
+def load(module: Any) -> types.ModuleType:
+    """The real module behind a stand-in, imported now if it wasn't yet"""
+    return module._lazy_load() if isinstance(module, LazyModule) else module
+
+
+def is_loaded(module: Any) -> bool:
+    return not isinstance(module, LazyModule) or module._lazy_module is not None
+
+
+# import profiling
+
+@dataclass
+class ImportRecord:
+    name: str
+    start_ms: float
+    cumulative_ms: float
+    self_ms: float
+    depth: int
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Times module imports, each exclusive of the imports nested in it"""
+
+    def __init__(self):
+        self.records: list[ImportRecord] = []
+        self._local = threading.local()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None  # another finder is looking, let it go on without us
+        self._local.finding = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                find = getattr(finder, "find_spec", None)
+                if finder is self or find is None:
+                    continue
+                spec = find(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._local.finding = False
+        if spec is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def timed(self, name: str, run: Callable[[], Any]):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        nested = [0.0]
+        stack.append(nested)
+        started = time.perf_counter()
+        try:
+            return run()
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            record = ImportRecord(name, _ms(started - _boot_started), _ms(elapsed), _ms(elapsed - nested[0]), len(stack))
+            with _lock:
+                self.records.append(record)
+
+    def by_package(self) -> dict[str, float]:
+        """Import time per top level package, slowest first"""
+        totals: dict[str, float] = {}
+        with _lock:
+            for record in self.records:
+                package = record.name.split(".", 1)[0]
+                totals[package] = totals.get(package, 0.0) + record.self_ms
+        return {name: round(ms, 2) for name, ms in sorted(totals.items(), key=lambda item: -item[1])}
+
+
+class _TimedLoader:
+    """Wraps the loader found for a module to time its execution"""
+
+    def __init__(self, loader, profiler: ImportProfiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # the module sees its real loader, so nothing looks different afterwards
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        self.profiler.timed(module.__name__, lambda: self.loader.exec_module(module))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.loader, name)
+
+
+_profiler: ImportProfiler | None = None
+_ready_ms: float | None = None
+
+
+def profile_imports() -> ImportProfiler:
+    """Time imports from now until finish()"""
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+    _profiler.install()
+    return _profiler
+
+
+def finish() -> float:
+    """Boot is done and the server accepts requests, returns the boot time in ms"""
+    global _ready_ms
+    _ready_ms = _ms(time.perf_counter() - _boot_started)
+    if _profiler:
+        _profiler.uninstall()
+    return _ready_ms
+
+
+# readiness
+
+@dataclass
+class Subsystem:
+    name: str
+    state: str = "pending"  # pending, warming, ready or failed
+    start_ms: float | None = None
+    duration_ms: float | None = None
+    error: str | None = None
+    done: Future = field(default_factory=Future, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "start_ms": self.start_ms,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+        }
+
+
+_subsystems: dict[str, Subsystem] = {}
+
+
+def subsystem(name: str) -> Subsystem:
+    with _lock:
+        if name not in _subsystems:
+            _subsystems[name] = Subsystem(name)
+        return _subsystems[name]
+
+
+def warm(name: str, func: Callable[..., Coroutine[Any, Any, Any]], *args: Any, **kwargs: Any) -> defer.DeferredTask:
+    """Run func in the background, subsystem name is ready once it returns"""
+    target = subsystem(name)
+
+    async def warming():
+        started = time.perf_counter()
+        target.state, target.start_ms = "warming", _ms(started - _boot_started)
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            target.state, target.error = "failed", f"{type(e).__name__}: {e}"
+            raise
+        else:
+            target.state = "ready"
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            target.duration_ms = _ms(elapsed)
+            _record("warmup", name, started, elapsed)
+            # failed counts as done too, waiting longer wouldn't help
+            if not target.done.done():
+                target.done.set_result(target.state)
+
+    return defer.DeferredTask().start_task(warming)
+
+
+def is_ready(*names: str) -> bool:
+    with _lock:
+        waiting = [_subsystems[name] for name in names if name in _subsystems]
+    return all(s.done.done() for s in waiting)
+
+
+async def wait_ready(names: Iterable[str], timeout: float | None = None) -> bool:
+    """Wait for the subsystems to finish warming, False on timeout
+
+    Subsystems nobody started are ready, so handlers work the same outside
+    the web server.
+    """
+    with _lock:
+        pending = [_subsystems[n].done for n in names if n in _subsystems and not _subsystems[n].done.done()]
+    if not pending:
+        return True
+    # waited on in a thread, wrapping the futures would cancel them on timeout
+    _, not_done = await asyncio.to_thread(wait, pending, timeout)
+    return not not_done
+
+
+def report(slowest: int = 25) -> dict:
+    with _lock:
+        timeline = sorted(_timeline, key=lambda entry: entry.start_ms)
+        subsystems = {name: s.to_dict() for name, s in _subsystems.items()}
+    result: dict[str, Any] = {
+        "ready_ms": _ready_ms,
+        "uptime_ms": _ms(time.perf_counter() - _boot_started),
+        "rss_mb": _rss_mb(),
+        "subsystems": subsystems,
+        "timeline": [entry.__dict__ for entry in timeline],
+    }
+    if _profiler:
+        with _lock:
+            records = sorted(_profiler.records, key=lambda r: -r.self_ms)[:slowest]
+        result["imports"] = {
+            "count": len(_profiler.records),
+            "packages": dict(list(_profiler.by_package().items())[:slowest]),
+            "slowest": [record.__dict__ for record in records],
+        }
+    return result
+
+
+def _rss_mb() -> float | None:
+    # resident set size, where /proc is available
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
@@ -13,8 +13,10 @@ Implements emergent collective intelligence through:
 from __future__ import annotations
 
 import asyncio
+import functools
 import hashlib
 import json
+import pickle
 import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
@@ -24,6 +26,8 @@ from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
+from python.helpers import process_pool
+
 # =============================================================================
 # AGENT ROLE DEFINITIONS
 # =============================================================================
@@ -108,137 +112,412 @@ class SwarmMessage:
 # PHEROMONE FIELD
 # =============================================================================
 
+def _journaled(method: Callable) -> Callable:
+    """Record calls to a PheromoneField mutator while its journal is open"""
+    @functools.wraps(method)
+    def wrapper(self: PheromoneField, *args: Any, **kwargs: Any) -> Any:
+        if self._journal is not None:
+            # arrays are copied, callers may reuse theirs
+            self._journal.append((method.__name__,
+                                  tuple(a.copy() if isinstance(a, np.ndarray) else a for a in args),
+                                  kwargs))
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
 class PheromoneField:
     """
     Shared pheromone field for stigmergic communication.
     Agents leave chemical-like trails that guide other agents.
+
+    Deposits are stored as parallel numpy arrays (positions matrix,
+    strengths, type codes, timestamps) so that sensing, gradients,
+    evaporation and diffusion run as matrix/vector operations. The
+    *_many methods answer queries for a batch of positions at once.
+
+    While a journal is open (start_journal), calls that change the field
+    are recorded so they can be replayed onto a copy of it (replay).
     """
 
+    INITIAL_CAPACITY = 1024
+    MIN_STRENGTH = 0.01
+
     def __init__(self, dimensions: int = 128,
                  evaporation_rate: float = 0.05,
-                 diffusion_rate: float = 0.02):
+                 diffusion_rate: float = 0.02,
+                 rng: Optional[np.random.Generator] = None):
         self.dimensions = dimensions
         self.evaporation_rate = evaporation_rate
         self.diffusion_rate = diffusion_rate
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._journal: Optional[List[Tuple[str, tuple, dict]]] = None
+
+        # Pheromone deposits: first _count rows of the arrays are live
+        self._count = 0
+        self._positions = np.zeros((0, dimensions), dtype=np.float64)
+        self._sq_norms = np.zeros(0, dtype=np.float64)
+        self._strengths = np.zeros(0, dtype=np.float64)
+        self._types = np.zeros(0, dtype=np.int32)
+        self._timestamps = np.zeros(0, dtype=np.float64)
+        self._type_codes: Dict[str, int] = {}
+        self._type_names: List[str] = []
+
+        # Message board for stigmergic communication; ttl and strength
+        # are kept in arrays and copied onto messages when they are read
+        self.message_board: List[SwarmMessage] = []
+        self._message_positions = np.zeros((0, dimensions), dtype=np.float64)
+        self._message_types = np.zeros(0, dtype=np.int32)
+        self._message_ttl = np.zeros(0, dtype=np.int64)
+        self._message_strengths = np.zeros(0, dtype=np.float64)
 
-        # Pheromone deposits: list of (position, strength, type)
-        self.deposits: List[Dict] = []
+    def start_journal(self) -> None:
+        """Start recording the calls that change the field"""
+        self._journal = []
 
-        # Message board for stigmergic communication
-        self.message_board: List[SwarmMessage] = []
+    def stop_journal(self) -> List[Tuple[str, tuple, dict]]:
+        """Stop recording and return the recorded calls"""
+        journal, self._journal = self._journal or [], None
+        return journal
+
+    def replay(self, journal: List[Tuple[str, tuple, dict]]) -> None:
+        """Apply calls recorded on another field to this one"""
+        for name, args, kwargs in journal:
+            getattr(self, name)(*args, **kwargs)
+
+    @property
+    def n_deposits(self) -> int:
+        return self._count
+
+    @property
+    def deposits(self) -> List[Dict]:
+        """Snapshot of live deposits as dicts (position, strength, type, timestamp)"""
+        return [
+            {
+                'position': self._positions[i].copy(),
+                'strength': float(self._strengths[i]),
+                'type': self._type_names[self._types[i]],
+                'timestamp': float(self._timestamps[i])
+            }
+            for i in range(self._count)
+        ]
+
+    def _type_code(self, pheromone_type: str) -> int:
+        code = self._type_codes.get(pheromone_type)
+        if code is None:
+            code = len(self._type_names)
+            self._type_codes[pheromone_type] = code
+            self._type_names.append(pheromone_type)
+        return code
+
+    def _reserve(self, extra: int) -> None:
+        """Grow deposit arrays geometrically to fit extra rows"""
+        needed = self._count + extra
+        capacity = len(self._strengths)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, self.INITIAL_CAPACITY)
+
+        def grown(array: np.ndarray) -> np.ndarray:
+            result = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            result[:self._count] = array[:self._count]
+            return result
+
+        self._positions = grown(self._positions)
+        self._sq_norms = grown(self._sq_norms)
+        self._strengths = grown(self._strengths)
+        self._types = grown(self._types)
+        self._timestamps = grown(self._timestamps)
 
     def deposit(self, position: np.ndarray, strength: float,
                 pheromone_type: str = "default") -> None:
         """Deposit pheromone at position"""
-        self.deposits.append({
-            'position': position.copy(),
-            'strength': strength,
-            'type': pheromone_type,
-            'timestamp': time.time()
-        })
+        self.deposit_many(np.asarray(position)[None, :], [strength], [pheromone_type])
+
+    @_journaled
+    def deposit_many(self, positions: np.ndarray, strengths: Any,
+                     pheromone_types: List[str]) -> None:
+        """Deposit a batch of pheromones, one row of positions each"""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, self.dimensions)
+        n = positions.shape[0]
+        if n == 0:
+            return
+        self._reserve(n)
+        rows = slice(self._count, self._count + n)
+        self._positions[rows] = positions
+        self._sq_norms[rows] = np.einsum('ij,ij->i', positions, positions)
+        self._strengths[rows] = strengths
+        self._types[rows] = [self._type_code(t) for t in pheromone_types]
+        self._timestamps[rows] = time.time()
+        self._count += n
+
+    @_journaled
+    def scale_recent(self, pheromone_type: str, factor: float, last_n: int = 10) -> None:
+        """Scale the strength of matching deposits among the last_n deposits"""
+        code = self._type_codes.get(pheromone_type)
+        if code is None:
+            return
+        start = max(0, self._count - last_n)
+        recent = slice(start, self._count)
+        self._strengths[recent] = np.where(self._types[recent] == code,
+                                           self._strengths[recent] * factor,
+                                           self._strengths[recent])
+
+    def _distances(self, points: np.ndarray, positions: np.ndarray,
+                   sq_norms: np.ndarray) -> np.ndarray:
+        """Euclidean distance matrix between query points and stored positions"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self.dimensions)
+        query_sq = np.einsum('ij,ij->i', points, points)
+        sq_distances = query_sq[:, None] + sq_norms[None, :] - 2.0 * (points @ positions.T)
+        np.maximum(sq_distances, 0.0, out=sq_distances)
+        return np.sqrt(sq_distances)
+
+    def deposit_distances(self, points: np.ndarray) -> np.ndarray:
+        """Distances from each query point to every live deposit"""
+        n = self._count
+        return self._distances(points, self._positions[:n], self._sq_norms[:n])
 
     def sense(self, position: np.ndarray, radius: float = 0.5,
               pheromone_type: Optional[str] = None) -> List[Dict]:
         """Sense pheromone near a position"""
-        sensed = []
-
-        for deposit in self.deposits:
-            if pheromone_type and deposit['type'] != pheromone_type:
-                continue
-
-            distance = np.linalg.norm(position - deposit['position'])
-            if distance < radius:
+        return self.sense_many(np.asarray(position)[None, :], radius, pheromone_type)[0]
+
+    def sense_many(self, positions: np.ndarray, radius: float = 0.5,
+                   pheromone_type: Optional[str] = None) -> List[List[Dict]]:
+        """Sense pheromone near each of a batch of positions"""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, self.dimensions)
+        within = self._within(positions, radius, pheromone_type)
+        if within is None:
+            return [[] for _ in range(len(positions))]
+        mask, distances = within
+
+        sensed: List[List[Dict]] = []
+        for i, position in enumerate(positions):
+            hits = np.flatnonzero(mask[i])
+            entries = []
+            for j, distance in zip(hits.tolist(), distances[i, hits].tolist()):
+                deposit_position = self._positions[j].copy()
                 # Strength decays with distance
-                effective_strength = deposit['strength'] * (1 - distance / radius)
-                sensed.append({
-                    'position': deposit['position'],
-                    'strength': effective_strength,
-                    'type': deposit['type'],
-                    'direction': (deposit['position'] - position) / (distance + 0.001)
+                entries.append({
+                    'position': deposit_position,
+                    'strength': float(self._strengths[j]) * (1 - distance / radius),
+                    'type': self._type_names[self._types[j]],
+                    'direction': (deposit_position - position) / (distance + 0.001)
                 })
-
+            sensed.append(entries)
         return sensed
 
+    def sense_counts(self, positions: np.ndarray, radius: float = 0.5,
+                     pheromone_type: Optional[str] = None) -> np.ndarray:
+        """Number of deposits within radius of each position"""
+        positions = np.asarray(positions).reshape(-1, self.dimensions)
+        within = self._within(positions, radius, pheromone_type)
+        if within is None:
+            return np.zeros(len(positions), dtype=np.int64)
+        return within[0].sum(axis=1)
+
+    def _within(self, positions: np.ndarray, radius: float,
+                pheromone_type: Optional[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self._count == 0:
+            return None
+        distances = self.deposit_distances(positions)
+        mask = distances < radius
+        if pheromone_type:
+            code = self._type_codes.get(pheromone_type)
+            if code is None:
+                return None
+            mask &= (self._types[:self._count] == code)[None, :]
+        return mask, distances
+
     def get_gradient(self, position: np.ndarray,
                      pheromone_type: str = "default") -> np.ndarray:
         """Get pheromone gradient at position"""
-        gradient = np.zeros(self.dimensions)
+        return self.get_gradients(np.asarray(position)[None, :], [pheromone_type])[0]
 
-        for deposit in self.deposits:
-            if deposit['type'] != pheromone_type:
-                continue
+    def get_gradients(self, positions: np.ndarray,
+                      pheromone_types: List[str]) -> np.ndarray:
+        """
+        Gradients for a batch of positions, each toward its own pheromone type.
+        Each deposit contributes strength / d² along the unit direction to it,
+        i.e. weight strength / d³ on (deposit - position).
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, self.dimensions)
+        gradients = np.zeros_like(positions)
+        if self._count == 0:
+            return gradients
 
-            direction = deposit['position'] - position
-            distance = np.linalg.norm(direction) + 0.001
+        codes = np.array([self._type_codes.get(t, -1) for t in pheromone_types])
+        match = self._types[:self._count][None, :] == codes[:, None]
+        if not match.any():
+            return gradients
 
-            # Gradient contribution
-            contribution = deposit['strength'] / (distance ** 2)
-            gradient += contribution * (direction / distance)
+        distances = self.deposit_distances(positions) + 0.001
+        weights = np.where(match, self._strengths[:self._count][None, :] / distances ** 3, 0.0)
+        gradients = weights @ self._positions[:self._count] - weights.sum(axis=1)[:, None] * positions
 
         # Normalize
-        norm = np.linalg.norm(gradient)
-        if norm > 0:
-            gradient = gradient / norm
-
-        return gradient
+        norms = np.linalg.norm(gradients, axis=1, keepdims=True)
+        np.divide(gradients, norms, out=gradients, where=norms > 0)
+        return gradients
 
+    @_journaled
     def post_message(self, message: SwarmMessage) -> None:
         """Post a message to the stigmergic message board"""
         self.message_board.append(message)
+        position = np.asarray(message.position, dtype=np.float64).reshape(1, self.dimensions)
+        self._message_positions = np.vstack([self._message_positions, position])
+        self._message_types = np.append(self._message_types, self._type_code(message.message_type))
+        self._message_ttl = np.append(self._message_ttl, message.ttl)
+        self._message_strengths = np.append(self._message_strengths, message.strength)
 
     def read_messages(self, position: np.ndarray,
                       radius: float = 1.0,
                       message_type: Optional[str] = None) -> List[SwarmMessage]:
         """Read messages near a position"""
-        messages = []
-
-        for msg in self.message_board:
-            if message_type and msg.message_type != message_type:
-                continue
-
-            distance = np.linalg.norm(position - msg.position)
-            if distance < radius:
-                messages.append(msg)
-
-        return messages
+        return self.read_messages_many(np.asarray(position)[None, :], radius, message_type)[0]
+
+    def read_messages_many(self, positions: np.ndarray,
+                           radius: float = 1.0,
+                           message_type: Optional[str] = None) -> List[List[SwarmMessage]]:
+        """Read messages near each of a batch of positions"""
+        mask = self.message_mask(positions, radius, message_type)
+
+        for j in np.flatnonzero(mask.any(axis=0)).tolist():
+            message = self.message_board[j]
+            message.ttl = int(self._message_ttl[j])
+            message.strength = float(self._message_strengths[j])
+        return [[self.message_board[j] for j in np.flatnonzero(row).tolist()] for row in mask]
+
+    def message_mask(self, positions: np.ndarray,
+                     radius: float = 1.0,
+                     message_type: Optional[str] = None) -> np.ndarray:
+        """Boolean (positions x message_board) matrix of messages within radius"""
+        positions = np.asarray(positions).reshape(-1, self.dimensions)
+        if not self.message_board:
+            return np.zeros((len(positions), 0), dtype=bool)
+
+        message_positions = self._message_positions
+        sq_norms = np.einsum('ij,ij->i', message_positions, message_positions)
+        mask = self._distances(positions, message_positions, sq_norms) < radius
+        if message_type:
+            mask &= self.message_type_mask(message_type)[None, :]
+        return mask
+
+    def message_type_mask(self, message_type: str) -> np.ndarray:
+        """Which messages on the board have the given type"""
+        return self._message_types == self._type_codes.get(message_type, -1)
+
+    def message_pull(self, positions: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Sum over the masked messages of strength * (message position - position),
+        one row per position.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, self.dimensions)
+        weights = mask * self._message_strengths[None, :]
+        return weights @ self._message_positions - weights.sum(axis=1)[:, None] * positions
 
-    def evaporate(self) -> None:
+    @_journaled
+    def evaporate(self, rate: Optional[float] = None) -> None:
         """Apply evaporation to all pheromones"""
-        for deposit in self.deposits:
-            deposit['strength'] *= (1 - self.evaporation_rate)
+        rate = self.evaporation_rate if rate is None else rate
+        n = self._count
+        self._strengths[:n] *= (1 - rate)
 
         # Remove weak deposits
-        self.deposits = [d for d in self.deposits if d['strength'] > 0.01]
+        keep = np.flatnonzero(self._strengths[:n] > self.MIN_STRENGTH)
+        if len(keep) < n:
+            k = len(keep)
+            self._positions[:k] = self._positions[keep]
+            self._sq_norms[:k] = self._sq_norms[keep]
+            self._strengths[:k] = self._strengths[keep]
+            self._types[:k] = self._types[keep]
+            self._timestamps[:k] = self._timestamps[keep]
+            self._count = k
+
+        if not self.message_board:
+            return
 
         # Age messages
-        for msg in self.message_board:
-            msg.ttl -= 1
-            msg.strength *= 0.95
+        self._message_ttl -= 1
+        self._message_strengths *= 0.95
 
         # Remove expired messages
-        self.message_board = [m for m in self.message_board if m.ttl > 0]
-
+        alive = self._message_ttl > 0
+        if not alive.all():
+            self.message_board = [m for m, a in zip(self.message_board, alive.tolist()) if a]
+            self._message_positions = self._message_positions[alive]
+            self._message_types = self._message_types[alive]
+            self._message_ttl = self._message_ttl[alive]
+            self._message_strengths = self._message_strengths[alive]
+        for message, ttl, strength in zip(self.message_board, self._message_ttl.tolist(),
+                                          self._message_strengths.tolist()):
+            message.ttl = ttl
+            message.strength = strength
+
+    @_journaled
     def diffuse(self) -> None:
         """Apply diffusion to spread pheromones"""
         # Simplified diffusion - spread strength to nearby space
-        for deposit in self.deposits:
-            noise = np.random.randn(self.dimensions) * self.diffusion_rate
-            deposit['position'] += noise
-            deposit['strength'] *= 0.99  # Small decay from diffusion
+        n = self._count
+        if n == 0:
+            return
+        positions = self._positions[:n]
+        positions += (self.rng.standard_normal((n, self.dimensions)) * self.diffusion_rate)
+        self._sq_norms[:n] = np.einsum('ij,ij->i', positions, positions)
+        self._strengths[:n] *= 0.99  # Small decay from diffusion
 
 
 # =============================================================================
 # SWARM ALGORITHMS
 # =============================================================================
 
+class CosineFitness:
+    """
+    Fitness as cosine similarity between a position and a target embedding,
+    optionally rescaled from [-1, 1] to [0, 1].
+    Picklable, so swarm_think can run in a worker process, and evaluates a
+    whole swarm at once through batch().
+    """
+
+    def __init__(self, target: np.ndarray, rescale: bool = True):
+        self.target = np.asarray(target, dtype=np.float64)
+        self.rescale = rescale
+
+    def batch(self, positions: np.ndarray) -> np.ndarray:
+        positions = np.atleast_2d(positions)
+        norms = np.linalg.norm(positions, axis=1, keepdims=True)
+        similarity = (positions / (norms + 0.001)) @ self.target
+        return (similarity + 1) / 2 if self.rescale else similarity
+
+    def __call__(self, position: np.ndarray) -> float:
+        return float(self.batch(position)[0])
+
+
+def evaluate_fitness(fitness_fn: Callable[[np.ndarray], float],
+                     positions: np.ndarray) -> np.ndarray:
+    """Fitness of each row of positions, batched when fitness_fn supports it"""
+    batch = getattr(fitness_fn, 'batch', None)
+    if batch is not None:
+        return np.asarray(batch(positions), dtype=np.float64)
+    return np.array([fitness_fn(position) for position in positions], dtype=np.float64)
+
+
+def clamp_speed(velocities: np.ndarray, max_speed: float = 1.0) -> np.ndarray:
+    """Scale down rows of velocities that are faster than max_speed"""
+    speeds = np.linalg.norm(velocities, axis=1, keepdims=True)
+    return velocities / np.maximum(speeds, max_speed) * max_speed
+
+
 class ParticleSwarmOptimizer:
     """
     Particle Swarm Optimization for collective intelligence.
+    Particle state is held in (n_particles, dimensions) arrays.
     """
 
-    def __init__(self, n_particles: int = 64, dimensions: int = 128):
+    def __init__(self, n_particles: int = 64, dimensions: int = 128,
+                 rng: Optional[np.random.Generator] = None):
         self.n_particles = n_particles
         self.dimensions = dimensions
+        self.rng = rng if rng is not None else np.random.default_rng()
 
         # PSO parameters
         self.w = 0.7      # Inertia weight
@@ -246,7 +525,11 @@ class ParticleSwarmOptimizer:
         self.c2 = 1.5     # Social (global best) weight
 
         # Swarm state
-        self.particles: List[SwarmAgent] = []
+        self.positions = np.zeros((n_particles, dimensions))
+        self.velocities = np.zeros((n_particles, dimensions))
+        self.personal_best = np.zeros((n_particles, dimensions))
+        self.personal_best_fitness = np.full(n_particles, float('-inf'))
+        self.roles: List[AgentRole] = []
         self.global_best: Optional[np.ndarray] = None
         self.global_best_fitness: float = float('-inf')
 
@@ -258,75 +541,58 @@ class ParticleSwarmOptimizer:
 
         for i in range(self.n_particles):
             # Random initial position and velocity
-            position = np.random.randn(self.dimensions)
-            velocity = np.random.randn(self.dimensions) * 0.1
+            self.positions[i] = self.rng.standard_normal(self.dimensions)
+            self.velocities[i] = self.rng.standard_normal(self.dimensions) * 0.1
 
             # Assign role based on index for diversity
-            role = roles[i % len(roles)]
+            self.roles.append(roles[i % len(roles)])
 
-            agent = SwarmAgent(
-                id=f"particle_{i}",
-                role=role,
-                position=position,
-                velocity=velocity
-            )
-            self.particles.append(agent)
+        self.personal_best = self.positions.copy()
 
     def step(self, fitness_fn: Callable[[np.ndarray], float]) -> None:
         """Perform one PSO iteration"""
-        for particle in self.particles:
-            # Evaluate fitness
-            fitness = fitness_fn(particle.position)
+        # Evaluate fitness
+        fitness = evaluate_fitness(fitness_fn, self.positions)
 
-            # Update personal best
-            if fitness > particle.personal_best_fitness:
-                particle.personal_best = particle.position.copy()
-                particle.personal_best_fitness = fitness
+        # Update personal best
+        improved = fitness > self.personal_best_fitness
+        self.personal_best[improved] = self.positions[improved]
+        self.personal_best_fitness[improved] = fitness[improved]
 
-            # Update global best
-            if fitness > self.global_best_fitness:
-                self.global_best = particle.position.copy()
-                self.global_best_fitness = fitness
+        # Update global best
+        best = int(np.argmax(fitness))
+        if fitness[best] > self.global_best_fitness:
+            self.global_best = self.positions[best].copy()
+            self.global_best_fitness = float(fitness[best])
 
         # Update velocities and positions
-        for particle in self.particles:
-            r1, r2 = np.random.random(2)
-
-            cognitive = self.c1 * r1 * (particle.personal_best - particle.position)
-            social = self.c2 * r2 * (self.global_best - particle.position)
+        r = self.rng.random((self.n_particles, 2))
+        cognitive = self.c1 * r[:, :1] * (self.personal_best - self.positions)
+        social = self.c2 * r[:, 1:] * (self.global_best - self.positions)
 
-            particle.velocity = (self.w * particle.velocity +
-                                cognitive + social)
+        # Velocity clamping
+        self.velocities = clamp_speed(self.w * self.velocities + cognitive + social)
 
-            # Velocity clamping
-            max_velocity = 1.0
-            velocity_magnitude = np.linalg.norm(particle.velocity)
-            if velocity_magnitude > max_velocity:
-                particle.velocity = particle.velocity / velocity_magnitude * max_velocity
-
-            particle.position += particle.velocity
+        self.positions += self.velocities
 
     def get_consensus(self) -> np.ndarray:
         """Get swarm consensus (weighted average of positions)"""
-        weights = np.array([p.personal_best_fitness for p in self.particles])
-        weights = np.maximum(weights, 0)  # Non-negative
+        weights = np.maximum(self.personal_best_fitness, 0)  # Non-negative
         weights = weights / (weights.sum() + 0.001)
-
-        consensus = np.zeros(self.dimensions)
-        for w, p in zip(weights, self.particles):
-            consensus += w * p.personal_best
-
-        return consensus
+        return weights @ self.personal_best
 
 
 class AntColonyOptimizer:
     """
     Ant Colony Optimization for path finding in solution space.
+    All ants build their tours together, one node per step.
     """
 
-    def __init__(self, n_ants: int = 32, n_nodes: int = 50):
+    def __init__(self, n_ants: int = 32, n_nodes: int = 50,
+                 rng: Optional[np.random.Generator] = None):
         self.n_ants = n_ants
         self.n_nodes = n_nodes
+        self.rng = rng if rng is not None else np.random.default_rng()
 
         # ACO parameters
         self.alpha = 1.0    # Pheromone importance
@@ -338,7 +604,7 @@ class AntColonyOptimizer:
         self.pheromones = np.ones((n_nodes, n_nodes))
 
         # Heuristic information (inverse distance)
-        self.heuristic = np.random.rand(n_nodes, n_nodes) + 0.1
+        self.heuristic = self.rng.random((n_nodes, n_nodes)) + 0.1
 
         # Solution paths
         self.best_path: List[int] = []
@@ -346,69 +612,59 @@ class AntColonyOptimizer:
 
     def step(self, cost_fn: Callable[[List[int]], float]) -> List[int]:
         """Perform one ACO iteration"""
-        all_paths = []
-        all_costs = []
-
-        for _ in range(self.n_ants):
-            path = self._construct_path()
-            cost = cost_fn(path)
-
-            all_paths.append(path)
-            all_costs.append(cost)
+        paths = self._construct_paths()
+        all_paths = paths.tolist()
+        all_costs = [cost_fn(path) for path in all_paths]
 
+        for path, cost in zip(all_paths, all_costs):
             if cost < self.best_path_length:
-                self.best_path = path.copy()
+                self.best_path = path
                 self.best_path_length = cost
 
         # Evaporate pheromones
         self.pheromones *= (1 - self.rho)
 
-        # Deposit pheromones
-        for path, cost in zip(all_paths, all_costs):
-            deposit = self.Q / (cost + 0.001)
-            for i in range(len(path) - 1):
-                self.pheromones[path[i], path[i+1]] += deposit
+        # Deposit pheromones along every ant's tour
+        deposits = self.Q / (np.asarray(all_costs, dtype=np.float64) + 0.001)
+        np.add.at(self.pheromones, (paths[:, :-1], paths[:, 1:]),
+                  np.repeat(deposits[:, None], self.n_nodes - 1, axis=1))
 
         return self.best_path
 
-    def _construct_path(self) -> List[int]:
-        """Construct a path using probabilistic selection"""
-        visited = set()
-        current = np.random.randint(self.n_nodes)
-        path = [current]
-        visited.add(current)
+    def _construct_paths(self) -> np.ndarray:
+        """Construct one tour per ant (n_ants, n_nodes) using probabilistic selection"""
+        ants = np.arange(self.n_ants)
+        weights = self._attractiveness()
 
-        while len(visited) < self.n_nodes:
-            probabilities = self._calculate_probabilities(current, visited)
+        paths = np.empty((self.n_ants, self.n_nodes), dtype=np.int64)
+        unvisited = np.ones((self.n_ants, self.n_nodes), dtype=bool)
+        current = self.rng.integers(self.n_nodes, size=self.n_ants)
+        paths[:, 0] = current
+        unvisited[ants, current] = False
 
-            if probabilities.sum() == 0:
-                # No valid moves - go to random unvisited
-                unvisited = list(set(range(self.n_nodes)) - visited)
-                if not unvisited:
-                    break
-                next_node = np.random.choice(unvisited)
-            else:
-                probabilities /= probabilities.sum()
-                next_node = np.random.choice(self.n_nodes, p=probabilities)
+        # uniform draws in (0, 1] so a zero-probability node is never picked
+        draws = 1.0 - self.rng.random((self.n_nodes - 1, self.n_ants))
 
-            path.append(next_node)
-            visited.add(next_node)
-            current = next_node
+        for step in range(1, self.n_nodes):
+            probabilities = weights[current] * unvisited
 
-        return path
+            # No valid moves - go to random unvisited
+            stuck = probabilities.sum(axis=1) <= 0
+            if stuck.any():
+                probabilities[stuck] = unvisited[stuck]
 
-    def _calculate_probabilities(self, current: int,
-                                  visited: Set[int]) -> np.ndarray:
-        """Calculate selection probabilities for next node"""
-        probabilities = np.zeros(self.n_nodes)
+            cdf = np.cumsum(probabilities, axis=1)
+            thresholds = draws[step - 1] * cdf[:, -1]
+            current = (cdf < thresholds[:, None]).sum(axis=1)
 
-        for j in range(self.n_nodes):
-            if j not in visited:
-                pheromone = self.pheromones[current, j] ** self.alpha
-                heuristic = self.heuristic[current, j] ** self.beta
-                probabilities[j] = pheromone * heuristic
+            paths[:, step] = current
+            unvisited[ants, current] = False
 
-        return probabilities
+        return paths
+
+    def _attractiveness(self) -> np.ndarray:
+        """Unnormalized selection weight of every edge"""
+        return self.pheromones ** self.alpha * self.heuristic ** self.beta
 
 
 class BoidFlocking:
@@ -417,9 +673,11 @@ class BoidFlocking:
     Agents flock toward promising solution regions.
     """
 
-    def __init__(self, n_boids: int = 64, dimensions: int = 128):
+    def __init__(self, n_boids: int = 64, dimensions: int = 128,
+                 rng: Optional[np.random.Generator] = None):
         self.n_boids = n_boids
         self.dimensions = dimensions
+        self.rng = rng if rng is not None else np.random.default_rng()
 
         # Flocking parameters
         self.separation_weight = 1.5
@@ -431,8 +689,8 @@ class BoidFlocking:
         self.perception_radius = 2.0
 
         # Boids
-        self.positions = np.random.randn(n_boids, dimensions)
-        self.velocities = np.random.randn(n_boids, dimensions) * 0.1
+        self.positions = self.rng.standard_normal((n_boids, dimensions))
+        self.velocities = self.rng.standard_normal((n_boids, dimensions)) * 0.1
 
         # Goal (attractor)
         self.goal: Optional[np.ndarray] = None
@@ -443,60 +701,46 @@ class BoidFlocking:
 
     def step(self) -> None:
         """Perform one flocking step"""
-        accelerations = np.zeros_like(self.velocities)
-
-        for i in range(self.n_boids):
-            # Find neighbors
-            distances = np.linalg.norm(self.positions - self.positions[i], axis=1)
-            neighbors = np.where((distances > 0) &
-                                 (distances < self.perception_radius))[0]
-
-            if len(neighbors) > 0:
-                # Separation: avoid crowding
-                separation = np.zeros(self.dimensions)
-                for j in neighbors:
-                    diff = self.positions[i] - self.positions[j]
-                    dist = np.linalg.norm(diff) + 0.001
-                    separation += diff / dist
-                separation /= len(neighbors)
-
-                # Alignment: match velocity
-                alignment = self.velocities[neighbors].mean(axis=0)
-
-                # Cohesion: move toward center
-                center = self.positions[neighbors].mean(axis=0)
-                cohesion = center - self.positions[i]
-            else:
-                separation = np.zeros(self.dimensions)
-                alignment = np.zeros(self.dimensions)
-                cohesion = np.zeros(self.dimensions)
-
-            # Goal seeking
-            if self.goal is not None:
-                goal_direction = self.goal - self.positions[i]
-                goal_direction = goal_direction / (np.linalg.norm(goal_direction) + 0.001)
-            else:
-                goal_direction = np.zeros(self.dimensions)
-
-            # Combine forces
-            acceleration = (
-                self.separation_weight * separation +
-                self.alignment_weight * alignment +
-                self.cohesion_weight * cohesion +
-                self.goal_weight * goal_direction
-            )
-
-            accelerations[i] = acceleration
+        positions = self.positions
+
+        # Find neighbors from the pairwise distance matrix
+        distances = pairwise_distances(positions)
+        neighbors = (distances > 0) & (distances < self.perception_radius)
+        np.fill_diagonal(neighbors, False)
+        counts = neighbors.sum(axis=1, keepdims=True)
+        has_neighbors = counts > 0
+        counts = np.maximum(counts, 1)
+
+        # Separation: avoid crowding, sum of unit-ish vectors away from neighbors
+        inverse = np.where(neighbors, 1.0 / (distances + 0.001), 0.0)
+        separation = (inverse.sum(axis=1, keepdims=True) * positions - inverse @ positions) / counts
+
+        # Alignment: match velocity
+        alignment = (neighbors @ self.velocities) / counts
+
+        # Cohesion: move toward center
+        cohesion = np.where(has_neighbors, (neighbors @ positions) / counts - positions, 0.0)
+
+        # Goal seeking
+        if self.goal is not None:
+            goal_direction = self.goal - positions
+            goal_direction = goal_direction / (np.linalg.norm(goal_direction, axis=1, keepdims=True) + 0.001)
+        else:
+            goal_direction = np.zeros_like(positions)
+
+        # Combine forces
+        accelerations = (
+            self.separation_weight * separation +
+            self.alignment_weight * alignment +
+            self.cohesion_weight * cohesion +
+            self.goal_weight * goal_direction
+        )
 
         # Update velocities and positions
         self.velocities += accelerations * 0.1
 
         # Velocity limiting
-        speeds = np.linalg.norm(self.velocities, axis=1, keepdims=True)
-        max_speed = 1.0
-        self.velocities = np.where(speeds > max_speed,
-                                    self.velocities / speeds * max_speed,
-                                    self.velocities)
+        self.velocities = clamp_speed(self.velocities)
 
         self.positions += self.velocities
 
@@ -511,6 +755,14 @@ class BoidFlocking:
         return distances.mean()
 
 
+def pairwise_distances(positions: np.ndarray) -> np.ndarray:
+    """Euclidean distance matrix between the rows of positions"""
+    sq_norms = np.einsum('ij,ij->i', positions, positions)
+    sq_distances = sq_norms[:, None] + sq_norms[None, :] - 2.0 * (positions @ positions.T)
+    np.maximum(sq_distances, 0.0, out=sq_distances)
+    return np.sqrt(sq_distances)
+
+
 # =============================================================================
 # SWARM SUPERINTELLIGENCE ENGINE
 # =============================================================================
@@ -519,22 +771,47 @@ class SwarmSuperintelligence:
     """
     Complete Swarm Superintelligence Engine.
     Orchestrates 64 specialized agents with stigmergic coordination.
+
+    Agent state lives in arrays indexed by agent (positions, velocities,
+    personal bests, ...); SwarmAgent objects are snapshots built on demand.
+    swarm_think runs its iterations in a worker process in small batches,
+    so it does not block the event loop and can be cancelled between
+    batches. The worker runs on a snapshot of the swarm and only the state
+    the iterations own (ITERATION_STATE) is taken back; changes made to the
+    pheromone field meanwhile are replayed on top of it. All randomness
+    comes from the swarm's own generator, so a seeded swarm gives the same
+    results in a worker as in-process.
     """
 
     MAX_AGENTS = 64
-
-    def __init__(self, dimensions: int = 128):
+    ITERATIONS_PER_TASK = 5  # iterations per worker round trip
+
+    # attributes run_iterations changes, copied back from the worker
+    ITERATION_STATE = (
+        'rng', 'pheromone_field', 'pso', 'aco', 'boids',
+        'positions', 'velocities', 'personal_best', 'personal_best_fitness',
+        'energy', 'completed', 'messages_sent', 'messages_received', 'discoveries',
+        'iteration', 'convergence_history', 'emergent_patterns', 'consensus_solutions',
+    )
+
+    def __init__(self, dimensions: int = 128, offload: bool = True,
+                 seed: Optional[int] = None):
         self.dimensions = dimensions
+        self.offload = offload
+        self.rng = np.random.default_rng(seed)
 
-        # Core components
-        self.pheromone_field = PheromoneField(dimensions=dimensions)
-        self.pso = ParticleSwarmOptimizer(n_particles=32, dimensions=dimensions)
-        self.aco = AntColonyOptimizer(n_ants=16, n_nodes=50)
-        self.boids = BoidFlocking(n_boids=16, dimensions=dimensions)
+        # Core components, sharing the swarm's generator
+        self.pheromone_field = PheromoneField(dimensions=dimensions, rng=self.rng)
+        self.pso = ParticleSwarmOptimizer(n_particles=32, dimensions=dimensions, rng=self.rng)
+        self.aco = AntColonyOptimizer(n_ants=16, n_nodes=50, rng=self.rng)
+        self.boids = BoidFlocking(n_boids=16, dimensions=dimensions, rng=self.rng)
 
         # Agent registry
-        self.agents: Dict[str, SwarmAgent] = {}
+        self.agent_ids: List[str] = []
+        self.roles: List[AgentRole] = []
         self.role_distribution: Dict[AgentRole, List[str]] = defaultdict(list)
+        self.specialization_scores: List[Dict[str, float]] = []
+        self.discoveries: List[List[Dict]] = []
 
         # Collective knowledge
         self.collective_memory: List[Dict] = []
@@ -545,249 +822,332 @@ class SwarmSuperintelligence:
         self.iteration = 0
         self.convergence_history: List[float] = []
 
+        self._lock = asyncio.Lock()
+
         self._initialize_agents()
 
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = asyncio.Lock()
+
     def _initialize_agents(self) -> None:
         """Initialize the swarm with specialized agents"""
         roles = list(AgentRole)
         agents_per_role = self.MAX_AGENTS // len(roles)
 
+        self.positions = np.zeros((self.MAX_AGENTS, self.dimensions))
+        self.velocities = np.zeros((self.MAX_AGENTS, self.dimensions))
+
         agent_count = 0
         for role in roles:
             for i in range(agents_per_role):
                 if agent_count >= self.MAX_AGENTS:
                     break
 
-                position = np.random.randn(self.dimensions)
-                velocity = np.random.randn(self.dimensions) * 0.1
-
-                agent = SwarmAgent(
-                    id=f"{role.value}_{i}",
-                    role=role,
-                    position=position,
-                    velocity=velocity
-                )
-
                 # Set role-specific specialization
-                agent.specialization_score = {
+                self._add_agent(f"{role.value}_{i}", role, {
                     'exploration': 0.8 if role in [AgentRole.EXPLORER, AgentRole.SCOUT] else 0.3,
                     'exploitation': 0.8 if role in [AgentRole.EXPLOITER, AgentRole.ANALYST] else 0.3,
                     'synthesis': 0.8 if role == AgentRole.SYNTHESIZER else 0.3,
                     'criticism': 0.8 if role in [AgentRole.CRITIC, AgentRole.DEVIL_ADVOCATE] else 0.3
-                }
-
-                self.agents[agent.id] = agent
-                self.role_distribution[role].append(agent.id)
+                })
                 agent_count += 1
 
         # Ensure we have all 64
         while agent_count < self.MAX_AGENTS:
             role = roles[agent_count % len(roles)]
-            position = np.random.randn(self.dimensions)
-            velocity = np.random.randn(self.dimensions) * 0.1
-
-            agent = SwarmAgent(
-                id=f"extra_{agent_count}",
-                role=role,
-                position=position,
-                velocity=velocity
-            )
-
-            self.agents[agent.id] = agent
-            self.role_distribution[role].append(agent.id)
+            self._add_agent(f"extra_{agent_count}", role, {})
             agent_count += 1
 
+        n = self.MAX_AGENTS
+        self.personal_best = self.positions.copy()
+        self.personal_best_fitness = np.full(n, float('-inf'))
+        self.energy = np.ones(n)
+        self.completed = np.zeros(n, dtype=bool)
+        self.messages_sent = np.zeros(n, dtype=np.int64)
+        self.messages_received = np.zeros(n, dtype=np.int64)
+        self.role_values = [role.value for role in self.roles]
+
+        # Role-specific response to the pheromone gradient
+        self.gradient_response = np.array([
+            -0.1 if role in [AgentRole.EXPLORER, AgentRole.SCOUT] else   # Explorers avoid strong trails
+            0.3 if role in [AgentRole.EXPLOITER, AgentRole.ANALYST] else  # Exploiters follow trails
+            -0.5 if role == AgentRole.DEVIL_ADVOCATE else                 # Contrarians go opposite
+            0.1                                                           # Others follow moderately
+            for role in self.roles
+        ])
+        self.is_explorer = np.array([role in [AgentRole.EXPLORER, AgentRole.SCOUT] for role in self.roles])
+        self.is_exploiter = np.array([role == AgentRole.EXPLOITER for role in self.roles])
+
+    def _add_agent(self, agent_id: str, role: AgentRole,
+                   specialization_score: Dict[str, float]) -> None:
+        index = len(self.agent_ids)
+        self.positions[index] = self.rng.standard_normal(self.dimensions)
+        self.velocities[index] = self.rng.standard_normal(self.dimensions) * 0.1
+
+        self.agent_ids.append(agent_id)
+        self.roles.append(role)
+        self.specialization_scores.append(specialization_score)
+        self.discoveries.append([])
+        self.role_distribution[role].append(agent_id)
+
+    def _agent(self, index: int) -> SwarmAgent:
+        """Snapshot of one agent's state"""
+        return SwarmAgent(
+            id=self.agent_ids[index],
+            role=self.roles[index],
+            position=self.positions[index].copy(),
+            velocity=self.velocities[index].copy(),
+            personal_best=self.personal_best[index].copy(),
+            personal_best_fitness=float(self.personal_best_fitness[index]),
+            state=AgentState.COMPLETED if self.completed[index] else AgentState.IDLE,
+            discoveries=self.discoveries[index],
+            messages_sent=int(self.messages_sent[index]),
+            messages_received=int(self.messages_received[index]),
+            energy=float(self.energy[index]),
+            specialization_score=self.specialization_scores[index]
+        )
+
+    @property
+    def agents(self) -> Dict[str, SwarmAgent]:
+        """Snapshots of all agents by id"""
+        return {agent_id: self._agent(i) for i, agent_id in enumerate(self.agent_ids)}
+
     async def swarm_think(self, task_embedding: np.ndarray,
                           fitness_fn: Callable[[np.ndarray], float],
-                          n_iterations: int = 50) -> Dict[str, Any]:
+                          n_iterations: int = 50,
+                          time_budget: Optional[float] = None) -> Dict[str, Any]:
         """
         Collective thinking through swarm intelligence.
         Returns consensus solution and emergent insights.
+
+        Runs up to n_iterations, stopping early once time_budget seconds
+        have passed. Iterations run in a worker process when offload is set
+        and fitness_fn can be pickled (e.g. CosineFitness), otherwise on the
+        calling thread, yielding to the event loop between batches.
         """
         result = {
-            'iterations': n_iterations,
+            'iterations': 0,
             'solutions': [],
             'emergent_patterns': [],
             'convergence': [],
             'role_contributions': {}
         }
+        deadline = time.time() + time_budget if time_budget is not None else None
+        offload = self.offload and _is_picklable(fitness_fn)
+
+        # one run at a time per swarm
+        async with self._lock:
+            # Set goal for boids
+            self.boids.set_goal(task_embedding)
+
+            for start in range(0, n_iterations, self.ITERATIONS_PER_TASK):
+                stop = min(start + self.ITERATIONS_PER_TASK, n_iterations)
+                if deadline is not None and time.time() >= deadline:
+                    break
+
+                if offload:
+                    partial = await self._run_in_worker(fitness_fn, start, stop, deadline)
+                else:
+                    partial = self.run_iterations(fitness_fn, start, stop, deadline)
+                    await asyncio.sleep(0)
+
+                for key in ('solutions', 'emergent_patterns', 'convergence'):
+                    result[key].extend(partial[key])
+                result['iterations'] += partial['iterations']
+                if partial['iterations'] < stop - start:
+                    break
+
+            # Final consensus
+            final_consensus = self._compute_consensus()
+            result['final_consensus'] = final_consensus.tolist()
+            result['final_fitness'] = fitness_fn(final_consensus)
 
-        # Set goal for boids
-        self.boids.set_goal(task_embedding)
+            # Role contributions
+            result['role_contributions'] = self._analyze_role_contributions()
 
-        for iteration in range(n_iterations):
+        return result
+
+    async def _run_in_worker(self, fitness_fn: Callable[[np.ndarray], float],
+                             start: int, stop: int,
+                             deadline: Optional[float]) -> Dict[str, Any]:
+        """Run iterations [start, stop) on a snapshot of the swarm in a worker and adopt its state"""
+        loop = asyncio.get_running_loop()
+        # pickled here rather than by the pool's feeder thread, so the
+        # snapshot and the journal start at the same point
+        snapshot = pickle.dumps(self)
+        self.pheromone_field.start_journal()
+        try:
+            state, partial = await loop.run_in_executor(
+                process_pool.get_pool(), _run_iterations_in_worker,
+                snapshot, fitness_fn, start, stop, deadline
+            )
+        finally:
+            journal = self.pheromone_field.stop_journal()
+        self.__dict__.update(state)
+        # deposits, evaporation etc. made by others while the worker ran
+        self.pheromone_field.replay(journal)
+        return partial
+
+    def run_iterations(self, fitness_fn: Callable[[np.ndarray], float],
+                       start: int, stop: int,
+                       deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Run iterations [start, stop) synchronously, stopping at the deadline"""
+        partial = {'iterations': 0, 'solutions': [], 'emergent_patterns': [], 'convergence': []}
+
+        for iteration in range(start, stop):
+            if deadline is not None and time.time() >= deadline:
+                break
             self.iteration = iteration
 
             # Phase 1: PSO update
             self.pso.step(fitness_fn)
 
             # Phase 2: ACO path finding
-            def path_cost(path):
-                return len(path) / 10  # Simple cost
-            self.aco.step(path_cost)
+            self.aco.step(_path_cost)
 
             # Phase 3: Boid flocking
             self.boids.step()
 
             # Phase 4: Pheromone updates
-            await self._update_pheromones(fitness_fn)
+            self._update_pheromones(fitness_fn)
 
             # Phase 5: Agent communication
-            await self._agent_communication()
+            self._agent_communication()
 
             # Phase 6: Emergent pattern detection
             patterns = self._detect_emergent_patterns()
             if patterns:
-                result['emergent_patterns'].extend(patterns)
+                partial['emergent_patterns'].extend(patterns)
 
             # Track convergence
             spread = self.boids.get_flock_spread()
             self.convergence_history.append(spread)
-            result['convergence'].append(spread)
+            partial['convergence'].append(spread)
 
             # Collect solutions
             if iteration % 10 == 0:
                 consensus = self._compute_consensus()
-                result['solutions'].append({
+                partial['solutions'].append({
                     'iteration': iteration,
                     'consensus': consensus.tolist(),
                     'fitness': fitness_fn(consensus)
                 })
 
-        # Final consensus
-        final_consensus = self._compute_consensus()
-        result['final_consensus'] = final_consensus.tolist()
-        result['final_fitness'] = fitness_fn(final_consensus)
+            partial['iterations'] += 1
 
-        # Role contributions
-        result['role_contributions'] = self._analyze_role_contributions()
+        return partial
 
-        return result
-
-    async def _update_pheromones(self,
-                                  fitness_fn: Callable[[np.ndarray], float]) -> None:
+    def _update_pheromones(self, fitness_fn: Callable[[np.ndarray], float]) -> None:
         """Update pheromone field based on agent discoveries"""
-        for agent in self.agents.values():
-            if agent.state == AgentState.COMPLETED:
-                continue
-
-            # Evaluate current position
-            fitness = fitness_fn(agent.position)
-
-            # Deposit pheromone proportional to fitness
-            if fitness > 0:
-                self.pheromone_field.deposit(
-                    agent.position,
-                    strength=fitness,
-                    pheromone_type=agent.role.value
-                )
-
-            # Update personal best
-            if fitness > agent.personal_best_fitness:
-                agent.personal_best = agent.position.copy()
-                agent.personal_best_fitness = fitness
-
-                agent.discoveries.append({
-                    'iteration': self.iteration,
-                    'position': agent.position.tolist(),
-                    'fitness': fitness
-                })
+        active = ~self.completed
+
+        # Evaluate current positions
+        fitness = np.full(self.MAX_AGENTS, float('-inf'))
+        fitness[active] = evaluate_fitness(fitness_fn, self.positions[active])
+
+        # Deposit pheromone proportional to fitness
+        depositing = np.flatnonzero(active & (fitness > 0))
+        if len(depositing):
+            self.pheromone_field.deposit_many(
+                self.positions[depositing],
+                fitness[depositing],
+                [self.role_values[i] for i in depositing]
+            )
+
+        # Update personal best
+        improved = np.flatnonzero(active & (fitness > self.personal_best_fitness))
+        self.personal_best[improved] = self.positions[improved]
+        self.personal_best_fitness[improved] = fitness[improved]
+        for i in improved.tolist():
+            self.discoveries[i].append({
+                'iteration': self.iteration,
+                'position': self.positions[i].tolist(),
+                'fitness': float(fitness[i])
+            })
 
         # Evaporate
         self.pheromone_field.evaporate()
 
-    async def _agent_communication(self) -> None:
+    def _agent_communication(self) -> None:
         """Stigmergic communication between agents"""
-        for agent in self.agents.values():
-            # Sense pheromones
-            sensed = self.pheromone_field.sense(
-                agent.position,
-                radius=1.0,
-                pheromone_type=None  # Sense all types
-            )
+        pheromones = self.pheromone_field
 
-            if sensed:
-                # Move toward strongest pheromone gradient
-                gradient = self.pheromone_field.get_gradient(
-                    agent.position,
-                    pheromone_type=agent.role.value
-                )
-
-                # Role-specific behavior
-                if agent.role in [AgentRole.EXPLORER, AgentRole.SCOUT]:
-                    # Explorers avoid strong pheromone trails
-                    agent.velocity -= gradient * 0.1
-                    agent.velocity += np.random.randn(self.dimensions) * 0.2
-                elif agent.role in [AgentRole.EXPLOITER, AgentRole.ANALYST]:
-                    # Exploiters follow pheromone trails
-                    agent.velocity += gradient * 0.3
-                elif agent.role == AgentRole.DEVIL_ADVOCATE:
-                    # Contrarians go opposite direction
-                    agent.velocity -= gradient * 0.5
-                else:
-                    # Others have moderate following
-                    agent.velocity += gradient * 0.1
-
-                # Velocity limiting
-                speed = np.linalg.norm(agent.velocity)
-                if speed > 1.0:
-                    agent.velocity = agent.velocity / speed
-
-                agent.position += agent.velocity
-
-            # Read and post messages
-            messages = self.pheromone_field.read_messages(agent.position)
-
-            for msg in messages:
-                agent.messages_received += 1
-
-                # React to messages based on type
-                if msg.message_type == 'discovery':
-                    if agent.role == AgentRole.EXPLOITER:
-                        # Move toward discovery
-                        direction = msg.position - agent.position
-                        agent.velocity += direction * 0.1 * msg.strength
-
-            # Post discoveries
-            if agent.discoveries and self.iteration % 5 == 0:
-                latest = agent.discoveries[-1]
-                message = SwarmMessage(
-                    sender_id=agent.id,
+        # Sense pheromones (all types) and follow role gradients
+        sensing = np.flatnonzero(pheromones.sense_counts(self.positions, radius=1.0) > 0)
+        if len(sensing):
+            gradients = pheromones.get_gradients(
+                self.positions[sensing], [self.role_values[i] for i in sensing]
+            )
+            self.velocities[sensing] += self.gradient_response[sensing, None] * gradients
+
+            # Explorers also wander randomly
+            exploring = sensing[self.is_explorer[sensing]]
+            self.velocities[exploring] += self.rng.standard_normal((len(exploring), self.dimensions)) * 0.2
+
+            # Velocity limiting
+            self.velocities[sensing] = clamp_speed(self.velocities[sensing])
+            self.positions[sensing] += self.velocities[sensing]
+
+        # Post discoveries. Message positions only depend on where agents
+        # moved, so all posts are made up front; an agent still only reads
+        # messages posted by agents ahead of it in this round.
+        first_new = len(pheromones.message_board)
+        posters = []
+        if self.iteration % 5 == 0:
+            for i, discoveries in enumerate(self.discoveries):
+                if not discoveries:
+                    continue
+                latest = discoveries[-1]
+                pheromones.post_message(SwarmMessage(
+                    sender_id=self.agent_ids[i],
                     message_type='discovery',
                     content={'fitness': latest['fitness']},
-                    position=agent.position.copy(),
+                    position=self.positions[i].copy(),
                     strength=latest['fitness']
-                )
-                self.pheromone_field.post_message(message)
-                agent.messages_sent += 1
+                ))
+                posters.append(i)
+            self.messages_sent[posters] += 1
+
+        # Read messages
+        visible = pheromones.message_mask(self.positions)
+        if posters:
+            readers = np.arange(self.MAX_AGENTS)[:, None]
+            visible[:, first_new:] &= readers > np.array(posters)[None, :]
+        self.messages_received += visible.sum(axis=1)
+
+        # Exploiters move toward discoveries
+        exploiters = np.flatnonzero(self.is_exploiter)
+        if visible.shape[1] and len(exploiters):
+            discovery = visible[exploiters] & pheromones.message_type_mask('discovery')[None, :]
+            self.velocities[exploiters] += 0.1 * pheromones.message_pull(
+                self.positions[exploiters], discovery
+            )
 
     def _detect_emergent_patterns(self) -> List[Dict]:
         """Detect emergent patterns in swarm behavior"""
         patterns = []
 
-        # Cluster detection
-        positions = np.array([a.position for a in self.agents.values()])
-
         # Simple clustering: find dense regions
-        for i, pos in enumerate(positions):
-            distances = np.linalg.norm(positions - pos, axis=1)
-            nearby = np.sum(distances < 0.5)
-
-            if nearby > 5:  # Cluster detected
-                cluster_center = positions[distances < 0.5].mean(axis=0)
-                avg_fitness = np.mean([
-                    list(self.agents.values())[j].personal_best_fitness
-                    for j in np.where(distances < 0.5)[0]
-                ])
-
-                patterns.append({
-                    'type': 'cluster',
-                    'iteration': self.iteration,
-                    'center': cluster_center.tolist(),
-                    'size': int(nearby),
-                    'avg_fitness': float(avg_fitness)
-                })
-                break  # One cluster per iteration
+        close = pairwise_distances(self.positions) < 0.5
+        np.fill_diagonal(close, True)
+        nearby = close.sum(axis=1)
+        dense = np.flatnonzero(nearby > 5)
+
+        if len(dense):  # Cluster detected, one cluster per iteration
+            members = close[dense[0]]
+            patterns.append({
+                'type': 'cluster',
+                'iteration': self.iteration,
+                'center': self.positions[members].mean(axis=0).tolist(),
+                'size': int(nearby[dense[0]]),
+                'avg_fitness': float(np.mean(self.personal_best_fitness[members]))
+            })
 
         # Convergence pattern
         if len(self.convergence_history) > 10:
@@ -805,16 +1165,11 @@ class SwarmSuperintelligence:
     def _compute_consensus(self) -> np.ndarray:
         """Compute swarm consensus solution"""
         # Weighted average by fitness
-        total_weight = 0
-        consensus = np.zeros(self.dimensions)
-
-        for agent in self.agents.values():
-            weight = max(0, agent.personal_best_fitness)
-            consensus += weight * agent.personal_best
-            total_weight += weight
+        weights = np.maximum(self.personal_best_fitness, 0)
+        total_weight = weights.sum()
 
         if total_weight > 0:
-            consensus /= total_weight
+            consensus = weights @ self.personal_best / total_weight
         else:
             # Fall back to PSO global best
             consensus = self.pso.global_best if self.pso.global_best is not None else np.zeros(self.dimensions)
@@ -825,19 +1180,19 @@ class SwarmSuperintelligence:
     def _analyze_role_contributions(self) -> Dict[str, Dict]:
         """Analyze contribution of each role"""
         contributions = {}
+        index_of = {agent_id: i for i, agent_id in enumerate(self.agent_ids)}
 
         for role in AgentRole:
-            agent_ids = self.role_distribution[role]
-            agents = [self.agents[aid] for aid in agent_ids]
+            indexes = [index_of[aid] for aid in self.role_distribution[role]]
 
-            if agents:
+            if indexes:
                 contributions[role.value] = {
-                    'count': len(agents),
-                    'avg_fitness': np.mean([a.personal_best_fitness for a in agents]),
-                    'total_discoveries': sum(len(a.discoveries) for a in agents),
-                    'messages_sent': sum(a.messages_sent for a in agents),
-                    'messages_received': sum(a.messages_received for a in agents),
-                    'avg_energy': np.mean([a.energy for a in agents])
+                    'count': len(indexes),
+                    'avg_fitness': np.mean(self.personal_best_fitness[indexes]),
+                    'total_discoveries': sum(len(self.discoveries[i]) for i in indexes),
+                    'messages_sent': int(self.messages_sent[indexes].sum()),
+                    'messages_received': int(self.messages_received[indexes].sum()),
+                    'avg_energy': np.mean(self.energy[indexes])
                 }
 
         return contributions
@@ -845,12 +1200,12 @@ class SwarmSuperintelligence:
     def get_swarm_state(self) -> Dict[str, Any]:
         """Get complete swarm state"""
         return {
-            'total_agents': len(self.agents),
+            'total_agents': len(self.agent_ids),
             'iteration': self.iteration,
             'pso_global_best_fitness': self.pso.global_best_fitness,
             'aco_best_path_length': self.aco.best_path_length,
             'boid_spread': self.boids.get_flock_spread(),
-            'pheromone_deposits': len(self.pheromone_field.deposits),
+            'pheromone_deposits': self.pheromone_field.n_deposits,
             'messages_on_board': len(self.pheromone_field.message_board),
             'emergent_patterns': len(self.emergent_patterns),
             'consensus_solutions': len(self.consensus_solutions),
@@ -859,12 +1214,29 @@ class SwarmSuperintelligence:
 
     def get_best_agents(self, n: int = 5) -> List[SwarmAgent]:
         """Get top performing agents"""
-        sorted_agents = sorted(
-            self.agents.values(),
-            key=lambda a: a.personal_best_fitness,
-            reverse=True
-        )
-        return sorted_agents[:n]
+        order = np.argsort(-self.personal_best_fitness, kind='stable')
+        return [self._agent(i) for i in order[:n]]
+
+
+def _path_cost(path: List[int]) -> float:
+    return len(path) / 10  # Simple cost
+
+
+def _is_picklable(obj: Any) -> bool:
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
+
+
+def _run_iterations_in_worker(snapshot: bytes,
+                              fitness_fn: Callable[[np.ndarray], float],
+                              start: int, stop: int,
+                              deadline: Optional[float]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    swarm: SwarmSuperintelligence = pickle.loads(snapshot)
+    partial = swarm.run_iterations(fitness_fn, start, stop, deadline)
+    return {name: getattr(swarm, name) for name in swarm.ITERATION_STATE}, partial
 
 
 # =============================================================================
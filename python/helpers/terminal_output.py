@@ -0,0 +1,180 @@
+"""
+Incremental terminal output handling shared by the local and SSH shells.
+
+TerminalOutput keeps the cleaned output of a running command and updates it
+from new bytes only: completed lines are cleaned once and never revisited,
+only the line still being written (progress bars redraw it with \\r) is
+re-cleaned, and it is kept short by dropping parts that were overwritten.
+The result is the same text clean_string would produce for the whole output.
+
+OutputSignal lets a coroutine on any event loop wait until a reader thread
+reports new output, instead of polling with sleeps.
+"""
+
+import asyncio
+import codecs
+import re
+import threading
+from concurrent.futures import Future
+
+ANSI_ESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+# escape sequences longer than this are not waited for across chunks
+MAX_ESCAPE_LENGTH = 64
+_LEADING_PROMPTS = re.compile(r"^[ \r]*(?:\r*\n>[ \r]*)*")
+_LEADING_MARKERS = re.compile(r"^(>\s*)+")
+_CONTENT = re.compile(r"[^\s>]")
+
+
+def clean_string(input_string: str) -> str:
+    # Remove ANSI escape codes
+    cleaned = ANSI_ESCAPE.sub("", input_string)
+
+    # remove null bytes
+    cleaned = cleaned.replace("\x00", "")
+
+    # remove ipython \r\r\n> sequences from the start
+    cleaned = _LEADING_PROMPTS.sub("", cleaned, count=1)
+    # also remove any amount of '> ' sequences from the start
+    cleaned = _LEADING_MARKERS.sub("", cleaned, count=1)
+
+    # Replace '\r\n' with '\n'
+    cleaned = cleaned.replace("\r\n", "\n")
+
+    # remove leading \r and spaces
+    cleaned = cleaned.lstrip("\r ")
+
+    # Split the string by newline characters to process each segment separately
+    return "\n".join(clean_line(line) for line in cleaned.split("\n"))
+
+
+def clean_line(line: str) -> str:
+    # Handle carriage returns '\r' by taking the last non-blank part
+    parts = [part for part in line.split("\r") if part.strip()]
+    return parts[-1].rstrip() if parts else line
+
+
+class TerminalOutput:
+
+    def __init__(self, encoding: str = "utf-8"):
+        self.encoding = encoding
+        self.reset()
+
+    def reset(self):
+        # multi-byte characters split across reads are completed by the decoder
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self._escape = ""  # unfinished escape sequence from the previous chunk
+        self._leading = ""  # output before anything but prompts and blanks arrived
+        self._started = False
+        self._done: list[str] = []  # cleaned completed lines, each ending with \n
+        self._done_text = ""
+        self._done_joined = 0
+        self._line = ""  # raw text of the line being written
+
+    @property
+    def text(self) -> str:
+        """Cleaned output so far"""
+        if not self._started:
+            return clean_string(self._leading)
+        if self._done_joined < len(self._done):
+            self._done_text += "".join(self._done[self._done_joined:])
+            self._done_joined = len(self._done)
+        return self._done_text + clean_line(self._line)
+
+    def tail(self, lines: int) -> list[str]:
+        """Last cleaned lines without building the whole text"""
+        if not self._started:
+            return clean_string(self._leading).split("\n")[-lines:]
+        result = [clean_line(self._line)]
+        for line in reversed(self._done[-lines:]):
+            result.insert(0, line[:-1])
+        return result[-lines:]
+
+    def feed(self, data: bytes | str) -> str:
+        """Add new output, returns the cleaned new chunk on its own"""
+        text = data if isinstance(data, str) else self._decoder.decode(data)
+        text = self._strip_escapes(self._escape + text)
+        if not text:
+            return ""
+        partial = clean_string(text)
+
+        if not self._started:
+            text = self._strip_leading(self._leading + text)
+            if not text:
+                return partial
+
+        lines = (self._line + text).split("\n")
+        for line in lines[:-1]:
+            self._done.append(clean_line(line.removesuffix("\r")) + "\n")
+        self._line = _collapse(lines[-1])
+        return partial
+
+    def _strip_escapes(self, text: str) -> str:
+        self._escape = ""
+        start = text.rfind("\x1b")
+        if start >= 0 and len(text) - start < MAX_ESCAPE_LENGTH:
+            if not ANSI_ESCAPE.match(text, start):
+                # possibly cut off, wait for the rest before removing it
+                self._escape = text[start:]
+                text = text[:start]
+        return ANSI_ESCAPE.sub("", text).replace("\x00", "")
+
+    def _strip_leading(self, text: str) -> str:
+        # the leading prompt patterns only match whitespace and '>', so once other
+        # text arrived, more output can't change what is stripped from the start
+        if not _CONTENT.search(text):
+            self._leading = text
+            return ""
+        self._started = True
+        self._leading = ""
+        stripped = _LEADING_PROMPTS.sub("", text, count=1)
+        stripped = _LEADING_MARKERS.sub("", stripped, count=1)
+        return stripped.lstrip("\r ")
+
+
+def _collapse(line: str) -> str:
+    # parts before the last non-blank \r part are never shown, drop them
+    end = len(line)
+    while True:
+        cut = line.rfind("\r", 0, end)
+        if cut < 0:
+            return line
+        if line[cut + 1:end].strip():
+            return line[cut + 1:]
+        end = cut
+
+
+class OutputSignal:
+    """Wakes coroutines waiting on any event loop when output arrives"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: list[Future] = []
+        self._pending = False
+
+    def notify(self):
+        with self._lock:
+            self._pending = True
+            waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(True)
+
+    def clear(self):
+        with self._lock:
+            self._pending = False
+
+    async def wait(self, timeout: float | None) -> bool:
+        """True as soon as output is pending, False after timeout"""
+        with self._lock:
+            if self._pending:
+                return True
+            waiter: Future = Future()
+            self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(waiter), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
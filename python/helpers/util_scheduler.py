@@ -0,0 +1,283 @@
+"""
+Scheduler for utility model calls coming from many contexts at once.
+
+- singleflight: a call identical to one already in flight waits for that
+  call's result instead of sending the same prompt again
+- at most max_concurrent calls run at once, the rest wait in a bounded
+  priority queue, foreground calls are served before background ones;
+  past the bound QueueFullError is raised and Agent.call_utility_model
+  calls the model directly instead
+- optionally, a call that gets a slot takes other small waiting prompts
+  with it and sends them all as one packed request, the response is split
+  back to the callers; prompts the packed response did not answer go back
+  to the queue and run on their own
+
+Agent contexts run on different event loops (see defer.EventLoopThread),
+so waiting is done on thread-safe futures, never on loop-bound primitives.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from python.helpers.batch_queue import QueueFullError
+from python.helpers.dirty_json import DirtyJson
+
+FOREGROUND = 0
+BACKGROUND = 1
+
+MAX_CONCURRENT = 4
+MAX_WAITING = 64
+# prompts sent together in one packed request, 1 = packing disabled
+PACK_MAX = 1
+# only messages shorter than this are packed
+PACK_MAX_CHARS = 4000
+
+_SLOT = object()
+_REQUEUE = object()
+
+
+@dataclass
+class PackItem:
+    system: str
+    message: str
+
+
+PackFn = Callable[[list[PackItem]], Awaitable[list[str | None]]]
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    future: Future = field(compare=False, default_factory=Future)
+    pack_item: PackItem | None = field(compare=False, default=None)
+
+
+def make_key(model: str, system: str, message: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, system, message):
+        digest.update(part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class UtilScheduler:
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrent: int = MAX_CONCURRENT,
+        max_waiting: int = MAX_WAITING,
+        pack_max: int = PACK_MAX,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.pack_max = pack_max
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._inflight: dict[str, Future] = {}
+
+        self.calls = 0
+        self.shared = 0
+        self.packed = 0
+        self.rejected = 0
+
+    async def call(
+        self,
+        key: str,
+        run: Callable[[], Awaitable[str]],
+        *,
+        priority: int = FOREGROUND,
+        pack_item: PackItem | None = None,
+        pack: PackFn | None = None,
+    ) -> str:
+        """
+        Result of run(), or of the identical call with the same key already
+        in flight. pack_item and pack make the call eligible for packing.
+        """
+        with self._lock:
+            self.calls += 1
+        while True:
+            with self._lock:
+                shared = self._inflight.get(key)
+                if shared is None:
+                    own: Future = Future()
+                    self._inflight[key] = own
+                else:
+                    self.shared += 1
+            if shared is None:
+                break
+            result = await asyncio.wrap_future(shared)
+            if result is not _REQUEUE:
+                return result
+            # the call we waited for was cancelled, try again ourselves
+
+        try:
+            result = await self._call(run, priority, pack_item, pack)
+        except asyncio.CancelledError:
+            own.set_result(_REQUEUE)
+            raise
+        except BaseException as e:
+            own.set_exception(e)
+            raise
+        else:
+            own.set_result(result)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active": self._active,
+                "waiting": len(self._waiting),
+                "max_concurrent": self.max_concurrent,
+                "calls": self.calls,
+                "shared": self.shared,
+                "packed": self.packed,
+                "rejected": self.rejected,
+            }
+
+    async def _call(
+        self,
+        run: Callable[[], Awaitable[str]],
+        priority: int,
+        pack_item: PackItem | None,
+        pack: PackFn | None,
+    ) -> str:
+        if pack is None or pack_item is None or len(pack_item.message) > PACK_MAX_CHARS:
+            pack_item = None
+        seq = next(self._seq)
+        while True:
+            granted = await self._acquire(_Waiter(priority, seq, pack_item=pack_item))
+            if granted is _SLOT:
+                break
+            if granted is not _REQUEUE:
+                return granted  # answered by another caller's packed request
+
+        try:
+            if pack_item and pack:
+                others = self._take_packable()
+                if others:
+                    own = await self._run_packed(pack_item, pack, others)
+                    if own is not None:
+                        return own
+            return await run()
+        finally:
+            self._release()
+
+    async def _acquire(self, waiter: _Waiter):
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiting:
+                self._active += 1
+                return _SLOT
+            if len(self._waiting) >= self.max_waiting:
+                self.rejected += 1
+                raise QueueFullError(f"{self.name} has {len(self._waiting)} utility calls waiting")
+            heapq.heappush(self._waiting, waiter)
+        try:
+            return await asyncio.wrap_future(waiter.future)
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiting:
+                    self._waiting.remove(waiter)
+                    heapq.heapify(self._waiting)
+            # the slot may have been handed to us just before the cancellation
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.result() is _SLOT:
+                self._release()
+            raise
+
+    def _release(self):
+        with self._lock:
+            while self._waiting:
+                waiter = heapq.heappop(self._waiting)
+                if waiter.future.set_running_or_notify_cancel():
+                    waiter.future.set_result(_SLOT)  # slot handed over
+                    return
+            self._active -= 1
+
+    def _take_packable(self) -> list[_Waiter]:
+        with self._lock:
+            if self.pack_max <= 1:
+                return []
+            taken: list[_Waiter] = []
+            for waiter in sorted(self._waiting):
+                if len(taken) >= self.pack_max - 1:
+                    break
+                if waiter.pack_item and waiter.future.set_running_or_notify_cancel():
+                    taken.append(waiter)
+            if taken:
+                self._waiting = [w for w in self._waiting if w not in taken]
+                heapq.heapify(self._waiting)
+            return taken
+
+    async def _run_packed(self, own: PackItem, pack: PackFn, others: list[_Waiter]) -> str | None:
+        try:
+            results = await pack([own] + [w.pack_item for w in others])  # type: ignore[misc]
+        except BaseException:
+            for waiter in others:
+                waiter.future.set_result(_REQUEUE)
+            raise
+        results = (list(results) + [None] * (len(others) + 1))[: len(others) + 1]
+        answered = 0
+        for waiter, result in zip(others, results[1:]):
+            waiter.future.set_result(_REQUEUE if result is None else result)
+            answered += result is not None
+        with self._lock:
+            self.packed += answered + (results[0] is not None)
+        return results[0]
+
+
+def pack_message(items: list[PackItem]) -> str:
+    return json.dumps(
+        [{"id": i, "instructions": item.system, "input": item.message} for i, item in enumerate(items)],
+        ensure_ascii=False,
+        indent=2,
+    )
+
+
+def unpack_response(response: str, count: int) -> list[str | None]:
+    """Responses by task id, None where the packed response has no answer"""
+    results: list[str | None] = [None] * count
+    try:
+        parsed = DirtyJson.parse_string(response.strip())
+    except Exception:
+        return results
+    if isinstance(parsed, dict):
+        parsed = parsed.get("responses", [])
+    if not isinstance(parsed, list):
+        return results
+    for entry in parsed:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("id"))  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            continue
+        answer = entry.get("response")
+        if 0 <= index < count and answer is not None:
+            results[index] = answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)
+    return results
+
+
+_schedulers: dict[str, UtilScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(model: str) -> UtilScheduler:
+    with _schedulers_lock:
+        if model not in _schedulers:
+            _schedulers[model] = UtilScheduler(f"utility calls {model}")
+        return _schedulers[model]
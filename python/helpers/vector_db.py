@@ -1,5 +1,8 @@
 from typing import Any, List, Sequence
+import os
+import pickle
 import uuid
+import numpy as np
 from langchain_community.vectorstores import FAISS
 
 # faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
@@ -72,6 +75,41 @@ class VectorDB:
             # normalize_L2=True,
             relevance_score_fn=cosine_normalizer,
         )
+        self._positions: dict[str, int] = {}
+        self._positions_of: dict | None = None
+
+    def save_local(self, folder_path: str):
+        self.db.save_local(folder_path=folder_path)
+
+    def serialize(self) -> tuple[bytes, bytes]:
+        """In-memory copy of the files save_local writes, as (index.faiss, index.pkl)."""
+        index = faiss.serialize_index(self.db.index).tobytes()
+        store = pickle.dumps((self.db.docstore, self.db.index_to_docstore_id))
+        return index, store
+
+    @staticmethod
+    def write_serialized(folder_path: str, data: tuple[bytes, bytes]):
+        """Write the output of serialize so load_local can read it back."""
+        os.makedirs(folder_path, exist_ok=True)
+        for name, content in zip(("index.faiss", "index.pkl"), data):
+            path = os.path.join(folder_path, name)
+            with open(path + ".tmp", "wb") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+
+    def load_local(self, folder_path: str) -> bool:
+        """Replace the in-memory index with one saved in folder_path, if present."""
+        if not os.path.exists(os.path.join(folder_path, "index.faiss")):
+            return False
+        self.db = MyFaiss.load_local(
+            folder_path=folder_path,
+            embeddings=self.embeddings,
+            allow_dangerous_deserialization=True,
+            distance_strategy=DistanceStrategy.COSINE,
+            relevance_score_fn=cosine_normalizer,
+        )  # type: ignore
+        self.index = self.db.index
+        return True
 
     async def search_by_similarity_threshold(
         self, query: str, limit: int, threshold: float, filter: str = ""
@@ -86,6 +124,56 @@ class VectorDB:
             filter=comparator,
         )
 
+    def search_by_vectors(
+        self,
+        vectors: Sequence[Sequence[float]],
+        limit: int,
+        threshold: float,
+        ids: Sequence[str] | None = None,
+    ) -> list[list[Document]]:
+        """
+        Exact similarity search for several query vectors in one pass,
+        optionally restricted to the documents with the given ids.
+        Returns one result list per query vector, best matches first.
+        """
+        index = self.db.index
+        index_to_id = self.db.index_to_docstore_id
+        if ids is None:
+            positions = list(range(index.ntotal))
+        else:
+            id_positions = self._id_positions()
+            positions = sorted({id_positions[id] for id in ids if id in id_positions})
+        if not positions or not len(vectors):
+            return [[] for _ in vectors]
+
+        if ids is None:
+            matrix = index.reconstruct_n(0, index.ntotal)
+        else:
+            matrix = index.reconstruct_batch(np.asarray(positions, dtype=np.int64))
+        scores = np.asarray(vectors, dtype=np.float32) @ matrix.T
+
+        docs = self.db.get_all_docs()
+        results = []
+        for row in scores:
+            top = np.argsort(-row, kind="stable")[:limit]
+            results.append(
+                [
+                    docs[index_to_id[positions[i]]]
+                    for i in top
+                    if cosine_normalizer(float(row[i])) >= threshold
+                ]
+            )
+        return results
+
+    def _id_positions(self) -> dict[str, int]:
+        """Index position of every document id, rebuilt when the index changes"""
+        index_to_id = self.db.index_to_docstore_id
+        # adds extend the mapping in place, deletes replace it
+        if self._positions_of is not index_to_id or len(self._positions) != len(index_to_id):
+            self._positions = {id: pos for pos, id in index_to_id.items()}
+            self._positions_of = index_to_id
+        return self._positions
+
     async def search_by_metadata(self, filter: str, limit: int = 0) -> list[Document]:
         comparator = get_comparator(filter)
         all_docs = self.db.get_all_docs()
@@ -108,6 +196,23 @@ class VectorDB:
             self.db.add_documents(documents=docs, ids=ids)
         return ids
 
+    def insert_embedded(
+        self, docs: list[Document], vectors: Sequence[Sequence[float]]
+    ) -> list[str]:
+        """Like insert_documents, with the embeddings already computed."""
+        ids = [str(uuid.uuid4()) for _ in range(len(docs))]
+
+        if ids:
+            for doc, id in zip(docs, ids):
+                doc.metadata["id"] = id  # add ids to documents metadata
+
+            self.db.add_embeddings(
+                text_embeddings=zip([doc.page_content for doc in docs], vectors),
+                metadatas=[doc.metadata for doc in docs],
+                ids=ids,
+            )
+        return ids
+
     async def delete_documents_by_ids(self, ids: list[str]):
         # aget_by_ids is not yet implemented in faiss, need to do a workaround
         rem_docs = await self.db.aget_by_ids(
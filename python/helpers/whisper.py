@@ -1,18 +1,66 @@
+import asyncio
 import base64
-import warnings
-import whisper
+import os
+import subprocess
 import tempfile
-import asyncio
+import warnings
+
+import numpy as np
 from python.helpers import runtime, rfc, settings, files
+from python.helpers.batch_queue import BatchQueue
+from python.helpers.model_worker import ModelWorker
 from python.helpers.print_style import PrintStyle
 from python.helpers.notification import NotificationManager, NotificationType, NotificationPriority
+from python.helpers.startup import lazy_import
+
+# brings in torch, imported on the first transcription
+whisper = lazy_import("whisper")
 
 # Suppress FutureWarning from torch.load
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-_model = None
-_model_name = ""
-is_updating_model = False  # Tracks whether the model is currently updating
+# transcription requests waiting at most, more are rejected until the queue drains
+MAX_QUEUE = 16
+# short clips waiting together are decoded in one batch
+MAX_BATCH = 8
+
+
+def _load_model(model_name: str):
+    NotificationManager.send_notification(
+        NotificationType.INFO,
+        NotificationPriority.NORMAL,
+        "Loading Whisper model...",
+        display_time=99,
+        group="whisper-preload")
+    PrintStyle.standard(f"Loading Whisper model: {model_name}")
+    model = whisper.load_model(name=model_name, download_root=files.get_abs_path("/tmp/models/whisper")) # type: ignore
+    NotificationManager.send_notification(
+        NotificationType.INFO,
+        NotificationPriority.NORMAL,
+        "Whisper model loaded.",
+        display_time=2,
+        group="whisper-preload")
+    return model
+
+
+# the model is loaded once and all transcription runs on this thread
+_worker = ModelWorker("whisper", _load_model)
+
+
+def _transcribe_batch(requests: list[tuple[str, np.ndarray]]) -> list[dict]:
+    model_name = requests[0][0]  # batches share the model, see batch_key
+    clips = [audio for _, audio in requests]
+    return _worker.submit(lambda model: _run_model(model, clips), key=model_name).result()
+
+
+_queue = BatchQueue(
+    "whisper-queue",
+    _transcribe_batch,
+    max_size=MAX_QUEUE,
+    max_batch=MAX_BATCH,
+    batch_key=lambda request: request[0],
+)
+
 
 async def preload(model_name:str):
     try:
@@ -21,40 +69,16 @@ async def preload(model_name:str):
     except Exception as e:
         # if not runtime.is_development():
         raise e
-        
-async def _preload(model_name:str):
-    global _model, _model_name, is_updating_model
-
-    while is_updating_model:
-        await asyncio.sleep(0.1)
 
-    try:
-        is_updating_model = True
-        if not _model or _model_name != model_name:
-            NotificationManager.send_notification(
-                NotificationType.INFO,
-                NotificationPriority.NORMAL,
-                "Loading Whisper model...",
-                display_time=99,
-                group="whisper-preload")
-            PrintStyle.standard(f"Loading Whisper model: {model_name}")
-            _model = whisper.load_model(name=model_name, download_root=files.get_abs_path("/tmp/models/whisper")) # type: ignore
-            _model_name = model_name
-            NotificationManager.send_notification(
-                NotificationType.INFO,
-                NotificationPriority.NORMAL,
-                "Whisper model loaded.",
-                display_time=2,
-                group="whisper-preload")
-    finally:
-        is_updating_model = False
+async def _preload(model_name:str):
+    await _worker.preload(model_name)
 
 async def is_downloading():
     # return await runtime.call_development_function(_is_downloading)
     return _is_downloading()
 
 def _is_downloading():
-    return is_updating_model
+    return _worker.loading
 
 async def is_downloaded():
     try:
@@ -67,7 +91,7 @@ async def is_downloaded():
         # return _is_downloaded()
 
 def _is_downloaded():
-    return _model is not None
+    return _worker.loaded
 
 async def transcribe(model_name:str, audio_bytes_b64: str):
     # return await runtime.call_development_function(_transcribe, model_name, audio_bytes_b64)
@@ -75,22 +99,140 @@ async def transcribe(model_name:str, audio_bytes_b64: str):
 
 
 async def _transcribe(model_name:str, audio_bytes_b64: str):
-    await _preload(model_name)
-    
     # Decode audio bytes if encoded as a base64 string
     audio_bytes = base64.b64decode(audio_bytes_b64)
 
-    # Create temp audio file
-    import os
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as audio_file:
-        audio_file.write(audio_bytes)
-        temp_path = audio_file.name
+    # decode to samples off the event loop, requests decode in parallel while the model is busy
+    audio = await asyncio.to_thread(decode_audio, audio_bytes)
+    return await _queue.process((model_name, audio))
+
+
+def get_stats() -> dict:
+    """Queue depth and latency of recent transcriptions"""
+    return {**_queue.stats(), "model_loaded": _worker.loaded, "model_loading": _worker.loading}
+
+
+def decode_audio(audio_bytes: bytes) -> np.ndarray:
+    """Decode any ffmpeg readable audio to 16 kHz mono float32 samples, like whisper.load_audio"""
     try:
-        # Transcribe the audio file
-        result = _model.transcribe(temp_path, fp16=False) # type: ignore
-        return result
-    finally:
+        return _ffmpeg_decode(audio_bytes, "pipe:0")
+    except subprocess.CalledProcessError:
+        # formats that need seeking (e.g. mp4 with the index at the end) can't be read from a pipe
+        with tempfile.NamedTemporaryFile(suffix=".audio", delete=False) as audio_file:
+            audio_file.write(audio_bytes)
+            temp_path = audio_file.name
         try:
-            os.remove(temp_path)
-        except Exception:
-            pass # ignore errors during cleanup
+            return _ffmpeg_decode(None, temp_path)
+        finally:
+            try:
+                os.remove(temp_path)
+            except Exception:
+                pass # ignore errors during cleanup
+
+
+def _ffmpeg_decode(audio_bytes: bytes | None, source: str) -> np.ndarray:
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(whisper.audio.SAMPLE_RATE),
+        "-",
+    ]
+    out = subprocess.run(cmd, input=audio_bytes, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+# the fallback rule and thresholds of whisper's transcribe()
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def _run_model(model, clips: list[np.ndarray]) -> list[dict]:
+    """
+    Transcribe clips on the model worker thread, one result per clip.
+
+    When two or more clips that fit one 30 s window are queued together,
+    they are decoded in a single batched forward pass, with transcribe()'s
+    temperature fallback applied to the clips whose decoding looks
+    degenerate. A lone clip and longer clips go through model.transcribe.
+    Either way a result is {"text", "segments", "language"}, with the
+    segments split at the decoded timestamps and carrying the same fields
+    as transcribe()'s.
+    """
+    results: list[dict | None] = [None] * len(clips)
+    short = [i for i, clip in enumerate(clips) if len(clip) <= whisper.audio.N_SAMPLES]
+    if len(short) > 1:
+        import torch
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(clips[i]), model.dims.n_mels)
+            for i in short
+        ]).to(model.device)
+        for i, decoded in zip(short, _decode_with_fallback(model, mels)):
+            results[i] = _window_result(model, decoded, len(clips[i]) / whisper.audio.SAMPLE_RATE)
+
+    for i, clip in enumerate(clips):
+        if results[i] is None:
+            results[i] = model.transcribe(clip, fp16=False) # type: ignore
+    return results # type: ignore
+
+
+def _decode_with_fallback(model, mels) -> list:
+    """Decode a batch of windows, retrying degenerate ones at higher temperatures"""
+    decoded: list = [None] * len(mels)
+    pending = list(range(len(mels)))
+    for temperature in TEMPERATURES:
+        options = whisper.DecodingOptions(fp16=False, temperature=temperature)
+        for i, result in zip(pending, whisper.decode(model, mels[pending], options)):  # type: ignore
+            decoded[i] = result
+        pending = [i for i in pending if _needs_fallback(decoded[i])]
+        if not pending:
+            break
+    return decoded
+
+
+def _needs_fallback(result) -> bool:
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+        return False  # silence, transcribe() doesn't retry it either
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def _window_result(model, result, duration: float) -> dict:
+    """A decoded window in model.transcribe's result format"""
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+        return {"text": "", "segments": [], "language": result.language}
+
+    tokenizer = whisper.tokenizer.get_tokenizer(
+        model.is_multilingual, num_languages=model.num_languages, language=result.language, task="transcribe"
+    )
+    precision = 2 * whisper.audio.HOP_LENGTH / whisper.audio.SAMPLE_RATE  # seconds per timestamp token
+    tokens = result.tokens
+    is_timestamp = [token >= tokenizer.timestamp_begin for token in tokens]
+
+    # a segment ends where two timestamp tokens follow each other
+    cuts = [i for i in range(1, len(tokens)) if is_timestamp[i - 1] and is_timestamp[i]]
+    if len(tokens) > 1 and is_timestamp[-1] and not is_timestamp[-2]:
+        cuts.append(len(tokens))  # ends on a single timestamp
+    if not cuts:
+        cuts = [len(tokens)]
+
+    segments = []
+    start = 0
+    for cut in cuts:
+        piece = tokens[start:cut]
+        stamps = [token for token in piece if token >= tokenizer.timestamp_begin]
+        text = tokenizer.decode([token for token in piece if token < tokenizer.eot])
+        segments.append({
+            "id": len(segments),
+            "seek": 0,
+            "start": (stamps[0] - tokenizer.timestamp_begin) * precision if stamps else 0.0,
+            "end": (stamps[-1] - tokenizer.timestamp_begin) * precision if len(stamps) > 1 else duration,
+            "text": text,
+            "tokens": piece,
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob,
+        })
+        start = cut
+    segments = [segment for segment in segments if segment["text"].strip()]
+    return {"text": result.text, "segments": segments, "language": result.language}
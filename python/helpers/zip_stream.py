@@ -0,0 +1,346 @@
+"""
+Streaming zip writer with parallel compression.
+
+Files are split into chunks that worker threads read and deflate
+independently (zlib releases the GIL, so this scales with cores). Each
+chunk ends on a sync flush, so the chunks of a file concatenate into one
+valid deflate stream. The writer keeps a running CRC over the chunks as it
+takes them in order; crc32 is far cheaper than deflate, so this costs
+little next to the workers. A single writer emits entries in order as their chunks complete,
+with sizes in data descriptors, so the archive can be streamed (e.g. to an
+HTTP response) without a temp file. The number of chunks in flight is
+bounded, which keeps memory flat regardless of archive size.
+
+Already-compressed media are stored without recompression.
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, Union
+
+from python.helpers.print_style import PrintStyle
+
+CHUNK_SIZE = 4 * 1024 * 1024
+MAX_WORKERS = max(1, min(os.cpu_count() or 1, 8))
+COMPRESSION_LEVEL = 6
+
+STORED = 0
+DEFLATED = 8
+
+# extensions whose content is already compressed, deflating them wastes cpu
+STORED_EXTENSIONS = {
+    ".7z", ".aac", ".avi", ".bz2", ".docx", ".flac", ".gif", ".gz", ".heic",
+    ".jpeg", ".jpg", ".m4a", ".mkv", ".mov", ".mp3", ".mp4", ".odt", ".ogg",
+    ".opus", ".png", ".pptx", ".rar", ".webm", ".webp", ".xlsx", ".xz",
+    ".zip", ".zst",
+}
+
+ZIP64_LIMIT = 0xFFFFFFFF
+# an empty final deflate block, terminates a stream cut short by a read error
+EMPTY_FINAL_BLOCK = b"\x03\x00"
+
+
+class ZipStreamCancelled(Exception):
+    pass
+
+
+@dataclass
+class ZipStreamProgress:
+    """Progress of a streaming archive, shared with whoever reports on it"""
+    files_total: int = 0
+    files_done: int = 0
+    bytes_total: int = 0
+    bytes_done: int = 0
+    status: str = "running"  # running, done, cancelled, error
+    error: str = ""
+    started: float = field(default_factory=time.time)
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def to_dict(self) -> dict:
+        return {
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "bytes_total": self.bytes_total,
+            "bytes_done": self.bytes_done,
+            "status": self.status,
+            "error": self.error,
+            "elapsed": time.time() - self.started,
+        }
+
+
+@dataclass
+class StreamSource:
+    """
+    Content read front to back from a file object, e.g. a member of another
+    archive. It is read on the writer's thread, only compression runs in
+    the workers.
+    """
+    open: Callable[[], BinaryIO]
+    size: int = 0  # expected, only decides whether the entry needs zip64
+    mtime: float = field(default_factory=time.time)
+
+
+# an entry is (archive name, path of a file to read), (archive name, bytes)
+# or (archive name, StreamSource)
+Entry = Tuple[str, Union[str, bytes, StreamSource]]
+
+
+@dataclass
+class _EntryState:
+    name: bytes
+    method: int
+    mtime: float
+    mode: int
+    expected_size: int = 0
+    offset: int = 0
+    crc: int = 0
+    compressed_size: int = 0
+    size: int = 0
+    zip64: bool = False
+
+
+def compression_method(name: str) -> int:
+    return STORED if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS else DEFLATED
+
+
+def stream_zip(
+    entries: Iterable[Entry],
+    progress: Optional[ZipStreamProgress] = None,
+    workers: int = MAX_WORKERS,
+    level: int = COMPRESSION_LEVEL,
+) -> Iterator[bytes]:
+    """
+    Yield a zip archive of entries piece by piece. Files that can't be read
+    are skipped with a warning. Raises ZipStreamCancelled when progress is
+    cancelled; closing the generator early cancels pending work.
+    """
+    progress = progress or ZipStreamProgress()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zip-stream")
+    pending: Deque[Tuple[_EntryState, int, bool, Future]] = deque()
+    max_pending = workers * 2
+    tasks = _chunk_tasks(entries, executor, level)
+    central: List[_EntryState] = []
+    offset = 0
+
+    try:
+        current: Optional[_EntryState] = None
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                task = next(tasks, None)
+                if task is None:
+                    exhausted = True
+                else:
+                    pending.append(task)
+            if not pending:
+                break
+            if progress.cancelled:
+                raise ZipStreamCancelled("Backup cancelled")
+
+            entry, index, last, future = pending.popleft()
+            try:
+                data, raw = future.result()
+            except OSError as e:
+                PrintStyle().warning(f"Could not backup file {entry.name.decode()}: {e}")
+                if index == 0:
+                    # skip the whole file, nothing of it is written yet
+                    while pending and pending[0][0] is entry:
+                        pending.popleft()[3].cancel()
+                    continue
+                # keep what was written, end the entry here
+                data, raw, last = (EMPTY_FINAL_BLOCK if entry.method == DEFLATED else b""), b"", True
+                while pending and pending[0][0] is entry:
+                    pending.popleft()[3].cancel()
+
+            if index == 0:
+                current = entry
+                entry.offset = offset
+                header = _local_header(entry)
+                offset += len(header)
+                yield header
+
+            assert current is entry
+            entry.crc = zlib.crc32(raw, entry.crc)
+            entry.size += len(raw)
+            entry.compressed_size += len(data)
+            offset += len(data)
+            progress.bytes_done += len(raw)
+            if data:
+                yield data
+
+            if last:
+                descriptor = _data_descriptor(entry)
+                offset += len(descriptor)
+                yield descriptor
+                central.append(entry)
+                progress.files_done += 1
+
+        yield _central_directory(central, offset)
+        progress.status = "done"
+
+    except ZipStreamCancelled:
+        progress.status = "cancelled"
+        raise
+    except GeneratorExit:
+        # consumer went away, e.g. the HTTP client disconnected
+        progress.status = "cancelled"
+        raise
+    except Exception as e:
+        progress.status = "error"
+        progress.error = str(e)
+        raise
+    finally:
+        for _, _, _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def write_zip(path: str, entries: Iterable[Entry], progress: Optional[ZipStreamProgress] = None) -> str:
+    """Write stream_zip output to a file"""
+    with open(path, "wb") as f:
+        for piece in stream_zip(entries, progress):
+            f.write(piece)
+    return path
+
+
+def _chunk_tasks(
+    entries: Iterable[Entry], executor: ThreadPoolExecutor, level: int
+) -> Iterator[Tuple[_EntryState, int, bool, Future]]:
+    """Submit chunk compression lazily, as the writer makes room"""
+    for name, source in entries:
+        method = compression_method(name)
+        if isinstance(source, bytes):
+            entry = _EntryState(name.encode("utf-8"), method, time.time(), 0o644, len(source))
+            yield entry, 0, True, executor.submit(_compress, source, method, level, True)
+            continue
+
+        if isinstance(source, StreamSource):
+            entry = _EntryState(name.encode("utf-8"), method, source.mtime, 0o644, source.size)
+            with source.open() as f:
+                data = f.read(CHUNK_SIZE)
+                index = 0
+                while True:
+                    # one chunk ahead, the last one is compressed with Z_FINISH
+                    following = f.read(CHUNK_SIZE)
+                    last = not following
+                    yield entry, index, last, executor.submit(_compress, data, method, level, last)
+                    if last:
+                        break
+                    data, index = following, index + 1
+            continue
+
+        try:
+            stat = os.stat(source)
+        except OSError as e:
+            PrintStyle().warning(f"Could not backup file {source}: {e}")
+            continue
+        entry = _EntryState(name.encode("utf-8"), method, stat.st_mtime, stat.st_mode & 0o7777, stat.st_size)
+        chunks = max(1, -(-stat.st_size // CHUNK_SIZE))
+        for index in range(chunks):
+            last = index == chunks - 1
+            yield entry, index, last, executor.submit(
+                _read_and_compress, source, index * CHUNK_SIZE, method, level, last
+            )
+
+
+def _read_and_compress(path: str, offset: int, method: int, level: int, last: bool) -> Tuple[bytes, bytes]:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(CHUNK_SIZE)
+    return _compress(data, method, level, last)
+
+
+def _compress(data: bytes, method: int, level: int, last: bool) -> Tuple[bytes, bytes]:
+    """Returns the chunk as written to the archive and as read"""
+    if method == STORED:
+        return data, data
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return compressed, data
+
+
+# -----------------------------------------------------------------------------
+# zip records
+
+def _dos_time(timestamp: float) -> Tuple[int, int]:
+    t = time.localtime(max(timestamp, 315532800))  # zip can't go before 1980
+    return (
+        (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+        ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday,
+    )
+
+
+def _local_header(entry: _EntryState) -> bytes:
+    # sizes are unknown until the data is written; chunks are not held back
+    # to find out, so every entry gets a data descriptor (flag bit 3). Entries
+    # past 4 GiB into the archive, or close to 4 GiB large (deflate can grow
+    # incompressible data slightly), use zip64 records.
+    entry.zip64 = entry.offset >= ZIP64_LIMIT or entry.expected_size >= ZIP64_LIMIT * 0.99
+    dos_time, dos_date = _dos_time(entry.mtime)
+    extra = b""
+    if entry.zip64:
+        extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+    return struct.pack(
+        "<IHHHHHIIIHH",
+        0x04034B50, 45 if entry.zip64 else 20, 0x0808, entry.method, dos_time, dos_date,
+        0, ZIP64_LIMIT if entry.zip64 else 0, ZIP64_LIMIT if entry.zip64 else 0,
+        len(entry.name), len(extra),
+    ) + entry.name + extra
+
+
+def _data_descriptor(entry: _EntryState) -> bytes:
+    if entry.zip64:
+        return struct.pack("<IIQQ", 0x08074B50, entry.crc, entry.compressed_size, entry.size)
+    return struct.pack("<IIII", 0x08074B50, entry.crc, entry.compressed_size, entry.size)
+
+
+def _central_directory(entries: List[_EntryState], offset: int) -> bytes:
+    records = []
+    for entry in entries:
+        dos_time, dos_date = _dos_time(entry.mtime)
+        zip64_fields = []
+        size, compressed_size, entry_offset = entry.size, entry.compressed_size, entry.offset
+        if size >= ZIP64_LIMIT:
+            zip64_fields.append(size)
+            size = ZIP64_LIMIT
+        if compressed_size >= ZIP64_LIMIT:
+            zip64_fields.append(compressed_size)
+            compressed_size = ZIP64_LIMIT
+        if entry_offset >= ZIP64_LIMIT:
+            zip64_fields.append(entry_offset)
+            entry_offset = ZIP64_LIMIT
+        extra = b""
+        if zip64_fields:
+            extra = struct.pack(f"<HH{len(zip64_fields)}Q", 0x0001, 8 * len(zip64_fields), *zip64_fields)
+        version = 45 if (zip64_fields or entry.zip64) else 20
+        records.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50, (3 << 8) | version, version, 0x0808, entry.method, dos_time, dos_date,
+            entry.crc, compressed_size, size, len(entry.name), len(extra), 0, 0, 0,
+            (0o100000 | (entry.mode or 0o644)) << 16, entry_offset,
+        ) + entry.name + extra)
+
+    directory = b"".join(records)
+    count, size = len(entries), len(directory)
+    end = b""
+    if count >= 0xFFFF or size >= ZIP64_LIMIT or offset >= ZIP64_LIMIT:
+        end += struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, count, count, size, offset)
+        end += struct.pack("<IIQI", 0x07064B50, 0, offset + size, 1)
+    end += struct.pack(
+        "<IHHHHIIH", 0x06054B50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+        min(size, ZIP64_LIMIT), min(offset, ZIP64_LIMIT), 0,
+    )
+    return directory + end
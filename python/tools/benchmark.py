@@ -1,3 +1,5 @@
+import asyncio
+
 from python.helpers import benchmark_suite as bs
 from python.helpers.tool import Response, Tool
 
@@ -14,7 +16,8 @@ class Benchmark(Tool):
             suite_name = self.args.get("suite", "")
 
             if suite_name:
-                results = runner.run_suite(suite_name)
+                # benchmarks are CPU bound and take seconds, keep the agent's loop free
+                results = await asyncio.to_thread(runner.run_suite, suite_name)
 
                 if results:
                     result_lines = "\n".join([
@@ -30,7 +33,7 @@ class Benchmark(Tool):
                     break_loop=False
                 )
             else:
-                all_results = runner.run_all()
+                all_results = await asyncio.to_thread(runner.run_all)
 
                 total = sum(len(r) for r in all_results.values())
                 passed = sum(
@@ -51,6 +54,7 @@ class Benchmark(Tool):
 
             suite_info = "\n".join([
                 f"  - {name}: {len(runner.suites[name].benchmarks)} benchmarks"
+                + (" (opt-in, run by name)" if runner.suites[name].opt_in else "")
                 for name in suites
             ])
 
@@ -2,13 +2,11 @@ import asyncio
 import time
 from typing import Optional, cast
 from agent import Agent, InterventionException
-from pathlib import Path
 
 from python.helpers.tool import Tool, Response
-from python.helpers import files, defer, persist_chat, strings
+from python.helpers import files, defer, persist_chat, strings, browser_pool
 from python.helpers.browser_use import browser_use  # type: ignore[attr-defined]
 from python.helpers.print_style import PrintStyle
-from python.helpers.playwright import ensure_playwright_binary
 from python.helpers.secrets import get_secrets_manager
 from python.extensions.message_loop_start._10_iteration_no import get_iter_no
 from pydantic import BaseModel
@@ -29,28 +27,28 @@ class State:
         self.use_agent: Optional[browser_use.Agent] = None
         self.secrets_dict: Optional[dict[str, str]] = None
         self.iter_no = 0
+        # superior and subordinate agents share a context, so the browser
+        # lease belongs to this state and not to the context
+        self.lease = str(uuid.uuid4())
 
     def __del__(self):
         self.kill_task()
-        files.delete_dir(self.get_user_data_dir()) # cleanup user data dir
-
-    def get_user_data_dir(self):
-        return str(
-            Path.home()
-            / ".config"
-            / "browseruse"
-            / "profiles"
-            / f"agent_{self.agent.context.id}"
-        )
+        # the finalizer may run on any thread, don't wait for the process there
+        self.release_browser(wait=False)
+
+    def release_browser(self, wait: bool = True):
+        # closes this state's browser process together with its profile
+        browser_pool.release(self.lease, wait=wait)
 
     async def _initialize(self):
         if self.browser_session:
             return
 
-        # for some reason we need to provide exact path to headless shell, otherwise it looks for headed browser
-        pw_binary = ensure_playwright_binary()
-                
+        # every state leases its own pre-launched browser with a throwaway profile
+        browser = await browser_pool.get_pool().acquire_async(self.lease)
+
         self.browser_session = browser_use.BrowserSession(
+            cdp_url=browser.cdp_url,
             browser_profile=browser_use.BrowserProfile(
                 headless=True,
                 disable_security=True,
@@ -58,7 +56,6 @@ class State:
                 accept_downloads=True,
                 downloads_path=files.get_abs_path("tmp/downloads"),
                 allowed_domains=["*", "http://*", "https://*"],
-                executable_path=pw_binary,
                 keep_alive=True,
                 minimum_wait_page_load_time=1.0,
                 wait_for_network_idle_page_load_time=2.0,
@@ -67,9 +64,6 @@ class State:
                 screen={"width": 1024, "height": 2048},
                 viewport={"width": 1024, "height": 2048},
                 no_viewport=False,
-                args=["--headless=new"],
-                # Use a unique user data directory to avoid conflicts
-                user_data_dir=self.get_user_data_dir(),
                 extra_http_headers=self.agent.config.browser_http_headers or {},
                 )
         )
@@ -93,7 +87,23 @@ class State:
                 PrintStyle().warning(f"Could not force set viewport size: {e}")
 
         # --------------------------------------------------------------------------    
-        
+
+        # the browser was launched by the pool, so apply the context settings
+        # that playwright would otherwise pass when creating the context
+        if self.browser_session and self.browser_session.browser_context:
+            try:
+                context = self.browser_session.browser_context
+                if self.agent.config.browser_http_headers:
+                    await context.set_extra_http_headers(self.agent.config.browser_http_headers)
+                if context.browser:
+                    cdp = await context.browser.new_browser_cdp_session()
+                    await cdp.send("Browser.setDownloadBehavior", {
+                        "behavior": "allow",
+                        "downloadPath": files.get_abs_path("tmp/downloads"),
+                    })
+            except Exception as e:
+                PrintStyle().warning(f"Could not apply browser context settings: {e}")
+
         # Add init script to the browser session
         if self.browser_session and self.browser_session.browser_context:
             js_override = files.get_abs_path("lib/browser/init_override.js")
@@ -104,7 +114,7 @@ class State:
             self.kill_task()
 
         self.task = defer.DeferredTask(
-            thread_name="BrowserAgent" + self.agent.context.id
+            thread_name="BrowserAgent" + self.lease
         )
         if self.agent.context.task:
             self.agent.context.task.add_child_task(self.task, terminate_thread=True)
@@ -378,6 +388,7 @@ class BrowserAgent(Tool):
         self.state = self.agent.get_data("_browser_agent_state")
         if reset and self.state:
             self.state.kill_task()
+            self.state.release_browser()
         if not self.state or reset:
             self.state = await State.create(self.agent)
         self.agent.set_data("_browser_agent_state", self.state)
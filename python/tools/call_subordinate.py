@@ -1,29 +1,29 @@
-from agent import Agent, UserMessage
+from agent import Agent, AgentContext, AgentContextType, UserMessage
 from python.helpers.tool import Tool, Response
+from python.helpers import fan_out, projects
+from python.helpers.fan_out import Branch
+from python.helpers.dirty_json import DirtyJson
 from initialize import initialize_agent
 from python.extensions.hist_add_tool_result import _90_save_tool_call_file as save_tool_call_file
 
+# subordinates running at once in a fan-out unless max_parallel says otherwise
+MAX_PARALLEL = 4
+
 
 class Delegation(Tool):
 
     async def execute(self, message="", reset="", **kwargs):
+        # fan out to several new subordinates at once
+        if kwargs.get("subordinates"):
+            return await self.fan_out(**kwargs)
+
         # create subordinate agent using the data object on this agent and set superior agent to his data object
         if (
             self.agent.get_data(Agent.DATA_NAME_SUBORDINATE) is None
             or str(reset).lower().strip() == "true"
         ):
-            # initialize default config
-            config = initialize_agent()
-
-            # set subordinate prompt profile if provided, if not, keep original
-            agent_profile = kwargs.get("profile")
-            if agent_profile:
-                config.profile = agent_profile
-
             # crate agent
-            sub = Agent(self.agent.number + 1, config, self.agent.context)
-            # register superior/subordinate
-            sub.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
+            sub = self.create_subordinate(kwargs.get("profile"), self.agent.context)
             self.agent.set_data(Agent.DATA_NAME_SUBORDINATE, sub)
 
         # add user message to subordinate agent
@@ -33,15 +33,140 @@ class Delegation(Tool):
         # run subordinate monologue
         result = await subordinate.monologue()
 
+        # result
+        return Response(message=result, break_loop=False, additional=self.hint(result))
+
+    async def fan_out(self, subordinates, gather="all", timeout=0, max_parallel=MAX_PARALLEL, **kwargs):
+        tasks = self.parse_subordinates(subordinates, kwargs.get("profile") or "")
+        first_k = self.parse_gather(gather, len(tasks))
+
+        # every subordinate gets its own background context, so their loops, logs and
+        # streaming state don't interfere with each other or with this agent
+        contexts = [self.create_branch_context(task["profile"]) for task in tasks]
+        branches: dict[int, Branch] = {}
+
+        def on_update(branch: Branch):
+            branches[branch.index] = branch
+            if branch.finished_ok:
+                self.log.stream(content=self.format_branch(branch, tasks[branch.index]) + "\n\n")
+            self.log.update(**{self.branch_key(branch): branch.status})
+
+        async def on_poll():
+            # mirror pause state and show what each running subordinate is doing
+            for context in contexts:
+                context.paused = self.agent.context.paused
+            for index, branch in branches.items():
+                if branch.status == fan_out.STATUS_RUNNING:
+                    progress = contexts[index].log.progress
+                    self.log.update(**{self.branch_key(branch): f"{branch.status}: {progress}"})
+            # an intervention ends the fan-out, results gathered so far are kept in history
+            self.set_progress(self.format_branches(list(branches.values()), tasks))
+            await self.agent.handle_intervention()
+
+        def runner(context: AgentContext, message: str):
+            async def run():
+                context.agent0.hist_add_user_message(UserMessage(message=message, attachments=[]))
+                return await context.agent0.monologue()
+            return run
+
+        try:
+            results = await fan_out.fan_out(
+                [runner(context, task["message"]) for context, task in zip(contexts, tasks)],
+                first_k=first_k,
+                timeout=float(timeout or 0),
+                max_parallel=int(max_parallel or 0),
+                on_update=on_update,
+                on_poll=on_poll,
+            )
+        finally:
+            for context in contexts:
+                AgentContext.remove(context.id)
+
+        result = self.format_branches(results, tasks)
+        return Response(message=result, break_loop=False, additional=self.hint(result))
+
+    def create_subordinate(self, profile: str | None, context: AgentContext) -> Agent:
+        sub = Agent(self.agent.number + 1, self.create_config(profile), context)
+        # register superior/subordinate
+        sub.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
+        return sub
+
+    def create_config(self, profile: str | None):
+        # initialize default config
+        config = initialize_agent()
+
+        # set subordinate prompt profile if provided, if not, keep original
+        if profile:
+            config.profile = profile
+        return config
+
+    def create_branch_context(self, profile: str) -> AgentContext:
+        config = self.create_config(profile)
+        context = AgentContext(config=config, type=AgentContextType.BACKGROUND)
+        context.agent0 = Agent(self.agent.number + 1, config, context)
+        context.agent0.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
+
+        # subordinates work on the same project as this agent
+        project = self.agent.context.get_data(projects.CONTEXT_DATA_KEY_PROJECT)
+        if project:
+            context.set_data(projects.CONTEXT_DATA_KEY_PROJECT, project)
+        return context
+
+    def parse_subordinates(self, subordinates, default_profile: str) -> list[dict[str, str]]:
+        if isinstance(subordinates, str):
+            subordinates = DirtyJson.parse_string(subordinates)
+        if not isinstance(subordinates, list):
+            subordinates = [subordinates]
+
+        tasks = []
+        for item in subordinates:
+            if isinstance(item, dict):
+                message, profile = str(item.get("message", "")), str(item.get("profile") or default_profile)
+            else:
+                message, profile = str(item), default_profile
+            if message.strip():
+                tasks.append({"message": message, "profile": profile})
+        if not tasks:
+            raise ValueError("subordinates must list at least one message")
+        return tasks
+
+    def parse_gather(self, gather, count: int) -> int:
+        value = str(gather).lower().strip()
+        if value in ("", "all"):
+            return 0
+        if value == "first":
+            return 1
+        try:
+            return max(0, min(int(value), count))
+        except ValueError:
+            raise ValueError(f"gather must be 'all', 'first' or a number, got {gather!r}")
+
+    def branch_key(self, branch: Branch) -> str:
+        return f"subordinate_{branch.index + 1}"
+
+    def format_branch(self, branch: Branch, task: dict[str, str]) -> str:
+        return self.agent.read_prompt(
+            "fw.call_sub.fan_out_result.md",
+            number=branch.index + 1,
+            profile=task["profile"] or "default",
+            status=branch.status,
+            duration=f"{branch.duration:.1f}",
+            result=branch.result if branch.finished_ok else branch.error,
+        )
+
+    def format_branches(self, branches: list[Branch], tasks: list[dict[str, str]]) -> str:
+        return "\n\n".join(
+            self.format_branch(branch, tasks[branch.index])
+            for branch in sorted(branches, key=lambda b: b.index)
+        )
+
+    def hint(self, result: str) -> dict | None:
         # hint to use includes for long responses
-        additional = None
         if len(result) >= save_tool_call_file.LEN_MIN:
             hint = self.agent.read_prompt("fw.hint.call_sub.md")
             if hint:
-                additional = {"hint": hint}
-
-        # result
-        return Response(message=result, break_loop=False, additional=additional)
+                return {"hint": hint}
+        return None
 
     def get_log_object(self):
         return self.agent.context.log.log(
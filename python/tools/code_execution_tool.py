@@ -28,6 +28,12 @@ OUTPUT_TIMEOUTS: dict[str, int] = {
     "dialog_timeout": 5,
 }
 
+# While output streams, the full output is reprocessed for the log at most this often (seconds).
+OUTPUT_UPDATE_INTERVAL = 0.25
+
+# literal \xNN byte escapes left in terminal output
+BYTE_ESCAPE = re.compile(r"(?<!\\)\\x[0-9A-Fa-f]{2}")
+
 @dataclass
 class ShellWrap:
     id: int
@@ -239,7 +245,7 @@ class CodeExecution(Tool):
         between_output_timeout=15,  # Wait up to x seconds between outputs
         dialog_timeout=5,  # potential dialog detection timeout
         max_exec_timeout=180,  # hard cap on total runtime
-        sleep_time=0.1,
+        sleep_time=0.5,  # longest wait between intervention checks while idle
         prefix="",
         timeouts: dict | None = None,
     ):
@@ -256,38 +262,68 @@ class CodeExecution(Tool):
 
         start_time = time.time()
         last_output_time = start_time
+        last_update_time = 0.0
         full_output = ""
         truncated_output = ""
         got_output = False
+        stale = False  # output arrived that is not in the log yet
+        shell = self.state.shells[session].session
+
+        def update_log():
+            nonlocal truncated_output, last_update_time, stale
+            last_update_time = time.time()
+            stale = False
+            truncated_output = self.fix_full_output(full_output)
+            self.set_progress(truncated_output)
+            heading = self.get_heading_from_output(truncated_output, 0)
+            self.log.update(content=prefix + truncated_output, heading=heading)
 
         # if prefix, log right away
         if prefix:
             self.log.update(content=prefix)
 
         while True:
-            await asyncio.sleep(sleep_time)
-            full_output, partial_output = await self.state.shells[session].session.read_output(
-                timeout=1, reset_full_output=reset_full_output
-            )
-            reset_full_output = False  # only reset once
+            # wake up as soon as output arrives, or when the next timeout is due
+            now = time.time()
+            if not got_output:
+                deadline = start_time + min(first_output_timeout, max_exec_timeout)
+            else:
+                deadline = min(start_time + max_exec_timeout, last_output_time + between_output_timeout)
+                if now < last_output_time + dialog_timeout:
+                    deadline = min(deadline, last_output_time + dialog_timeout)
+            has_output = await shell.wait_output(timeout=max(0.0, min(sleep_time, deadline - now)))
+
+            partial_output = None
+            if has_output or reset_full_output:
+                full_output, partial_output = await shell.read_output(
+                    timeout=1, reset_full_output=reset_full_output
+                )
+                reset_full_output = False  # only reset once
 
             await self.agent.handle_intervention()
 
             now = time.time()
             if partial_output:
                 PrintStyle(font_color="#85C1E9").stream(partial_output)
-                # full_output += partial_output # Append new output
-                truncated_output = self.fix_full_output(full_output)
-                self.set_progress(truncated_output)
-                heading = self.get_heading_from_output(truncated_output, 0)
-                self.log.update(content=prefix + truncated_output, heading=heading)
                 last_output_time = now
                 got_output = True
+                stale = True
+
+                # the whole output is only reprocessed for the log a few times per second,
+                # a prompt at its end is detected from the last lines alone
+                last_lines = shell.output.tail(4)
+                if last_lines and not last_lines[-1]:
+                    last_lines.pop()  # line break at the very end
+                last_lines = [BYTE_ESCAPE.sub("", line) for line in last_lines[-3:]]
+                prompt_found = any(
+                    pat.search(line.strip())
+                    for line in last_lines
+                    for pat in self.prompt_patterns
+                )
+                if prompt_found or now - last_update_time >= OUTPUT_UPDATE_INTERVAL:
+                    update_log()
 
                 # Check for shell prompt at the end of output
-                last_lines = (
-                    truncated_output.splitlines()[-3:] if truncated_output else []
-                )
                 last_lines.reverse()
                 for idx, line in enumerate(last_lines):
                     for pat in self.prompt_patterns:
@@ -303,8 +339,13 @@ class CodeExecution(Tool):
                             self.mark_session_idle(session)
                             return truncated_output
 
+            elif stale:
+                update_log()  # output paused, show all of it
+
             # Check for max execution time
             if now - start_time > max_exec_timeout:
+                if stale:
+                    update_log()
                 sysinfo = self.agent.read_prompt(
                     "fw.code.max_time.md", timeout=max_exec_timeout
                 )
@@ -465,7 +506,7 @@ class CodeExecution(Tool):
 
     def fix_full_output(self, output: str):
         # remove any single byte \xXX escapes
-        output = re.sub(r"(?<!\\)\\x[0-9A-Fa-f]{2}", "", output)
+        output = BYTE_ESCAPE.sub("", output)
         # Strip every line of output before truncation
         # output = "\n".join(line.strip() for line in output.splitlines())
         output = truncate_text_agent(agent=self.agent, output=output, threshold=1000000) # ~1MB, larger outputs should be dumped to file, not read from terminal
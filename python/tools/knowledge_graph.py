@@ -17,6 +17,7 @@ class KnowledgeGraph(Tool):
             properties = self.args.get("properties", {})
 
             entity = graph.add_entity(name, entity_type, properties)
+            graph.flush()
             return Response(
                 message=f"✅ Added entity '{name}' (type: {entity_type}, id: {entity.id})",
                 break_loop=False
@@ -37,6 +38,7 @@ class KnowledgeGraph(Tool):
                 )
 
             rel = graph.add_relationship(source_entity.id, target_entity.id, relation)
+            graph.flush()
             return Response(
                 message=f"✅ Added relationship: {source} --[{relation}]--> {target}",
                 break_loop=False
@@ -50,6 +52,7 @@ class KnowledgeGraph(Tool):
             obj_type = self.args.get("object_type", "concept")
 
             s, r, o = graph.add_triple(subject, subject_type, predicate, obj, obj_type)
+            graph.flush()
             return Response(
                 message=f"✅ Added triple: {subject} --[{predicate}]--> {obj}",
                 break_loop=False
@@ -83,6 +86,7 @@ class KnowledgeGraph(Tool):
 
         elif operation == "infer":
             count = graph.run_inference()
+            graph.flush()
             return Response(
                 message=f"🧠 Inference complete. {count} new relationships inferred.",
                 break_loop=False
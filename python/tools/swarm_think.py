@@ -8,7 +8,7 @@ import hashlib
 
 import numpy as np
 
-from python.helpers.swarm_intelligence import get_swarm_intelligence
+from python.helpers.swarm_intelligence import CosineFitness, get_swarm_intelligence
 from python.helpers.tool import Response, Tool
 
 
@@ -23,7 +23,8 @@ class SwarmThink(Tool):
 
         task = self.args.get("task", "")
         action = self.args.get("action", "think")  # think, status, patterns
-        iterations = self.args.get("iterations", 20)
+        iterations = int(self.args.get("iterations", 20))
+        time_budget = self.args.get("time_budget")  # seconds, optional
 
         if action == "think":
             if not task:
@@ -38,17 +39,15 @@ class SwarmThink(Tool):
             task_embedding = np.random.randn(128)
             task_embedding = task_embedding / np.linalg.norm(task_embedding)
 
-            # Simple fitness function based on distance to task
-            def fitness_fn(position: np.ndarray) -> float:
-                similarity = np.dot(position / (np.linalg.norm(position) + 0.001),
-                                   task_embedding)
-                return (similarity + 1) / 2  # Normalize to [0, 1]
+            # Simple fitness function based on distance to task, normalized to [0, 1]
+            fitness_fn = CosineFitness(task_embedding)
 
             # Run swarm thinking
             result = await swarm.swarm_think(
                 task_embedding=task_embedding,
                 fitness_fn=fitness_fn,
-                n_iterations=iterations
+                n_iterations=iterations,
+                time_budget=float(time_budget) if time_budget else None
             )
 
             # Format results
@@ -56,7 +55,7 @@ class SwarmThink(Tool):
             contributions = result.get('role_contributions', {})
 
             result_lines = [
-                f"**Swarm Thinking Complete** ({iterations} iterations)",
+                f"**Swarm Thinking Complete** ({result['iterations']} iterations)",
                 f"",
                 f"**Final Fitness**: {result.get('final_fitness', 0):.4f}",
                 f"",
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 from python.helpers.print_style import PrintStyle
 from python.helpers.tool import Tool, Response
@@ -17,40 +18,43 @@ class VisionLoad(Tool):
         self.images_dict = {}
         template: list[dict[str, str]] = []  # type: ignore
 
+        image_paths = []
         for path in paths:
+            if path in image_paths:
+                continue
             if not await runtime.call_development_function(files.exists, str(path)):
                 continue
+            mime_type, _ = guess_type(str(path))
+            if mime_type and mime_type.startswith("image/"):
+                image_paths.append(path)
 
-            if path not in self.images_dict:
-                mime_type, _ = guess_type(str(path))
-                if mime_type and mime_type.startswith("image/"):
-                    try:
-                        # Read binary file
-                        file_content = await runtime.call_development_function(
-                            files.read_file_base64, str(path)
-                        )
-                        file_content = base64.b64decode(file_content)
-                        # Compress and convert to JPEG
-                        compressed = images.compress_image(
-                            file_content, max_pixels=MAX_PIXELS, quality=QUALITY
-                        )
-                        # Encode as base64
-                        file_content_b64 = base64.b64encode(compressed).decode("utf-8")
-
-                        # DEBUG: Save compressed image
-                        # await runtime.call_development_function(
-                        #     files.write_file_base64, str(path), file_content_b64
-                        # )
-
-                        # Construct the data URL (always JPEG after compression)
-                        self.images_dict[path] = file_content_b64
-                    except Exception as e:
-                        self.images_dict[path] = None
-                        PrintStyle().error(f"Error processing image {path}: {e}")
-                        self.agent.context.log.log("warning", f"Error processing image {path}: {e}")
+        # images are read and compressed in parallel, compression runs off the event loop
+        results = await asyncio.gather(
+            *[self.load_image(path) for path in image_paths], return_exceptions=True
+        )
+        for path, result in zip(image_paths, results):
+            if isinstance(result, BaseException):
+                self.images_dict[path] = None
+                PrintStyle().error(f"Error processing image {path}: {result}")
+                self.agent.context.log.log("warning", f"Error processing image {path}: {result}")
+            else:
+                self.images_dict[path] = result
 
         return Response(message="dummy", break_loop=False)
 
+    async def load_image(self, path: str) -> str:
+        # Read binary file
+        file_content = await runtime.call_development_function(
+            files.read_file_base64, str(path)
+        )
+        file_content = base64.b64decode(file_content)
+        # Compress and convert to JPEG
+        compressed = await images.compress_image_async(
+            file_content, max_pixels=MAX_PIXELS, quality=QUALITY
+        )
+        # Encode as base64
+        return base64.b64encode(compressed).decode("utf-8")
+
     async def after_execution(self, response: Response, **kwargs):
 
         # build image data messages for LLMs, or error message
@@ -1,3 +1,7 @@
+# time the imports below for the startup report, until the server is up
+from python.helpers import startup
+startup.profile_imports()
+
 import asyncio
 from datetime import timedelta
 import os
@@ -233,15 +237,17 @@ def run():
         )
 
     # initialize and register API handlers
-    handlers = load_classes_from_folder("python/api", "*.py", ApiHandler)
-    for handler in handlers:
-        register_api_handler(webapp, handler)
+    with startup.step("api handlers"):
+        handlers = load_classes_from_folder("python/api", "*.py", ApiHandler)
+        for handler in handlers:
+            register_api_handler(webapp, handler)
 
     # add the webapp, mcp, and a2a to the app
-    middleware_routes = {
-        "/mcp": ASGIMiddleware(app=mcp_server.DynamicMcpProxy.get_instance()),  # type: ignore
-        "/a2a": ASGIMiddleware(app=fasta2a_server.DynamicA2AProxy.get_instance()),  # type: ignore
-    }
+    with startup.step("mcp and a2a servers"):
+        middleware_routes = {
+            "/mcp": ASGIMiddleware(app=mcp_server.DynamicMcpProxy.get_instance()),  # type: ignore
+            "/a2a": ASGIMiddleware(app=fasta2a_server.DynamicA2AProxy.get_instance()),  # type: ignore
+        }
 
     app = DispatcherMiddleware(webapp, middleware_routes)  # type: ignore
 
@@ -257,9 +263,12 @@ def run():
     process.set_server(server)
     server.log_startup()
 
-    # Start init_a0 in a background thread when server starts
-    # threading.Thread(target=init_a0, daemon=True).start()
-    init_a0()
+    # subsystems warm up in the background, requests wait only for those they need
+    with startup.step("init a0"):
+        init_a0()
+
+    ready_ms = startup.finish()
+    PrintStyle().debug(f"Ready to serve after {ready_ms:.0f} ms, subsystems keep warming up in the background")
 
     # run the server
     server.serve_forever()
@@ -267,13 +276,14 @@ def run():
 
 def init_a0():
     # initialize contexts and MCP
-    init_chats = initialize.initialize_chats()
-    # only wait for init chats, otherwise they would seem to disappear for a while on restart
-    init_chats.result_sync()
+    # API handlers wait for the chats, otherwise they would seem to disappear for a while on restart
+    initialize.initialize_chats()
 
     initialize.initialize_mcp()
     # start job loop
     initialize.initialize_job_loop()
+    # import the model libraries before the first message needs them
+    initialize.initialize_models()
     # preload
     initialize.initialize_preload()
 
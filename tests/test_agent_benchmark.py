@@ -0,0 +1,134 @@
+"""
+Tests for the agent loop benchmark pieces that run without an agent
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers.agent_benchmark import PhaseTimer, ScenarioResult, check, load_baseline, save_baseline
+
+
+class Worker:
+
+    async def outer(self):
+        time.sleep(0.02)
+        await self.inner()
+        return "done"
+
+    async def inner(self):
+        await asyncio.sleep(0.05)
+
+    @staticmethod
+    def helper(value):
+        time.sleep(0.01)
+        return value * 2
+
+
+def test_phases_are_timed_exclusively():
+    timer = PhaseTimer()
+    timer.instrument(Worker, "outer", "outer")
+    timer.instrument(Worker, "inner", "inner")
+    timer.instrument(Worker, "helper", "helper")
+    try:
+        assert asyncio.run(Worker().outer()) == "done"
+        assert Worker.helper(2) == 4 and Worker().helper(3) == 6
+    finally:
+        timer.restore()
+
+    ms = timer.milliseconds()
+    # the nested sleep isn't counted twice: outer keeps only its own sleep
+    assert ms["inner"] >= 50 and ms["outer"] >= 20
+    assert ms["outer"] < ms["inner"]
+    assert timer.counts == {"outer": 1, "inner": 1, "helper": 2}
+    assert isinstance(Worker.__dict__["helper"], staticmethod)
+    assert Worker.outer.__name__ == "outer"
+
+
+def result(total: float, **phases) -> ScenarioResult:
+    return ScenarioResult("loop", runs=3, total_ms=total, phases=phases, calls={}, model_calls=2)
+
+
+def test_baseline_thresholds_flag_regressions(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    save_baseline({"loop": result(100.0, llm=40.0, prompt_build=2.0)}, path, tolerance=0.2)
+    baseline = load_baseline(path)
+    assert baseline["scenarios"]["loop"]["total_ms"] == {"baseline": 100.0, "max": 120.0}
+    # small phases get an absolute margin
+    assert baseline["scenarios"]["loop"]["phases"]["prompt_build"]["max"] == 7.0
+
+    assert check({"loop": result(115.0, llm=47.0, prompt_build=6.0)}, baseline) == []
+    regressions = check({"loop": result(130.0, llm=55.0, prompt_build=3.0), "other": result(1e6)}, baseline)
+    assert [(r.metric, r.current_ms) for r in regressions] == [("total_ms", 130.0), ("llm", 55.0)]
+
+    failed = result(1.0)
+    failed.error = "2 scripted responses were not used"
+    save_baseline({"loop": failed}, path)
+    assert load_baseline(path)["scenarios"]["loop"]["total_ms"]["baseline"] == 100.0
+    assert json.loads(open(path).read())["tolerance"] == 0.25
+
+
+@pytest.fixture
+def offline_litellm(monkeypatch):
+    """LiteLLM without the remote cost map, telemetry or logging callbacks"""
+    # set before LiteLLM is first imported, otherwise the cost map is fetched
+    # and retried on a background thread
+    monkeypatch.setenv("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    monkeypatch.setenv("LITELLM_TELEMETRY", "False")
+    pytest.importorskip("litellm")
+    import litellm
+
+    for name in ("callbacks", "success_callback", "failure_callback", "_async_success_callback", "_async_failure_callback"):
+        monkeypatch.setattr(litellm, name, [])
+    monkeypatch.setattr(litellm, "disable_streaming_logging", True)
+    monkeypatch.setattr(litellm, "custom_provider_map", list(litellm.custom_provider_map))
+    return litellm
+
+
+def test_scripted_provider_streams_through_litellm(offline_litellm):
+    litellm = offline_litellm
+    from python.helpers import bench_llm
+
+    llm = bench_llm.register(bench_llm.ScriptedLLM({"chat": ["first answer", "second"]}, tokens_per_chunk=1))
+
+    async def stream(model):
+        response = await litellm.acompletion(
+            model=f"{bench_llm.PROVIDER}/{model}", messages=[{"role": "user", "content": "hi"}], stream=True
+        )
+        return [chunk.choices[0].delta.content or "" async for chunk in response]
+
+    chunks = asyncio.run(stream("chat"))
+    assert "".join(chunks) == "first answer" and len(chunks) >= 3
+    assert "".join(asyncio.run(stream("chat"))) == "second"
+    assert "".join(asyncio.run(stream("utility"))) == "[]"
+    assert llm.pending("chat") == 0 and [name for name, _ in llm.calls] == ["chat", "chat", "utility"]
+
+    response = litellm.embedding(
+        model=f"{bench_llm.PROVIDER}/embedding",
+        input=["staging database port", "the staging database runs on port 5433", "billing webhooks"],
+    )
+    vectors = [item["embedding"] for item in response.data]
+    assert len(vectors[0]) == bench_llm.EMBEDDING_DIMENSIONS
+    assert math.isclose(sum(v * v for v in vectors[0]), 1.0)
+    similarity = [sum(a * b for a, b in zip(vectors[0], other)) for other in vectors[1:]]
+    assert similarity[0] > similarity[1]
+
+
+def test_one_scenario_runs_end_to_end(offline_litellm):
+    from python.helpers import agent_benchmark
+
+    agent_benchmark.stub_missing_modules()
+    pytest.importorskip("agent")
+
+    result = agent_benchmark.run_scenario(agent_benchmark.SCENARIOS["memory_recall"], runs=1, warmup=0)
+    assert result.error is None
+    # three saves, one recall and the answer
+    assert result.calls["tool_execution"] == 5 and result.calls["llm"] == 5
+    assert result.model_calls >= 5 and result.phases["llm"] > 0 and result.total_ms > 0
@@ -0,0 +1,171 @@
+"""
+Tests for incremental backup chains
+"""
+
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers import backup_chain
+from python.helpers.backup_chain import BackupChain
+from python.helpers.zip_stream import ZipStreamCancelled, ZipStreamProgress
+
+
+def matched(root):
+    result = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            result.append({"path": path, "real_path": path, "size": os.path.getsize(path)})
+    return result
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def contents(zip_path):
+    with zipfile.ZipFile(zip_path) as zipf:
+        return {name: zipf.read(name).decode() for name in zipf.namelist() if name != "metadata.json"}
+
+
+def test_incremental_chain_stores_changes_and_restores_each_point(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    chain = BackupChain(str(tmp_path / "store"))
+    write(str(data / "memory/a.txt"), "alpha")
+    write(str(data / "memory/b.txt"), "beta")
+    write(str(data / "chats/c.json"), "chat")
+
+    first = chain.write("first.zip", matched(data), {"backup_name": "test"})
+    assert (first["total_files"], first["stored_files"]) == (3, 3)
+
+    write(str(data / "memory/a.txt"), "alpha 2")
+    write(str(data / "memory/copy.txt"), "beta")  # duplicate content
+    os.remove(data / "chats/c.json")
+    hashed = []
+    original_hash = backup_chain.file_hash
+    monkeypatch.setattr(backup_chain, "file_hash", lambda path: hashed.append(path) or original_hash(path))
+
+    second = chain.write("second.zip", matched(data), {"backup_name": "test"})
+
+    assert (second["total_files"], second["stored_files"], second["parent"]) == (3, 1, "first.zip")
+    assert sorted(os.path.basename(p) for p in hashed) == ["a.txt", "copy.txt"]
+    assert list(contents(chain.archive_path("second.zip")).values()) == ["alpha 2"]
+    assert [p["archive"] for p in chain.restore_points()] == ["first.zip", "second.zip"]
+
+    old = contents(chain.materialize("first.zip", str(tmp_path / "old.zip")))
+    new = contents(chain.materialize("second.zip", str(tmp_path / "new.zip")))
+    root = str(data).lstrip("/")
+    assert old == {f"{root}/memory/a.txt": "alpha", f"{root}/memory/b.txt": "beta", f"{root}/chats/c.json": "chat"}
+    assert new == {f"{root}/memory/a.txt": "alpha 2", f"{root}/memory/b.txt": "beta", f"{root}/memory/copy.txt": "beta"}
+
+    with zipfile.ZipFile(tmp_path / "new.zip") as zipf:
+        metadata = json.loads(zipf.read("metadata.json"))
+    assert metadata["backup_type"] == "full" and "manifest" not in metadata
+
+
+def test_materialize_uses_uploaded_copy_of_archive(tmp_path):
+    data = tmp_path / "data"
+    chain = BackupChain(str(tmp_path / "store"))
+    write(str(data / "a.txt"), "alpha")
+    chain.write("first.zip", matched(data), {})
+    write(str(data / "a.txt"), "alpha, edited")
+    chain.write("second.zip", matched(data), {})
+
+    uploaded = str(tmp_path / "upload.zip")
+    os.replace(chain.archive_path("second.zip"), uploaded)
+
+    restored = contents(chain.materialize("second.zip", str(tmp_path / "full.zip"), {"second.zip": uploaded}))
+    assert list(restored.values()) == ["alpha, edited"]
+
+
+def test_files_of_deleted_archive_are_stored_again(tmp_path):
+    data = tmp_path / "data"
+    chain = BackupChain(str(tmp_path / "store"))
+    write(str(data / "a.txt"), "alpha")
+    write(str(data / "b.txt"), "beta")
+    chain.write("first.zip", matched(data), {})
+    write(str(data / "b.txt"), "beta 2")
+    chain.write("second.zip", matched(data), {})
+    write(str(data / "a.txt"), "alpha 3")
+    chain.write("third.zip", matched(data), {})
+
+    # b.txt is unchanged since the deleted middle archive
+    os.remove(chain.archive_path("second.zip"))
+    fourth = chain.write("fourth.zip", matched(data), {})
+
+    assert (fourth["parent"], fourth["stored_files"]) == ("third.zip", 1)
+    assert [p["archive"] for p in chain.restore_points()] == ["first.zip", "third.zip", "fourth.zip"]
+    restored = contents(chain.materialize("fourth.zip", str(tmp_path / "full.zip")))
+    root = str(data).lstrip("/")
+    assert restored == {f"{root}/a.txt": "alpha 3", f"{root}/b.txt": "beta 2"}
+
+
+def test_write_and_materialize_report_progress_and_cancel(tmp_path):
+    data = tmp_path / "data"
+    chain = BackupChain(str(tmp_path / "store"))
+    write(str(data / "a.txt"), "alpha")
+    write(str(data / "b.txt"), "beta")
+    chain.write("first.zip", matched(data), {})
+    write(str(data / "b.txt"), "beta, edited")
+
+    progress = ZipStreamProgress()
+    chain.write("second.zip", matched(data), {}, progress)
+    assert (progress.status, progress.files_total, progress.bytes_total) == ("done", 1, 12)
+    assert progress.bytes_done == 12
+
+    progress = ZipStreamProgress()
+    chain.materialize("second.zip", str(tmp_path / "full.zip"), progress=progress)
+    assert (progress.status, progress.files_total, progress.bytes_total) == ("done", 2, 17)
+
+    cancelled = ZipStreamProgress()
+    cancelled.cancel()
+    with pytest.raises(ZipStreamCancelled):
+        chain.materialize("second.zip", str(tmp_path / "cancelled.zip"), progress=cancelled)
+    assert not os.path.exists(tmp_path / "cancelled.zip")
+    with pytest.raises(ZipStreamCancelled):
+        chain.write("third.zip", matched(data), {}, cancelled)
+    assert not os.path.exists(chain.archive_path("third.zip"))
+    assert [p["archive"] for p in chain.restore_points()] == ["first.zip", "second.zip"]
+
+
+def test_unreadable_files_are_left_out_of_the_manifest(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    chain = BackupChain(str(tmp_path / "store"))
+    write(str(data / "a.txt"), "alpha")
+    write(str(data / "gone.txt"), "gone")
+
+    # removed between planning and writing
+    plan = chain.plan
+    def plan_then_remove(*args, **kwargs):
+        result = plan(*args, **kwargs)
+        os.remove(data / "gone.txt")
+        return result
+    monkeypatch.setattr(chain, "plan", plan_then_remove)
+
+    point = chain.write("first.zip", matched(data), {})
+    assert (point["total_files"], point["stored_files"]) == (1, 1)
+    assert list(chain.load_manifest("first.zip")) == [str(data / "a.txt")]
+    restored = contents(chain.materialize("first.zip", str(tmp_path / "full.zip")))
+    assert list(restored.values()) == ["alpha"]
+
+
+def test_operations_expire_by_age_even_while_running(monkeypatch):
+    backup = pytest.importorskip("python.helpers.backup")
+    service = backup.BackupService
+    monkeypatch.setattr(service, "_operations", {})
+
+    # a streamed backup whose response is never read stays "running"
+    abandoned = service._start_operation("abandoned", [])
+    abandoned.started -= service.OPERATION_TTL + 1
+    service._start_operation("current", [{"size": 5}])
+
+    assert service.get_operation("abandoned") is None
+    assert service.get_operation("current").bytes_total == 5
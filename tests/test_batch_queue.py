@@ -0,0 +1,63 @@
+"""
+Tests for the bounded batching request queue
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers.batch_queue import BatchQueue, QueueFullError
+
+
+def test_requests_waiting_together_are_batched_by_key():
+    batches = []
+    gate = threading.Event()
+
+    def process(items):
+        gate.wait(5)
+        batches.append(list(items))
+        return [f"{key}:{value}" for key, value in items]
+
+    queue = BatchQueue("test-queue", process, max_batch=3, batch_key=lambda item: item[0])
+    futures = [queue.submit(("base", 0))]
+    time.sleep(0.05)  # first request is being processed alone
+    futures += [queue.submit(item) for item in [("base", 1), ("base", 2), ("large", 3), ("base", 4), ("base", 5), ("base", 6)]]
+    assert queue.stats()["queue_depth"] == 6
+
+    gate.set()
+    assert [f.result(5) for f in futures] == ["base:0", "base:1", "base:2", "large:3", "base:4", "base:5", "base:6"]
+    assert [[value for _, value in batch] for batch in batches] == [[0], [1, 2], [3], [4, 5, 6]]
+
+    stats = queue.stats()
+    assert stats["processed"] == 7 and stats["queue_depth"] == 0
+    assert stats["avg_batch_size"] == 1.75 and stats["p95_latency_ms"] >= stats["avg_wait_ms"]
+
+
+def test_full_queue_rejects_and_errors_reach_callers():
+    gate = threading.Event()
+
+    def process(items):
+        gate.wait(5)
+        if "bad" in items:
+            raise ValueError("cannot decode")
+        return items
+
+    queue = BatchQueue("test-queue", process, max_size=2, max_batch=1)
+    first = queue.submit("ok")
+    time.sleep(0.05)
+    queued = [queue.submit("bad"), queue.submit("ok")]
+    with pytest.raises(QueueFullError):
+        queue.submit("ok")
+
+    gate.set()
+    assert first.result(5) == "ok"
+    with pytest.raises(ValueError):
+        queued[0].result(5)
+    assert asyncio.run(queue.process("fine")) == "fine"
+    assert queue.stats()["rejected"] == 1 and queue.stats()["failed"] == 1
@@ -0,0 +1,23 @@
+"""
+Tests for the benchmark runner's suite selection
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers.benchmark_suite import Benchmark, BenchmarkRunner, BenchmarkSuite
+
+
+def test_run_all_skips_opt_in_suites():
+    runner = BenchmarkRunner()
+    assert runner.suites["memory_100k"].opt_in and not runner.suites["memory_10k"].opt_in
+
+    ran = []
+    runner.suites = {
+        "quick": BenchmarkSuite("quick", "", [Benchmark("quick", "", lambda: ran.append("quick"))]),
+        "slow": BenchmarkSuite("slow", "", [Benchmark("slow", "", lambda: ran.append("slow"))], opt_in=True),
+    }
+    assert list(runner.run_all()) == ["quick"] and ran == ["quick"]
+    assert [r.success for r in runner.run_suite("slow")] == [True] and ran == ["quick", "slow"]
@@ -0,0 +1,152 @@
+"""
+Tests for the warm browser pool
+"""
+
+import functools
+import http.server
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers import browser_pool
+from python.helpers.browser_pool import BrowserPool, BrowserProcess
+
+
+def fake_launch(launched: list, delay: float = 0.05):
+    def launch():
+        time.sleep(delay)
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        browser = BrowserProcess(f"http://127.0.0.1:{9000 + len(launched)}", process, launch_time=delay)
+        launched.append(browser)
+        return browser
+    return launch
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_contexts_get_warm_isolated_browsers_recycled_on_release():
+    launched = []
+    pool = BrowserPool(fake_launch(launched), warm=1)
+    try:
+        pool.prewarm()
+        wait_for(lambda: pool.stats()["idle"] == 1)
+
+        first = pool.acquire("context-a")
+        assert pool.acquire("context-a") is first
+        wait_for(lambda: pool.stats()["idle"] == 1)  # spare replaced in the background
+        second = pool.acquire("context-b")
+        assert second is not first
+
+        pool.release("context-a")
+        assert not first.alive
+
+        stats = pool.stats()
+        assert (stats["warm_hits"], stats["cold_starts"], stats["recycled"]) == (2, 0, 1)
+        assert stats["avg_launch_ms"] == pytest.approx(50, abs=1)
+        assert stats["memory_mb"] > 0
+    finally:
+        pool.close()
+    assert not any(browser.alive for browser in launched)
+
+
+def test_release_without_wait_closes_in_the_background():
+    launched = []
+    pool = BrowserPool(fake_launch(launched), warm=0)
+    try:
+        browser = pool.acquire("state-a")
+        other = pool.acquire("state-b")
+        pool.release("state-a", wait=False)
+        wait_for(lambda: not browser.alive)
+        assert other.alive  # only the released lease is closed
+        assert pool.stats()["leased"] == 1
+    finally:
+        pool.close()
+
+
+def test_acquire_waits_for_capacity_and_times_out():
+    pool = BrowserPool(fake_launch([]), warm=0, max_browsers=1, acquire_timeout=0.2)
+    try:
+        pool.acquire("context-a")
+        with pytest.raises(TimeoutError):
+            pool.acquire("context-b")
+
+        threading.Timer(0.05, pool.release, args=["context-a"]).start()
+        pool.acquire_timeout = 5
+        assert pool.acquire("context-b").alive
+        assert pool.stats()["cold_starts"] == 2
+    finally:
+        pool.close()
+
+
+def test_memory_cap_closes_spares_and_blocks_launches():
+    launched = []
+    pool = BrowserPool(fake_launch(launched), warm=1, max_memory_mb=1, acquire_timeout=0.2)
+    try:
+        pool.acquire("context-a")  # a python process is well over 1 MB
+        time.sleep(0.2)
+        assert pool.stats()["idle"] == 0
+        with pytest.raises(TimeoutError):
+            pool.acquire("context-b")
+        assert len(launched) == 1
+    finally:
+        pool.close()
+
+
+def find_chromium() -> str | None:
+    for name in ("chromium", "chromium-browser", "google-chrome", "headless_shell"):
+        if path := shutil.which(name):
+            return path
+    try:
+        from python.helpers.playwright import get_playwright_binary
+        binary = get_playwright_binary()
+        return str(binary) if binary else None
+    except Exception:
+        return None
+
+
+def test_real_browsers_are_isolated(tmp_path):
+    sync_api = pytest.importorskip("playwright.sync_api")
+    executable = find_chromium()
+    if not executable:
+        pytest.skip("no chromium binary installed")
+
+    (tmp_path / "index.html").write_text("<html><body><h1>pool test</h1></body></html>")
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+
+    pool = BrowserPool(lambda: browser_pool.launch_chromium(executable), warm=1)
+    try:
+        with sync_api.sync_playwright() as playwright:
+            def open_page(owner):
+                browser = playwright.chromium.connect_over_cdp(pool.acquire(owner).cdp_url)
+                page = browser.contexts[0].pages[0] if browser.contexts[0].pages else browser.contexts[0].new_page()
+                page.goto(url)
+                return page
+
+            page_a = open_page("context-a")
+            assert page_a.inner_text("h1") == "pool test"
+            page_a.evaluate("localStorage.setItem('owner', 'a')")
+
+            page_b = open_page("context-b")
+            assert page_b.evaluate("localStorage.getItem('owner')") is None
+
+        stats = pool.stats()
+        assert stats["warm_hits"] + stats["cold_starts"] == 2
+        assert stats["avg_launch_ms"] > 0
+    finally:
+        pool.close()
+        server.shutdown()
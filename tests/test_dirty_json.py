@@ -0,0 +1,59 @@
+"""
+Tests for the tolerant JSON parser and its strict fast path
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers.dirty_json import DirtyJson
+
+RESPONSE = {
+    "thoughts": ["Check the logs", "Then restart the service"],
+    "headline": "Restarting \"web\" service",
+    "tool_name": "code_execution_tool",
+    "tool_args": {"runtime": "terminal", "session": 0, "code": "tail -n 5 /var/log/web.log\nsystemctl restart web\t# café ✓"},
+    "values": [1, -2.5, 3e2, True, False, None],
+}
+
+
+def test_well_formed_json_parses_like_json_loads():
+    text = json.dumps(RESPONSE, indent=2, ensure_ascii=False)
+    assert DirtyJson.parse_string(text) == RESPONSE
+    assert DirtyJson.parse_string(f"Sure, here it is:\n```json\n{text}\n```") == RESPONSE
+    assert DirtyJson.parse_string('{"a": {"b": {"c": 1}}, "e": 3}') == {"a": {"b": {"c": 1}}, "e": 3}
+
+
+def test_lenient_syntax_is_still_accepted():
+    text = """{
+        // the tool to use
+        tool_name: 'code_execution_tool', /* unquoted key, single quotes */
+        "tool_args": {"code": \"\"\"
+print("multi
+line")
+\"\"\", "flags": [1, 2,],},
+        "raw": "line one
+line two",
+    }"""
+    assert DirtyJson.parse_string(text) == {
+        "tool_name": "code_execution_tool",
+        "tool_args": {"code": 'print("multi\nline")', "flags": [1, 2]},
+        "raw": "line one\nline two",
+    }
+    assert DirtyJson.parse_string("{{ a: NaN, b: undefined }}") == {"a": "NaN", "b": None}
+    assert DirtyJson.parse_string('{"s": "bad \\x escape \\u00e9 \\uzzzz"}') == {"s": "bad  escape é \\uzzzz"}
+
+
+def test_truncated_input_keeps_the_parsed_prefix():
+    text = json.dumps(RESPONSE, ensure_ascii=False)
+    cut = text.index("systemctl")
+    assert DirtyJson.parse_string(text[:cut]) == {
+        "thoughts": RESPONSE["thoughts"],
+        "headline": RESPONSE["headline"],
+        "tool_name": "code_execution_tool",
+        "tool_args": {"runtime": "terminal", "session": 0, "code": "tail -n 5 /var/log/web.log\n"},
+    }
+    cut = text.index("session")
+    assert DirtyJson.parse_string(text[:cut + 4])["tool_args"] == {"runtime": "terminal", "sess": None}
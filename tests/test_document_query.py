@@ -0,0 +1,267 @@
+"""
+Tests for the persisted, shared document query index
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import uuid
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+document_query = pytest.importorskip("python.helpers.document_query")
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from python.helpers.vector_db import VectorDB, cosine_normalizer
+
+DocumentQueryStore = document_query.DocumentQueryStore
+DocumentQueryHelper = document_query.DocumentQueryHelper
+
+
+class WordEmbeddings(Embeddings):
+    """Hashed bag of words, texts sharing words are similar"""
+
+    def __init__(self):
+        # VectorDB caches embeddings per model name, one name per instance
+        self.model_name = f"test-word-embeddings-{uuid.uuid4()}"
+        self.calls = 0
+        self.async_queries = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        vector = [0.0] * 64
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.async_queries += 1
+        return self.embed_query(text)
+
+
+class FakeAgent:
+
+    def __init__(self):
+        self.embeddings = WordEmbeddings()
+
+    def get_embedding_model(self):
+        return self.embeddings
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(DocumentQueryStore, "STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(DocumentQueryStore, "SAVE_DELAY", 60.0)  # flushed explicitly
+    return tmp_path
+
+
+TEXT = "\n\n".join(f"Section {i}: the pump model P{i} runs at {i * 100} rpm." for i in range(40))
+
+
+def test_index_is_saved_and_reloaded(store_dir):
+    async def scenario():
+        store = DocumentQueryStore(FakeAgent(), "reload")
+        ok, ids = await store.add_document(TEXT, "/docs/pumps.txt", fingerprint="v1")
+        assert ok and len(ids) > 1
+        assert not os.path.exists(store_dir / "reload" / "index.faiss")  # debounced
+        store.flush()
+
+        reloaded = DocumentQueryStore(FakeAgent(), "reload")
+        assert await reloaded.document_exists("/docs/pumps.txt", fingerprint="v1")
+        assert not await reloaded.document_exists("/docs/pumps.txt", fingerprint="v2")
+        document = await reloaded.get_document("file:///docs/pumps.txt")
+        assert document and "P39 runs at 3900 rpm" in document.page_content
+
+    asyncio.run(scenario())
+
+
+def test_flush_writes_to_disk_outside_the_lock(store_dir, monkeypatch):
+    async def scenario():
+        store = DocumentQueryStore(FakeAgent(), "snapshot")
+        await store.add_document(TEXT, "/docs/pumps.txt")
+
+        # the disk write runs on the save timer thread, adds on the event
+        # loop must still get the lock meanwhile
+        write = VectorDB.write_serialized
+        lock_free = []
+
+        def checked_write(folder, data):
+            acquired = store._lock.acquire(blocking=False)
+            if acquired:
+                store._lock.release()
+            lock_free.append(acquired)
+            write(folder, data)
+
+        monkeypatch.setattr(VectorDB, "write_serialized", staticmethod(checked_write))
+        await asyncio.to_thread(store.flush)
+        assert lock_free == [True]
+
+        reloaded = DocumentQueryStore(FakeAgent(), "snapshot")
+        document = await reloaded.get_document("/docs/pumps.txt")
+        assert document and "P39 runs at 3900 rpm" in document.page_content
+
+    asyncio.run(scenario())
+
+
+def test_manifest_entries_without_chunks_are_dropped(store_dir):
+    async def scenario():
+        store = DocumentQueryStore(FakeAgent(), "stale")
+        await store.add_document(TEXT, "/docs/pumps.txt")
+        store.flush()
+
+        manifest_path = store_dir / "stale" / DocumentQueryStore.MANIFEST_FILE
+        manifest = json.loads(manifest_path.read_text())
+        manifest["file:///docs/lost.txt"] = {
+            "fingerprint": None, "content_hash": "x", "ids": ["missing-id"], "timestamp": "2020-01-01 00:00:00",
+        }
+        manifest_path.write_text(json.dumps(manifest))
+
+        reloaded = DocumentQueryStore(FakeAgent(), "stale")
+        assert not await reloaded.document_exists("/docs/lost.txt")
+        assert await reloaded.list_documents() == ["file:///docs/pumps.txt"]
+
+    asyncio.run(scenario())
+
+
+def test_same_content_under_new_fingerprint_reuses_chunks(store_dir):
+    async def scenario():
+        agent = FakeAgent()
+        store = DocumentQueryStore(agent, "reuse")
+        _, ids = await store.add_document(TEXT, "/docs/pumps.txt", fingerprint="mtime-1")
+        calls = agent.embeddings.calls
+
+        ok, reused = await store.add_document(TEXT, "/docs/pumps.txt", fingerprint="mtime-2")
+        assert ok and reused == ids and agent.embeddings.calls == calls
+        assert await store.document_exists("/docs/pumps.txt", fingerprint="mtime-2")
+
+        _, replaced = await store.add_document(TEXT + "\n\nAppendix.", "/docs/pumps.txt", fingerprint="mtime-3")
+        assert not set(replaced) & set(ids)
+        assert len(store.vector_db.db.get_all_docs()) == len(replaced)
+
+    asyncio.run(scenario())
+
+
+class HelperAgent(FakeAgent):
+
+    async def handle_intervention(self):
+        pass
+
+
+def test_unknown_version_is_read_again(store_dir, tmp_path, monkeypatch):
+    path = tmp_path / "page.txt"
+    path.write_text("first version of the page")
+
+    async def unknown(self, document, scheme, response=None):
+        return None  # e.g. a web page without ETag or Last-Modified
+
+    monkeypatch.setattr(DocumentQueryHelper, "document_fingerprint", unknown)
+
+    async def scenario():
+        helper = DocumentQueryHelper.__new__(DocumentQueryHelper)
+        helper.agent = HelperAgent()
+        helper.store = DocumentQueryStore(helper.agent, "unknown")
+        helper.progress_callback = lambda message: None
+
+        assert await helper.document_get_content(str(path), True) == "first version of the page"
+        ids = list(helper.store.documents[f"file://{path}"]["ids"])
+
+        # unchanged content keeps its chunks
+        await helper.document_get_content(str(path), True)
+        assert helper.store.documents[f"file://{path}"]["ids"] == ids
+
+        path.write_text("second version of the page")
+        assert await helper.document_get_content(str(path), True) == "second version of the page"
+        assert helper.store.documents[f"file://{path}"]["ids"] != ids
+
+    asyncio.run(scenario())
+
+
+def test_oldest_documents_are_evicted_over_the_cap(store_dir, monkeypatch):
+    monkeypatch.setattr(DocumentQueryStore, "MAX_CHUNKS", 2)
+
+    async def scenario():
+        store = DocumentQueryStore(FakeAgent(), "evict")
+        for i, name in enumerate(["a", "b", "c"]):
+            await store.add_document(f"document {name}", f"/docs/{name}.txt")
+            store.documents[f"file:///docs/{name}.txt"]["timestamp"] = f"2024-01-0{i + 1} 00:00:00"
+        assert await store.list_documents() == ["file:///docs/b.txt", "file:///docs/c.txt"]
+        assert len(store.vector_db.db.get_all_docs()) == 2
+
+    asyncio.run(scenario())
+
+
+def test_search_by_vectors_matches_similarity_threshold_search():
+    async def scenario():
+        db = VectorDB(FakeAgent())  # type: ignore
+        ids = await db.insert_documents([
+            Document(page_content=f"pump P{i} runs at {i * 100} rpm on line {i % 3}") for i in range(30)
+        ])
+        queries = ["pump P7 rpm", "line 2", "what runs at 1200 rpm"]
+        vectors = [db.embeddings.embed_query(query) for query in queries]
+        batched = db.search_by_vectors(vectors, limit=5, threshold=0.3)
+        for query, vector, results in zip(queries, vectors, batched):
+            # hashed words make ties, whose order differs, so compare scores by rank
+            single = await db.db.asimilarity_search_with_relevance_scores(query, k=5, score_threshold=0.3)
+            scores = [cosine_normalizer(float(np.dot(vector, db.embeddings.embed_query(d.page_content)))) for d in results]
+            assert results and scores == pytest.approx([score for _, score in single], abs=1e-5)
+
+        # restricted to ids, also after a delete has shifted the positions
+        db.db.delete(ids=ids[:10])
+        [restricted] = db.search_by_vectors(vectors[:1], limit=30, threshold=0.0, ids=ids[5:15])
+        assert {d.metadata["id"] for d in restricted} == set(ids[10:15])
+        assert restricted[0].page_content.startswith("pump P")
+
+    asyncio.run(scenario())
+
+
+def test_batch_search_embeds_queries_asynchronously(store_dir):
+    async def scenario():
+        agent = FakeAgent()
+        store = DocumentQueryStore(agent, "batch")
+        await store.add_document(TEXT, "/docs/pumps.txt")
+        queries = ["model P3 rpm", "P12 rpm", "pump valves checked"]
+
+        batched = await store.search_documents_batch(queries, ["/docs/pumps.txt"], limit=3, threshold=0.2)
+        assert agent.embeddings.async_queries == len(queries)
+        for query, results in zip(queries, batched):
+            single = await store.search_documents(query, limit=3, threshold=0.2)
+            assert results and [d.metadata["id"] for d in results] == [d.metadata["id"] for d in single]
+
+        # only the chunks of the given documents are searched
+        await store.add_document("Valves are checked weekly.", "/docs/valves.txt")
+        batched = await store.search_documents_batch(queries, ["/docs/pumps.txt"], limit=10, threshold=0.0)
+        assert {d.metadata["document_uri"] for results in batched for d in results} == {"file:///docs/pumps.txt"}
+
+    asyncio.run(scenario())
+
+
+def chunks(*ids):
+    return [Document(page_content=id, metadata={"id": id}) for id in ids]
+
+
+def test_questions_group_by_overlap_not_transitively():
+    groups = DocumentQueryHelper.group_questions([
+        chunks("a", "b"),
+        chunks("b", "c", "d"),  # a third shared, stays apart
+        chunks("a", "b", "x"),  # two thirds shared with the first
+        [],
+        chunks("c", "d"),
+    ])
+    assert groups == [[0, 2], [1, 4]]
+
+
+def test_question_groups_are_capped():
+    question_chunks = [chunks("a", "b")] * (DocumentQueryHelper.MAX_GROUP_SIZE * 2 + 1)
+    groups = DocumentQueryHelper.group_questions(question_chunks)
+    assert [len(group) for group in groups] == [DocumentQueryHelper.MAX_GROUP_SIZE] * 2 + [1]
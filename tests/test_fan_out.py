@@ -0,0 +1,105 @@
+"""
+Tests for concurrent fan-out of subtasks
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers import fan_out
+
+
+def sleeper(delay, result=None, error=None):
+    async def run():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result if result is not None else f"slept {delay}"
+    return run
+
+
+def test_branches_run_concurrently_in_input_order():
+    updates = []
+    start = time.monotonic()
+    branches = asyncio.run(fan_out.fan_out(
+        [sleeper(0.3), sleeper(0.1), sleeper(0.2, error=RuntimeError("boom"))],
+        on_update=lambda b: updates.append((b.index, b.status)),
+    ))
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5  # the slowest branch, not the sum
+    assert [b.status for b in branches] == ["done", "done", "failed"]
+    assert branches[0].result == "slept 0.3"
+    assert branches[2].error == "RuntimeError: boom"
+    assert (1, "done") in updates and updates.index((1, "done")) < updates.index((0, "done"))
+
+
+def test_first_k_and_timeout_cancel_the_rest():
+    cancelled = []
+
+    def tracked(delay):
+        async def run():
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return "ok"
+        return run
+
+    branches = asyncio.run(fan_out.fan_out([tracked(5), tracked(0.05), tracked(0.1)], first_k=2))
+    assert [b.status for b in branches] == ["cancelled", "done", "done"]
+    assert cancelled == [5]
+
+    start = time.monotonic()
+    branches = asyncio.run(fan_out.fan_out([sleeper(5), sleeper(0.05)], timeout=0.2))
+    assert time.monotonic() - start < 1
+    assert [b.status for b in branches] == ["timed out", "done"]
+
+
+def test_max_parallel_limits_running_branches():
+    running, peak = 0, 0
+
+    def counted():
+        async def run():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return ""
+        return run
+
+    branches = asyncio.run(fan_out.fan_out([counted() for _ in range(6)], max_parallel=2))
+    assert peak == 2
+    assert all(b.finished_ok for b in branches)
+
+
+def test_poll_exception_cancels_branches():
+    async def interrupt():
+        raise InterruptedError()
+
+    async def run():
+        return await fan_out.fan_out([sleeper(5)], on_poll=interrupt, poll_interval=0.01)
+
+    try:
+        asyncio.run(run())
+    except InterruptedError:
+        pass
+    else:
+        raise AssertionError("poll exception was swallowed")
+
+
+def test_delegation_tool_parses_subordinates():
+    call_subordinate = pytest.importorskip("python.tools.call_subordinate")
+    tool = object.__new__(call_subordinate.Delegation)
+
+    tasks = tool.parse_subordinates('[{"message": "audit", "profile": "developer"}, "summarize", " "]', "")
+    assert tasks == [{"message": "audit", "profile": "developer"}, {"message": "summarize", "profile": ""}]
+    assert tool.parse_gather("first", 2) == 1 and tool.parse_gather("5", 2) == 2
+    assert tool.branch_key(fan_out.Branch(index=1)) == "subordinate_2"
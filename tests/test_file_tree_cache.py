@@ -0,0 +1,78 @@
+"""
+Tests for cached file tree rendering
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers import file_tree
+from python.helpers.file_tree import FileTreeCache
+
+IGNORE = "node_modules/\n*.log\n"
+
+
+def write(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def render(root, cache=None, **kwargs):
+    return file_tree.file_tree(str(root), ignore=IGNORE, cache=cache, **kwargs)
+
+
+def touch_later(path):
+    # make sure the new mtime differs on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_cached_tree_matches_uncached_tree(tmp_path):
+    write(str(tmp_path / "src/app.py"))
+    write(str(tmp_path / "src/util/helpers.py"))
+    write(str(tmp_path / "node_modules/pkg/index.js"))
+    write(str(tmp_path / "debug.log"))
+    write(str(tmp_path / "README.md"))
+    cache = FileTreeCache()
+
+    for kwargs in (
+        {},
+        {"max_depth": 1},
+        {"max_files": 1, "sort": ("name", "asc")},
+        {"output_mode": file_tree.OUTPUT_MODE_NESTED},
+    ):
+        assert render(tmp_path, cache, **kwargs) == render(tmp_path, **kwargs)
+        assert render(tmp_path, cache, **kwargs) == render(tmp_path, **kwargs)
+
+
+def test_cached_tree_follows_changes(tmp_path):
+    write(str(tmp_path / "src/app.py"))
+    write(str(tmp_path / "docs/index.md"))
+    cache = FileTreeCache()
+    first = render(tmp_path, cache)
+    assert render(tmp_path, cache) is first
+
+    write(str(tmp_path / "src/new.py"))
+    touch_later(tmp_path / "src")
+    assert "new.py" in render(tmp_path, cache)
+
+    # modification time of a file changes the order, not the listing
+    touch_later(tmp_path / "docs/index.md")
+    touch_later(tmp_path / "docs")
+    assert render(tmp_path, cache) == render(tmp_path)
+
+    os.remove(tmp_path / "src/app.py")
+    touch_later(tmp_path / "src")
+    assert "app.py" not in render(tmp_path, cache)
+    assert render(tmp_path, cache) == render(tmp_path)
+
+
+def test_cached_structured_result_is_not_shared(tmp_path):
+    write(str(tmp_path / "a.txt"))
+    cache = FileTreeCache()
+    items = render(tmp_path, cache, output_mode=file_tree.OUTPUT_MODE_FLAT)
+    items.clear()
+    assert render(tmp_path, cache, output_mode=file_tree.OUTPUT_MODE_FLAT)
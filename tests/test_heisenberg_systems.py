@@ -70,6 +70,139 @@ class TestHeisenbergCore:
         assert hasattr(core, 'self_modifier')
 
 
+class TestTopologicalMemory:
+    """Tests for the array-backed topological memory"""
+
+    @staticmethod
+    def _brute_force_components(points, threshold):
+        import numpy as np
+        n = len(points)
+        distances = np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+        adjacent = (distances < threshold) & ~np.eye(n, dtype=bool)
+        seen, components = set(), 0
+        for start in range(n):
+            if start in seen:
+                continue
+            components += 1
+            stack = [start]
+            seen.add(start)
+            while stack:
+                u = stack.pop()
+                for v in np.flatnonzero(adjacent[u]):
+                    if v not in seen:
+                        seen.add(v)
+                        stack.append(v)
+        return components, int(adjacent.sum() // 2)
+
+    def test_components_match_brute_force_with_eviction(self):
+        """Test incremental β₀ and edge count stay exact while evicting"""
+        import numpy as np
+        from python.helpers.heisenberg_core import TopologicalMemory
+        rng = np.random.default_rng(0)
+        memory = TopologicalMemory(distance_threshold=1.0, capacity=40)
+
+        for i in range(150):
+            memory.add_memory(rng.normal(size=3) * 2, f"m{i}")
+            if i % 10 == 0 or i == 149:
+                components, edges = self._brute_force_components(
+                    memory.points.astype(np.float64), 1.0)
+                assert memory.betti_numbers[0] == components
+                assert memory.get_topological_signature()['n_connections'] == edges
+
+        assert len(memory.points) == 40
+        assert memory.evictions == 110
+
+    def test_persistence_pairs_follow_minimum_spanning_tree(self):
+        """Test H0 deaths equal the minimum spanning tree edge lengths"""
+        import numpy as np
+        from python.helpers.heisenberg_core import TopologicalMemory
+        rng = np.random.default_rng(1)
+        points = rng.normal(size=(30, 4))
+        memory = TopologicalMemory(distance_threshold=0.5)
+        for i, point in enumerate(points):
+            memory.add_memory(point, f"p{i}")
+
+        pairs = memory.compute_persistent_homology([10.0])
+        deaths = sorted(d for _, d in pairs if d != float('inf'))
+
+        # Prim's algorithm as reference
+        distances = np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+        best = distances[0].copy()
+        in_tree = np.zeros(len(points), dtype=bool)
+        in_tree[0] = True
+        mst = []
+        for _ in range(len(points) - 1):
+            candidate = np.where(in_tree, np.inf, best)
+            j = int(np.argmin(candidate))
+            mst.append(candidate[j])
+            in_tree[j] = True
+            best = np.minimum(best, distances[j])
+
+        assert len(pairs) == len(points)
+        assert np.allclose(deaths, sorted(mst), atol=1e-4)
+
+    def test_find_topological_neighbors_sorted(self):
+        """Test nearest neighbors come back closest first"""
+        import numpy as np
+        from python.helpers.heisenberg_core import TopologicalMemory
+        memory = TopologicalMemory()
+        for i in range(10):
+            memory.add_memory(np.full(8, float(i)), f"p{i}")
+
+        neighbors = memory.find_topological_neighbors(np.full(8, 3.2), 3)
+        assert [label for _, label, _ in neighbors] == ["p3", "p4", "p2"]
+
+
+class TestMemorySupercharger:
+    """Tests for the array-backed memory supercharger"""
+
+    def test_retrieve_matches_reference_scoring(self):
+        """Test vectorized scoring ranks like EnhancedMemory.relevance_score"""
+        import numpy as np
+        from python.helpers.memory_supercharger import MemorySupercharger
+        supercharger = MemorySupercharger()
+        for i in range(50):
+            supercharger.insert(f"memory {i}", tags=["even" if i % 2 == 0 else "odd"])
+
+        query = supercharger._hash_embedding("memory 7")
+        expected = sorted(
+            (m for m in supercharger.memories.values() if "odd" in m.tags),
+            key=lambda m: (np.dot(query, m.embedding) * 0.5 + m.relevance_score * 0.5) * (1 + m.recency * 0.2),
+            reverse=True
+        )[:5]
+
+        results = supercharger.retrieve("memory 7", tags=["odd"], limit=5)
+        assert [m.id for m in results] == [m.id for m in expected]
+        assert results[0].content == "memory 7"
+        assert supercharger.memories[results[0].id].access_count == 1
+
+    def test_eviction_keeps_capacity_and_tag_index(self):
+        """Test eviction bounds the store and cleans tag sets"""
+        from python.helpers.memory_supercharger import MemorySupercharger
+        supercharger = MemorySupercharger(max_memories=100)
+        for i in range(250):
+            supercharger.insert(f"memory {i}", tags=["all"])
+
+        assert len(supercharger.memories) <= 100
+        assert supercharger.tag_index["all"] == set(supercharger.memories.keys())
+
+    def test_consolidation_pairs_bounded_and_merged(self):
+        """Test near-duplicates are paired, bounded and merged"""
+        import numpy as np
+        from python.helpers.memory_supercharger import MemorySupercharger
+        supercharger = MemorySupercharger(max_pending_consolidations=5)
+        base = np.ones(16) / 4.0
+        ids = [supercharger.insert(f"copy {i}", embedding=base) for i in range(10)]
+
+        assert len(supercharger.consolidation_pairs) == 5
+        assert supercharger.memories[ids[1]].topological_neighbors == [ids[0]]
+
+        merged = supercharger.consolidate()
+        assert merged > 0
+        assert len(supercharger.memories) == 10 - merged
+        assert supercharger.get_statistics()['pending_consolidations'] == 0
+
+
 class TestSwarmIntelligence:
     """Tests for the swarm intelligence system"""
 
@@ -91,6 +224,162 @@ class TestSwarmIntelligence:
         swarm = get_swarm_intelligence()
         assert hasattr(swarm, 'collective_consensus')
 
+    def test_pheromone_sense_and_gradient_match_reference(self):
+        """Test batched pheromone queries agree with per-deposit loops"""
+        import numpy as np
+        from python.helpers.swarm_intelligence import PheromoneField
+        rng = np.random.default_rng(0)
+        field = PheromoneField(dimensions=8)
+        for i, position in enumerate(rng.normal(size=(200, 8)) * 0.5):
+            field.deposit(position, 1.0 + i % 3, "a" if i % 2 == 0 else "b")
+
+        queries = rng.normal(size=(4, 8)) * 0.5
+        sensed = field.sense_many(queries, radius=1.0)
+        gradients = field.get_gradients(queries, ["a", "b", "a", "b"])
+        for query, hits, gradient, kind in zip(queries, sensed, gradients, "abab"):
+            expected_strengths, expected_gradient = [], np.zeros(8)
+            for deposit in field.deposits:
+                distance = np.linalg.norm(deposit['position'] - query)
+                if distance < 1.0:
+                    expected_strengths.append(deposit['strength'] * (1 - distance))
+                if deposit['type'] == kind:
+                    d = distance + 0.001
+                    expected_gradient += deposit['strength'] / d ** 2 * (deposit['position'] - query) / d
+            expected_gradient /= np.linalg.norm(expected_gradient)
+
+            assert np.allclose(sorted(h['strength'] for h in hits), sorted(expected_strengths), atol=1e-4)
+            assert np.allclose(gradient, expected_gradient, atol=1e-3)
+
+    def test_pheromone_evaporation_drops_weak_deposits(self):
+        """Test evaporation compacts the field and ages messages"""
+        import numpy as np
+        from python.helpers.swarm_intelligence import PheromoneField, SwarmMessage
+        field = PheromoneField(dimensions=4)
+        field.deposit_many(np.eye(4), [1.0, 0.5, 0.0105, 0.2], ["a", "b", "a", "b"])
+        field.post_message(SwarmMessage("s", "discovery", {}, np.zeros(4), ttl=1))
+        field.scale_recent("b", 2.0, last_n=2)
+
+        field.evaporate(0.1)
+
+        assert field.n_deposits == 3
+        assert [d['type'] for d in field.deposits] == ["a", "b", "b"]
+        assert np.allclose([d['strength'] for d in field.deposits], [0.9, 0.45, 0.36])
+        assert field.message_board == []
+
+    def test_pso_step_matches_particle_loop(self):
+        """Test the array PSO update matches the per-particle update"""
+        import numpy as np
+        from python.helpers.swarm_intelligence import CosineFitness, ParticleSwarmOptimizer
+        rng = np.random.default_rng(1)
+        pso = ParticleSwarmOptimizer(n_particles=8, dimensions=6, rng=rng)
+        fitness_fn = CosineFitness(np.eye(6)[0])
+        pso.step(fitness_fn)
+
+        positions, velocities = pso.positions.copy(), pso.velocities.copy()
+        personal_best, best_fitness = pso.personal_best.copy(), pso.personal_best_fitness.copy()
+        global_best, global_best_fitness = pso.global_best.copy(), pso.global_best_fitness
+        state = rng.bit_generator.state
+        pso.step(fitness_fn)
+
+        rng.bit_generator.state = state
+        for i in range(8):
+            fitness = fitness_fn(positions[i])
+            if fitness > best_fitness[i]:
+                personal_best[i], best_fitness[i] = positions[i].copy(), fitness
+            if fitness > global_best_fitness:
+                global_best, global_best_fitness = positions[i].copy(), fitness
+        for i in range(8):
+            r1, r2 = rng.random(), rng.random()
+            velocity = (0.7 * velocities[i] + 1.5 * r1 * (personal_best[i] - positions[i]) +
+                        1.5 * r2 * (global_best - positions[i]))
+            speed = np.linalg.norm(velocity)
+            velocities[i] = velocity / speed if speed > 1.0 else velocity
+            positions[i] += velocities[i]
+
+        assert np.allclose(pso.positions, positions)
+        assert np.allclose(pso.personal_best_fitness, best_fitness)
+        assert pso.global_best_fitness == pytest.approx(global_best_fitness)
+
+    def test_swarm_think_offloaded_matches_inline(self):
+        """Test a worker-process run reproduces the in-process run"""
+        import numpy as np
+        from python.helpers.swarm_intelligence import CosineFitness, SwarmSuperintelligence
+
+        def run(offload):
+            swarm = SwarmSuperintelligence(dimensions=16, offload=offload, seed=3)
+            task = np.eye(16)[0]
+            result = asyncio.run(swarm.swarm_think(task, CosineFitness(task), n_iterations=7))
+            return swarm, result
+
+        inline, inline_result = run(False)
+        offloaded, offloaded_result = run(True)
+
+        assert inline_result['iterations'] == offloaded_result['iterations'] == 7
+        assert inline_result['final_consensus'] == offloaded_result['final_consensus']
+        assert np.array_equal(inline.positions, offloaded.positions)
+        assert inline.get_swarm_state() == offloaded.get_swarm_state()
+
+    def test_swarm_think_keeps_field_changes_made_while_offloaded(self):
+        """Test deposits and evaporation during a worker run are not lost"""
+        import numpy as np
+        from python.helpers.swarm_intelligence import CosineFitness, SwarmSuperintelligence
+
+        async def run(concurrent):
+            swarm = SwarmSuperintelligence(dimensions=8, offload=True, seed=5)
+            task = np.eye(8)[0]
+            thinking = asyncio.create_task(swarm.swarm_think(task, CosineFitness(task), n_iterations=5))
+            await asyncio.sleep(0)  # snapshot taken, worker running
+            if concurrent:
+                swarm.pheromone_field.deposit(np.full(8, 9.0), 5.0, "tool_usage")
+                swarm.pheromone_field.scale_recent("tool_usage", 2.0)
+                swarm.pheromone_field.evaporate(0.5)
+            await thinking
+            return swarm
+
+        quiet, busy = asyncio.run(run(False)), asyncio.run(run(True))
+        assert np.array_equal(quiet.positions, busy.positions)  # iterations unaffected
+        tool = [d for d in busy.pheromone_field.deposits if d['type'] == "tool_usage"]
+        assert len(tool) == 1 and tool[0]['strength'] == pytest.approx(5.0)
+        assert busy.pheromone_field.n_deposits <= quiet.pheromone_field.n_deposits + 1
+
+    def test_swarm_think_runs_one_at_a_time(self):
+        """Test concurrent swarm_think calls on one swarm are serialized"""
+        import numpy as np
+        from python.helpers.swarm_intelligence import CosineFitness, SwarmSuperintelligence
+        swarm = SwarmSuperintelligence(dimensions=8, offload=False, seed=0)
+        task = np.eye(8)[0]
+        calls = []
+
+        class Tracked(CosineFitness):
+            def __init__(self, target, name):
+                super().__init__(target)
+                self.name = name
+
+            def batch(self, positions):
+                calls.append(self.name)
+                return super().batch(positions)
+
+        async def main():
+            # each run yields to the loop between batches of iterations
+            await asyncio.gather(*[
+                swarm.swarm_think(task, Tracked(task, name), n_iterations=10) for name in "ab"
+            ])
+
+        asyncio.run(main())
+        assert calls == sorted(calls) and set(calls) == {"a", "b"}
+
+    def test_swarm_think_stops_at_time_budget(self):
+        """Test an exhausted time budget runs no iterations"""
+        import numpy as np
+        from python.helpers.swarm_intelligence import CosineFitness, SwarmSuperintelligence
+        swarm = SwarmSuperintelligence(dimensions=8, offload=False)
+        task = np.eye(8)[0]
+
+        result = asyncio.run(swarm.swarm_think(task, CosineFitness(task), n_iterations=50, time_budget=0))
+
+        assert result['iterations'] == 0
+        assert 'final_fitness' in result
+
 
 class TestHeisenbergUltimate:
     """Tests for the Ultimate Integration Layer"""
@@ -0,0 +1,64 @@
+"""
+Tests for image compression off the event loop
+"""
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+Image = pytest.importorskip("PIL.Image")
+
+from python.helpers import images
+
+
+def make_image(width: int, height: int, format: str, mode: str = "RGB") -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, (width, height), (200, 40, 90) if mode == "RGB" else 3).save(output, format=format)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("format", ["JPEG", "PNG"])
+def test_large_images_are_reduced_to_max_pixels(format):
+    data = make_image(4000, 3000, format)  # 50x over the limit, takes the fast reduce path
+    compressed = Image.open(io.BytesIO(images.compress_image(data, max_pixels=240_000, quality=60)))
+
+    assert compressed.format == "JPEG"
+    assert compressed.size == (565, 424)
+    assert compressed.getpixel((200, 200)) == pytest.approx((200, 40, 90), abs=6)
+
+
+def test_small_palette_images_are_only_converted():
+    compressed = Image.open(io.BytesIO(images.compress_image(make_image(50, 40, "PNG", "P"))))
+    assert (compressed.size, compressed.mode) == ((50, 40), "RGB")
+
+
+def test_results_are_cached_by_content_and_parameters():
+    calls = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            calls.append(args[1:])
+            return super().submit(fn, *args, **kwargs)
+
+    data = make_image(1000, 800, "PNG")
+
+    async def main():
+        with CountingExecutor(max_workers=2) as executor:
+            first, second = await asyncio.gather(
+                images.compress_image_async(data, max_pixels=10_000, executor=executor),
+                images.compress_image_async(make_image(900, 800, "PNG"), max_pixels=10_000, executor=executor),
+            )
+            again = await images.compress_image_async(data, max_pixels=10_000, executor=executor)
+            other_size = await images.compress_image_async(data, max_pixels=20_000, executor=executor)
+        return first, second, again, other_size
+
+    first, second, again, other_size = asyncio.run(main())
+    assert again == first
+    assert len(other_size) > len(first)
+    assert len(calls) == 3
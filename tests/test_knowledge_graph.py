@@ -0,0 +1,138 @@
+"""
+Tests for the indexed knowledge graph engine.
+Index-backed lookups are checked against brute-force scans of the
+relationship table.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from python.helpers.knowledge_graph import KnowledgeGraph
+from python.helpers.knowledge_graph_store import SQLiteGraphStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def new_graph(request, tmp_path):
+    """Factory for empty graphs, in memory or backed by SQLite"""
+    def factory():
+        if request.param == "memory":
+            return KnowledgeGraph("test")
+        return KnowledgeGraph("test", store=SQLiteGraphStore(str(tmp_path / "test.db")))
+    return factory
+
+
+def _random_graph(graph, n_entities=60, n_relationships=300, seed=3):
+    rng = random.Random(seed)
+    ids = [graph.add_entity(f"e{i}", "concept").id for i in range(n_entities)]
+    for _ in range(n_relationships):
+        graph.add_relationship(rng.choice(ids), rng.choice(ids),
+                               rng.choice(["is_a", "has_a", "related_to"]),
+                               bidirectional=rng.random() < 0.2)
+    return graph
+
+
+def _scan_neighbors(graph, entity_id):
+    neighbors = set()
+    for rel in graph.relationships.values():
+        if rel.source_id == entity_id:
+            neighbors.add(rel.target_id)
+        if rel.bidirectional and rel.target_id == entity_id:
+            neighbors.add(rel.source_id)
+    return neighbors
+
+
+def test_neighbors_and_relationships_match_scan(new_graph):
+    graph = _random_graph(new_graph())
+    for entity_id in graph.entities:
+        assert graph.get_neighbors(entity_id) == _scan_neighbors(graph, entity_id)
+        assert {r.id for r in graph.get_relationships_from(entity_id)} == \
+            {r.id for r in graph.relationships.values() if r.source_id == entity_id}
+        assert {r.id for r in graph.get_relationships_to(entity_id)} == \
+            {r.id for r in graph.relationships.values() if r.target_id == entity_id}
+
+
+def test_find_entity_by_name_returns_first_match(new_graph):
+    graph = new_graph()
+    first = graph.add_entity("Python", "language")
+    graph.add_entity("Python", "snake")
+    assert graph.find_entity_by_name("Python") == first
+    assert graph.find_entity_by_name("Missing") is None
+
+
+def test_query_matches_scan(new_graph):
+    graph = _random_graph(new_graph())
+    entity_id = next(iter(graph.entities))
+
+    targets = graph.query(f"{entity_id} is_a ?y")
+    expected = [r for r in graph.relationships.values()
+                if r.source_id == entity_id and r.relation_type == "is_a"]
+    assert sorted(t["?y"] for t in targets) == sorted(r.target_id for r in expected)
+
+    sources = graph.query(f"?x has_a {entity_id}")
+    expected = [r for r in graph.relationships.values()
+                if r.target_id == entity_id and r.relation_type == "has_a"]
+    assert sorted(s["?x"] for s in sources) == sorted(r.source_id for r in expected)
+
+    assert len(graph.query("?x related_to *")) == \
+        sum(1 for r in graph.relationships.values() if r.relation_type == "related_to")
+
+
+def test_path_query_matches_unpruned_dfs(new_graph):
+    graph = _random_graph(new_graph(), n_entities=25, n_relationships=60)
+    ids = list(graph.entities)
+
+    def all_paths(current, target, path, max_depth):
+        if current == target:
+            return [path]
+        if len(path) >= max_depth:
+            return []
+        found = []
+        for neighbor in _scan_neighbors(graph, current):
+            if neighbor not in path:
+                found += all_paths(neighbor, target, path + [neighbor], max_depth)
+        return found
+
+    for start, end in [(ids[0], ids[1]), (ids[2], ids[5]), (ids[3], ids[3])]:
+        paths = graph.query_engine.path_query(start, end, max_depth=4)
+        assert sorted(paths) == sorted(all_paths(start, end, [start], 4))
+
+
+def test_triangles_and_clusters(new_graph):
+    graph = new_graph()
+    a, b, c, d = (graph.add_entity(name, "concept").id for name in "abcd")
+    graph.add_relationship(a, b, "related_to")
+    graph.add_relationship(b, c, "related_to")
+    graph.add_relationship(a, c, "related_to")
+    graph.add_relationship(c, d, "related_to")
+
+    assert graph.pattern_matcher.find_triangles() == [tuple(sorted((a, b, c)))]
+    assert graph.pattern_matcher.find_clusters(min_size=3)[0] == {a, b, c, d}
+
+
+def test_duplicate_relationship_does_not_double_count():
+    graph = KnowledgeGraph("test")
+    a, b = graph.add_entity("a", "concept").id, graph.add_entity("b", "concept").id
+    graph.add_relationship(a, b, "is_a")
+    graph.add_relationship(a, b, "is_a")
+    graph.index.remove_relationship(graph.relationships[f"{a}-is_a-{b}"])
+    assert b not in graph.index.successors[a]
+
+
+def test_stored_graph_survives_reopen(tmp_path):
+    path = str(tmp_path / "persist.db")
+    graph = KnowledgeGraph("persist", store=SQLiteGraphStore(path))
+    graph.add_triple("Python", "language", "is_a", "Language", "concept")
+    graph.close()
+
+    reopened = KnowledgeGraph("persist", store=SQLiteGraphStore(path))
+    python = reopened.find_entity_by_name("Python")
+    language = reopened.find_entity_by_name("Language")
+    assert python is not None and language is not None
+    assert reopened.get_neighbors(python.id) == {language.id}
+    assert reopened.stats["relationships_added"] == 1
+    reopened.close()
@@ -0,0 +1,165 @@
+"""
+Tests for batched memory search and consolidation
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+memory_consolidation = pytest.importorskip("python.helpers.memory_consolidation")
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from python.helpers.memory import Memory, MyFaiss
+
+ConsolidationConfig = memory_consolidation.ConsolidationConfig
+MemoryConsolidator = memory_consolidation.MemoryConsolidator
+
+
+class WordEmbeddings(Embeddings):
+    """Hashed bag of words, texts sharing words are similar"""
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = [0.0] * 64
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    saves = []
+    monkeypatch.setattr(Memory, "_save_db_file", staticmethod(lambda db, subdir: saves.append(subdir)))
+    db = MyFaiss(
+        embedding_function=WordEmbeddings(),
+        index=faiss.IndexFlatIP(64),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=Memory._cosine_normalizer,
+    )
+    memory = Memory(db, "test")
+    memory.saves = saves  # type: ignore
+    return memory
+
+
+def insert(memory, texts, area="main"):
+    return asyncio.run(memory.insert_documents([Document(t, metadata={"area": area}) for t in texts]))
+
+
+def test_batch_search_matches_single_searches(memory):
+    # texts of different lengths, so that no two scores tie
+    insert(memory, [
+        f"the {color} pump " + " ".join(f"note{j}" for j in range(i))
+        for i, color in enumerate(["red", "blue", "green"] * 4)
+    ])
+    insert(memory, ["the red valve is closed", "blue valves leak"], area="fragments")
+    queries = ["red pump", "blue valve", "green pump note1", "nothing matches this"]
+
+    async def run(filter):
+        batched = await memory.search_similarity_threshold_batch(queries, [3, 5, 2, 3], 0.3, filter)
+        singles = [
+            await memory.search_similarity_threshold(query, limit, 0.3, filter)
+            for query, limit in zip(queries, [3, 5, 2, 3])
+        ]
+        return batched, singles
+
+    for filter in ["", "area == 'fragments'"]:
+        batched, singles = asyncio.run(run(filter))
+        assert [[d.metadata["id"] for d in r] for r in batched] == [[d.metadata["id"] for d in r] for r in singles]
+
+
+def test_deferred_save_writes_once(memory):
+    with memory.deferred_save():
+        insert(memory, ["first"])
+        with memory.deferred_save():
+            insert(memory, ["second"])
+        insert(memory, ["third"])
+        assert memory.saves == []
+    assert memory.saves == ["test"]
+
+    insert(memory, ["fourth"])
+    assert memory.saves == ["test", "test"]
+
+
+def similar(*ids):
+    return [(Document(id, metadata={"id": id}), 0.8) for id in ids]
+
+
+def test_new_memories_sharing_similar_memories_are_grouped():
+    consolidator = MemoryConsolidator(None)  # type: ignore
+    groups = consolidator._group_by_similar_memories([
+        similar("a"), similar("b"), similar("a", "c"), [], similar("c"),
+    ])
+    assert sorted(groups) == [[0, 2, 4], [1], [3]]
+
+
+class FakeAgent:
+    """Answers keyword extraction and consolidation calls with canned responses"""
+
+    def __init__(self, decision: dict, delay: float = 0.0):
+        self.decision = decision
+        self.delay = delay
+
+    def read_prompt(self, file: str, **kwargs) -> str:
+        return file
+
+    async def call_utility_model(self, system: str, message: str, **kwargs) -> str:
+        if system == ConsolidationConfig.keyword_extraction_batch_sys_prompt:
+            return json.dumps([["pump"], ["pump"]])
+        await asyncio.sleep(self.delay)
+        return json.dumps(self.decision)
+
+
+def consolidate(memory, monkeypatch, agent, **config):
+    async def get(_agent):
+        return memory
+
+    monkeypatch.setattr(Memory, "get", staticmethod(get))
+    insert(memory, ["the red pump runs at 100 rpm"])
+    consolidator = MemoryConsolidator(agent, ConsolidationConfig(similarity_threshold=0.3, **config))  # type: ignore
+    new_memories = ["the red pump now runs at 120 rpm", "the red pump was serviced"]
+    result = asyncio.run(consolidator.process_new_memories(new_memories, "main", {"area": "main"}))
+    return result, sorted(doc.page_content for doc in memory.db.get_all_docs().values())
+
+
+def test_keep_separate_of_a_group_keeps_every_member(memory, monkeypatch):
+    agent = FakeAgent({"action": "keep_separate", "new_memory_content": "a rewrite of both"})
+    result, contents = consolidate(memory, monkeypatch, agent)
+
+    assert result["success"] and len(result["memory_ids"]) == 2
+    assert contents == sorted([
+        "the red pump runs at 100 rpm", "the red pump now runs at 120 rpm", "the red pump was serviced",
+    ])
+
+
+def test_merge_of_a_group_replaces_it(memory, monkeypatch):
+    agent = FakeAgent({"action": "merge", "new_memory_content": "the red pump runs at 120 rpm, serviced"})
+    result, contents = consolidate(memory, monkeypatch, agent)
+
+    assert result["success"] and result["consolidated"] == 2
+    assert "the red pump runs at 120 rpm, serviced" in contents
+    assert "the red pump now runs at 120 rpm" not in contents
+
+
+def test_timed_out_analysis_inserts_memories_as_they_are(memory, monkeypatch):
+    agent = FakeAgent({"action": "merge", "new_memory_content": "too late"}, delay=5.0)
+    result, contents = consolidate(memory, monkeypatch, agent, processing_timeout_seconds=0.1)
+
+    assert result["success"] and len(result["memory_ids"]) == 2
+    assert "too late" not in contents
+    assert "the red pump was serviced" in contents
@@ -0,0 +1,87 @@
+"""
+Tests for the dedicated model worker thread
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers.model_worker import ModelWorker
+
+SENTENCE_SECONDS = 0.05
+
+
+class TinyTTS:
+    """Stand-in for a TTS pipeline: one short tone per sentence after a fixed delay"""
+
+    def __init__(self, key):
+        self.key = key
+        self.thread = threading.current_thread().name
+        self.calls = 0
+
+    def __call__(self, sentence):
+        self.calls += 1
+        time.sleep(SENTENCE_SECONDS)
+        return np.full(len(sentence) * 10, 0.1, dtype=np.float32)
+
+
+def sentences(model, items):
+    for item in items:
+        yield model(item)
+
+
+def test_stream_yields_first_audio_before_the_rest_is_synthesized():
+    loads = []
+    worker = ModelWorker("tts-test", lambda key: loads.append(key) or TinyTTS(key))
+    text = ["One.", "Two.", "Three.", "Four.", "Five."]
+
+    start = time.monotonic()
+    arrivals = []
+    for audio in worker.stream(lambda model: sentences(model, text)):
+        arrivals.append(time.monotonic() - start)
+    total = time.monotonic() - start
+
+    assert len(arrivals) == 5
+    assert arrivals[0] < total / 2  # time to first audio is about one sentence
+
+    # model stays loaded on its own thread
+    model = worker.submit(lambda model: model).result()
+    assert loads == [None] and worker.loaded
+    assert model.thread.startswith("tts-test") and model.calls == 5
+
+
+def test_async_stream_and_errors():
+    worker = ModelWorker("tts-test", TinyTTS)
+
+    def failing(model):
+        yield model("ok")
+        raise ValueError("bad sentence")
+
+    async def run():
+        received = []
+        try:
+            async for audio in worker.astream(failing):
+                received.append(audio)
+        except ValueError as e:
+            return received, str(e)
+
+    received, error = asyncio.run(run())
+    assert len(received) == 1 and error == "bad sentence"
+
+
+def test_abandoned_stream_stops_producing_and_key_reloads():
+    worker = ModelWorker("tts-test", TinyTTS)
+    stream = worker.stream(lambda model: sentences(model, ["a"] * 20))
+    next(stream)
+    stream.close()
+
+    model = worker.submit(lambda model: model).result()
+    assert model.calls < 5
+
+    assert asyncio.run(worker.call(lambda model: model.key, key="large")) == "large"
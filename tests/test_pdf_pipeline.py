@@ -0,0 +1,123 @@
+"""
+Tests for the page-level PDF extraction pipeline
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pymupdf = pytest.importorskip("pymupdf")
+
+from python.helpers import pdf_pipeline
+
+
+def _has_ocr() -> bool:
+    try:
+        import PIL  # noqa: F401
+        import pytesseract  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which("tesseract") is not None
+
+
+# only the tests that actually OCR need pytesseract and the tesseract binary
+needs_ocr = pytest.mark.skipif(not _has_ocr(), reason="pytesseract or tesseract binary not installed")
+
+N_PAGES = 8
+
+
+@pytest.fixture(scope="module")
+def scanned_pdf(tmp_path_factory):
+    """Multi-page PDF whose pages are images only, like a scan"""
+    path = tmp_path_factory.mktemp("pdf") / "scanned.pdf"
+    scanned = pymupdf.open()
+    for i in range(N_PAGES):
+        source = pymupdf.open()
+        page = source.new_page()
+        page.insert_text((72, 144), f"Scanned page number {i}", fontsize=24)
+        pixmap = page.get_pixmap(dpi=150)
+        scanned.new_page(width=page.rect.width, height=page.rect.height).insert_image(
+            page.rect, pixmap=pixmap
+        )
+    scanned.save(str(path))
+    return str(path)
+
+
+def extract(path, workers):
+    async def run():
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [page async for page in pdf_pipeline.extract_pages(path, executor)]
+
+    start = time.perf_counter()
+    pages = asyncio.run(run())
+    return pages, time.perf_counter() - start
+
+
+@needs_ocr
+def test_scanned_pages_are_ocrd_in_order(scanned_pdf):
+    pages, _ = extract(scanned_pdf, 2)
+
+    assert [index for index, _ in pages] == list(range(N_PAGES))
+    for index, text in pages:
+        assert f"number {index}" in text
+
+
+def test_text_pages_skip_ocr(tmp_path):
+    path = tmp_path / "text.pdf"
+    doc = pymupdf.open()
+    doc.new_page().insert_text((72, 72), "A page with a real text layer, long enough.")
+    doc.save(str(path))
+
+    with pymupdf.open(str(path)) as reopened:
+        page = reopened[0]
+        assert not pdf_pipeline._needs_ocr(page, page.get_text("text").strip())
+
+
+class CountingExecutor(ThreadPoolExecutor):
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.page_tasks = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        if fn is pdf_pipeline.extract_page_range:
+            self.page_tasks += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_page_tasks_are_submitted_as_pages_are_consumed(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_pipeline.process_pool, "MAX_WORKERS", 1)
+    path = tmp_path / "long.pdf"
+    doc = pymupdf.open()
+    for i in range(20):
+        doc.new_page().insert_text((72, 72), f"Text page number {i}, long enough to skip OCR.")
+    doc.save(str(path))
+
+    async def run():
+        with CountingExecutor() as executor:
+            pages, in_flight = [], []
+            async for page in pdf_pipeline.extract_pages(str(path), executor):
+                pages.append(page)
+                consumed = -(-len(pages) // pdf_pipeline.PAGES_PER_TASK)
+                in_flight.append(executor.page_tasks - consumed)
+            return pages, in_flight
+
+    pages, in_flight = asyncio.run(run())
+    assert [index for index, _ in pages] == list(range(20))
+    assert max(in_flight) <= 2  # twice the single worker
+
+@needs_ocr
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs multiple cores")
+def test_parallel_extraction_scales_with_cores(scanned_pdf):
+    workers = min(4, os.cpu_count() or 1)
+    _, serial = extract(scanned_pdf, 1)
+    _, parallel = extract(scanned_pdf, workers)
+
+    assert parallel < serial * 0.8
@@ -0,0 +1,60 @@
+"""
+Tests for the persistent utility model response cache
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers.response_cache import ResponseCache
+
+
+def test_exact_key_hits_and_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    cache.put("openai/gpt", "summarize", "hello world", "a greeting")
+
+    assert cache.get("openai/gpt", "summarize", "hello world") == "a greeting"
+    assert cache.get("openai/gpt", "summarize", "hello there") is None
+    assert cache.get("openai/gpt", "extract keywords", "hello world") is None
+    assert cache.get("other/model", "summarize", "hello world") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 1)
+
+    # entries survive reopening the database
+    cache.close()
+    assert ResponseCache(str(tmp_path / "cache.db")).get("openai/gpt", "summarize", "hello world") == "a greeting"
+
+
+def test_ttl_and_least_recently_used_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("m", "s", "first", "1")
+    cache.put("m", "s", "second", "2")
+    time.sleep(0.01)
+    assert cache.get("m", "s", "first") == "1"  # second is now least recently used
+    cache.put("m", "s", "third", "3")
+
+    assert cache.get("m", "s", "second") is None
+    assert cache.get("m", "s", "first") == "1"
+    assert cache.get("m", "s", "third") == "3"
+    assert cache.stats()["evictions"] == 1
+
+    expiring = ResponseCache(str(tmp_path / "expiring.db"), ttl=0.05)
+    expiring.put("m", "s", "message", "response")
+    time.sleep(0.1)
+    assert expiring.get("m", "s", "message") is None
+
+
+def test_near_duplicates_match_by_embedding(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), similarity=0.95)
+    cache.put("m", "s", "what is the weather", "sunny", embedding=[1.0, 0.0, 0.1])
+
+    assert cache.get("m", "s", "what's the weather", embedding=[0.98, 0.02, 0.1]) == "sunny"
+    assert cache.get("m", "s", "delete all files", embedding=[0.0, 1.0, 0.0]) is None
+    # near-duplicates only match under the same system prompt
+    assert cache.get("m", "other", "what's the weather", embedding=[0.98, 0.02, 0.1]) is None
+    # vectors from a different embeddings model are ignored
+    assert cache.get("m", "s", "what's the weather", embedding=[1.0, 0.0]) is None
+    assert cache.stats()["semantic_hits"] == 1
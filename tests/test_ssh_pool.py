@@ -0,0 +1,163 @@
+"""
+Tests for the shared SSH connection pool against an in-process paramiko server
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+paramiko = pytest.importorskip("paramiko")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers import ssh_pool
+from python.helpers.ssh_pool import SSHConnectionPool, SSHTarget
+
+HOST_KEY = paramiko.RSAKey.generate(1024)
+
+
+class ShellServer(paramiko.ServerInterface):
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL if password == "secret" else paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+
+def run_shell(channel):
+    # answers every line with "ran <line>" and a prompt
+    channel.send(b"$ ")
+    buffer = b""
+    while data := channel.recv(1024):
+        buffer += data
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            channel.send(b"ran " + line.strip() + b"\r\n$ ")
+
+
+class FakeSSHServer:
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(10)
+        self.port = self.sock.getsockname()[1]
+        self.transports: list = []
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(client)
+            transport.add_server_key(HOST_KEY)
+            transport.start_server(server=ShellServer())
+            self.transports.append(transport)
+            threading.Thread(target=self._accept_channels, args=(transport,), daemon=True).start()
+
+    def _accept_channels(self, transport):
+        while transport.is_active():
+            channel = transport.accept(0.5)
+            if channel is not None:
+                threading.Thread(target=run_shell, args=(channel,), daemon=True).start()
+
+    def close(self):
+        self.sock.close()
+        for transport in self.transports:
+            transport.close()
+
+
+@pytest.fixture
+def server():
+    server = FakeSSHServer()
+    yield server
+    server.close()
+
+
+def read_until(channel, suffix: bytes, timeout: float = 5.0) -> bytes:
+    arrived = threading.Event()
+    ssh_pool.on_output(channel, arrived.set)
+    output = b""
+    deadline = time.monotonic() + timeout
+    while not output.endswith(suffix):
+        assert arrived.wait(deadline - time.monotonic()), output
+        arrived.clear()
+        output += ssh_pool.read_available(channel)
+    return output
+
+
+def test_sessions_share_one_authenticated_transport(server):
+    pool = SSHConnectionPool(idle_timeout=-1)
+    target = SSHTarget("127.0.0.1", server.port, "root", "secret")
+    try:
+        first = pool.open_shell(target)
+        second = pool.open_shell(target)
+        assert first.get_transport() is second.get_transport()
+        assert len(server.transports) == 1
+
+        for channel, command in ((first, b"one"), (second, b"two")):
+            read_until(channel, b"$ ")
+            channel.send(command + b"\n")
+            assert read_until(channel, b"$ ") == b"ran " + command + b"\r\n$ "
+
+        pool.release(target, first)
+        assert first.closed and not second.closed
+        stats = pool.stats()
+        assert (stats["connections"], stats["channels"], stats["connects"]) == (1, 1, 1)
+        assert stats["channels_opened"] == 2
+    finally:
+        pool.close()
+
+
+def test_dead_transport_is_replaced_on_next_open(server):
+    pool = SSHConnectionPool(idle_timeout=-1)
+    target = SSHTarget("127.0.0.1", server.port, "root", "secret")
+    try:
+        channel = pool.open_shell(target)
+        server.transports[0].close()  # server side drops the connection
+        deadline = time.monotonic() + 5
+        while channel.get_transport().is_active():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        pool.release(target, channel)
+        channel = pool.open_shell(target)
+        read_until(channel, b"$ ")
+        channel.send(b"again\n")
+        assert read_until(channel, b"$ ").startswith(b"ran again")
+        assert (pool.stats()["connects"], pool.stats()["reconnects"]) == (2, 1)
+    finally:
+        pool.close()
+
+
+def test_idle_connection_closes_unless_reused(server):
+    pool = SSHConnectionPool(idle_timeout=0.2)
+    target = SSHTarget("127.0.0.1", server.port, "root", "secret")
+    try:
+        pool.release(target, pool.open_shell(target))
+        pool.release(target, pool.open_shell(target))  # reused before the timeout
+        assert pool.stats()["connects"] == 1
+
+        deadline = time.monotonic() + 5
+        while server.transports[0].is_active():
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        assert pool.stats()["connections"] == 0
+    finally:
+        pool.close()
@@ -0,0 +1,93 @@
+"""
+Tests for deferred imports, import profiling and startup readiness
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers import startup
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    # modules that sleep while imported, removed again afterwards
+    def write(name: str, body: str = ""):
+        (tmp_path / f"{name}.py").write_text(body)
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield write
+    for name in list(sys.modules):
+        if name.startswith("startup_test_"):
+            del sys.modules[name]
+
+
+def test_lazy_module_imports_on_first_use(modules):
+    modules("startup_test_heavy", "import time\ntime.sleep(0.02)\nVALUE = 1\n")
+    loaded = []
+    heavy = startup.lazy_import("startup_test_heavy", on_load=loaded.append)
+    assert "startup_test_heavy" not in sys.modules and not startup.is_loaded(heavy)
+
+    assert heavy.VALUE == 1
+    heavy.VALUE = 2  # lands on the real module
+    assert sys.modules["startup_test_heavy"].VALUE == 2 and heavy.VALUE == 2
+    assert startup.load(heavy) is sys.modules["startup_test_heavy"]
+    assert len(loaded) == 1 and startup.is_loaded(heavy)
+    assert any(
+        entry["kind"] == "deferred_import" and entry["name"] == "startup_test_heavy" and entry["duration_ms"] >= 20
+        for entry in startup.report()["timeline"]
+    )
+    # once imported, there's nothing left to defer
+    assert startup.lazy_import("startup_test_heavy") is sys.modules["startup_test_heavy"]
+
+
+def test_profiler_times_imports_exclusively(modules):
+    modules("startup_test_outer", "import time\ntime.sleep(0.02)\nimport startup_test_inner\n")
+    modules("startup_test_inner", "import time\ntime.sleep(0.04)\n")
+    profiler = startup.ImportProfiler()
+    profiler.install()
+    try:
+        import startup_test_outer  # noqa: F401
+    finally:
+        profiler.uninstall()
+
+    records = {record.name: record for record in profiler.records}
+    outer, inner = records["startup_test_outer"], records["startup_test_inner"]
+    assert inner.depth == outer.depth + 1
+    assert 20 <= outer.self_ms < 40 and outer.cumulative_ms >= 60
+    assert inner.self_ms >= 40
+    assert profiler.by_package()["startup_test_outer"] == outer.self_ms
+    # modules keep their real loader
+    assert type(sys.modules["startup_test_outer"].__loader__).__name__ == "SourceFileLoader"
+
+
+def test_requests_wait_for_warming_subsystems():
+    async def warming():
+        await asyncio.sleep(0.1)
+        return "warm"
+
+    async def failing():
+        raise RuntimeError("no model")
+
+    async def scenario():
+        task = startup.warm("test_slow", warming)
+        assert not startup.is_ready("test_slow")
+        assert not await startup.wait_ready(["test_slow"], timeout=0.01)
+        assert await startup.wait_ready(["test_slow", "never_started"], timeout=5)
+        assert await task.result() == "warm"
+
+        failed = startup.warm("test_failing", failing)
+        assert await startup.wait_ready(["test_failing"], timeout=5)
+        with pytest.raises(RuntimeError):
+            await failed.result()
+
+    asyncio.run(scenario())
+    subsystems = startup.report()["subsystems"]
+    assert subsystems["test_slow"]["state"] == "ready" and subsystems["test_slow"]["duration_ms"] >= 100
+    assert (subsystems["test_failing"]["state"], subsystems["test_failing"]["error"]) == ("failed", "RuntimeError: no model")
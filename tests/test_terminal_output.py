@@ -0,0 +1,57 @@
+"""
+Tests for incremental terminal output cleaning
+"""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers.terminal_output import OutputSignal, TerminalOutput, clean_string
+
+
+def feed_in_chunks(output: TerminalOutput, data: bytes, rng: random.Random):
+    position = 0
+    while position < len(data):
+        size = rng.randint(1, 6)
+        output.feed(data[position:position + size])
+        position += size
+
+
+def test_chunked_output_cleans_like_the_whole_string():
+    rng = random.Random(7)
+    pieces = ["ab", " ", "\r", "\n", "\r\n", ">", "> ", "\x1b[31m", "\x1b[0m", "\x1b[2K", "\x00", "é", "✓", "\t"]
+    for _ in range(3000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        output = TerminalOutput()
+        feed_in_chunks(output, text.encode(), rng)
+        assert output.text == clean_string(text), repr(text)
+
+
+def test_progress_redraws_keep_only_the_last_state():
+    output = TerminalOutput()
+    output.feed(b"\r\n> downloading\n")
+    for percent in range(0, 101):
+        output.feed(f"\r\x1b[2K{percent}%".encode())
+    assert len(output._line) < 10  # overwritten progress is dropped, not re-cleaned
+    output.feed(b"\ndone\n$ ")
+
+    assert output.text == "downloading\n100%\ndone\n$"
+    assert output.tail(2) == ["done", "$"]
+
+
+def test_signal_wakes_waiters_from_another_thread():
+    signal = OutputSignal()
+
+    async def main():
+        assert not await signal.wait(0.01)
+        threading.Timer(0.05, signal.notify).start()
+        assert await signal.wait(5)
+        assert await signal.wait(0)  # stays set until cleared
+        signal.clear()
+        assert not await signal.wait(0.01)
+
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Tests for the utility call scheduler
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python.helpers import util_scheduler
+from python.helpers.util_scheduler import BACKGROUND, FOREGROUND, PackItem, UtilScheduler
+
+
+def test_identical_calls_in_flight_share_one_result():
+    scheduler = UtilScheduler("test")
+    runs = []
+
+    async def run():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "summary"
+
+    async def main():
+        return await asyncio.gather(*[scheduler.call("same", run) for _ in range(5)], scheduler.call("other", run))
+
+    assert asyncio.run(main()) == ["summary"] * 6
+    assert len(runs) == 2
+    assert scheduler.stats()["shared"] == 4
+
+
+def test_foreground_calls_are_served_before_background():
+    scheduler = UtilScheduler("test", max_concurrent=1)
+    order = []
+
+    def runner(name):
+        async def run():
+            order.append(name)
+            await asyncio.sleep(0.01)
+            return name
+        return run
+
+    async def main():
+        first = asyncio.create_task(scheduler.call("first", runner("first")))
+        await asyncio.sleep(0)
+        queued = [
+            scheduler.call("memorize", runner("memorize"), priority=BACKGROUND),
+            scheduler.call("consolidate", runner("consolidate"), priority=BACKGROUND),
+            scheduler.call("recall", runner("recall"), priority=FOREGROUND),
+        ]
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(main())
+    assert order == ["first", "recall", "memorize", "consolidate"]
+
+
+def test_waiting_prompts_are_packed_and_unanswered_ones_run_alone():
+    scheduler = UtilScheduler("test", max_concurrent=1, pack_max=3)
+    packs, single = [], []
+
+    async def pack(items):
+        packs.append([item.message for item in items])
+        response = '[{"id": 0, "response": "A"}, {"id": 1, "response": "B"}]'  # third task left out
+        return util_scheduler.unpack_response(response, len(items))
+
+    def runner(name):
+        async def run():
+            single.append(name)
+            await asyncio.sleep(0.01)
+            return name.lower()
+        return run
+
+    def call(name):
+        return scheduler.call(name, runner(name), pack_item=PackItem("sys", name), pack=pack)
+
+    async def main():
+        blocker = asyncio.create_task(scheduler.call("blocker", runner("blocker")))
+        await asyncio.sleep(0)
+        return await asyncio.gather(blocker, call("a"), call("b"), call("c"))
+
+    assert asyncio.run(main()) == ["blocker", "A", "B", "c"]
+    assert packs == [["a", "b", "c"]]
+    assert single == ["blocker", "c"]
+    assert scheduler.stats()["packed"] == 2
+
+
+def test_agent_calls_the_model_directly_when_the_queue_is_full(monkeypatch):
+    agent = pytest.importorskip("agent")
+    scheduler = UtilScheduler("test", max_concurrent=1, max_waiting=0)
+    monkeypatch.setitem(util_scheduler._schedulers, "util-model", scheduler)
+    release = asyncio.Event()
+
+    class Model:
+        model_name = "util-model"
+
+        async def unified_call(self, system_message, user_message, **kwargs):
+            if user_message == "first":
+                await release.wait()
+            return f"re: {user_message}", ""
+
+    class FakeAgent:
+        rate_limiter_callback = None
+
+        def get_utility_model(self):
+            return Model()
+
+        async def call_extensions(self, *args, **kwargs):
+            pass
+
+    async def main():
+        call = lambda message: agent.Agent.call_utility_model(FakeAgent(), "system", message, background=True)
+        first = asyncio.create_task(call("first"))
+        await asyncio.sleep(0.01)  # holds the only slot
+        second = await call("second")  # would wait past max_waiting
+        release.set()
+        return await first, second
+
+    assert asyncio.run(main()) == ("re: first", "re: second")
+    assert scheduler.stats()["rejected"] == 1
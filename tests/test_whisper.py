@@ -0,0 +1,113 @@
+"""
+Tests for batched whisper decoding, against a stub model and tokenizer
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+whisper_helper = pytest.importorskip("python.helpers.whisper")
+
+TIMESTAMP_BEGIN = 1000
+EOT = 999
+WORDS = {1: " pump", 2: " starts", 3: " stops"}
+
+
+class StubTokenizer:
+    timestamp_begin = TIMESTAMP_BEGIN
+    eot = EOT
+
+    def decode(self, tokens):
+        return "".join(WORDS[token] for token in tokens)
+
+
+@pytest.fixture
+def stub_whisper(monkeypatch):
+    decoded = []  # (window indices, temperature) of every decode call
+
+    def decode(model, mels, options):
+        decoded.append(([int(mel) for mel in mels], options.temperature))
+        return [model.script[int(mel)](options.temperature) for mel in mels]
+
+    stub = SimpleNamespace(
+        audio=SimpleNamespace(SAMPLE_RATE=16000, HOP_LENGTH=160, N_SAMPLES=480000),
+        tokenizer=SimpleNamespace(get_tokenizer=lambda *args, **kwargs: StubTokenizer()),
+        DecodingOptions=lambda fp16, temperature: SimpleNamespace(temperature=temperature),
+        decode=decode,
+    )
+    monkeypatch.setattr(whisper_helper, "whisper", stub)
+    return decoded
+
+
+def result(tokens=(1,), temperature=0.0, avg_logprob=-0.2, compression_ratio=1.2, no_speech_prob=0.1):
+    return SimpleNamespace(
+        tokens=list(tokens),
+        text=StubTokenizer().decode([t for t in tokens if t < EOT]),
+        language="en",
+        temperature=temperature,
+        avg_logprob=avg_logprob,
+        compression_ratio=compression_ratio,
+        no_speech_prob=no_speech_prob,
+    )
+
+
+def stamp(seconds):
+    return TIMESTAMP_BEGIN + round(seconds / 0.02)
+
+
+def test_needs_fallback_follows_transcribe():
+    assert not whisper_helper._needs_fallback(result())
+    assert whisper_helper._needs_fallback(result(compression_ratio=3.0))
+    assert whisper_helper._needs_fallback(result(avg_logprob=-1.5))
+    # silence is not retried
+    assert not whisper_helper._needs_fallback(result(avg_logprob=-1.5, no_speech_prob=0.9))
+
+
+def test_only_degenerate_windows_are_decoded_again(stub_whisper):
+    model = SimpleNamespace(script={
+        0: lambda t: result(temperature=t),
+        1: lambda t: result(temperature=t, compression_ratio=3.0 if t < 0.4 else 1.5),
+        2: lambda t: result(temperature=t),
+    })
+    decoded = whisper_helper._decode_with_fallback(model, np.arange(3))
+
+    assert stub_whisper == [([0, 1, 2], 0.0), ([1], 0.2), ([1], 0.4)]
+    assert [r.temperature for r in decoded] == [0.0, 0.4, 0.0]
+
+
+def test_window_is_split_into_segments_at_timestamp_pairs(stub_whisper):
+    model = SimpleNamespace(is_multilingual=False, num_languages=1)
+    tokens = [stamp(0), 1, 2, stamp(1.5), stamp(1.5), 1, 3, stamp(2.4)]
+    window = whisper_helper._window_result(model, result(tokens), duration=3.0)
+
+    assert window["text"] == " pump starts pump stops"
+    assert [(s["id"], s["start"], s["end"], s["text"]) for s in window["segments"]] == [
+        (0, 0.0, 1.5, " pump starts"),
+        (1, 1.5, 2.4, " pump stops"),
+    ]
+    assert window["segments"][1]["tokens"] == tokens[4:]
+
+
+def test_window_without_end_timestamp_lasts_to_the_clip_end(stub_whisper):
+    model = SimpleNamespace(is_multilingual=False, num_languages=1)
+    window = whisper_helper._window_result(model, result([stamp(0.5), 1, 2]), duration=3.0)
+    assert [(s["start"], s["end"]) for s in window["segments"]] == [(0.5, 3.0)]
+
+
+def test_silent_window_has_no_text(stub_whisper):
+    model = SimpleNamespace(is_multilingual=False, num_languages=1)
+    window = whisper_helper._window_result(model, result(avg_logprob=-1.5, no_speech_prob=0.9), duration=3.0)
+    assert window == {"text": "", "segments": [], "language": "en"}
+
+
+def test_lone_clip_goes_through_transcribe(stub_whisper):
+    transcribed = []
+    model = SimpleNamespace(transcribe=lambda clip, fp16: transcribed.append(len(clip)) or {"text": "x"})
+
+    assert whisper_helper._run_model(model, [np.zeros(16000, dtype=np.float32)]) == [{"text": "x"}]
+    assert transcribed == [16000] and stub_whisper == []
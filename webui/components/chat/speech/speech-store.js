@@ -3,6 +3,7 @@ import { updateChatInput, sendMessage } from "/index.js";
 import { sleep } from "/js/sleep.js";
 import { store as microphoneSettingStore } from "/components/settings/speech/microphone-setting-store.js";
 import * as shortcuts from "/js/shortcuts.js";
+import * as api from "/js/api.js";
 
 const Status = {
   INACTIVE: "inactive",
@@ -403,30 +404,32 @@ const model = {
   // Kokoro TTS
   async speakWithKokoro(text, waitForPrevious = false, terminator = null) {
     try {
-      // synthesize on the backend
-      const response = await sendJsonData("/synthesize", { text });
-
-      // wait for previous to finish if requested
-      while (waitForPrevious && this.isSpeaking) await sleep(25);
-      if (terminator && terminator()) return;
-
-      // stop previous if any
-      this.stopAudio();
-
-      if (response.success) {
-        if (response.audio_parts) {
-          // Multiple chunks - play sequentially
-          for (const audioPart of response.audio_parts) {
-            if (terminator && terminator()) return;
-            await this.playAudio(audioPart);
-            await sleep(100); // Brief pause
-          }
-        } else if (response.audio) {
-          // Single audio
-          this.playAudio(response.audio);
+      // synthesize on the backend, audio of each sentence arrives as soon as it is ready
+      const response = await api.fetchApi("/synthesize", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ text, stream: true }),
+      });
+      if (!response.ok) throw new Error(await response.text());
+
+      let playback = null;
+      for await (const part of readJsonLines(response)) {
+        if (part.error) throw new Error(part.error);
+
+        if (playback) {
+          // play sentences back to back
+          await playback;
+        } else {
+          // wait for previous to finish if requested
+          while (waitForPrevious && this.isSpeaking) await sleep(25);
+          if (terminator && terminator()) return;
+
+          // stop previous if any
+          this.stopAudio();
         }
-      } else {
-        throw new Error("Kokoro TTS error:", response.error);
+        if (terminator && terminator()) return;
+
+        playback = this.playAudio(part.audio);
       }
     } catch (error) {
       throw new Error("Kokoro TTS error:", error);
@@ -965,3 +968,22 @@ export const store = createStore("speech", model);
 // Event listeners
 document.addEventListener("settings-updated", () => store.loadSettings());
 // document.addEventListener("DOMContentLoaded", () => speechStore.init());
+
+// parse a newline delimited JSON response as its lines arrive
+async function* readJsonLines(response) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (value) buffer += decoder.decode(value, { stream: true });
+    let newline;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) yield JSON.parse(line);
+    }
+    if (done) break;
+  }
+  if (buffer.trim()) yield JSON.parse(buffer);
+}
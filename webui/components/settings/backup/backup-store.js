@@ -34,7 +34,8 @@ const model = {
 
   // Progress state
   progressData: null,
-  progressEventSource: null,
+  progressTimer: null,
+  operationId: null,
 
   // Restore state
   backupFile: null,
@@ -60,6 +61,7 @@ const model = {
   },
 
   resetState() {
+    this.stopProgress();
     this.loading = false;
     this.error = '';
     this.backupFile = null;
@@ -396,6 +398,7 @@ const model = {
       this.addFileOperation('Starting backup creation...');
 
       const metadata = this.backupMetadataConfig;
+      const operationId = this.startProgress('Compressing');
 
       // Use fetch directly since backup_create returns a file download, not JSON
       const response = await fetchApi('/backup_create', {
@@ -405,7 +408,9 @@ const model = {
           include_patterns: metadata.include_patterns,
           exclude_patterns: metadata.exclude_patterns,
           include_hidden: metadata.include_hidden || false,
-          backup_name: metadata.backup_name
+          backup_name: metadata.backup_name,
+          incremental: metadata.incremental || false,
+          operation_id: operationId
         })
       });
 
@@ -438,6 +443,7 @@ const model = {
       this.addFileOperation(`Error: ${error.message}`);
     } finally {
       this.loading = false;
+      this.stopProgress();
     }
   },
 
@@ -463,15 +469,47 @@ const model = {
     }
   },
 
-  cancelBackup() {
-    if (this.progressEventSource) {
-      this.progressEventSource.close();
-      this.progressEventSource = null;
+  // Progress of a running backup or restore, polled from backup_progress
+  startProgress(label) {
+    this.stopProgress();
+    this.operationId = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    this.progressTimer = setInterval(() => this.pollProgress(label), 1000);
+    return this.operationId;
+  },
+
+  async pollProgress(label) {
+    if (!this.operationId) return;
+    try {
+      const progress = await sendJsonData("backup_progress", { operation_id: this.operationId });
+      if (!progress.success) return;
+      this.progressData = progress;
+      const mb = (bytes) => (bytes / (1024 * 1024)).toFixed(1);
+      this.loadingMessage = `${label} ${progress.files_done}/${progress.files_total} files, ` +
+        `${mb(progress.bytes_done)}/${mb(progress.bytes_total)} MB`;
+    } catch (error) {
+      console.error('Progress error:', error);
     }
-    this.loading = false;
+  },
+
+  stopProgress() {
+    if (this.progressTimer) {
+      clearInterval(this.progressTimer);
+      this.progressTimer = null;
+    }
+    this.operationId = null;
     this.progressData = null;
   },
 
+  async cancelBackup() {
+    if (!this.operationId) return;
+    try {
+      await sendJsonData("backup_progress", { operation_id: this.operationId, cancel: true });
+      this.addFileOperation('Cancelling...');
+    } catch (error) {
+      console.error('Cancel error:', error);
+    }
+  },
+
   resetToDefaults() {
     this.getDefaultBackupMetadata().then(defaultMetadata => {
       if (this.backupEditor) {
@@ -700,6 +738,7 @@ const model = {
       formData.append('metadata', this.getEditorValue());
       formData.append('overwrite_policy', this.overwritePolicy);
       formData.append('clean_before_restore', this.cleanBeforeRestore);
+      formData.append('operation_id', this.startProgress('Restoring'));
 
       const response = await fetchApi('/backup_restore', {
         method: 'POST',
@@ -757,6 +796,7 @@ const model = {
       this.addFileOperation(`Error: ${error.message}`);
     } finally {
       this.loading = false;
+      this.stopProgress();
     }
   },
 